@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+App Factory App Scaffolding
+
+Precompiles templates/app_template once into a manifest of static files and
+placeholder-bearing files ({{NAME}} markers, split into literal/placeholder
+segments). The manifest is persisted to .cache/app_template_manifest.json
+and refreshed for any template file whose mtime or size changed.
+
+Scaffolding a build is then one pass: static files are copied from a
+content-addressed copy (.cache/app_template_objects/<sha256>, never the
+template itself) and every other file is rendered from its segments.
+'.template' is dropped from output names (package.template.json ->
+package.json). Output depends only on the template and the values given.
+
+Values are escaped for where each placeholder sits: JSON/JS string escaping
+inside quotes in .json/.js/.ts/.tsx files (JSX text gets an expression
+container when needed) and shell quoting in .sh files; values that cannot
+be made safe (e.g. shell metacharacters in an unquoted argument list) are
+rejected. CODE_PLACEHOLDERS are generated source and inserted as is.
+
+With --link, static files are hard-linked to the objects instead (after
+checking each object's hash). Linked builds share those inodes, so an
+in-place edit in one shows up in the others: use it for throwaway builds
+such as benchmarks, not for builds that are edited after scaffolding.
+
+Usage:
+    python -m appfactory.app_scaffold build
+    python -m appfactory.app_scaffold placeholders
+    python -m appfactory.app_scaffold new <dest> --values values.json [--set KEY=VALUE ...] [--link]
+    python -m appfactory.app_scaffold bench [--count N] [--link]
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .jsonio import read_json, write_json
+
+MANIFEST_VERSION = 2
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Z][A-Z0-9_]*)\}\}")
+TEMPLATE_MARKER = ".template"
+# Output extensions whose placeholders are escaped as JSON/JS strings or shell words
+JS_EXTENSIONS = {".js", ".jsx", ".ts", ".tsx"}
+SHELL_EXTENSIONS = {".sh"}
+# Placeholders whose values are generated source code (JSX), inserted without escaping
+CODE_PLACEHOLDERS = {"PREMIUM_FEATURES"}
+SHELL_WORDS_PATTERN = re.compile(r"^[\w@./:+=~^\s-]*$")
+JSX_SPECIAL = set("{}<>")
+
+_manifest_lock = threading.Lock()
+_manifest: Optional[Dict[str, Any]] = None
+# Objects whose hash was checked, by digest -> (ctime_ns, size) at the time
+_verified_objects: Dict[str, Tuple[int, int]] = {}
+
+class ScaffoldError(Exception):
+    """Raised when a build cannot be scaffolded (missing values, existing destination)."""
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_template_dir() -> Path:
+    """Get the app template directory."""
+    return get_repo_root() / "templates" / "app_template"
+
+def get_manifest_path() -> Path:
+    """Get the path of the persisted template manifest."""
+    return get_repo_root() / ".cache" / "app_template_manifest.json"
+
+def get_objects_dir() -> Path:
+    """Get the directory of read-only static file copies that builds link to."""
+    return get_repo_root() / ".cache" / "app_template_objects"
+
+def output_name(relpath: str) -> str:
+    """Build-relative output path for a template file (drops '.template' from the name)."""
+    directory, name = os.path.split(relpath)
+    return os.path.join(directory, name.replace(TEMPLATE_MARKER, "", 1)).replace(os.sep, "/")
+
+def quote_context(line: str) -> str:
+    """The quote character open at the end of a line prefix ('' when outside any string)."""
+    quote = ""
+    escaped = False
+    for char in line:
+        if escaped:
+            escaped = False
+        elif char == "\\" and quote != "'":
+            escaped = True
+        elif quote:
+            if char == quote:
+                quote = ""
+        elif char in "\"'`":
+            quote = char
+    return quote
+
+def compile_segments(content: str) -> List[Any]:
+    """Split text into literal strings and [placeholder, quote] markers."""
+    segments: List[Any] = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(content):
+        if match.start() > position:
+            segments.append(content[position:match.start()])
+        line = content[content.rfind("\n", 0, match.start()) + 1:match.start()]
+        segments.append([match.group(1), quote_context(PLACEHOLDER_PATTERN.sub("", line))])
+        position = match.end()
+    if position < len(content):
+        segments.append(content[position:])
+    return segments
+
+def escape_value(name: str, value: str, target: str, quote: str) -> str:
+    """
+    Escape a placeholder value for its position in a target file.
+
+    Raises ScaffoldError for values that cannot be placed safely.
+    """
+    extension = os.path.splitext(target)[1]
+    if name in CODE_PLACEHOLDERS or (extension not in JS_EXTENSIONS | SHELL_EXTENSIONS | {".json"}):
+        return value
+
+    if extension in SHELL_EXTENSIONS:
+        if quote == '"':
+            return re.sub(r'([\\"$`])', r"\\\1", value)
+        if quote == "'":
+            return value.replace("'", "'\\''")
+        if not SHELL_WORDS_PATTERN.match(value):
+            raise ScaffoldError(f"Unsafe value for {name} in {target}: "
+                                "only words of letters, digits and @./:+=~^- are allowed")
+        return value
+
+    if quote in ('"', "'"):
+        escaped = json.dumps(value, ensure_ascii=False)[1:-1]
+        return escaped.replace("'", "\\'") if quote == "'" else escaped
+    if quote == "`":
+        return value.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
+    if extension == ".json":
+        try:
+            json.loads(value)
+        except ValueError:
+            raise ScaffoldError(f"Value for {name} in {target} must be JSON (placeholder is not quoted)")
+        return value
+    # Unquoted in a JS/TS file: JSX text
+    return "{" + json.dumps(value, ensure_ascii=False) + "}" if JSX_SPECIAL & set(value) else value
+
+def object_intact(digest: str) -> bool:
+    """Whether a static file object exists and still hashes to its name (checked once per change)."""
+    object_path = get_objects_dir() / digest
+    try:
+        file_stat = object_path.stat()
+    except FileNotFoundError:
+        return False
+    # ctime changes on any write or chmod and cannot be set back by the writer
+    stamp = (file_stat.st_ctime_ns, file_stat.st_size)
+    if _verified_objects.get(digest) == stamp:
+        return True
+    if hashlib.sha256(object_path.read_bytes()).hexdigest() != digest:
+        return False
+    _verified_objects[digest] = stamp
+    return True
+
+def _store_object(raw: bytes, digest: str) -> None:
+    object_path = get_objects_dir() / digest
+    if object_intact(digest):
+        return
+    object_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = object_path.with_name(f"{digest}.tmp.{os.getpid()}")
+    tmp_path.write_bytes(raw)
+    os.chmod(tmp_path, 0o444)
+    os.replace(tmp_path, object_path)
+
+def compile_template_file(template_path: Path) -> Dict[str, Any]:
+    """Compile one template file into its manifest entry."""
+    raw = template_path.read_bytes()
+    file_stat = template_path.stat()
+    digest = hashlib.sha256(raw).hexdigest()
+    entry = {
+        "target": output_name(str(template_path.relative_to(get_template_dir()))),
+        "mtime_ns": file_stat.st_mtime_ns,
+        "size": file_stat.st_size,
+        "mode": stat.S_IMODE(file_stat.st_mode),
+        "sha256": digest,
+        "placeholders": [],
+        "segments": None
+    }
+
+    try:
+        content = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        content = None
+    if content is not None and PLACEHOLDER_PATTERN.search(content):
+        entry["segments"] = compile_segments(content)
+        entry["placeholders"] = sorted({s[0] for s in entry["segments"] if isinstance(s, list)})
+    else:
+        _store_object(raw, digest)
+    return entry
+
+def _refresh_manifest(manifest: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """Bring a manifest up to date with the template tree; returns (manifest, changed)."""
+    if manifest is None or manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "files": {}}
+
+    files = {}
+    changed = False
+    template_dir = get_template_dir()
+    for dirpath, dirnames, filenames in os.walk(template_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            relpath = str(path.relative_to(template_dir)).replace(os.sep, "/")
+            file_stat = path.stat()
+            entry = manifest["files"].get(relpath)
+            if (entry is None or entry["mtime_ns"] != file_stat.st_mtime_ns
+                    or entry["size"] != file_stat.st_size
+                    or (entry["segments"] is None and not object_intact(entry["sha256"]))):
+                entry = compile_template_file(path)
+                changed = True
+            files[relpath] = entry
+
+    if not changed and set(files) == set(manifest["files"]):
+        return manifest, False
+
+    placeholders = sorted({name for entry in files.values() for name in entry["placeholders"]})
+    return {"version": MANIFEST_VERSION, "placeholders": placeholders, "files": files}, True
+
+def load_scaffold_manifest(force_rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Get the compiled template manifest.
+
+    The persisted manifest is read once per process; every call re-stats the
+    template tree and recompiles files whose mtime or size changed.
+    """
+    global _manifest
+
+    with _manifest_lock:
+        manifest = None if force_rebuild else _manifest
+        if manifest is None and not force_rebuild:
+            try:
+                manifest = read_json(get_manifest_path())
+            except (OSError, json.JSONDecodeError):
+                manifest = None
+
+        manifest, changed = _refresh_manifest(manifest)
+        if changed:
+            try:
+                get_manifest_path().parent.mkdir(parents=True, exist_ok=True)
+                write_json(get_manifest_path(), manifest, compact=True)
+            except OSError as e:
+                print(f"Warning: Could not save template manifest: {e}", file=sys.stderr)
+        _manifest = manifest
+        return manifest
+
+def render_segments(segments: List[Any], values: Dict[str, str], target: Optional[str] = None) -> str:
+    """
+    Substitute placeholder values into compiled segments in one pass.
+
+    With a target file name, values are escaped for their position in it.
+    """
+    if target is None:
+        return "".join(values[s[0]] if isinstance(s, list) else s for s in segments)
+    return "".join(escape_value(s[0], values[s[0]], target, s[1]) if isinstance(s, list) else s
+                   for s in segments)
+
+def default_values(values: Dict[str, Any]) -> Dict[str, str]:
+    """Fill derivable placeholders (slugs, bundle identifier) and stringify values."""
+    values = {k: v if isinstance(v, str) else json.dumps(v) for k, v in values.items()}
+    if "APP_NAME" in values:
+        slug = re.sub(r"[^a-z0-9]+", "-", values["APP_NAME"].lower()).strip("-")
+        values.setdefault("APP_NAME_SLUG", slug)
+        values.setdefault("APP_SLUG", slug)
+        values.setdefault("BUNDLE_IDENTIFIER", "com.appfactory." + slug.replace("-", ""))
+    return values
+
+def scaffold_app(dest: str, values: Dict[str, Any], link: bool = False,
+                 manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Materialize a new build from the app template.
+
+    Static files are copied from their object copies (hard-linked with
+    link=True, once the object's hash checks out); placeholder files are
+    rendered. Raises ScaffoldError if a placeholder has no value, a value
+    cannot be placed safely or dest is not empty.
+    """
+    started = time.perf_counter()
+    manifest = manifest or load_scaffold_manifest()
+    values = default_values(values)
+    missing = [name for name in manifest["placeholders"] if name not in values]
+    if missing:
+        raise ScaffoldError(f"Missing values for placeholders: {', '.join(missing)}")
+    if os.path.exists(dest) and os.listdir(dest):
+        raise ScaffoldError(f"Destination is not empty: {dest}")
+
+    objects_dir = get_objects_dir()
+    counts = {"linked": 0, "copied": 0, "rendered": 0}
+    created = set()
+    for relpath in sorted(manifest["files"]):
+        entry = manifest["files"][relpath]
+        target = os.path.join(dest, entry["target"])
+        directory = os.path.dirname(target)
+        if directory not in created:
+            os.makedirs(directory, exist_ok=True)
+            created.add(directory)
+
+        if entry["segments"] is not None:
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(render_segments(entry["segments"], values, entry["target"]))
+            os.chmod(target, entry["mode"])
+            counts["rendered"] += 1
+            continue
+
+        source = str(objects_dir / entry["sha256"])
+        if not object_intact(entry["sha256"]):
+            raise ScaffoldError(f"Template object for {entry['target']} was modified; run 'app_scaffold build'")
+        if link:
+            try:
+                os.link(source, target)
+                counts["linked"] += 1
+                continue
+            except OSError:
+                pass
+        shutil.copyfile(source, target)
+        os.chmod(target, entry["mode"])
+        counts["copied"] += 1
+
+    return {"dest": dest, **counts, "seconds": round(time.perf_counter() - started, 4)}
+
+def sample_values(index: int = 0) -> Dict[str, str]:
+    """Deterministic placeholder values for benchmarks and tests."""
+    values = {name: f"sample-{name.lower()}" for name in load_scaffold_manifest()["placeholders"]}
+    values.update({
+        "APP_NAME": f"Sample App {index}",
+        "PRIMARY_COLOR": "#4F46E5",
+        "SECONDARY_COLOR": "#22D3EE",
+        "SPLASH_BACKGROUND_COLOR": "#FFFFFF",
+        "CREATED_AT": "2026-01-01T00:00:00",
+        "EXPO_MODULES": "expo-haptics",
+        "PREMIUM_FEATURES": "[]"
+    })
+    for derived in ["APP_NAME_SLUG", "APP_SLUG", "BUNDLE_IDENTIFIER"]:
+        values.pop(derived, None)
+    return values
+
+def benchmark(count: int = 200, link: bool = False) -> Dict[str, Any]:
+    """Scaffold count builds into a temp directory and report throughput."""
+    manifest = load_scaffold_manifest()
+    with tempfile.TemporaryDirectory(dir=str(get_repo_root() / ".cache")) as tmp:
+        started = time.perf_counter()
+        for i in range(count):
+            scaffold_app(os.path.join(tmp, f"build_{i:04d}"), sample_values(i), link, manifest)
+        elapsed = time.perf_counter() - started
+    return {
+        "builds": count,
+        "files_per_build": len(manifest["files"]),
+        "seconds": round(elapsed, 3),
+        "builds_per_minute": round(count / elapsed * 60) if elapsed else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory app scaffolding")
+    parser.add_argument("command", choices=["build", "placeholders", "new", "bench"], help="Command to execute")
+    parser.add_argument("dest", nargs="?", help="Build directory for new")
+    parser.add_argument("--values", help="JSON file of placeholder values")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Placeholder value")
+    parser.add_argument("--link", action="store_true",
+                        help="Hard-link static files to shared objects (throwaway builds only)")
+    parser.add_argument("--count", type=int, default=200, help="Builds to scaffold for bench")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            manifest = load_scaffold_manifest(force_rebuild=True)
+            rendered = sum(1 for e in manifest["files"].values() if e["segments"] is not None)
+            print(f"✓ Compiled {len(manifest['files'])} template files "
+                  f"({rendered} with placeholders): {get_manifest_path()}")
+
+        elif args.command == "placeholders":
+            manifest = load_scaffold_manifest()
+            for name in manifest["placeholders"]:
+                files = [e["target"] for e in manifest["files"].values() if name in e["placeholders"]]
+                print(f"{name:<28} {', '.join(files)}")
+
+        elif args.command == "new":
+            if not args.dest:
+                print("Error: dest required for new", file=sys.stderr)
+                sys.exit(1)
+            values = read_json(args.values) if args.values else {}
+            values.setdefault("CREATED_AT", datetime.now().isoformat())
+            for item in args.set:
+                key, _, value = item.partition("=")
+                values[key] = value
+            result = scaffold_app(args.dest, values, link=args.link)
+            print(f"✓ Scaffolded {result['dest']}: {result['rendered']} rendered, "
+                  f"{result['linked']} linked, {result['copied']} copied in {result['seconds']}s")
+
+        elif args.command == "bench":
+            result = benchmark(args.count, link=args.link)
+            print(f"Scaffolded {result['builds']} builds ({result['files_per_build']} files each) "
+                  f"in {result['seconds']}s: {result['builds_per_minute']} builds/minute")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
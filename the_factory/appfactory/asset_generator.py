@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+App Factory Asset Generator
+
+Pure-Python replacement for the macOS-only sips fallback: renders the
+required app assets (1024x1024 icon, 1284x2778 splash, adaptive icon,
+favicon) from the Stage 08 brand output and encodes them as PNGs with
+zlib, so asset stages run headless on any Linux worker.
+
+Each asset is a monogram badge (the app's initial in a 5x7 block font on
+a circle) in the brand's colors. Shapes are rasterized as horizontal
+spans written with slice assignment, one process per asset. Output is
+deterministic for a given brand, and generation_log.json has the same
+format as the sips generator's.
+
+Usage:
+    python -m appfactory.asset_generator generate <output_dir> [--brand <stage08.json|idea_dir>] [--app-name NAME]
+    python -m appfactory.asset_generator brand <stage08.json|idea_dir>
+"""
+
+import hashlib
+import math
+import os
+import platform
+import re
+import shutil
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from .jsonio import write_json
+from .png_optimize import encode_png
+
+# (filename, width, height, transparent background)
+ASSETS = [
+    ("icon.png", 1024, 1024, False),
+    ("splash.png", 1284, 2778, False),
+    ("adaptive-icon.png", 1024, 1024, True),
+    ("favicon.png", 32, 32, False)
+]
+DEFAULT_PRIMARY = "#2563EB"
+DEFAULT_BACKGROUND = "#FFFFFF"
+DARK_INK = "#111827"
+LIGHT_INK = "#FFFFFF"
+HEX_COLOR = re.compile(r"#[0-9A-Fa-f]{6}\b")
+# Sibling fields whose text says what a color is for
+HINT_FIELDS = {"name", "color_name", "usage", "role", "purpose", "use"}
+GENERATION_LOG = "generation_log.json"
+
+GLYPHS = {
+    "A": (" ### ", "#   #", "#   #", "#####", "#   #", "#   #", "#   #"),
+    "B": ("#### ", "#   #", "#   #", "#### ", "#   #", "#   #", "#### "),
+    "C": (" ####", "#    ", "#    ", "#    ", "#    ", "#    ", " ####"),
+    "D": ("#### ", "#   #", "#   #", "#   #", "#   #", "#   #", "#### "),
+    "E": ("#####", "#    ", "#    ", "#### ", "#    ", "#    ", "#####"),
+    "F": ("#####", "#    ", "#    ", "#### ", "#    ", "#    ", "#    "),
+    "G": (" ####", "#    ", "#    ", "#  ##", "#   #", "#   #", " ####"),
+    "H": ("#   #", "#   #", "#   #", "#####", "#   #", "#   #", "#   #"),
+    "I": ("#####", "  #  ", "  #  ", "  #  ", "  #  ", "  #  ", "#####"),
+    "J": ("  ###", "   # ", "   # ", "   # ", "   # ", "#  # ", " ##  "),
+    "K": ("#   #", "#  # ", "# #  ", "##   ", "# #  ", "#  # ", "#   #"),
+    "L": ("#    ", "#    ", "#    ", "#    ", "#    ", "#    ", "#####"),
+    "M": ("#   #", "## ##", "# # #", "# # #", "#   #", "#   #", "#   #"),
+    "N": ("#   #", "##  #", "# # #", "#  ##", "#   #", "#   #", "#   #"),
+    "O": (" ### ", "#   #", "#   #", "#   #", "#   #", "#   #", " ### "),
+    "P": ("#### ", "#   #", "#   #", "#### ", "#    ", "#    ", "#    "),
+    "Q": (" ### ", "#   #", "#   #", "#   #", "# # #", "#  # ", " ## #"),
+    "R": ("#### ", "#   #", "#   #", "#### ", "# #  ", "#  # ", "#   #"),
+    "S": (" ####", "#    ", "#    ", " ### ", "    #", "    #", "#### "),
+    "T": ("#####", "  #  ", "  #  ", "  #  ", "  #  ", "  #  ", "  #  "),
+    "U": ("#   #", "#   #", "#   #", "#   #", "#   #", "#   #", " ### "),
+    "V": ("#   #", "#   #", "#   #", "#   #", "#   #", " # # ", "  #  "),
+    "W": ("#   #", "#   #", "#   #", "# # #", "# # #", "## ##", "#   #"),
+    "X": ("#   #", "#   #", " # # ", "  #  ", " # # ", "#   #", "#   #"),
+    "Y": ("#   #", "#   #", " # # ", "  #  ", "  #  ", "  #  ", "  #  "),
+    "Z": ("#####", "    #", "   # ", "  #  ", " #   ", "#    ", "#####"),
+    "0": (" ### ", "#   #", "#  ##", "# # #", "##  #", "#   #", " ### "),
+    "1": ("  #  ", " ##  ", "  #  ", "  #  ", "  #  ", "  #  ", " ### "),
+    "2": (" ### ", "#   #", "    #", "   # ", "  #  ", " #   ", "#####"),
+    "3": ("#####", "   # ", "  #  ", "   # ", "    #", "#   #", " ### "),
+    "4": ("   # ", "  ## ", " # # ", "#  # ", "#####", "   # ", "   # "),
+    "5": ("#####", "#    ", "#### ", "    #", "    #", "#   #", " ### "),
+    "6": ("  ## ", " #   ", "#    ", "#### ", "#   #", "#   #", " ### "),
+    "7": ("#####", "    #", "   # ", "  #  ", " #   ", " #   ", " #   "),
+    "8": (" ### ", "#   #", "#   #", " ### ", "#   #", "#   #", " ### "),
+    "9": (" ### ", "#   #", "#   #", " ####", "    #", "   # ", " ##  ")
+}
+
+def parse_color(value: str) -> Tuple[int, int, int]:
+    """'#RRGGBB' -> (r, g, b)."""
+    return tuple(int(value[i:i + 2], 16) for i in (1, 3, 5))
+
+def ink_for(color: str) -> str:
+    """Dark or light ink, whichever reads better on a background color."""
+    r, g, b = parse_color(color)
+    return DARK_INK if 0.299 * r + 0.587 * g + 0.114 * b > 150 else LIGHT_INK
+
+def _color_hints(node: Any, path: str = ""):
+    """Yield (hint, hex color) for every color in a brand spec; hint is the key path plus name/usage text."""
+    if isinstance(node, dict):
+        siblings = " ".join(v for k, v in node.items() if k in HINT_FIELDS and isinstance(v, str))
+        for key, value in node.items():
+            if isinstance(value, str):
+                for color in HEX_COLOR.findall(value):
+                    yield f"{path}.{key} {siblings} {value}".lower(), color.upper()
+            else:
+                yield from _color_hints(value, f"{path}.{key}")
+    elif isinstance(node, list):
+        for index, item in enumerate(node):
+            if isinstance(item, str):
+                for color in HEX_COLOR.findall(item):
+                    yield f"{path}.{index} {item}".lower(), color.upper()
+            else:
+                yield from _color_hints(item, f"{path}.{index}")
+
+def _find_name(node: Any) -> Optional[str]:
+    if isinstance(node, dict):
+        for key in ["final_name", "app_name", "brand_name", "idea_name", "name"]:
+            if isinstance(node.get(key), str) and node[key].strip():
+                return node[key].strip()
+        for value in node.values():
+            found = _find_name(value) if isinstance(value, (dict, list)) else None
+            if found:
+                return found
+    elif isinstance(node, list):
+        for item in node:
+            found = _find_name(item)
+            if found:
+                return found
+    return None
+
+def extract_brand(stage08: Dict[str, Any], app_name: Optional[str] = None) -> Dict[str, str]:
+    """
+    Pull the app name and colors out of a Stage 08 brand output.
+
+    Stage 08 outputs vary in shape, so colors are found by walking the
+    document for hex values and classifying them by key names and the
+    usage text next to them (background, primary, secondary/accent).
+    """
+    roles: Dict[str, str] = {}
+    ordered: List[str] = []
+    for hint, color in _color_hints({k: v for k, v in stage08.items() if k != "meta"}):
+        if color not in ordered:
+            ordered.append(color)
+        if "background" in hint:
+            roles.setdefault("background", color)
+        elif "primary" in hint:
+            roles.setdefault("primary", color)
+        elif "secondary" in hint or "accent" in hint:
+            roles.setdefault("secondary", color)
+
+    primary = roles.get("primary") or (ordered[0] if ordered else DEFAULT_PRIMARY)
+    others = [c for c in ordered if c not in (primary, roles.get("background"))]
+    meta = stage08.get("meta", {})
+    name = app_name or _find_name(stage08.get("brand_identity", {})) or meta.get("idea_name") \
+        or _find_name(stage08) or "App Factory App"
+    return {
+        "app_name": name,
+        "primary": primary,
+        "secondary": roles.get("secondary") or (others[0] if others else ink_for(primary)),
+        "background": roles.get("background") or DEFAULT_BACKGROUND
+    }
+
+def load_brand(path: Optional[str], app_name: Optional[str] = None) -> Dict[str, str]:
+    """Brand for a stage08.json file or an idea directory (defaults when path is None)."""
+    if path is None:
+        return extract_brand({}, app_name)
+    from .run_archive import read_json as read_run_json
+
+    if not path.endswith(".json"):
+        path = os.path.join(path, "stages", "stage08.json")
+    return extract_brand(read_run_json(path), app_name)
+
+def monogram(name: str) -> Optional[str]:
+    """First letter or digit of a name that the block font can draw."""
+    for char in name.upper():
+        if char in GLYPHS:
+            return char
+    return None
+
+class Canvas:
+    """RGB or RGBA raster drawn with horizontal spans."""
+
+    def __init__(self, width: int, height: int, background: Optional[str]):
+        self.width = width
+        self.height = height
+        self.channels = 4 if background is None else 3
+        fill = bytes(4) if background is None else bytes(parse_color(background))
+        self.rows = [bytearray(fill * width) for _ in range(height)]
+
+    def _pixel(self, color: Tuple[int, int, int]) -> bytes:
+        return bytes(color) + (b"\xff" if self.channels == 4 else b"")
+
+    def _blend(self, y: int, x: int, color: Tuple[int, int, int], coverage: float) -> None:
+        if not 0 <= x < self.width or coverage <= 0:
+            return
+        row = self.rows[y]
+        start = x * self.channels
+        if self.channels == 4:
+            alpha = row[start + 3] / 255
+            new_alpha = coverage + alpha * (1 - coverage)
+            for ch in range(3):
+                mixed = (color[ch] * coverage + row[start + ch] * alpha * (1 - coverage)) / new_alpha
+                row[start + ch] = round(mixed)
+            row[start + 3] = round(new_alpha * 255)
+        else:
+            for ch in range(3):
+                row[start + ch] = round(color[ch] * coverage + row[start + ch] * (1 - coverage))
+
+    def fill_span(self, y: int, x0: int, x1: int, color: Tuple[int, int, int]) -> None:
+        """Fill pixels [x0, x1) of row y."""
+        x0, x1 = max(0, x0), min(self.width, x1)
+        if 0 <= y < self.height and x1 > x0:
+            self.rows[y][x0 * self.channels:x1 * self.channels] = self._pixel(color) * (x1 - x0)
+
+    def fill_rect(self, x: int, y: int, width: int, height: int, color: str) -> None:
+        """Fill a pixel-aligned rectangle."""
+        rgb = parse_color(color)
+        for row in range(max(0, y), min(self.height, y + height)):
+            self.fill_span(row, x, x + width, rgb)
+
+    def fill_circle(self, cx: float, cy: float, radius: float, color: str) -> None:
+        """Fill a circle with anti-aliased left and right edges."""
+        rgb = parse_color(color)
+        for y in range(max(0, int(cy - radius)), min(self.height, int(math.ceil(cy + radius)))):
+            dy = y + 0.5 - cy
+            if abs(dy) >= radius:
+                continue
+            half = math.sqrt(radius * radius - dy * dy)
+            left, right = cx - half, cx + half
+            inner_left, inner_right = int(math.ceil(left)), int(math.floor(right))
+            if inner_right > inner_left:
+                self.fill_span(y, inner_left, inner_right, rgb)
+                self._blend(y, inner_left - 1, rgb, inner_left - left)
+                self._blend(y, inner_right, rgb, right - inner_right)
+            else:
+                self._blend(y, int(left), rgb, right - left)
+
+    def draw_glyph(self, char: str, cx: float, cy: float, cell: int, color: str) -> None:
+        """Draw a block-font character centered on (cx, cy) with square cells of a given size."""
+        x0 = int(round(cx - 2.5 * cell))
+        y0 = int(round(cy - 3.5 * cell))
+        for row_index, line in enumerate(GLYPHS[char]):
+            for match in re.finditer(r"#+", line):
+                self.fill_rect(x0 + match.start() * cell, y0 + row_index * cell,
+                               (match.end() - match.start()) * cell, cell, color)
+
+    def to_png(self) -> bytes:
+        return encode_png(self.width, self.height, [bytes(row) for row in self.rows],
+                          6 if self.channels == 4 else 2)
+
+def render_asset(filename: str, width: int, height: int, transparent: bool, brand: Dict[str, str]) -> bytes:
+    """Render one asset as PNG bytes."""
+    primary, secondary = brand["primary"], brand["secondary"]
+    char = monogram(brand["app_name"])
+    size = min(width, height)
+
+    if filename == "splash.png":
+        canvas = Canvas(width, height, brand["background"])
+        radius = size * 0.18
+        canvas.fill_circle(width / 2, height / 2, radius, primary)
+        if char:
+            canvas.draw_glyph(char, width / 2, height / 2, max(1, int(radius * 0.16)), ink_for(primary))
+    elif filename == "favicon.png":
+        canvas = Canvas(width, height, primary)
+        if char:
+            canvas.draw_glyph(char, width / 2, height / 2, max(1, size // 10), ink_for(primary))
+    elif transparent:
+        # Adaptive icon foreground: keep the mark inside Android's safe zone
+        canvas = Canvas(width, height, None)
+        radius = size * 0.22
+        canvas.fill_circle(width / 2, height / 2, radius, primary)
+        if char:
+            canvas.draw_glyph(char, width / 2, height / 2, max(1, int(radius * 0.16)), ink_for(primary))
+    else:
+        canvas = Canvas(width, height, primary)
+        radius = size * 0.34
+        canvas.fill_circle(width / 2, height / 2, radius + size * 0.025, secondary)
+        canvas.fill_circle(width / 2, height / 2, radius, ink_for(primary))
+        if char:
+            canvas.draw_glyph(char, width / 2, height / 2, max(1, int(radius * 0.16)), primary)
+    return canvas.to_png()
+
+def _write_asset(args: Tuple[str, str, int, int, bool, Dict[str, str]]) -> Dict[str, Any]:
+    """Render and write one asset (worker entry point)."""
+    output_dir, filename, width, height, transparent, brand = args
+    data = render_asset(filename, width, height, transparent, brand)
+    path = os.path.join(output_dir, filename)
+    # Replace rather than overwrite: the old file may be a hard link into the asset store
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return {
+        "filename": filename,
+        "dimensions": {"width": width, "height": height},
+        "file_size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest()
+    }
+
+def generate_assets(output_dir: str, brand: Dict[str, str], workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Render every required asset into output_dir in parallel and write generation_log.json.
+
+    workers=1 renders serially in this process.
+    """
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(output_dir, filename, width, height, transparent, brand)
+            for filename, width, height, transparent in ASSETS]
+
+    if workers == 1:
+        results = [_write_asset(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or len(jobs)) as pool:
+            results = list(pool.map(_write_asset, jobs))
+
+    log = {
+        "generation_session": {
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "app_name": brand["app_name"],
+            "output_directory": output_dir,
+            "method": "python_raster",
+            "assets_generated": len(results),
+            "assets_failed": 0
+        },
+        "generated_assets": results,
+        "brand": brand,
+        "tools_used": {
+            "sips_available": shutil.which("sips") is not None,
+            "sharp_available": False,
+            "python_raster": True,
+            "platform": platform.system()
+        }
+    }
+    write_json(os.path.join(output_dir, GENERATION_LOG), log)
+    return log
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory asset generator")
+    parser.add_argument("command", choices=["generate", "brand"], help="Command to execute")
+    parser.add_argument("path", help="Output directory (generate) or brand source (brand)")
+    parser.add_argument("--brand", help="Stage 08 JSON file or idea directory to take brand colors from")
+    parser.add_argument("--app-name", help="App name (overrides the brand spec)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per asset)")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "generate":
+            brand = load_brand(args.brand, args.app_name)
+            log = generate_assets(args.path, brand, args.workers)
+            for asset in log["generated_assets"]:
+                dims = asset["dimensions"]
+                print(f"   ✅ {asset['filename']} ({asset['file_size']} bytes, {dims['width']}x{dims['height']}) "
+                      f"- SHA256: {asset['sha256'][:16]}...")
+            print(f"✓ Generated {len(log['generated_assets'])} assets for {brand['app_name']} "
+                  f"({brand['primary']}) in {log['generation_session']['output_directory']}")
+
+        elif args.command == "brand":
+            brand = load_brand(args.path, args.app_name)
+            for key, value in brand.items():
+                print(f"{key:<12} {value}")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+App Factory Asset Store
+
+Content-addressed store of binary app assets (icons, splash images, fonts)
+keyed by sha256: .cache/asset_store/<sha[:2]>/<sha>. Builds get their
+assets as hard links to store objects, so an icon shared by many builds
+(or by icon.png and adaptive-icon.png in one build) is stored once.
+
+Store objects are read-only so a build cannot modify the shared copy
+through its hard link. Generation logs (generation_log.json) record the
+store object of every asset they list.
+
+Usage:
+    python -m appfactory.asset_store add <assets_dir>
+    python -m appfactory.asset_store dedupe [builds_dir] [--dry-run]
+    python -m appfactory.asset_store stats
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .jsonio import read_json, write_json
+
+ASSET_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".ico", ".ttf", ".otf", ".mp3", ".wav", ".mp4"}
+SKIP_DIRS = {"node_modules", ".git", ".expo"}
+GENERATION_LOG = "generation_log.json"
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_store_dir() -> Path:
+    """Directory holding one read-only object per asset sha256."""
+    return get_repo_root() / ".cache" / "asset_store"
+
+def object_path(digest: str) -> Path:
+    """Store path of the object with a given sha256."""
+    return get_store_dir() / digest[:2] / digest
+
+def store_reference(digest: str) -> str:
+    """Object path as recorded in generation logs (repo-relative when inside the repo)."""
+    path = object_path(digest)
+    try:
+        return str(path.relative_to(get_repo_root()))
+    except ValueError:
+        return str(path)
+
+def hash_file(path: str) -> str:
+    """sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def is_asset(path: str) -> bool:
+    """Whether a file is a binary asset handled by the store."""
+    return os.path.splitext(path)[1].lower() in ASSET_EXTENSIONS
+
+def store_object(path: str, digest: Optional[str] = None) -> Path:
+    """Copy a file into the store (if its content is not there yet) and return the object path."""
+    digest = digest or hash_file(path)
+    target = object_path(digest)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{digest}.tmp.{os.getpid()}")
+        shutil.copyfile(path, tmp_path)
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, target)
+    return target
+
+def link_asset(path: str, digest: Optional[str] = None) -> bool:
+    """
+    Replace an asset file with a hard link to its store object.
+
+    Returns whether the file was relinked (False when it already shares the
+    object's inode, or when linking fails across devices).
+    """
+    digest = digest or hash_file(path)
+    target = store_object(path, digest)
+    if os.stat(target).st_ino == os.stat(path).st_ino:
+        return False
+
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    try:
+        os.link(target, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return False
+    return True
+
+def iter_asset_files(root: str) -> List[str]:
+    """Non-empty asset files under a directory, in sorted order."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if is_asset(path) and not os.path.islink(path) and os.path.getsize(path) > 0:
+                files.append(path)
+    return files
+
+def update_generation_log(assets_dir: str, digests: Dict[str, str]) -> bool:
+    """
+    Record the store object of each asset listed in an assets directory's generation log.
+
+    digests maps asset filename to sha256. Returns whether the log changed.
+    """
+    log_path = os.path.join(assets_dir, GENERATION_LOG)
+    if not os.path.exists(log_path):
+        return False
+    log = read_json(log_path)
+    changed = False
+    for asset in log.get("generated_assets", []):
+        digest = digests.get(asset.get("filename"))
+        if digest is None:
+            continue
+        store_path = store_reference(digest)
+        if asset.get("sha256") != digest or asset.get("store_object") != store_path:
+            asset["sha256"] = digest
+            asset["store_object"] = store_path
+            changed = True
+    if changed:
+        write_json(log_path, log)
+    return changed
+
+def add_assets(assets_dir: str, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Link every asset under a directory to the store and update its generation logs.
+
+    reclaimed is the disk usage (distinct inodes, counting store objects that
+    already existed) before minus after, so a dry run reports the same figure.
+    """
+    report = {"files": 0, "linked": 0, "bytes": 0, "logs_updated": 0}
+    log_dirs: Dict[str, Dict[str, str]] = {}
+    inodes_before: Dict[tuple, int] = {}
+    objects: Dict[str, int] = {}
+
+    for path in iter_asset_files(assets_dir):
+        stat = os.stat(path)
+        digest = hash_file(path)
+        inodes_before[(stat.st_dev, stat.st_ino)] = stat.st_size
+        target = object_path(digest)
+        if digest not in objects and target.exists():
+            target_stat = target.stat()
+            inodes_before[(target_stat.st_dev, target_stat.st_ino)] = target_stat.st_size
+        objects[digest] = stat.st_size
+
+        if not dry_run:
+            report["linked"] += int(link_asset(path, digest))
+        report["files"] += 1
+        report["bytes"] += stat.st_size
+        log_dirs.setdefault(os.path.dirname(path), {})[os.path.basename(path)] = digest
+
+    if not dry_run:
+        report["logs_updated"] = sum(update_generation_log(d, digests) for d, digests in log_dirs.items())
+    report["objects"] = len(objects)
+    report["reclaimed"] = sum(inodes_before.values()) - sum(objects.values())
+    return report
+
+def dedupe(builds_dir: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Retrofit existing builds onto the store.
+
+    Duplicate assets across (and within) builds end up as hard links to a
+    single object; reclaimed counts the bytes no longer stored twice.
+    """
+    builds_dir = builds_dir or str(get_repo_root() / "builds")
+    report = add_assets(builds_dir, dry_run=dry_run)
+    report["builds_dir"] = builds_dir
+    report["dry_run"] = dry_run
+    return report
+
+def store_stats() -> Dict[str, Any]:
+    """Object count, stored bytes and references (hard links outside the store)."""
+    stats = {"objects": 0, "bytes": 0, "references": 0, "unreferenced": 0}
+    store_dir = get_store_dir()
+    if not store_dir.exists():
+        return stats
+    for path in store_dir.glob("*/*"):
+        if ".tmp." in path.name:
+            continue
+        stat = path.stat()
+        stats["objects"] += 1
+        stats["bytes"] += stat.st_size
+        stats["references"] += stat.st_nlink - 1
+        stats["unreferenced"] += int(stat.st_nlink == 1)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory content-addressed asset store")
+    parser.add_argument("command", choices=["add", "dedupe", "stats"], help="Command to execute")
+    parser.add_argument("path", nargs="?", help="Assets directory (add) or builds directory (dedupe)")
+    parser.add_argument("--dry-run", action="store_true", help="Report without relinking files")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "add":
+            if not args.path:
+                print("Error: assets directory required for add", file=sys.stderr)
+                sys.exit(1)
+            report = add_assets(args.path, dry_run=args.dry_run)
+            print(f"✓ {report['files']} assets ({report['objects']} unique) in store, "
+                  f"{report['linked']} relinked, {report['logs_updated']} generation logs updated")
+
+        elif args.command == "dedupe":
+            report = dedupe(args.path, dry_run=args.dry_run)
+            verb = "Would reclaim" if args.dry_run else "Reclaimed"
+            print(f"{report['builds_dir']}: {report['files']} assets, {report['objects']} unique, "
+                  f"{report['linked']} relinked")
+            print(f"✓ {verb} {report['reclaimed']:,} of {report['bytes']:,} bytes")
+
+        elif args.command == "stats":
+            stats = store_stats()
+            print(f"{stats['objects']} objects, {stats['bytes']:,} bytes, "
+                  f"{stats['references']} references, {stats['unreferenced']} unreferenced")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+App Factory Batch Executor
+
+Advances every unbuilt idea pack of a batch run (runs/<date>/<run>/ideas/*)
+concurrently on a bounded worker pool. Each pack moves through its own
+stages in order (get_next_stage per pack), reads and writes only inside its
+boundary.json, and checkpoints every stage to the run's event log, so an
+interrupted batch resumes from the last completed stage of each pack.
+
+Stages are scheduled one at a time per pack: whenever a stage finishes, that
+pack's next stage is queued, so a batch takes about as long as its slowest
+pack rather than the sum of all of them.
+
+Usage:
+    python -m appfactory.batch_executor plan <run_path>
+    python -m appfactory.batch_executor run <run_path> --standin [--workers N] [--latency S] [--cache]
+
+From the CLI, `run` only executes with the model stand-in (--standin) and
+is meant for copies of runs (benchmarks, tests): it writes synthetic
+outputs and marks stages completed. Real stages are agent-driven through
+run_batch() with a real stage runner.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+from .jsonio import read_json
+from .logging_utils import get_next_stage, get_stage_status, stage_sort_key, update_stage_status
+from .stage_cache import run_stage_cached
+from .stage_events import materialize_run_summary
+from .usage_ledger import record_usage
+
+# run_stage(stage_num, stage_json_path, input_paths) writes the stage output and
+# may return the model usage of the call (input_tokens, output_tokens, ...); a
+# failing call may attach its usage to the exception as a `usage` attribute
+StageRunner = Callable[[str, str, List[str]], Optional[Dict[str, Any]]]
+
+# Stage 01 runs once at run level; idea packs start at 02
+RUN_LEVEL_STAGES = {"01", "01_dream"}
+PACK_STAGE_ORDER = [f"{i:02d}" for i in range(2, 11)]
+# Stage outputs proper (stage02.json, stage09.5.json), not stage02_validation.json and the like
+STAGE_OUTPUT_PATTERN = re.compile(r"^stage(\d+(?:\.\d+)*)\.json$")
+
+class BoundaryViolation(Exception):
+    """Raised when a pack would touch a path outside its boundary."""
+    pass
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def discover_idea_packs(run_path: str) -> List[str]:
+    """List idea pack directories of a batch run in idea_index order."""
+    ideas_dir = os.path.join(run_path, "ideas")
+    if not os.path.isdir(ideas_dir):
+        return []
+
+    index_path = os.path.join(run_path, "meta", "idea_index.json")
+    directories = []
+    if os.path.exists(index_path):
+        ideas = read_json(index_path).get("ideas", [])
+        # Indexes list ideas either as an array or keyed by idea id
+        for idea in ideas.values() if isinstance(ideas, dict) else ideas:
+            if isinstance(idea, dict) and idea.get("directory"):
+                directories.append(idea["directory"])
+    if not directories:
+        directories = sorted(os.listdir(ideas_dir))
+
+    return [os.path.join(ideas_dir, d) for d in directories
+            if os.path.isdir(os.path.join(ideas_dir, d))]
+
+def rebase_boundary_path(path: str, run_path: str) -> str:
+    """
+    Resolve a repo-relative boundary path.
+
+    Paths that name the run directory are rebased onto run_path, so a copied
+    or moved run keeps its isolation; anything else is relative to the repo.
+    """
+    parts = Path(path).parts
+    run_name = os.path.basename(os.path.normpath(run_path))
+    if run_name in parts:
+        rest = parts[parts.index(run_name) + 1:]
+        return os.path.normpath(os.path.join(os.path.abspath(run_path), *rest))
+    return os.path.normpath(os.path.join(get_repo_root(), path))
+
+def load_boundary(pack_path: str) -> Dict[str, Any]:
+    """
+    Load a pack's boundary.json as a list of allowed absolute paths.
+
+    Handles every boundary layout found in runs/: allowed_paths,
+    allowed_reads + boundary_path/source_root, and a nested
+    boundary_enforcement block. The pack directory is always allowed; a pack
+    without a boundary.json gets the standard batch isolation (its own
+    directory, the run's stage01 output and idea index).
+    """
+    pack_path = os.path.abspath(pack_path)
+    run_path = os.path.dirname(os.path.dirname(pack_path))
+    boundary_file = os.path.join(pack_path, "meta", "boundary.json")
+    raw = read_json(boundary_file) if os.path.exists(boundary_file) else {}
+    raw = raw.get("boundary_enforcement", raw)
+
+    declared = list(raw.get("allowed_paths", [])) + list(raw.get("allowed_reads", []))
+    if not raw:
+        declared = [os.path.join(run_path, "stage01", "stages", "stage01.json"),
+                    os.path.join(run_path, "meta", "idea_index.json")]
+    for key in ["boundary_path", "source_root"]:
+        if raw.get(key):
+            declared.append(raw[key])
+
+    allowed = [pack_path]
+    for path in declared:
+        resolved = rebase_boundary_path(path, run_path)
+        if resolved not in allowed:
+            allowed.append(resolved)
+
+    return {"pack": pack_path, "allowed": allowed, "declared": bool(raw)}
+
+def check_boundary(boundary: Dict[str, Any], path: str) -> str:
+    """Return the absolute path if the boundary allows it, else raise BoundaryViolation."""
+    path = os.path.normpath(os.path.abspath(path))
+    for allowed in boundary["allowed"]:
+        if path == allowed or path.startswith(allowed + os.sep):
+            return path
+    raise BoundaryViolation(f"{path} is outside the boundary of {boundary['pack']}")
+
+def collect_stage_inputs(pack_path: str, stage_num: str, boundary: Dict[str, Any]) -> List[str]:
+    """Inputs for a pack stage: the run's stage01 output plus the pack's earlier stage outputs."""
+    run_path = os.path.dirname(os.path.dirname(os.path.abspath(pack_path)))
+    candidates = [os.path.join(run_path, "stage01", "stages", "stage01.json")]
+
+    stages_dir = os.path.join(pack_path, "stages")
+    if os.path.isdir(stages_dir):
+        priors = [m.group(1) for m in map(STAGE_OUTPUT_PATTERN.match, os.listdir(stages_dir)) if m]
+        for prior in sorted(priors, key=stage_sort_key):
+            if stage_sort_key(prior) < stage_sort_key(stage_num):
+                candidates.append(os.path.join(stages_dir, f"stage{prior}.json"))
+
+    return [check_boundary(boundary, path) for path in candidates if os.path.exists(path)]
+
+def next_pack_stage(pack_path: str) -> str:
+    """A pack's next stage, skipping the run-level stage 01 that packs never run themselves."""
+    next_stage = get_next_stage(pack_path)
+    if next_stage in RUN_LEVEL_STAGES:
+        next_stage = get_next_stage(pack_path, PACK_STAGE_ORDER)
+    return next_stage
+
+def plan_batch(run_path: str) -> List[Dict[str, Any]]:
+    """Report each pack's next stage; packs that are built or complete have next 'completed'."""
+    plan = []
+    for pack_path in discover_idea_packs(run_path):
+        status = get_stage_status(pack_path)
+        next_stage = "completed" if status.get("status") == "built" else next_pack_stage(pack_path)
+        plan.append({"pack": os.path.basename(pack_path), "path": pack_path, "next_stage": next_stage})
+    return plan
+
+def execute_pack_stage(pack_path: str, stage_num: str, boundary: Dict[str, Any],
+                       run_stage: StageRunner, use_cache: bool = False,
+                       max_attempts: int = 3) -> Dict[str, Any]:
+    """
+    Run one stage of one pack and checkpoint it.
+
+    The stage is marked in_progress, run with up to max_attempts attempts and
+    marked completed (with its artifacts) or failed in the event log. The
+    call's tokens, latency and retries go to the run's usage ledger.
+    """
+    started = time.perf_counter()
+    stage_json_path = check_boundary(boundary, os.path.join(pack_path, "stages", f"stage{stage_num}.json"))
+    input_paths = collect_stage_inputs(pack_path, stage_num, boundary)
+    update_stage_status(stage_num, pack_path, "in_progress")
+    os.makedirs(os.path.dirname(stage_json_path), exist_ok=True)
+
+    error = None
+    cached = False
+    usage: Dict[str, Any] = {}
+
+    def add_usage(attempt_usage: Optional[Dict[str, Any]]) -> None:
+        # Every attempt was billed, so token counts accumulate across retries
+        for key, value in (attempt_usage or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                usage[key] = usage.get(key, 0) + value
+            else:
+                usage[key] = value
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            if use_cache:
+                def call():
+                    add_usage(run_stage(stage_num, stage_json_path, input_paths))
+                cached = run_stage_cached(stage_num, input_paths, stage_json_path, call)["cached"]
+            else:
+                add_usage(run_stage(stage_num, stage_json_path, input_paths))
+            error = None
+            break
+        except BoundaryViolation:
+            raise
+        except Exception as e:
+            add_usage(getattr(e, "usage", None))
+            error = str(e)
+
+    call_usage = {"latency_s": time.perf_counter() - started, "retries": attempt - 1,
+                  "cached": cached, "failed": error is not None}
+    call_usage.update(usage)
+    record_usage(pack_path, stage_num, **call_usage)
+    if error is not None:
+        update_stage_status(stage_num, pack_path, "failed")
+    else:
+        update_stage_status(stage_num, pack_path, "completed", [stage_json_path])
+
+    return {
+        "pack": os.path.basename(pack_path),
+        "stage": stage_num,
+        "status": "failed" if error else "completed",
+        "attempts": attempt,
+        "cached": cached,
+        "error": error,
+        "seconds": round(time.perf_counter() - started, 4)
+    }
+
+def run_batch(run_path: str, run_stage: StageRunner, workers: int = 4,
+              use_cache: bool = False, max_attempts: int = 3) -> Dict[str, Any]:
+    """
+    Advance all unbuilt idea packs of a batch run concurrently.
+
+    A failed stage stops only its own pack. Returns per-pack results and the
+    batch wall time.
+    """
+    started = time.perf_counter()
+    pending = [entry for entry in plan_batch(run_path) if entry["next_stage"] != "completed"]
+    boundaries = {entry["path"]: load_boundary(entry["path"]) for entry in pending}
+    packs = {entry["pack"]: {"stages": [], "status": "in_progress"} for entry in pending}
+
+    def submit(pool, pack_path, stage_num):
+        return pool.submit(execute_pack_stage, pack_path, stage_num, boundaries[pack_path],
+                           run_stage, use_cache, max_attempts)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        running = {submit(pool, e["path"], e["next_stage"]): e["path"] for e in pending}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                pack_path = running.pop(future)
+                pack = packs[os.path.basename(pack_path)]
+                try:
+                    result = future.result()
+                except BoundaryViolation as e:
+                    pack.update(status="boundary_violation", error=str(e))
+                    continue
+
+                pack["stages"].append(result)
+                if result["status"] == "failed":
+                    pack.update(status="failed", error=result["error"])
+                    continue
+
+                next_stage = next_pack_stage(pack_path)
+                if next_stage == "completed":
+                    pack["status"] = "completed"
+                else:
+                    running[submit(pool, pack_path, next_stage)] = pack_path
+
+    materialize_run_summary(run_path)
+    return {
+        "run_path": run_path,
+        "workers": workers,
+        "packs": packs,
+        "wall_seconds": round(time.perf_counter() - started, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory batch executor")
+    parser.add_argument("command", choices=["plan", "run"], help="Command to execute")
+    parser.add_argument("run_path", help="Batch run directory (contains ideas/)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent stage workers")
+    parser.add_argument("--standin", action="store_true",
+                       help="Run stages with the model stand-in (writes synthetic outputs; use on run copies)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                       help="Mean stand-in model latency (seconds)")
+    parser.add_argument("--seed", type=int, help="Stand-in random seed")
+    parser.add_argument("--cache", action="store_true", help="Run stages through the stage cache")
+
+    args = parser.parse_args()
+
+    try:
+        if not os.path.isdir(os.path.join(args.run_path, "ideas")):
+            print(f"Error: Not a batch run (no ideas/): {args.run_path}", file=sys.stderr)
+            sys.exit(1)
+
+        if args.command == "plan":
+            for entry in plan_batch(args.run_path):
+                print(f"{entry['pack']:<60} {entry['next_stage']}")
+
+        elif args.command == "run":
+            # Stage execution is agent-driven; from the CLI only the model stand-in can produce outputs
+            if not args.standin:
+                print("Error: run writes stand-in outputs into the idea packs; pass --standin "
+                      "to do so (on a copy of the run)", file=sys.stderr)
+                sys.exit(1)
+            from .model_standin import ModelStandIn
+            from .prompt_assembly import estimate_tokens
+            standin = ModelStandIn(latency=args.latency, seed=args.seed)
+
+            def run_stage(stage_num, stage_json_path, input_paths):
+                standin.make_stage_runner(stage_num, stage_json_path)()
+                with open(stage_json_path, 'r', encoding='utf-8') as f:
+                    return {"output_tokens": estimate_tokens(f.read())}
+
+            result = run_batch(args.run_path, run_stage, args.workers, args.cache)
+            for pack, info in result["packs"].items():
+                print(f"{pack:<60} {info['status']:<20} {len(info['stages'])} stages")
+            print(f"✓ Batch finished in {result['wall_seconds']}s with {args.workers} workers")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+App Factory Build and Run Garbage Collection
+
+Reclaims disk from builds/ and runs/ according to a retention policy:
+
+- builds referenced in builds/build_index.json are always kept
+- the newest keep_successful successful builds of each slug are kept;
+  older ones (superseded build_YYYYMMDD_HHMMSS directories) are removed
+- failed builds are removed after failed_days
+- scratch directories (scratch_patterns, e.g. memevault_working) are
+  removed after scratch_days
+- kept builds untouched for inactive_days lose their node_modules (the
+  node_modules store reinstalls them in seconds)
+- runs that never got past their bootstrap files (meta/ and inputs/) and
+  that no build came from are removed after abandoned_run_days, and
+  unpacked archived runs (runs/.archive/unpacked) after scratch_days
+- node_modules store entries no kept build's lockfile maps to, and asset
+  store objects no kept build links to, are removed after store_days
+
+A build is a directory directly under a slug directory (builds/NN_slug__id/),
+or the slug directory itself for flat builds; one without an app
+(package.json or app.json) was never finished and counts as failed. Its
+time is its registry createdAt, else the timestamp in its name, else the
+newest modification outside node_modules.
+
+Reclaimable bytes count hard-linked files only when every link is removed,
+so trees sharing the node_modules and asset stores are not over-reported.
+Deletion runs in parallel and handles the stores' read-only files.
+
+The policy defaults to DEFAULT_POLICY and can be overridden repo-wide in
+standards/retention_policy.json or per call (--policy name=value).
+
+Usage:
+    python -m appfactory.build_gc [--dry-run] [--policy keep_successful=2 ...] [--workers N] [--json]
+"""
+
+import fnmatch
+import os
+import re
+import shutil
+import stat
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from . import asset_store, node_modules_store
+from .jsonio import dumps, read_json
+from .run_archive import ARCHIVE_DIRNAME, UNPACKED_DIRNAME
+
+DEFAULT_POLICY = {
+    # Newest successful builds kept per slug (registered builds are kept regardless)
+    "keep_successful": 3,
+    # Age after which unregistered failed builds are removed
+    "failed_days": 7,
+    # Age after which scratch directories and unpacked archived runs are removed
+    "scratch_days": 3,
+    # Age after which kept builds lose their node_modules
+    "inactive_days": 14,
+    # Age after which runs with nothing but bootstrap files are removed
+    "abandoned_run_days": 30,
+    # Age after which unused node_modules store entries and asset objects are removed
+    "store_days": 14,
+    # Directory names (fnmatch) of scratch build directories
+    "scratch_patterns": ["*_working", "*_scratch", "tmp_*", "*.tmp.*"]
+}
+SLUG_DIR_PATTERN = re.compile(r"^\d+_(.+?)__")
+TIMESTAMP_PATTERN = re.compile(r"(20\d{6})_(\d{6})")
+APP_MARKERS = ["package.json", "app.json"]
+RUN_BOOTSTRAP_DIRS = {"meta", "inputs"}
+DEFAULT_WORKERS = 8
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def load_policy(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Default policy, then standards/retention_policy.json, then overrides."""
+    policy = dict(DEFAULT_POLICY)
+    path = get_repo_root() / "standards" / "retention_policy.json"
+    if path.exists():
+        policy.update(read_json(path))
+    policy.update(overrides or {})
+    return policy
+
+def parse_policy_overrides(items: List[str]) -> Dict[str, int]:
+    """Parse name=value policy overrides (numeric settings only)."""
+    overrides = {}
+    numeric = [name for name, value in DEFAULT_POLICY.items() if isinstance(value, int)]
+    for item in items:
+        name, _, value = item.partition("=")
+        if name not in numeric or not value.isdigit():
+            raise ValueError(f"Invalid policy '{item}' (expected one of {', '.join(numeric)}=<int>)")
+        overrides[name] = int(value)
+    return overrides
+
+def load_registry(builds_dir: str) -> Dict[str, Any]:
+    """The builds directory's build_index.json (empty when there is none)."""
+    registry_path = os.path.join(builds_dir, "build_index.json")
+    return read_json(registry_path) if os.path.exists(registry_path) else {"builds": []}
+
+def newest_mtime(path: str) -> float:
+    """Newest modification time of a tree, ignoring node_modules."""
+    newest = os.lstat(path).st_mtime
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = [d for d in dirnames if d != "node_modules"]
+        for name in dirnames + filenames:
+            try:
+                newest = max(newest, os.lstat(os.path.join(dirpath, name)).st_mtime)
+            except FileNotFoundError:
+                continue
+    return newest
+
+def is_app_dir(path: str) -> bool:
+    """Whether a directory holds an app (directly or in app/)."""
+    return any(os.path.exists(os.path.join(path, sub, marker))
+               for sub in ["", "app"] for marker in APP_MARKERS)
+
+def build_status(path: str, entry: Optional[Dict[str, Any]]) -> str:
+    """'success' or 'failed', from the registry or the build's validation reports."""
+    if entry is not None:
+        return "success" if entry.get("status") == "success" else "failed"
+    if not is_app_dir(path):
+        return "failed"
+    report_path = os.path.join(path, "meta", "build_validation.json")
+    if os.path.exists(report_path):
+        try:
+            if read_json(report_path).get("errors"):
+                return "failed"
+        except ValueError:
+            pass
+    summary_path = os.path.join(path, "build_validation_summary.json")
+    if os.path.exists(summary_path):
+        try:
+            if read_json(summary_path).get("overall") == "failed":
+                return "failed"
+        except ValueError:
+            pass
+    # Unvalidated builds count as successful so keep_successful protects them
+    return "success"
+
+def _registry_entry(path: str, registered: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Registry entry whose buildPath is, contains or is inside a build directory."""
+    for build_path, entry in registered.items():
+        if build_path == path or build_path.startswith(path + os.sep) or path.startswith(build_path + os.sep):
+            return entry
+    return None
+
+def _build_time(path: str, entry: Optional[Dict[str, Any]], mtime: float) -> float:
+    if entry is not None and entry.get("createdAt"):
+        try:
+            return datetime.fromisoformat(entry["createdAt"].replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    match = TIMESTAMP_PATTERN.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime.strptime("".join(match.groups()), "%Y%m%d%H%M%S").timestamp()
+        except ValueError:
+            pass
+    return mtime
+
+def find_builds(builds_dir: str, patterns: List[str]) -> List[Dict[str, Any]]:
+    """Every build under the slug directories, with its slug, status, age and registry entry."""
+    registry = load_registry(builds_dir)
+    root = os.path.dirname(os.path.abspath(builds_dir))
+    registered = {os.path.normpath(os.path.join(root, b["buildPath"])): b
+                  for b in registry.get("builds", []) if b.get("buildPath")}
+
+    builds = []
+    for slug_name in sorted(os.listdir(builds_dir)):
+        slug_dir = os.path.join(os.path.abspath(builds_dir), slug_name)
+        match = SLUG_DIR_PATTERN.match(slug_name)
+        if not match or not os.path.isdir(slug_dir):
+            continue
+        if any(os.path.exists(os.path.join(slug_dir, marker)) for marker in APP_MARKERS):
+            paths = [slug_dir]
+        else:
+            paths = [os.path.join(slug_dir, name) for name in sorted(os.listdir(slug_dir))
+                     if not name.startswith(".") and name != "meta"
+                     and os.path.isdir(os.path.join(slug_dir, name))]
+        for path in paths:
+            entry = _registry_entry(path, registered)
+            mtime = newest_mtime(path)
+            builds.append({
+                "path": path,
+                "slug": match.group(1),
+                "registered": entry is not None,
+                "scratch": entry is None and any(fnmatch.fnmatch(os.path.basename(path), p) for p in patterns),
+                "status": build_status(path, entry),
+                "time": _build_time(path, entry, mtime),
+                "mtime": mtime
+            })
+    return builds
+
+def find_node_modules(path: str) -> List[str]:
+    """node_modules directories of a build (not nested ones inside them)."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        if "node_modules" in dirnames:
+            found.append(os.path.join(dirpath, "node_modules"))
+        dirnames[:] = [d for d in dirnames if d not in ("node_modules", ".git")]
+    return found
+
+def plan_builds(builds: List[Dict[str, Any]], policy: Dict[str, Any], now: float) -> List[Dict[str, Any]]:
+    """Builds and node_modules trees to remove under the policy."""
+    day = 86400
+    actions = []
+    kept = set()
+    by_slug: Dict[str, List[Dict[str, Any]]] = {}
+    for build in builds:
+        if build["scratch"]:
+            if now - build["mtime"] > policy["scratch_days"] * day:
+                actions.append({"path": build["path"], "kind": "scratch",
+                                "reason": f"scratch directory older than {policy['scratch_days']} days"})
+            else:
+                kept.add(build["path"])
+        elif build["registered"]:
+            kept.add(build["path"])
+        elif build["status"] == "failed":
+            if now - build["mtime"] > policy["failed_days"] * day:
+                actions.append({"path": build["path"], "kind": "failed_build",
+                                "reason": f"failed build older than {policy['failed_days']} days"})
+            else:
+                kept.add(build["path"])
+        if build["status"] == "success" and not build["scratch"]:
+            by_slug.setdefault(build["slug"], []).append(build)
+
+    for slug, successful in sorted(by_slug.items()):
+        successful.sort(key=lambda b: b["time"], reverse=True)
+        for rank, build in enumerate(successful):
+            if rank < policy["keep_successful"]:
+                kept.add(build["path"])
+            elif not build["registered"]:
+                actions.append({"path": build["path"], "kind": "superseded_build",
+                                "reason": f"superseded by {policy['keep_successful']} newer builds of {slug}"})
+
+    for build in builds:
+        if build["path"] in kept and now - build["mtime"] > policy["inactive_days"] * day:
+            for path in find_node_modules(build["path"]):
+                actions.append({"path": path, "kind": "node_modules",
+                                "reason": f"build inactive for {policy['inactive_days']} days"})
+    return actions
+
+def plan_runs(runs_dir: str, builds_dir: str, policy: Dict[str, Any], now: float) -> List[Dict[str, Any]]:
+    """Abandoned runs and stale unpacked archived runs to remove under the policy."""
+    day = 86400
+    actions = []
+    registry = load_registry(builds_dir)
+    run_ids = {b.get("origin", {}).get("runId") for b in registry.get("builds", [])}
+
+    for date in sorted(os.listdir(runs_dir)):
+        date_dir = os.path.join(os.path.abspath(runs_dir), date)
+        if date.startswith(".") or not os.path.isdir(date_dir):
+            continue
+        for run in sorted(os.listdir(date_dir)):
+            run_dir = os.path.join(date_dir, run)
+            if not os.path.isdir(run_dir) or run in run_ids:
+                continue
+            started = any(name not in RUN_BOOTSTRAP_DIRS for name in os.listdir(run_dir))
+            if not started and now - newest_mtime(run_dir) > policy["abandoned_run_days"] * day:
+                actions.append({"path": run_dir, "kind": "abandoned_run",
+                                "reason": f"no stage output in {policy['abandoned_run_days']} days"})
+
+    unpacked = os.path.join(os.path.abspath(runs_dir), ARCHIVE_DIRNAME, UNPACKED_DIRNAME)
+    if os.path.isdir(unpacked):
+        for date in sorted(os.listdir(unpacked)):
+            for run in sorted(os.listdir(os.path.join(unpacked, date))):
+                path = os.path.join(unpacked, date, run)
+                if now - newest_mtime(path) > policy["scratch_days"] * day:
+                    actions.append({"path": path, "kind": "unpacked_run",
+                                    "reason": f"unpacked archive copy older than {policy['scratch_days']} days"})
+    return actions
+
+def plan_node_modules_store(kept_builds: List[str], policy: Dict[str, Any], now: float) -> List[Dict[str, Any]]:
+    """Store entries no kept build's lockfile maps to, and abandoned staging directories."""
+    store_dir = node_modules_store.get_store_dir()
+    if not store_dir.exists():
+        return []
+    day = 86400
+    keys = set()
+    for build in kept_builds:
+        for app_dir in [build, os.path.join(build, "app")]:
+            if os.path.exists(os.path.join(app_dir, "package-lock.json")):
+                try:
+                    keys.add(node_modules_store.lockfile_key(app_dir))
+                except (ValueError, KeyError, OSError):
+                    continue
+
+    actions = []
+    for path in sorted(store_dir.iterdir()):
+        age = now - path.stat().st_mtime
+        if ".tmp." in path.name:
+            if age > policy["scratch_days"] * day:
+                actions.append({"path": str(path), "kind": "store_entry", "reason": "abandoned staging directory"})
+        elif path.name not in keys and age > policy["store_days"] * day:
+            actions.append({"path": str(path), "kind": "store_entry",
+                            "reason": "no kept build uses this lockfile"})
+    return actions
+
+def _walk_inodes(path: str) -> List[os.stat_result]:
+    """lstat of a path and everything below it (symlinks are not followed)."""
+    try:
+        stats = [os.lstat(path)]
+    except FileNotFoundError:
+        return []
+    if not stat.S_ISDIR(stats[0].st_mode):
+        return stats
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in dirnames + filenames:
+            try:
+                stats.append(os.lstat(os.path.join(dirpath, name)))
+            except FileNotFoundError:
+                continue
+    return stats
+
+def _account(actions: List[Dict[str, Any]], inodes: Dict[Tuple[int, int], List[Any]]) -> None:
+    """Record every inode under the actions' paths: [links, size, links seen, owning action]."""
+    for action in actions:
+        action["bytes"] = 0
+        for st in _walk_inodes(action["path"]):
+            size = st.st_size if not stat.S_ISDIR(st.st_mode) else 0
+            action["bytes"] += size
+            record = inodes.setdefault((st.st_dev, st.st_ino), [st.st_nlink, size, 0, action])
+            record[2] += 1
+
+def plan_asset_objects(inodes: Dict[Tuple[int, int], List[Any]], policy: Dict[str, Any],
+                       now: float) -> List[Dict[str, Any]]:
+    """Asset store objects whose every link outside the store is being removed."""
+    store_dir = asset_store.get_store_dir()
+    if not store_dir.exists():
+        return []
+    actions = []
+    for path in sorted(store_dir.glob("*/*")):
+        st = path.stat()
+        links_removed = inodes[(st.st_dev, st.st_ino)][2] if (st.st_dev, st.st_ino) in inodes else 0
+        if st.st_nlink - 1 <= links_removed and now - st.st_mtime > policy["store_days"] * 86400:
+            actions.append({"path": str(path), "kind": "asset_object", "reason": "no kept build links to it"})
+    return actions
+
+def plan_gc(builds_dir: Optional[str] = None, runs_dir: Optional[str] = None,
+            policy: Optional[Dict[str, Any]] = None, today: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Everything the policy would remove, with apparent and reclaimable bytes.
+
+    bytes is the apparent size of each path; reclaimable counts each inode
+    once, and only when all of its links are removed.
+    """
+    builds_dir = builds_dir or str(get_repo_root() / "builds")
+    runs_dir = runs_dir or str(get_repo_root() / "runs")
+    policy = policy or load_policy()
+    now = (today or datetime.now()).timestamp()
+
+    builds = find_builds(builds_dir, policy["scratch_patterns"]) if os.path.isdir(builds_dir) else []
+    actions = plan_builds(builds, policy, now)
+    if os.path.isdir(runs_dir):
+        actions += plan_runs(runs_dir, builds_dir, policy, now)
+    removed = {a["path"] for a in actions if a["kind"] != "node_modules"}
+    actions += plan_node_modules_store([b["path"] for b in builds if b["path"] not in removed], policy, now)
+
+    inodes: Dict[Tuple[int, int], List[Any]] = {}
+    _account(actions, inodes)
+    assets = plan_asset_objects(inodes, policy, now)
+    _account(assets, inodes)
+    actions += assets
+
+    for action in actions:
+        action["reclaimable"] = 0
+    for links, size, seen, owner in inodes.values():
+        if seen >= links:
+            owner["reclaimable"] += size
+
+    by_kind: Dict[str, Dict[str, int]] = {}
+    for action in actions:
+        totals = by_kind.setdefault(action["kind"], {"count": 0, "bytes": 0, "reclaimable": 0})
+        totals["count"] += 1
+        totals["bytes"] += action["bytes"]
+        totals["reclaimable"] += action["reclaimable"]
+
+    return {
+        "builds_dir": builds_dir,
+        "runs_dir": runs_dir,
+        "policy": policy,
+        "builds": len(builds),
+        "actions": actions,
+        "by_kind": by_kind,
+        "bytes": sum(a["bytes"] for a in actions),
+        "reclaimable": sum(a["reclaimable"] for a in actions)
+    }
+
+def _force_writable(function, path, exc_info) -> None:
+    """rmtree error handler: make the parent directory (and path) writable and retry."""
+    parent = os.path.dirname(path)
+    os.chmod(parent, os.stat(parent).st_mode | stat.S_IWUSR | stat.S_IXUSR)
+    if not os.path.islink(path) and os.path.isdir(path):
+        os.chmod(path, os.stat(path).st_mode | stat.S_IRWXU)
+    function(path)
+
+def remove_path(path: str) -> None:
+    """Remove a file or directory tree, including read-only store files."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, onerror=_force_writable)
+    elif os.path.lexists(path):
+        os.unlink(path)
+
+def _remove_action(action: Dict[str, Any]) -> Optional[str]:
+    try:
+        remove_path(action["path"])
+    except OSError as e:
+        return f"{action['path']}: {e}"
+    return None
+
+def _prune_empty_parents(paths: List[str], stops: List[str]) -> None:
+    """Remove directories left empty by the deletions, up to (not including) the stop directories."""
+    stops = {os.path.abspath(s) for s in stops}
+    for path in sorted({os.path.dirname(os.path.abspath(p)) for p in paths}, key=len, reverse=True):
+        while any(path.startswith(stop + os.sep) for stop in stops) and os.path.isdir(path) \
+                and not os.listdir(path):
+            os.rmdir(path)
+            path = os.path.dirname(path)
+
+def run_gc(builds_dir: Optional[str] = None, runs_dir: Optional[str] = None,
+           policy: Optional[Dict[str, Any]] = None, dry_run: bool = False,
+           workers: Optional[int] = None, today: Optional[datetime] = None) -> Dict[str, Any]:
+    """Plan the collection and, unless dry_run, delete everything planned in parallel."""
+    started = time.perf_counter()
+    report = plan_gc(builds_dir, runs_dir, policy, today)
+    report["dry_run"] = dry_run
+    report["errors"] = []
+
+    if not dry_run and report["actions"]:
+        # Largest trees first so the pool stays busy until the end
+        actions = sorted(report["actions"], key=lambda a: a["bytes"], reverse=True)
+        with ThreadPoolExecutor(max_workers=workers or DEFAULT_WORKERS) as pool:
+            report["errors"] = [e for e in pool.map(_remove_action, actions) if e]
+        stops = [report["builds_dir"], report["runs_dir"], str(asset_store.get_store_dir()),
+                 str(node_modules_store.get_store_dir())]
+        _prune_empty_parents([a["path"] for a in actions], stops)
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+def format_size(size: int) -> str:
+    """Human readable byte count."""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1000 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1000
+    return f"{size:.1f} GB"
+
+def format_gc_report(report: Dict[str, Any]) -> str:
+    """Format a gc report for the terminal."""
+    root = os.path.dirname(os.path.abspath(report["builds_dir"]))
+    verb = "Would remove" if report["dry_run"] else "Removed"
+    lines = [f"{'-' if report['dry_run'] else '✓'} [{a['kind']}] {os.path.relpath(a['path'], root)} "
+             f"({format_size(a['reclaimable'])}): {a['reason']}" for a in report["actions"]]
+    lines += [f"✗ {error}" for error in report["errors"]]
+    lines.append("")
+    for kind, totals in sorted(report["by_kind"].items()):
+        lines.append(f"  {kind:<17} {totals['count']:>5}  {format_size(totals['reclaimable']):>10} reclaimable "
+                     f"({format_size(totals['bytes'])} apparent)")
+    lines.append(f"{verb} {len(report['actions'])} paths from {report['builds']} builds: "
+                 f"{format_size(report['reclaimable'])} reclaimable in {report['seconds']}s")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory build and run garbage collection")
+    parser.add_argument("--builds-dir", help="Builds directory (default: repo builds/)")
+    parser.add_argument("--runs-dir", help="Runs directory (default: repo runs/)")
+    parser.add_argument("--dry-run", action="store_true", help="Report reclaimable bytes without deleting")
+    parser.add_argument("--policy", nargs="*", default=[], metavar="NAME=VALUE",
+                        help=f"Override a retention setting ({', '.join(DEFAULT_POLICY)})")
+    parser.add_argument("--workers", type=int, help=f"Parallel deletions (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--json", action="store_true", help="Print JSON report")
+
+    args = parser.parse_args()
+
+    try:
+        policy = load_policy(parse_policy_overrides(args.policy))
+        report = run_gc(args.builds_dir, args.runs_dir, policy, args.dry_run, args.workers)
+        print(dumps(report).decode("utf-8") if args.json else format_gc_report(report))
+        if report["errors"]:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,15 @@ Manages build_index.json file for tracking completed builds across all modes.
 import json
 import hashlib
 import os
+import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Union, Tuple
+
+from .jsonio import read_json, write_json
+
+# In-process lookup index, rebuilt whenever build_index.json changes on disk
+_registry_index_cache: Dict = {"stamp": None, "index": None}
 
 def get_build_registry_path() -> Path:
     """Get the path to the build registry file."""
@@ -30,13 +36,11 @@ def load_build_registry() -> Dict:
             "updatedAt": datetime.now().isoformat(),
             "builds": []
         }
-        with open(registry_path, 'w') as f:
-            json.dump(empty_registry, f, indent=2)
+        write_json(registry_path, empty_registry)
         return empty_registry
     
     try:
-        with open(registry_path, 'r') as f:
-            return json.load(f)
+        return read_json(registry_path)
     except (json.JSONDecodeError, IOError) as e:
         print(f"Warning: Could not load build registry: {e}")
         return {
@@ -56,8 +60,7 @@ def save_build_registry(registry: Dict) -> bool:
         registry["updatedAt"] = datetime.now().isoformat()
         
         # Write to file
-        with open(registry_path, 'w') as f:
-            json.dump(registry, f, indent=2, sort_keys=True)
+        write_json(registry_path, registry, sort_keys=True)
         
         return True
     except IOError as e:
@@ -141,8 +144,8 @@ def register_build(
         "preview": {
             "enabled": status == "success",
             "instructions": [
+                f"python3 -m appfactory.node_modules_store install {build_path}",
                 f"cd {build_path}",
-                "npm install",
                 "npx expo install --check",
                 launch_command
             ]
@@ -216,6 +219,133 @@ def get_build_by_id(build_id: str) -> Optional[Dict]:
     builds = get_builds()
     return next((build for build in builds if build["buildId"] == build_id), None)
 
+def build_registry_index(registry: Dict) -> Dict[str, Dict]:
+    """
+    Index successful builds by origin.
+
+    Returns a dict with 'byDreamPromptHash' and 'byPipelineOrigin' maps. When
+    several successful builds share an origin the most recent one wins.
+    """
+    by_dream_hash = {}
+    by_pipeline_origin = {}
+
+    builds = [b for b in registry.get("builds", []) if b.get("status") == "success"]
+    for build in sorted(builds, key=lambda b: b.get("createdAt", "")):
+        origin = build.get("origin", {})
+        if origin.get("dreamPromptHash"):
+            by_dream_hash[origin["dreamPromptHash"]] = build
+        if origin.get("mode") == "pipeline" and origin.get("runId") and origin.get("ideaSlug"):
+            by_pipeline_origin[f"{origin['runId']}::{origin['ideaSlug']}"] = build
+
+    return {
+        "byDreamPromptHash": by_dream_hash,
+        "byPipelineOrigin": by_pipeline_origin
+    }
+
+def get_registry_index() -> Dict[str, Dict]:
+    """Get the lookup index, reloading the registry only if it changed on disk."""
+    registry_path = get_build_registry_path()
+    try:
+        stat = registry_path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        stamp = None
+
+    if _registry_index_cache["index"] is None or _registry_index_cache["stamp"] != stamp:
+        _registry_index_cache["index"] = build_registry_index(load_build_registry())
+        _registry_index_cache["stamp"] = stamp
+
+    return _registry_index_cache["index"]
+
+def find_build_by_dream_prompt_hash(dream_prompt_hash: str) -> Optional[Dict]:
+    """Get the latest successful build for a dream prompt hash."""
+    return get_registry_index()["byDreamPromptHash"].get(dream_prompt_hash)
+
+def find_pipeline_build(run_id: str, idea_slug: str) -> Optional[Dict]:
+    """Get the latest successful build for a pipeline run and idea."""
+    return get_registry_index()["byPipelineOrigin"].get(f"{run_id}::{idea_slug}")
+
+def clone_build_tree(source_path: str, dest_path: str) -> Tuple[int, int]:
+    """
+    Hard-link a build tree into a new location.
+
+    Files are hard-linked where possible and copied otherwise (e.g. across
+    filesystems). Linked files share content with the source build, so later
+    edits must replace files rather than modify them in place. Symlinks, to
+    files or directories, are recreated as symlinks.
+
+    Returns:
+        Tuple of (linked_count, copied_count); symlinks count as copied
+    """
+    repo_root = Path(__file__).parent.parent
+    source = Path(source_path) if Path(source_path).is_absolute() else repo_root / source_path
+    dest = Path(dest_path) if Path(dest_path).is_absolute() else repo_root / dest_path
+
+    if not source.is_dir():
+        raise FileNotFoundError(f"Build directory not found: {source}")
+    if dest.exists() and any(dest.iterdir()):
+        raise FileExistsError(f"Destination is not empty: {dest}")
+
+    linked = copied = 0
+    for dirpath, dirnames, filenames in os.walk(source):
+        target_dir = dest / Path(dirpath).relative_to(source)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for name in dirnames + filenames:
+            src_file = os.path.join(dirpath, name)
+            dst_file = target_dir / name
+            if os.path.islink(src_file):
+                os.symlink(os.readlink(src_file), dst_file)
+                copied += 1
+                continue
+            if name not in filenames:
+                continue
+            try:
+                os.link(src_file, dst_file)
+                linked += 1
+            except OSError:
+                shutil.copy2(src_file, dst_file)
+                copied += 1
+        # Symlinked directories were recreated above; do not descend into them
+        dirnames[:] = [d for d in dirnames if not os.path.islink(os.path.join(dirpath, d))]
+
+    return linked, copied
+
+def reuse_dream_build(
+    dream_prompt_hash: str,
+    name: str,
+    slug: str,
+    build_path: str,
+    run_id: str,
+    notes: str = ""
+) -> Optional[Dict]:
+    """
+    Reuse an existing successful dream build for an identical prompt.
+
+    If a build with the same dreamPromptHash exists it is returned as-is when
+    build_path matches, otherwise its tree is cloned into build_path and the
+    clone is registered. Returns None when there is nothing to reuse, in which
+    case the caller should run the full dream pipeline.
+    """
+    existing = find_build_by_dream_prompt_hash(dream_prompt_hash)
+    if existing is None:
+        return None
+
+    if os.path.normpath(existing["buildPath"]) == os.path.normpath(build_path):
+        return existing
+
+    linked, copied = clone_build_tree(existing["buildPath"], build_path)
+    clone_notes = notes or f"Cloned from build {existing['buildId']} ({linked} linked, {copied} copied)"
+    register_dream_build(
+        name=name,
+        slug=slug,
+        build_path=build_path,
+        status="success",
+        run_id=run_id,
+        dream_prompt_hash=dream_prompt_hash,
+        notes=clone_notes
+    )
+    return find_build_by_dream_prompt_hash(dream_prompt_hash)
+
 def validate_build_registry() -> List[str]:
     """Validate the build registry and return any errors found."""
     errors = []
@@ -268,6 +398,8 @@ if __name__ == "__main__":
         print("  validate     - Validate the build registry")
         print("  list         - List all builds")
         print("  register     - Register a new build")
+        print("  lookup       - Find a successful build (--dream-hash H | --run-id R --idea-slug S)")
+        print("  clone        - Hard-link a build tree: clone <source_path> <dest_path>")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -291,6 +423,30 @@ if __name__ == "__main__":
     elif command == "register":
         print("Use register_pipeline_build() or register_dream_build() functions from Python code")
     
+    elif command == "lookup":
+        options = dict(zip(sys.argv[2::2], sys.argv[3::2]))
+        if "--dream-hash" in options:
+            build = find_build_by_dream_prompt_hash(options["--dream-hash"])
+        elif "--run-id" in options and "--idea-slug" in options:
+            build = find_pipeline_build(options["--run-id"], options["--idea-slug"])
+        else:
+            print("Usage: python -m appfactory.build_registry lookup --dream-hash <hash>")
+            print("       python -m appfactory.build_registry lookup --run-id <id> --idea-slug <slug>")
+            sys.exit(1)
+        
+        if build is None:
+            print("No successful build found")
+            sys.exit(1)
+        print(json.dumps(build, indent=2))
+    
+    elif command == "clone":
+        if len(sys.argv) < 4:
+            print("Usage: python -m appfactory.build_registry clone <source_path> <dest_path>")
+            sys.exit(1)
+        
+        linked, copied = clone_build_tree(sys.argv[2], sys.argv[3])
+        print(f"Cloned build tree: {linked} files linked, {copied} copied")
+    
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
\ No newline at end of file
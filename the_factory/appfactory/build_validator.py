@@ -2,50 +2,121 @@
 """
 Build Validator for App Factory
 
-Validates Expo builds and generates validation reports.
+Validates Expo builds and generates validation reports, including a
+bundle-size analysis checked against budgets (see bundle_analyzer), a
+render-performance lint gated on a severity threshold (see render_lint)
+and a cold-start estimate recorded per build (see cold_start).
 """
 
-import json
+import hashlib
 import os
+import re
+import signal
 import subprocess
 import sys
+import tempfile
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
-def run_command(command: List[str], cwd: Optional[Path] = None, timeout: int = 30) -> Dict[str, Union[str, int]]:
-    """Run a command and return the result."""
+from .bundle_analyzer import analyze_build, load_budgets, parse_budget_overrides
+from .cold_start import analyze_cold_start, record_cold_start
+from .jsonio import read_json, write_json, loads
+from .render_lint import SEVERITIES, format_finding, lint_build, at_or_above
+
+# Bytes of a command's output kept in the report; the full output stays in meta/logs/
+OUTPUT_HEAD_BYTES = 2_000
+OUTPUT_TAIL_BYTES = 4_000
+# Seconds a timed-out process group gets between SIGTERM and SIGKILL
+KILL_GRACE_SECONDS = 5
+
+def summarize_output(path: Path) -> Dict[str, Union[str, int, bool]]:
+    """Bounded head and tail of a log file, with its size and sha256 (read in chunks)."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        head = f.read(OUTPUT_HEAD_BYTES)
+        digest.update(head)
+        size += len(head)
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+            size += len(chunk)
+        tail = b""
+        if size > OUTPUT_HEAD_BYTES:
+            f.seek(max(OUTPUT_HEAD_BYTES, size - OUTPUT_TAIL_BYTES))
+            tail = f.read()
+    omitted = size - len(head) - len(tail)
+    text = head.decode("utf-8", errors="replace")
+    if omitted:
+        text += f"\n... [{omitted} bytes omitted] ...\n"
+    text += tail.decode("utf-8", errors="replace")
+    return {"text": text.strip(), "bytes": size, "sha256": digest.hexdigest(), "truncated": omitted > 0}
+
+def kill_process_group(process: subprocess.Popen) -> None:
+    """Terminate a process and everything it spawned (npx children), then reap it."""
     try:
-        result = subprocess.run(
-            command,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        return {
-            "command": " ".join(command),
-            "returncode": result.returncode,
-            "stdout": result.stdout.strip(),
-            "stderr": result.stderr.strip(),
-            "success": result.returncode == 0
-        }
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+        process.wait(timeout=KILL_GRACE_SECONDS)
+    except ProcessLookupError:
+        pass
     except subprocess.TimeoutExpired:
-        return {
-            "command": " ".join(command),
-            "returncode": -1,
-            "stdout": "",
-            "stderr": f"Command timed out after {timeout}s",
-            "success": False
-        }
-    except Exception as e:
-        return {
-            "command": " ".join(command),
-            "returncode": -1,
-            "stdout": "",
-            "stderr": str(e),
-            "success": False
-        }
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            process.kill()
+    process.wait()
+
+def run_command(command: List[str], cwd: Optional[Path] = None, timeout: int = 30,
+                log_dir: Optional[Path] = None, name: Optional[str] = None) -> Dict[str, Union[str, int]]:
+    """
+    Run a command and return the result.
+
+    stdout and stderr stream to <log_dir>/<name>.stdout.log and .stderr.log
+    (a temporary directory when log_dir is None) instead of memory. The
+    result keeps a bounded head and tail of each plus their size and
+    sha256. The command runs in its own process group, which is killed
+    as a whole on timeout.
+    """
+    name = name or re.sub(r"[^\w.-]+", "_", " ".join(command[:3])).strip("_")
+    with tempfile.TemporaryDirectory() as tmp:
+        logs_dir = Path(log_dir) if log_dir else Path(tmp)
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        stdout_path = logs_dir / f"{name}.stdout.log"
+        stderr_path = logs_dir / f"{name}.stderr.log"
+        result = {"command": " ".join(command), "returncode": -1, "success": False}
+        error = None
+        try:
+            with open(stdout_path, 'wb') as stdout, open(stderr_path, 'wb') as stderr:
+                process = subprocess.Popen(command, cwd=cwd, stdin=subprocess.DEVNULL, stdout=stdout,
+                                           stderr=stderr, start_new_session=True)
+                try:
+                    result["returncode"] = process.wait(timeout=timeout)
+                    result["success"] = result["returncode"] == 0
+                except subprocess.TimeoutExpired:
+                    kill_process_group(process)
+                    result["timedOut"] = True
+                    error = f"Command timed out after {timeout}s"
+        except Exception as e:
+            error = str(e)
+
+        for stream, path in (("stdout", stdout_path), ("stderr", stderr_path)):
+            output = summarize_output(path) if path.exists() else {"text": "", "bytes": 0, "sha256": None,
+                                                                   "truncated": False}
+            result[stream] = output["text"]
+            result[f"{stream}Bytes"] = output["bytes"]
+            result[f"{stream}Sha256"] = output["sha256"]
+            result[f"{stream}Truncated"] = output["truncated"]
+            if log_dir:
+                result[f"{stream}Log"] = str(path)
+        if error:
+            result["stderr"] = f"{error}\n{result['stderr']}".strip()
+        return result
 
 def get_node_version() -> Optional[str]:
     """Get Node.js version."""
@@ -57,7 +128,22 @@ def get_npm_version() -> Optional[str]:
     result = run_command(["npm", "--version"])
     return result["stdout"] if result["success"] else None
 
-def validate_expo_build(build_path: Path) -> Dict:
+def summarize_expo_config(config: Dict) -> Dict:
+    """The fields of a public Expo config that validation reports keep."""
+    config = config.get("expo", config)
+    plugins = [p[0] if isinstance(p, list) and p else p for p in config.get("plugins", [])]
+    return {
+        "name": config.get("name"),
+        "slug": config.get("slug"),
+        "version": config.get("version"),
+        "sdkVersion": config.get("sdkVersion"),
+        "ios": {"bundleIdentifier": config.get("ios", {}).get("bundleIdentifier")},
+        "android": {"package": config.get("android", {}).get("package")},
+        "plugins": [p for p in plugins if isinstance(p, str)]
+    }
+
+def validate_expo_build(build_path: Path, budgets: Optional[Dict[str, int]] = None,
+                        lint_threshold: str = "error") -> Dict:
     """Validate an Expo build and generate a validation report."""
     
     validation_report = {
@@ -72,7 +158,9 @@ def validate_expo_build(build_path: Path) -> Dict:
             "hasValidBundleIdentifier": False,
             "hasValidAndroidPackage": False,
             "hasMandatoryFiles": False,
-            "expoInstallCheck": False
+            "expoInstallCheck": False,
+            "withinBundleBudgets": False,
+            "passesRenderLint": False
         },
         "expo": {
             "version": None,
@@ -84,6 +172,9 @@ def validate_expo_build(build_path: Path) -> Dict:
             "expoModules": [],
             "issues": []
         },
+        "bundle": None,
+        "renderLint": None,
+        "coldStart": None,
         "commands": {},
         "errors": [],
         "warnings": []
@@ -99,8 +190,7 @@ def validate_expo_build(build_path: Path) -> Dict:
     if package_json_path.exists():
         validation_report["validation"]["packageJsonExists"] = True
         try:
-            with open(package_json_path, 'r') as f:
-                package_data = json.load(f)
+            package_data = read_json(package_json_path)
             
             # Extract Expo modules
             dependencies = package_data.get("dependencies", {})
@@ -125,8 +215,7 @@ def validate_expo_build(build_path: Path) -> Dict:
     if app_json_path.exists():
         validation_report["validation"]["appJsonExists"] = True
         try:
-            with open(app_json_path, 'r') as f:
-                app_data = json.load(f)
+            app_data = read_json(app_json_path)
             
             expo_config = app_data.get("expo", {})
             
@@ -165,31 +254,91 @@ def validate_expo_build(build_path: Path) -> Dict:
     if not has_entry_point:
         validation_report["errors"].append("No valid entry point found (App.js, App.tsx, or app/_layout.tsx)")
 
-    # Run Expo commands
+    # Analyze bundle weight against budgets
+    if validation_report["validation"]["packageJsonExists"]:
+        try:
+            bundle = analyze_build(build_path, budgets)
+            validation_report["bundle"] = bundle
+            validation_report["validation"]["withinBundleBudgets"] = not bundle["budget_violations"]
+            for violation in bundle["budget_violations"]:
+                validation_report["errors"].append(
+                    f"Bundle budget exceeded: {violation['budget']} is {violation['actual']:,} "
+                    f"(budget {violation['limit']:,})"
+                )
+            if bundle["dependencies"]["unused"]:
+                validation_report["warnings"].append(
+                    f"Unused dependencies: {', '.join(bundle['dependencies']['unused'])}"
+                )
+            for item in bundle["heavy_imports"]:
+                validation_report["warnings"].append(f"Heavy import {item['package']}: {item['reason']}")
+        except Exception as e:
+            validation_report["warnings"].append(f"Bundle analysis failed: {e}")
+
+    # Lint screens and stores for render-performance problems
+    try:
+        lint = lint_build(build_path, lint_threshold)
+        validation_report["renderLint"] = lint
+        validation_report["validation"]["passesRenderLint"] = lint["passed"]
+        failing = at_or_above(lint["findings"], lint_threshold)
+        for finding in failing:
+            validation_report["errors"].append(f"Render lint: {format_finding(finding)}")
+        for finding in at_or_above(lint["findings"], "warning"):
+            if finding not in failing:
+                validation_report["warnings"].append(f"Render lint: {format_finding(finding)}")
+    except Exception as e:
+        validation_report["warnings"].append(f"Render lint failed: {e}")
+
+    # Estimate cold-start cost and record it for regression tracking (meta/cold_start*.json)
+    try:
+        cold_start = analyze_cold_start(build_path)
+        regression = record_cold_start(build_path, cold_start)
+        validation_report["coldStart"] = {
+            "templateVersion": cold_start["template_version"],
+            "estimate": cold_start["estimate"],
+            "actions": cold_start["actions"],
+            "regression": regression
+        }
+        for key, change in regression.items():
+            validation_report["warnings"].append(
+                f"Cold-start regression: {key} {change['before']} -> {change['after']} ms"
+            )
+    except Exception as e:
+        validation_report["warnings"].append(f"Cold-start analysis failed: {e}")
+
+    # Run Expo commands, streaming their output to meta/logs/
     original_cwd = Path.cwd()
+    log_dir = build_path.resolve().parent / "meta" / "logs"
+
+    def run_expo(key: str, command: List[str]) -> Dict:
+        result = run_command(command, log_dir=log_dir, name=key)
+        stored = dict(result)
+        for stream in ("stdout", "stderr"):
+            if f"{stream}Log" in stored:
+                stored[f"{stream}Log"] = os.path.relpath(stored[f"{stream}Log"], log_dir.parent.parent)
+        validation_report["commands"][key] = stored
+        return result
+
     try:
         os.chdir(build_path)
         
         # Check Expo version
-        expo_version_result = run_command(["npx", "expo", "--version"])
-        validation_report["commands"]["expo_version"] = expo_version_result
+        expo_version_result = run_expo("expo_version", ["npx", "expo", "--version"])
         if expo_version_result["success"]:
             validation_report["expo"]["version"] = expo_version_result["stdout"]
 
-        # Check Expo config
-        expo_config_result = run_command(["npx", "expo", "config", "--type", "public"])
-        validation_report["commands"]["expo_config"] = expo_config_result
+        # Check Expo config (parsed from the full log; the report keeps a summary)
+        expo_config_result = run_expo("expo_config", ["npx", "expo", "config", "--type", "public"])
         if expo_config_result["success"]:
             try:
-                config_data = json.loads(expo_config_result["stdout"])
-                validation_report["expo"]["config"] = config_data
-                validation_report["expo"]["sdkVersion"] = config_data.get("expo", {}).get("sdkVersion")
+                config_data = loads(Path(expo_config_result["stdoutLog"]).read_bytes())
+                validation_report["expo"]["config"] = summarize_expo_config(config_data)
+                validation_report["expo"]["sdkVersion"] = config_data.get("sdkVersion") or \
+                    config_data.get("expo", {}).get("sdkVersion")
             except:
                 validation_report["warnings"].append("Could not parse expo config JSON")
 
         # Check Expo install status
-        expo_install_result = run_command(["npx", "expo", "install", "--check"])
-        validation_report["commands"]["expo_install_check"] = expo_install_result
+        expo_install_result = run_expo("expo_install_check", ["npx", "expo", "install", "--check"])
         validation_report["validation"]["expoInstallCheck"] = expo_install_result["success"]
         
         if not expo_install_result["success"]:
@@ -198,8 +347,7 @@ def validate_expo_build(build_path: Path) -> Dict:
             )
 
         # Check Expo doctor if available
-        expo_doctor_result = run_command(["npx", "expo-doctor"])
-        validation_report["commands"]["expo_doctor"] = expo_doctor_result
+        run_expo("expo_doctor", ["npx", "expo-doctor"])
 
     except Exception as e:
         validation_report["errors"].append(f"Error during command execution: {e}")
@@ -217,8 +365,7 @@ def write_validation_report(build_path: Path, report: Dict) -> bool:
         
         # Write validation report
         validation_path = meta_dir / "build_validation.json"
-        with open(validation_path, 'w') as f:
-            json.dump(report, f, indent=2, sort_keys=True)
+        write_json(validation_path, report, sort_keys=True)
         
         print(f"Validation report written to: {validation_path}")
         return True
@@ -263,7 +410,8 @@ def main():
     if len(sys.argv) < 2:
         print("Usage: python -m appfactory.build_validator <command> [args...]")
         print("\nCommands:")
-        print("  validate <build_path>    - Validate an Expo build")
+        print("  validate <build_path> [--budget name=value ...] [--lint-threshold error|warning|info]")
+        print("                           - Validate an Expo build (bundle budgets: see bundle_analyzer)")
         print("  bundle-id <slug>         - Generate bundle identifier from slug")
         sys.exit(1)
     
@@ -271,13 +419,23 @@ def main():
     
     if command == "validate":
         if len(sys.argv) < 3:
-            print("Usage: python -m appfactory.build_validator validate <build_path>")
+            print("Usage: python -m appfactory.build_validator validate <build_path> [--budget name=value ...] "
+                  "[--lint-threshold error|warning|info]")
             sys.exit(1)
         
         build_path = Path(sys.argv[2])
+        overrides = [arg for flag, arg in zip(sys.argv[3:], sys.argv[4:]) if flag == "--budget"]
+        budgets = load_budgets(parse_budget_overrides(overrides))
+        thresholds = [arg for flag, arg in zip(sys.argv[3:], sys.argv[4:]) if flag == "--lint-threshold"]
+        lint_threshold = thresholds[-1] if thresholds else "error"
+        if lint_threshold not in SEVERITIES:
+            # lint_build would raise and the gate would degrade to a warning
+            print(f"Error: Unknown lint threshold '{lint_threshold}' (expected one of {', '.join(SEVERITIES)})",
+                  file=sys.stderr)
+            sys.exit(1)
         print(f"Validating build at: {build_path}")
         
-        report = validate_expo_build(build_path)
+        report = validate_expo_build(build_path, budgets, lint_threshold)
         write_validation_report(build_path, report)
         
         # Print summary
@@ -292,6 +450,12 @@ def main():
         print(f"✅ Android package: {validation['hasValidAndroidPackage']}")
         print(f"✅ Entry point: {validation['hasMandatoryFiles']}")
         print(f"✅ Expo install check: {validation['expoInstallCheck']}")
+        print(f"✅ Within bundle budgets: {validation['withinBundleBudgets']}")
+        print(f"✅ Passes render lint: {validation['passesRenderLint']}")
+        if report["coldStart"]:
+            estimate = report["coldStart"]["estimate"]
+            print(f"🚀 Cold start: first frame ~{estimate['first_frame_ms']} ms, "
+                  f"then ~{estimate['after_first_frame_ms']} ms of startup work")
         
         if errors:
             print(f"\n❌ Errors ({len(errors)}):")
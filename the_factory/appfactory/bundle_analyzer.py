@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+App Factory Bundle Analyzer
+
+Estimates how heavy a generated Expo build is. The import graph is walked
+from the app's entry points (every route under app/ for expo-router
+builds, App.tsx/index.ts otherwise) through src/, resolving relative
+imports and tsconfig path aliases. For each imported package the installed
+size is attributed from node_modules when present (own files, and with its
+dependency closure). Unused dependencies, heavy imports and asset bytes
+are reported, and sizes are checked against budgets.
+
+Budgets default to DEFAULT_BUDGETS and can be overridden repo-wide in
+standards/bundle_budgets.json or per call (--budget name=value).
+build_validator embeds the analysis in meta/build_validation.json and
+fails validation when a budget is exceeded.
+
+Usage:
+    python -m appfactory.bundle_analyzer <build_path> [--budget asset_bytes=5000000 ...] [--json]
+"""
+
+import json
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .asset_store import iter_asset_files
+from .jsonio import dumps, loads
+
+DEFAULT_BUDGETS = {
+    # JS/TS source reachable from the entry points
+    "source_bytes": 1_000_000,
+    # Images, fonts and media shipped in the build
+    "asset_bytes": 5_000_000,
+    # Direct runtime dependencies in package.json
+    "dependency_count": 40,
+    # Installed size of the runtime dependencies and their dependencies (needs node_modules)
+    "installed_bytes": 300_000_000
+}
+# Imported packages whose installed size (with dependencies) is above this are reported as heavy
+HEAVY_PACKAGE_BYTES = 5_000_000
+KNOWN_HEAVY = {
+    "moment": "large and not tree-shakeable; date-fns or dayjs are much smaller",
+    "lodash": "the root import pulls in the whole library; import per method (lodash/get)",
+    "aws-sdk": "v2 SDK bundles every service; use the modular @aws-sdk/client-* packages",
+    "firebase": "the compat root import bundles every product; import firebase/<product>"
+}
+# Used without being imported: the runtime (and modules it loads itself), web support, and expo-router's peers
+IMPLICIT_DEPENDENCIES = {
+    "expo", "react", "react-native", "react-dom", "react-native-web",
+    "expo-asset", "expo-font", "expo-splash-screen",
+    "expo-constants", "expo-linking", "react-native-safe-area-context", "react-native-screens",
+    "react-native-reanimated", "react-native-gesture-handler"
+}
+SOURCE_EXTENSIONS = [".tsx", ".ts", ".jsx", ".js", ".json"]
+ENTRY_FILES = ["App.tsx", "App.ts", "App.jsx", "App.js", "index.tsx", "index.ts", "index.js"]
+CONFIG_FILES = ["app.json", "app.config.js", "app.config.ts", "babel.config.js", "metro.config.js"]
+SKIP_DIRS = {"node_modules", ".git", ".expo", "_upstream", "_docs"}
+
+IMPORT_PATTERN = re.compile(
+    r"""(?:\bimport\s+(type\s+)?(?:[\w*{}\s,$]+?\s+from\s+)?"""
+    r"""|\bexport\s+(type\s+)?(?:[\w*{}\s,$]+?\s+from\s+)"""
+    r"""|\brequire\s*\(\s*|\bimport\s*\(\s*)['"]([^'"\n]+)['"]"""
+)
+BABEL_ALIAS_PATTERN = re.compile(r"""['"]?([@~\w][\w\-/]*)['"]?\s*:\s*['"](\.[^'"]*)['"]""")
+COMMENT_PATTERN = re.compile(r"/\*.*?\*/|^\s*//[^\n]*", re.DOTALL | re.MULTILINE)
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def load_budgets(overrides: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Default budgets, then standards/bundle_budgets.json, then overrides."""
+    budgets = dict(DEFAULT_BUDGETS)
+    path = get_repo_root() / "standards" / "bundle_budgets.json"
+    if path.exists():
+        budgets.update(_read_jsonc(path))
+    budgets.update(overrides or {})
+    return budgets
+
+def _read_jsonc(path: Path) -> Dict[str, Any]:
+    """Read JSON that may contain comments and trailing commas (tsconfig.json)."""
+    text = path.read_text(encoding="utf-8")
+    try:
+        return loads(text)
+    except ValueError:
+        text = re.sub(r"/\*.*?\*/|(?<![:\"'])//[^\n]*", "", text, flags=re.DOTALL)
+        return json.loads(re.sub(r",(\s*[}\]])", r"\1", text))
+
+def find_imports(source: str) -> List[str]:
+    """Module specifiers imported by a JS/TS file (type-only imports excluded)."""
+    source = COMMENT_PATTERN.sub("", source)
+    return [m.group(3) for m in IMPORT_PATTERN.finditer(source) if not (m.group(1) or m.group(2))]
+
+def package_name(specifier: str) -> str:
+    """Package part of a bare specifier ('@scope/pkg/sub' -> '@scope/pkg')."""
+    parts = specifier.split("/")
+    return "/".join(parts[:2]) if specifier.startswith("@") and len(parts) > 1 else parts[0]
+
+def load_path_aliases(build_path: Path) -> List[Tuple[str, List[Path]]]:
+    """
+    Import aliases as (prefix, target paths), longest prefix first.
+
+    Read from tsconfig 'paths' and babel module-resolver 'alias' entries
+    (a babel alias 'x' covers 'x' and 'x/...', never 'x-other').
+    """
+    aliases = []
+    tsconfig = build_path / "tsconfig.json"
+    if tsconfig.exists():
+        try:
+            options = _read_jsonc(tsconfig).get("compilerOptions", {})
+        except (OSError, ValueError):
+            options = {}
+        base = build_path / options.get("baseUrl", ".")
+        for pattern, targets in options.get("paths", {}).items():
+            prefix = pattern[:-1] if pattern.endswith("*") else pattern
+            aliases.append((prefix, [base / (t[:-1] if t.endswith("*") else t) for t in targets]))
+
+    babel_config = build_path / "babel.config.js"
+    if babel_config.exists():
+        block = re.search(r"alias\s*:\s*\{([^}]*)\}", babel_config.read_text(encoding="utf-8", errors="replace"))
+        for key, target in BABEL_ALIAS_PATTERN.findall(block.group(1) if block else ""):
+            aliases.append((key + "/", [build_path / target / ""]))
+            aliases.append((key, [build_path / target]))
+    return sorted(aliases, key=lambda alias: len(alias[0]), reverse=True)
+
+def resolve_file(path: Path) -> Optional[Path]:
+    """Resolve an import target the way Metro does (extensions, then index files)."""
+    if path.is_file():
+        return path
+    for extension in SOURCE_EXTENSIONS:
+        candidate = path.with_name(path.name + extension)
+        if candidate.is_file():
+            return candidate
+    for extension in SOURCE_EXTENSIONS:
+        candidate = path / f"index{extension}"
+        if candidate.is_file():
+            return candidate
+    return None
+
+def resolve_import(path: Path, specifier: str,
+                   aliases: List[Tuple[str, List[Path]]]) -> Tuple[Optional[Path], Optional[str]]:
+    """
+    Resolve a specifier imported by a file to (file, None) or (None, package).
+
+    Relative and aliased imports that do not resolve give (None, None).
+    """
+    if specifier.startswith("."):
+        targets = [path.parent / specifier]
+    else:
+        targets = [target / specifier[len(prefix):] for prefix, dirs in aliases
+                   if specifier.startswith(prefix) and (prefix.endswith("/") or specifier == prefix)
+                   for target in dirs]
+        if not targets:
+            return None, package_name(specifier)
+    return next((r for r in (resolve_file(t) for t in targets) if r), None), None
+
+def find_entry_points(build_path: Path) -> List[Path]:
+    """Entry files: expo-router routes under app/, plus App/index files at the root."""
+    entries = [build_path / name for name in ENTRY_FILES if (build_path / name).is_file()]
+    app_dir = build_path / "app"
+    if app_dir.is_dir():
+        for dirpath, dirnames, filenames in os.walk(app_dir):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and d != "assets")
+            entries.extend(Path(dirpath) / f for f in sorted(filenames)
+                           if os.path.splitext(f)[1] in SOURCE_EXTENSIONS[:4])
+    return entries
+
+def walk_import_graph(build_path: Path) -> Dict[str, Any]:
+    """Source files reachable from the entry points and the packages they import."""
+    aliases = load_path_aliases(build_path)
+    entries = find_entry_points(build_path)
+    seen: Set[Path] = set()
+    pending = list(entries)
+    packages: Dict[str, Set[str]] = {}
+    root_imports: Set[str] = set()
+    unresolved = []
+    referenced_assets: Set[Path] = set()
+
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        if path.suffix == ".json":
+            continue
+        relpath = str(path.relative_to(build_path))
+        for specifier in find_imports(path.read_text(encoding="utf-8", errors="replace")):
+            resolved, package = resolve_import(path, specifier, aliases)
+            if package:
+                packages.setdefault(package, set()).add(relpath)
+                if specifier == package:
+                    root_imports.add(specifier)
+            elif resolved is None:
+                unresolved.append({"file": relpath, "import": specifier})
+            elif resolved.suffix in SOURCE_EXTENSIONS:
+                pending.append(resolved.resolve())
+            else:
+                referenced_assets.add(resolved)
+
+    return {
+        "entry_points": [str(p.relative_to(build_path)) for p in entries],
+        "files": sorted(seen),
+        "packages": packages,
+        "root_imports": root_imports,
+        "unresolved": sorted(unresolved, key=lambda u: (u["file"], u["import"])),
+        "referenced_assets": sorted(referenced_assets)
+    }
+
+class PackageSizes:
+    """Installed package sizes from a node_modules tree, resolved like Node (nested, then hoisted)."""
+
+    def __init__(self, node_modules: Path):
+        self.node_modules = node_modules
+        self._own: Dict[Path, int] = {}
+        self._deps: Dict[Path, List[Path]] = {}
+
+    def locate(self, name: str, parent: Optional[Path] = None) -> Optional[Path]:
+        candidates = [parent / "node_modules" / name] if parent else []
+        candidates.append(self.node_modules / name)
+        return next((c for c in candidates if (c / "package.json").is_file()), None)
+
+    def own_bytes(self, package_dir: Path) -> int:
+        """Bytes of a package's own files (nested node_modules excluded)."""
+        if package_dir not in self._own:
+            total = 0
+            for dirpath, dirnames, filenames in os.walk(package_dir):
+                dirnames[:] = [d for d in dirnames if d != "node_modules"]
+                for filename in filenames:
+                    try:
+                        total += os.lstat(os.path.join(dirpath, filename)).st_size
+                    except OSError:
+                        pass
+            self._own[package_dir] = total
+        return self._own[package_dir]
+
+    def dependencies(self, package_dir: Path) -> List[Path]:
+        if package_dir not in self._deps:
+            try:
+                manifest = loads((package_dir / "package.json").read_bytes())
+            except (OSError, ValueError):
+                manifest = {}
+            names = list(manifest.get("dependencies", {})) + list(manifest.get("optionalDependencies", {}))
+            self._deps[package_dir] = [d for d in (self.locate(n, package_dir) for n in names) if d]
+        return self._deps[package_dir]
+
+    def closure(self, package_dirs: List[Path]) -> Set[Path]:
+        """Package directories reachable from the given ones."""
+        seen: Set[Path] = set()
+        pending = list(package_dirs)
+        while pending:
+            package_dir = pending.pop()
+            if package_dir not in seen:
+                seen.add(package_dir)
+                pending.extend(self.dependencies(package_dir))
+        return seen
+
+    def closure_bytes(self, package_dirs: List[Path]) -> int:
+        return sum(self.own_bytes(p) for p in self.closure(package_dirs))
+
+    def peer_dependencies(self, package_dir: Path) -> List[str]:
+        try:
+            return list(loads((package_dir / "package.json").read_bytes()).get("peerDependencies", {}))
+        except (OSError, ValueError):
+            return []
+
+def _config_mentions(build_path: Path, names: List[str]) -> Set[str]:
+    text = ""
+    for filename in CONFIG_FILES:
+        if (build_path / filename).is_file():
+            text += (build_path / filename).read_text(encoding="utf-8", errors="replace")
+    return {name for name in names if re.search(rf"['\"]{re.escape(name)}(/[^'\"]*)?['\"]", text)}
+
+def analyze_build(build_path: Path, budgets: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """Analyze a build directory (the one containing package.json) against budgets."""
+    build_path = Path(build_path).resolve()
+    budgets = budgets or load_budgets()
+    manifest = loads((build_path / "package.json").read_bytes())
+    declared = sorted(manifest.get("dependencies", {}))
+
+    graph = walk_import_graph(build_path)
+    imported = graph["packages"]
+    used = set(imported) | IMPLICIT_DEPENDENCIES | _config_mentions(build_path, declared)
+    if str(manifest.get("main", "")).startswith("expo-router"):
+        used.add("expo-router")
+
+    node_modules = build_path / "node_modules"
+    sizes = PackageSizes(node_modules) if node_modules.is_dir() else None
+    if sizes:
+        # Peers of used packages are required at runtime even when never imported directly
+        for name in sorted(used):
+            package_dir = sizes.locate(name)
+            if package_dir:
+                used.update(sizes.peer_dependencies(package_dir))
+
+    packages = {}
+    heavy = []
+    for name in sorted(imported):
+        info = {"imported_by": sorted(imported[name]), "declared": name in declared,
+                "installed_bytes": None, "with_dependencies_bytes": None}
+        package_dir = sizes.locate(name) if sizes else None
+        if package_dir:
+            info["installed_bytes"] = sizes.own_bytes(package_dir)
+            info["with_dependencies_bytes"] = sizes.closure_bytes([package_dir])
+        packages[name] = info
+        if name in KNOWN_HEAVY and name in graph["root_imports"]:
+            heavy.append({"package": name, "reason": KNOWN_HEAVY[name],
+                          "with_dependencies_bytes": info["with_dependencies_bytes"]})
+        elif (info["with_dependencies_bytes"] or 0) > HEAVY_PACKAGE_BYTES:
+            heavy.append({"package": name, "reason": f"installs {info['with_dependencies_bytes']:,} bytes "
+                          f"with its dependencies", "with_dependencies_bytes": info["with_dependencies_bytes"]})
+
+    source_bytes = sum(p.stat().st_size for p in graph["files"])
+    asset_files = [Path(p) for p in iter_asset_files(str(build_path))]
+    asset_sizes = sorted(((p.stat().st_size, str(p.relative_to(build_path))) for p in asset_files), reverse=True)
+    installed_bytes = None
+    if sizes:
+        direct = [d for d in (sizes.locate(name) for name in declared) if d]
+        installed_bytes = sizes.closure_bytes(direct)
+
+    actual = {
+        "source_bytes": source_bytes,
+        "asset_bytes": sum(size for size, _ in asset_sizes),
+        "dependency_count": len(declared),
+        "installed_bytes": installed_bytes
+    }
+    violations = [{"budget": name, "limit": limit, "actual": actual[name]}
+                  for name, limit in sorted(budgets.items())
+                  if actual.get(name) is not None and actual[name] > limit]
+
+    return {
+        "build_path": str(build_path),
+        "entry_points": graph["entry_points"],
+        "source_files": len(graph["files"]),
+        "unresolved_imports": graph["unresolved"],
+        "packages": packages,
+        "dependencies": {
+            "declared": len(declared),
+            "unused": sorted(set(declared) - used),
+            "undeclared": sorted(n for n in imported if n not in declared
+                                 and n not in manifest.get("devDependencies", {}))
+        },
+        "heavy_imports": heavy,
+        "assets": {
+            "files": len(asset_sizes),
+            "referenced": len(graph["referenced_assets"]),
+            "largest": [{"path": path, "bytes": size} for size, path in asset_sizes[:5]]
+        },
+        "node_modules": sizes is not None,
+        "totals": actual,
+        "budgets": budgets,
+        "budget_violations": violations
+    }
+
+def format_report(analysis: Dict[str, Any]) -> str:
+    """Human-readable summary of an analysis."""
+    totals = analysis["totals"]
+    lines = [
+        f"📦 Bundle analysis: {analysis['build_path']}",
+        f"   Entry points: {len(analysis['entry_points'])}, source files: {analysis['source_files']} "
+        f"({totals['source_bytes']:,} bytes)",
+        f"   Assets: {analysis['assets']['files']} files ({totals['asset_bytes']:,} bytes)",
+        f"   Dependencies: {totals['dependency_count']} declared, {len(analysis['packages'])} imported"
+        + (f", {totals['installed_bytes']:,} bytes installed" if totals["installed_bytes"] is not None
+           else " (no node_modules; sizes not attributed)")
+    ]
+    if analysis["dependencies"]["unused"]:
+        lines.append(f"   ⚠️ Unused dependencies: {', '.join(analysis['dependencies']['unused'])}")
+    if analysis["dependencies"]["undeclared"]:
+        lines.append(f"   ⚠️ Imported but not declared: {', '.join(analysis['dependencies']['undeclared'])}")
+    for item in analysis["heavy_imports"]:
+        lines.append(f"   ⚠️ Heavy import {item['package']}: {item['reason']}")
+    for item in analysis["unresolved_imports"]:
+        lines.append(f"   ⚠️ Unresolved import '{item['import']}' in {item['file']}")
+    for violation in analysis["budget_violations"]:
+        lines.append(f"   ❌ Over budget {violation['budget']}: {violation['actual']:,} > {violation['limit']:,}")
+    return "\n".join(lines)
+
+def parse_budget_overrides(items: List[str]) -> Dict[str, int]:
+    """Parse name=value budget overrides."""
+    overrides = {}
+    for item in items:
+        name, _, value = item.partition("=")
+        if name not in DEFAULT_BUDGETS or not value.isdigit():
+            raise ValueError(f"Invalid budget '{item}' (expected one of {', '.join(DEFAULT_BUDGETS)}=<int>)")
+        overrides[name] = int(value)
+    return overrides
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory bundle-size analyzer")
+    parser.add_argument("build_path", help="Build directory containing package.json")
+    parser.add_argument("--budget", action="append", default=[], metavar="NAME=VALUE", help="Override a budget")
+    parser.add_argument("--json", action="store_true", help="Print the analysis as JSON")
+
+    args = parser.parse_args()
+
+    try:
+        analysis = analyze_build(Path(args.build_path), load_budgets(parse_budget_overrides(args.budget)))
+        if args.json:
+            print(dumps(analysis).decode("utf-8"))
+        else:
+            print(format_report(analysis))
+        if analysis["budget_violations"]:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+App Factory Cold-Start Analysis
+
+Reconstructs what a generated app executes at startup, from source:
+
+- the modules evaluated before the first frame: the static import closure
+  of the root layout (app/_layout for expo-router, App/index otherwise)
+  plus, unless expo-router async routes are enabled, every route module;
+- startup work found in that code: SDK initialization, database setup,
+  store hydration, storage reads (async and synchronous), font loading,
+  permission prompts. Work runs before the first frame when it is at
+  module top level, or when the root layout or a provider holds rendering
+  back (loading/ready early returns, splash screen gating); otherwise it
+  runs in effects right after it.
+
+The startup cost estimate comes from a fixed cost model of a low-end
+Android device (COST_MODEL, PACKAGE_COSTS). It is meant for comparing
+builds and template versions, not as a measured time. Each analysis lists
+actionable items (lazy routes, deferred SDK init, concurrent init, ...).
+
+Results are recorded per build in meta/cold_start.json, with one line per
+run appended to meta/cold_start_history.jsonl (tagged with the build's
+templateVersion from build_meta.json) so regressions can be tracked.
+
+Usage:
+    python -m appfactory.cold_start analyze <build_path> [--record] [--json]
+    python -m appfactory.cold_start trend [builds_dir]
+"""
+
+import os
+import re
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .bundle_analyzer import IMPLICIT_DEPENDENCIES, find_entry_points, load_path_aliases, resolve_import
+from .jsonio import append_jsonl, dumps, loads, read_json, write_json
+from .render_lint import Source, match_bracket
+
+COST_MODEL = {
+    # Parse and evaluate app JS (Hermes bytecode) per KB of source
+    "source_ms_per_kb": 1.0,
+    # Module initialization of an eagerly imported package without a PACKAGE_COSTS entry
+    "package_ms": 4,
+    # Route registration per route module evaluated at startup
+    "route_ms": 3,
+    # Startup work, by kind
+    "sdk_init": 60,
+    "storage_init": 30,
+    "storage_read": 40,
+    "sync_storage_read": 10,
+    "hydration": 40,
+    "font_loading": 20,
+    "notification_setup": 5,
+    "permission_request": 0
+}
+PACKAGE_COSTS = {
+    "react-native-purchases": 30,
+    "react-native-purchases-ui": 30,
+    "expo-notifications": 15,
+    "expo-sqlite": 10,
+    "expo-av": 15,
+    "expo-camera": 20,
+    "react-native-reanimated": 25,
+    "react-native-svg": 10,
+    "react-native-chart-kit": 20,
+    "victory-native": 25,
+    "@sentry/react-native": 30,
+    "firebase": 120,
+    "moment": 20,
+    "lodash": 15,
+    "date-fns": 8
+}
+# Loaded by the runtime whatever the app imports
+BASELINE_PACKAGES = IMPLICIT_DEPENDENCIES | {"expo-router", "expo-status-bar"}
+REGRESSION_TOLERANCE = 0.10
+
+TASK_PATTERNS = [
+    ("sdk_init", re.compile(
+        r"\b(?:Purchases|Sentry|firebase|Analytics|Amplitude|Mixpanel|OneSignal|mobileAds\(\))\s*\.\s*"
+        r"(?:configure|init|initialize|initializeApp|setup)\w*\s*\("
+        r"|\binit(?:ialize)?(?:Purchases|RevenueCat|Sentry|Analytics)\s*\("
+        r"|\b\w*(?:purchases|Purchases|revenueCat|RevenueCat)\w*\.(?:init|initialize|configure)\w*\s*\(")),
+    ("storage_init", re.compile(
+        r"\b\w*(?:database|Database|db|Db)\w*\.(?:init|initialize|open|migrate)\w*\s*\("
+        r"|\bopenDatabaseAsync\s*\(")),
+    ("sync_storage_read", re.compile(
+        r"\bopenDatabaseSync\s*\(|\.(?:getAllSync|getFirstSync|execSync|runSync|getString|getNumber|getBoolean)\s*\("
+        r"|\bSecureStore\.getItem\s*\(|\blocalStorage\.getItem\s*\(")),
+    ("storage_read", re.compile(
+        r"\bAsyncStorage\.(?:getItem|multiGet|getAllKeys)\s*\(|\bSecureStore\.getItemAsync\s*\("
+        r"|\.(?:getAllAsync|getFirstAsync)\s*\(")),
+    ("hydration", re.compile(
+        r"\b(?:load|hydrate|rehydrate|restore|refresh)[A-Z]\w*\s*\(|\bcheck\w*Status\s*\(|\bpersist\s*\(")),
+    ("font_loading", re.compile(r"\buseFonts\s*\(|\bFont\.loadAsync\s*\(")),
+    ("permission_request", re.compile(r"\b\w*[Rr]equest\w*Permissions?(?:Async)?\s*\(")),
+    ("notification_setup", re.compile(
+        r"\bNotifications\.set\w+Handler\s*\(|\badd\w*(?:Notification|Response)\w*Listener\s*\(")),
+]
+STATIC_IMPORT = re.compile(
+    r"""^[ \t]*(?:import\s+(type\s+)?(?:[\w*{}\s,$]+?\s+from\s+)?|export\s+(type\s+)?[\w*{}\s,$]+?\s+from\s+)"""
+    r"""['"]([^'"\n]+)['"]""", re.MULTILINE)
+TOP_LEVEL_REQUIRE = re.compile(r"""^(?:const|let|var)\s+[^=\n]+=\s*require\(\s*['"]([^'"\n]+)['"]""", re.MULTILINE)
+DEFAULT_EXPORT = re.compile(r"\bexport\s+default\s+(?:function\s+)?(\w+)")
+PROVIDER_ELEMENT = re.compile(r"<(\w+Provider)\b")
+RENDER_GATE = re.compile(
+    r"\bif\s*\(\s*!?\s*\w*(?:[Ll]oading|[Rr]eady|[Ll]oaded|[Hh]ydrated|[Ii]nitialized)\w*\s*\)\s*\{?\s*return\b"
+    r"|\bpreventAutoHideAsync\s*\(")
+LAYOUT_NAMES = ["_layout.tsx", "_layout.ts", "_layout.jsx", "_layout.js"]
+APP_NAMES = ["App.tsx", "App.ts", "App.jsx", "App.js", "index.tsx", "index.ts", "index.js"]
+CONFIG_FILES = ["app.json", "app.config.js", "app.config.ts"]
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_meta_dir(build_path: Path) -> Path:
+    """meta/ directory of a build (next to the app directory, like build_validation.json)."""
+    return Path(build_path).parent / "meta"
+
+def read_template_version(build_path: Path) -> Optional[str]:
+    """generation.templateVersion from the build's build_meta.json, if recorded."""
+    for path in [build_path / "build_meta.json", build_path.parent / "build_meta.json",
+                 get_meta_dir(build_path) / "build_meta.json"]:
+        if path.is_file():
+            try:
+                return read_json(path).get("generation", {}).get("templateVersion")
+            except (OSError, ValueError):
+                return None
+    return None
+
+def uses_expo_router(build_path: Path) -> bool:
+    try:
+        manifest = loads((build_path / "package.json").read_bytes())
+    except (OSError, ValueError):
+        return False
+    return str(manifest.get("main", "")).startswith("expo-router") or "expo-router" in manifest.get("dependencies", {})
+
+def async_routes_enabled(build_path: Path) -> bool:
+    """Whether the expo-router plugin config enables async (lazily loaded) routes."""
+    for filename in CONFIG_FILES:
+        path = build_path / filename
+        if path.is_file():
+            match = re.search(r"asyncRoutes['\"]?\s*:\s*([^,}\s]+)", path.read_text(encoding="utf-8", errors="replace"))
+            if match and match.group(1).strip("'\"") != "false":
+                return True
+    return False
+
+def find_root(build_path: Path, expo_router: bool) -> Optional[Path]:
+    """The root component module: app/_layout for expo-router, else App/index."""
+    names = [f"app/{name}" for name in LAYOUT_NAMES] if expo_router else []
+    return next((build_path / n for n in names + APP_NAMES if (build_path / n).is_file()), None)
+
+def find_eager_imports(src: Source) -> List[str]:
+    """Specifiers evaluated when a module is: import/export-from declarations and top-level requires."""
+    specifiers = [m.group(3) for m in STATIC_IMPORT.finditer(src.text) if not (m.group(1) or m.group(2))]
+    return specifiers + TOP_LEVEL_REQUIRE.findall(src.text)
+
+def is_definition(text: str, match: re.Match) -> bool:
+    """Whether a call-like match is really a function or method definition."""
+    close = match_bracket(text, match.end() - 1)
+    return bool(re.match(r"\s*(?::\s*[^{=;]+)?\{", text[close + 1:close + 80])) or \
+        bool(re.search(r"\bfunction\s+$", text[max(0, match.start() - 20):match.start()]))
+
+class StartupGraph:
+    """Sources evaluated at startup and the import edges between them."""
+
+    def __init__(self, build_path: Path):
+        self.build_path = build_path
+        self.aliases = load_path_aliases(build_path)
+        self.sources: Dict[Path, Source] = {}
+        self.imports: Dict[Path, Dict[str, Path]] = {}
+        self.packages: Dict[str, Set[str]] = {}
+
+    def source(self, path: Path) -> Source:
+        if path not in self.sources:
+            relpath = str(path.relative_to(self.build_path))
+            self.sources[path] = Source(path.read_text(encoding="utf-8", errors="replace"), relpath)
+        return self.sources[path]
+
+    def add(self, entries: List[Path]) -> None:
+        """Add the eager import closure of entry modules."""
+        pending = [p.resolve() for p in entries]
+        while pending:
+            path = pending.pop()
+            if path in self.imports:
+                continue
+            self.imports[path] = {}
+            if path.suffix == ".json":
+                continue
+            src = self.source(path)
+            for specifier in find_eager_imports(src):
+                resolved, package = resolve_import(path, specifier, self.aliases)
+                if package:
+                    self.packages.setdefault(package, set()).add(src.filename)
+                elif resolved is not None and resolved.suffix in {".ts", ".tsx", ".js", ".jsx", ".json"}:
+                    self.imports[path][specifier] = resolved.resolve()
+                    pending.append(resolved.resolve())
+
+    def imported_name(self, path: Path, name: str) -> Optional[Path]:
+        """Module a name is imported from in a file (import { name } / import name)."""
+        text = self.source(path).text
+        for specifier, target in self.imports.get(path, {}).items():
+            if re.search(rf"import\s+(?:\w+\s*,\s*)?(?:\{{[^}}]*\b{name}\b[^}}]*\}}|{name}\b)[^;]*?['\"]"
+                         rf"{re.escape(specifier)}['\"]", text):
+                return target
+        return None
+
+    def file_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.imports)
+
+def package_cost(name: str) -> float:
+    if name in BASELINE_PACKAGES:
+        return 0
+    return PACKAGE_COSTS.get(name, COST_MODEL["package_ms"])
+
+def _scan_tasks(src: Source, start: int, end: int, followed: Set[str],
+                skip: List[Tuple[str, int, int]]) -> List[Dict[str, Any]]:
+    """
+    Startup work matched in src.text[start:end], outside the skipped function bodies.
+
+    Calls into followed functions are skipped too (their bodies are scanned instead).
+    """
+    tasks = []
+    for kind, pattern in TASK_PATTERNS:
+        for match in pattern.finditer(src.text, start, end):
+            if is_definition(src.text, match) or any(f[1] < match.start() <= f[2] for f in skip):
+                continue
+            call = re.sub(r"\s+", "", match.group(0)).rstrip("(")
+            if call.split(".")[-1] in followed:
+                continue
+            tasks.append({"kind": kind, "call": call, "file": src.filename, "line": src.line(match.start()),
+                          "cost_ms": COST_MODEL[kind]})
+    return tasks
+
+def _component_tasks(graph: StartupGraph, path: Path, name: str) -> Tuple[List[Dict[str, Any]], bool, List[str]]:
+    """
+    Work a component runs at startup: its body and effects, and the app functions they call
+    (same-file functions, imported functions and methods of imported objects).
+
+    Returns (tasks, holds rendering back, calls awaited one after another).
+    """
+    src = graph.source(path)
+    component = next((f for f in src.functions if f[0] == name), None)
+    if component is None:
+        return [], False, []
+    gated = bool(RENDER_GATE.search(src.text, component[1], component[2]))
+
+    # Functions defined inside the component (event handlers, helpers) only run at startup when called
+    nested = [f for f in src.functions if component[1] < f[1] and f[2] <= component[2]]
+    scopes = [(path, component, nested)]
+    followed = {(path, name)}
+    index = 0
+    while index < len(scopes):
+        scope_path, (_, start, end), skip = scopes[index]
+        scope_src = graph.source(scope_path)
+        for call in re.finditer(r"\b(?:(\w+)\.)?(\w+)\s*\(", scope_src.text[start:end]):
+            if any(f[1] < start + call.start() <= f[2] for f in skip):
+                continue
+            owner, callee = call.groups()
+            target = scope_path if owner in (None, "this") else graph.imported_name(scope_path, owner)
+            if owner is None and not any(f[0] == callee for f in scope_src.functions):
+                target = graph.imported_name(scope_path, callee)
+            if target is None or target.suffix == ".json" or (target, callee) in followed:
+                continue
+            function = next((f for f in graph.source(target).functions if f[0] == callee), None)
+            if function:
+                followed.add((target, callee))
+                scopes.append((target, function, []))
+        index += 1
+
+    followed_names = {callee for _, callee in followed}
+    tasks, sequential = [], []
+    for scope_path, (_, start, end), skip in scopes:
+        tasks.extend(_scan_tasks(graph.source(scope_path), start, end, followed_names, skip))
+    # Only the component's own file is checked for sequential awaits (services order their own steps)
+    for scope_path, (_, start, end), skip in (scope for scope in scopes if scope[0] == path):
+        text = graph.source(scope_path).text
+        awaited = [m.group(1) for m in re.finditer(r"\bawait\s+([\w.]+)\s*\(", text[start:end])
+                   if not any(f[1] < start + m.start() <= f[2] for f in skip)]
+        names = list(dict.fromkeys(call for call in awaited if call.split(".")[-1] in followed_names
+                                   or any(t["call"] == call for t in tasks)))
+        if len(names) >= 2 and ", ".join(names) not in sequential:
+            sequential.append(", ".join(names))
+    # The same call in alternative branches (iOS/Android keys) runs once
+    seen = set()
+    unique = [t for t in tasks if (t["kind"], t["call"]) not in seen and not seen.add((t["kind"], t["call"]))]
+    return unique, gated, sequential
+
+def analyze_cold_start(build_path: Path) -> Dict[str, Any]:
+    """Reconstruct startup work for a build and estimate its cold-start cost."""
+    build_path = Path(build_path).resolve()
+    expo_router = uses_expo_router(build_path)
+    root = find_root(build_path, expo_router)
+    if root is None:
+        raise FileNotFoundError(f"No root layout or App entry found in {build_path}")
+
+    graph = StartupGraph(build_path)
+    graph.add([root])
+    root_closure = set(graph.imports)
+    lazy_routes = expo_router and async_routes_enabled(build_path)
+    routes = []
+    if expo_router and not lazy_routes:
+        routes = [p.resolve() for p in find_entry_points(build_path)
+                  if p.parent.name != "app" or p.name not in LAYOUT_NAMES]
+        routes = [p for p in routes if (build_path / "app") in p.parents and p.resolve() != root.resolve()]
+        graph.add(routes)
+
+    root_src = graph.source(root.resolve())
+    root_imports = []
+    for specifier in find_eager_imports(root_src):
+        resolved, package = resolve_import(root.resolve(), specifier, graph.aliases)
+        if package:
+            root_imports.append({"import": specifier, "package": package, "cost_ms": package_cost(package)})
+        elif resolved is not None:
+            kb = resolved.stat().st_size / 1024
+            root_imports.append({"import": specifier, "file": str(resolved.relative_to(build_path)),
+                                 "cost_ms": round(kb * COST_MODEL["source_ms_per_kb"], 1)})
+
+    # Module top-level work in every eagerly evaluated file runs before the first frame
+    tasks = []
+    for path in sorted(graph.imports):
+        if path.suffix != ".json":
+            src = graph.source(path)
+            for task in _scan_tasks(src, 0, len(src.text), set(), src.functions):
+                task.update(phase="module_load", blocking=True)
+                tasks.append(task)
+
+    # The root component and the providers it renders run their work at startup
+    components = []
+    root_match = DEFAULT_EXPORT.search(root_src.text)
+    if root_match:
+        components.append((root.resolve(), root_match.group(1)))
+    for provider in sorted(set(PROVIDER_ELEMENT.findall(root_src.text))):
+        provider_path = graph.imported_name(root.resolve(), provider)
+        if provider_path and provider_path.suffix != ".json":
+            components.append((provider_path, provider))
+
+    providers, sequential = [], []
+    for path, name in components:
+        component_tasks, gated, awaited = _component_tasks(graph, path, name)
+        for task in component_tasks:
+            task.update(phase=f"{name} (holds first frame)" if gated else f"{name} effects", blocking=gated)
+        tasks.extend(component_tasks)
+        sequential.extend(f"{name}: {names}" for names in awaited)
+        if path != root.resolve():
+            providers.append({"name": name, "file": graph.source(path).filename, "holds_first_frame": gated,
+                              "tasks": len(component_tasks)})
+
+    source_kb = graph.file_bytes() / 1024
+    eager_packages = {name: package_cost(name) for name in sorted(graph.packages)}
+    module_ms = (source_kb * COST_MODEL["source_ms_per_kb"] + sum(eager_packages.values())
+                 + len(routes) * COST_MODEL["route_ms"])
+    first_frame_ms = module_ms + sum(t["cost_ms"] for t in tasks if t["blocking"])
+    after_first_frame_ms = sum(t["cost_ms"] for t in tasks if not t["blocking"])
+
+    analysis = {
+        "build_path": str(build_path),
+        "template_version": read_template_version(build_path),
+        "root": str(root.relative_to(build_path)),
+        "expo_router": expo_router,
+        "async_routes": lazy_routes,
+        "root_imports": root_imports,
+        "providers": providers,
+        "eager_files": len(graph.imports),
+        "eager_routes": len(routes),
+        "eager_source_bytes": graph.file_bytes(),
+        "eager_packages": eager_packages,
+        "tasks": sorted(tasks, key=lambda t: (t["file"], t["line"])),
+        "estimate": {
+            "module_load_ms": round(module_ms),
+            "first_frame_ms": round(first_frame_ms),
+            "after_first_frame_ms": round(after_first_frame_ms),
+            "total_ms": round(first_frame_ms + after_first_frame_ms)
+        }
+    }
+    analysis["actions"] = suggest_actions(analysis, graph, routes, root_closure, sequential)
+    return analysis
+
+def suggest_actions(analysis: Dict[str, Any], graph: StartupGraph, routes: List[Path],
+                    root_closure: Set[Path], sequential: List[str]) -> List[Dict[str, Any]]:
+    """Actionable items with the startup time each would save (estimated)."""
+    actions = []
+    if len(routes) > 1:
+        # Route modules (and what only they import) would load on navigation instead
+        route_only = set(graph.imports) - root_closure
+        route_kb = sum(p.stat().st_size for p in route_only) / 1024
+        route_packages = {name for name, files in graph.packages.items()
+                          if all(graph.build_path / f not in root_closure and
+                                 (graph.build_path / f).resolve() not in root_closure for f in files)}
+        saving = (route_kb * COST_MODEL["source_ms_per_kb"] + len(routes) * COST_MODEL["route_ms"]
+                  + sum(package_cost(name) for name in route_packages))
+        actions.append({"id": "lazy-routes", "saving_ms": round(saving * (len(routes) - 1) / len(routes)),
+                        "message": f"All {len(routes)} routes are evaluated at startup; enable expo-router async "
+                                   f"routes (plugin option asyncRoutes) so screens load on navigation"})
+
+    for task in analysis["tasks"]:
+        location = f"{task['file']}:{task['line']}"
+        if task["kind"] == "sdk_init":
+            actions.append({"id": "defer-sdk-init", "saving_ms": task["cost_ms"] if task["blocking"] else 0,
+                            "message": f"Defer {task['call']} ({location}) until after the first screen is "
+                                       f"interactive (InteractionManager.runAfterInteractions) or until it is needed"})
+        elif task["kind"] == "permission_request":
+            actions.append({"id": "permission-in-context", "saving_ms": 0,
+                            "message": f"{task['call']} ({location}) prompts at launch; ask when the feature "
+                                       f"that needs the permission is first used"})
+        elif task["kind"] == "sync_storage_read" and task["phase"] == "module_load":
+            actions.append({"id": "defer-sync-read", "saving_ms": task["cost_ms"],
+                            "message": f"{task['call']} ({location}) reads storage synchronously while modules "
+                                       f"load; read it lazily on first use"})
+
+    held = [t for t in analysis["tasks"] if t["blocking"] and t["phase"] != "module_load"
+            and t["kind"] in ("storage_read", "hydration", "storage_init", "sdk_init")]
+    if held:
+        actions.append({"id": "render-before-hydration", "saving_ms": sum(t["cost_ms"] for t in held),
+                        "message": "The first frame waits for " + ", ".join(sorted({t["call"] for t in held}))
+                                   + "; render the app shell immediately and hydrate in the background"})
+    for names in sequential:
+        actions.append({"id": "concurrent-init", "saving_ms": 0,
+                        "message": f"Startup steps are awaited one after another ({names}); "
+                                   f"run independent steps concurrently with Promise.all"})
+    for name, cost in analysis["eager_packages"].items():
+        importers = graph.packages[name]
+        if cost >= 20 and any((graph.build_path / f).resolve() in root_closure for f in importers):
+            actions.append({"id": "lazy-package", "saving_ms": cost,
+                            "message": f"{name} is evaluated at startup (imported by {', '.join(sorted(importers))}); "
+                                       f"require it lazily where it is used"})
+    return sorted(actions, key=lambda a: -a["saving_ms"])
+
+def record_cold_start(build_path: Path, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write meta/cold_start.json and append to meta/cold_start_history.jsonl.
+
+    Returns the regression against the previous record ({} when there is none).
+    """
+    meta_dir = get_meta_dir(build_path)
+    meta_dir.mkdir(parents=True, exist_ok=True)
+    history_path = meta_dir / "cold_start_history.jsonl"
+    previous = None
+    if history_path.exists():
+        lines = [line for line in history_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+        previous = loads(lines[-1]) if lines else None
+
+    estimate = analysis["estimate"]
+    regression = {}
+    if previous:
+        for key in ("first_frame_ms", "after_first_frame_ms"):
+            before, after = previous["estimate"].get(key, 0), estimate[key]
+            if after > before * (1 + REGRESSION_TOLERANCE) and after - before >= 5:
+                regression[key] = {"before": before, "after": after,
+                                   "template_version_before": previous.get("template_version")}
+
+    write_json(meta_dir / "cold_start.json", analysis)
+    append_jsonl(history_path, {
+        "recorded_at": datetime.now().isoformat(),
+        "template_version": analysis["template_version"],
+        "estimate": estimate,
+        "eager_files": analysis["eager_files"],
+        "eager_packages": len(analysis["eager_packages"]),
+        "regression": regression
+    })
+    return regression
+
+def cold_start_trend(builds_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Latest recorded estimate of every build, averaged per template version."""
+    builds_dir = Path(builds_dir or get_repo_root() / "builds")
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for dirpath, dirnames, filenames in os.walk(builds_dir):
+        dirnames[:] = [d for d in dirnames if d not in ("node_modules", ".git")]
+        if "cold_start_history.jsonl" not in filenames:
+            continue
+        lines = Path(dirpath, "cold_start_history.jsonl").read_text(encoding="utf-8").splitlines()
+        latest = loads(next(line for line in reversed(lines) if line.strip()))
+        latest["build"] = str(Path(dirpath).parent.relative_to(builds_dir))
+        groups.setdefault(latest.get("template_version") or "unknown", []).append(latest)
+
+    trend = {}
+    for version, records in sorted(groups.items()):
+        trend[version] = {
+            "builds": sorted(r["build"] for r in records),
+            "first_frame_ms": round(sum(r["estimate"]["first_frame_ms"] for r in records) / len(records)),
+            "after_first_frame_ms": round(sum(r["estimate"]["after_first_frame_ms"] for r in records) / len(records))
+        }
+    return trend
+
+def format_report(analysis: Dict[str, Any]) -> str:
+    """Human-readable summary of an analysis."""
+    estimate = analysis["estimate"]
+    lines = [
+        f"🚀 Cold start: {analysis['root']} (template {analysis['template_version'] or 'unknown'})",
+        f"   First frame ~{estimate['first_frame_ms']} ms (modules {estimate['module_load_ms']} ms: "
+        f"{analysis['eager_files']} files, {len(analysis['eager_packages'])} packages, "
+        f"{analysis['eager_routes']} eager routes), then ~{estimate['after_first_frame_ms']} ms of startup work"
+    ]
+    for task in analysis["tasks"]:
+        lines.append(f"   - {task['phase']}: {task['kind']} {task['call']} ({task['file']}:{task['line']}, "
+                     f"{task['cost_ms']} ms)")
+    for action in analysis["actions"]:
+        saving = f" [~{action['saving_ms']} ms]" if action["saving_ms"] else ""
+        lines.append(f"   → {action['message']}{saving}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory cold-start analysis")
+    parser.add_argument("command", choices=["analyze", "trend"], help="Command to execute")
+    parser.add_argument("path", nargs="?", help="Build directory (analyze) or builds directory (trend)")
+    parser.add_argument("--record", action="store_true", help="Record the analysis in the build's meta/")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "analyze":
+            if not args.path:
+                print("Error: build path required for analyze", file=sys.stderr)
+                sys.exit(1)
+            analysis = analyze_cold_start(Path(args.path))
+            regression = record_cold_start(Path(args.path), analysis) if args.record else {}
+            print(dumps(analysis).decode() if args.json else format_report(analysis))
+            for key, change in regression.items():
+                print(f"⚠️  Cold-start regression: {key} {change['before']} → {change['after']} ms")
+
+        elif args.command == "trend":
+            trend = cold_start_trend(args.path)
+            if args.json:
+                print(dumps(trend).decode())
+                return
+            for version, summary in trend.items():
+                print(f"template {version}: first frame ~{summary['first_frame_ms']} ms, "
+                      f"then ~{summary['after_first_frame_ms']} ms ({len(summary['builds'])} builds)")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+App Factory JSON I/O
+
+Single entry point for reading and writing JSON files. Uses orjson when it
+is installed and falls back to the standard library otherwise. Human-facing
+files keep the repo's indent=2 formatting; machine-only files (indexes,
+caches) can opt into a compact encoding. Writes are atomic by default.
+
+Usage:
+    python -m appfactory.jsonio codec
+    python -m appfactory.jsonio bench [json_files...] [--iterations N]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+AVAILABLE_CODECS = ["stdlib"] + (["orjson"] if orjson is not None else [])
+_codec = "orjson" if orjson is not None else "stdlib"
+
+def get_codec() -> str:
+    """Get the name of the active codec."""
+    return _codec
+
+def set_codec(name: str) -> None:
+    """Select the codec used by this process ('stdlib' or 'orjson')."""
+    global _codec
+    if name not in AVAILABLE_CODECS:
+        raise ValueError(f"JSON codec not available: {name} (available: {', '.join(AVAILABLE_CODECS)})")
+    _codec = name
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text.
+
+    Raises json.JSONDecodeError for invalid input with either codec.
+    """
+    if _codec == "orjson":
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+def _orjson_floats_match(obj: Any) -> bool:
+    """
+    Check that every float in obj encodes the same way under orjson and stdlib.
+
+    orjson writes NaN/Infinity as null and never uses exponent notation
+    (1e-05 becomes 0.00001), whereas the stdlib follows repr().
+    """
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            magnitude = abs(value)
+            if magnitude != magnitude or magnitude == float("inf"):
+                return False
+            if magnitude and not (1e-4 <= magnitude < 1e16):
+                return False
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return True
+
+def dumps(obj: Any, compact: bool = False, sort_keys: bool = False,
+          ensure_ascii: bool = True) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes.
+
+    Output is byte-identical to json.dumps(indent=2) (or the compact
+    separators) with either codec: whenever orjson would differ (non-ASCII
+    text with ensure_ascii=True, non-finite or exponent-notation floats)
+    the stdlib codec is used instead.
+    """
+    if _codec == "orjson" and _orjson_floats_match(obj):
+        option = 0 if compact else orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data = orjson.dumps(obj, option=option)
+        except TypeError:
+            # Non-string keys, oversized ints and the like: defer to stdlib
+            data = None
+        if data is not None and (not ensure_ascii or data.isascii()):
+            return data
+
+    if compact:
+        text = json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys, ensure_ascii=ensure_ascii)
+    else:
+        text = json.dumps(obj, indent=2, sort_keys=sort_keys, ensure_ascii=ensure_ascii)
+    return text.encode("utf-8")
+
+def read_json(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def write_json(path: Union[str, Path], obj: Any, compact: bool = False,
+               sort_keys: bool = False, ensure_ascii: bool = True,
+               atomic: bool = True) -> None:
+    """
+    Write a JSON file.
+
+    With atomic=True the data is written to a sibling temp file and renamed
+    into place, so readers never observe a partially written file. Writes
+    inside runs that keep a Merkle manifest are journaled (see run_manifest).
+    """
+    data = dumps(obj, compact=compact, sort_keys=sort_keys, ensure_ascii=ensure_ascii)
+    path = str(path)
+
+    if not atomic:
+        with open(path, 'wb') as f:
+            f.write(data)
+        _record_write(path, data)
+        return
+
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _record_write(path, data)
+
+def _record_write(path: str, data: Optional[bytes] = None) -> None:
+    # Imported lazily: run_manifest itself writes through this module
+    from .run_manifest import record_write
+    record_write(path, data)
+
+def append_jsonl(path: Union[str, Path], obj: Any) -> None:
+    """
+    Append one compact JSON line to a log file.
+
+    The line goes out in a single write on an O_APPEND descriptor, so it
+    lands whole at the end of the file even with concurrent writers.
+    """
+    line = dumps(obj, compact=True) + b"\n"
+    fd = os.open(str(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+    _record_write(str(path))
+
+def default_benchmark_files() -> List[Path]:
+    """Real repository files used to compare codecs."""
+    repo_root = Path(__file__).parent.parent
+    files = [
+        repo_root / "leaderboards" / "app_factory_all_time.json",
+        repo_root / "leaderboards" / "app_factory_global.json",
+        repo_root / "builds" / "build_index.json",
+        repo_root / "dashboard" / "public" / "leaderboard.json",
+    ]
+    files.extend(sorted((repo_root / "runs").glob("*/*/ideas/*/stages/stage10.json"))[:5])
+    return [f for f in files if f.exists()]
+
+def benchmark_codecs(paths: List[Path], iterations: int = 20) -> Dict[str, Dict[str, Any]]:
+    """Time load, pretty dump and compact dump for each available codec."""
+    active = get_codec()
+    documents = []
+    for path in paths:
+        try:
+            documents.append((path, path.read_bytes(), json.loads(path.read_bytes())))
+        except (OSError, json.JSONDecodeError):
+            continue
+
+    results = {}
+    try:
+        for codec in AVAILABLE_CODECS:
+            set_codec(codec)
+            timings = {"load_ms": 0.0, "dump_pretty_ms": 0.0, "dump_compact_ms": 0.0}
+            for path, raw, obj in documents:
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    loads(raw)
+                timings["load_ms"] += (time.perf_counter() - started) * 1000 / iterations
+
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    dumps(obj)
+                timings["dump_pretty_ms"] += (time.perf_counter() - started) * 1000 / iterations
+
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    dumps(obj, compact=True)
+                timings["dump_compact_ms"] += (time.perf_counter() - started) * 1000 / iterations
+
+            results[codec] = {key: round(value, 3) for key, value in timings.items()}
+    finally:
+        set_codec(active)
+
+    results["_files"] = {
+        "count": len(documents),
+        "bytes": sum(len(raw) for _, raw, _ in documents)
+    }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory JSON I/O")
+    parser.add_argument("command", choices=["codec", "bench"], help="Command to execute")
+    parser.add_argument("paths", nargs="*", help="JSON files to benchmark (default: real repo files)")
+    parser.add_argument("--iterations", type=int, default=20, help="Iterations per file")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "codec":
+            print(f"Active codec: {get_codec()} (available: {', '.join(AVAILABLE_CODECS)})")
+
+        elif args.command == "bench":
+            paths = [Path(p) for p in args.paths] or default_benchmark_files()
+            results = benchmark_codecs(paths, args.iterations)
+            files = results.pop("_files")
+            print(f"Benchmarked {files['count']} files ({files['bytes']} bytes), "
+                  f"{args.iterations} iterations each")
+            print(f"{'Codec':<8} {'Load ms':>10} {'Pretty ms':>10} {'Compact ms':>11}")
+            for codec, timings in results.items():
+                print(f"{codec:<8} {timings['load_ms']:>10.3f} {timings['dump_pretty_ms']:>10.3f} "
+                      f"{timings['dump_compact_ms']:>11.3f}")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,19 @@ import os
 import sys
 import argparse
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+
+from .jsonio import write_json
+from .stage_events import append_event, materialize_stage_status
+
+# Progress list fields used by idea-pack stage_status.json files
+COMPLETED_LIST_KEYS = ["stages_completed", "completed_stages"]
+PENDING_LIST_KEYS = ["stages_remaining", "stages_pending", "pending_stages", "missing_stages"]
+
+def stage_sort_key(stage_num: str) -> Tuple:
+    """Sort key ordering stage ids numerically ('02' < '02.5' < '10' < '10.1')."""
+    head = stage_num.split("_", 1)[0]
+    return tuple(int(part) for part in head.split(".") if part.isdigit()), stage_num
 
 def write_execution_log(stage_num: str, run_path: str, content: str) -> str:
     """Write execution log for a stage."""
@@ -54,69 +66,56 @@ def write_validation_result(stage_num: str, run_path: str, schema_path: str,
         "timestamp": datetime.now().isoformat()
     }
     
-    with open(result_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2)
+    write_json(result_path, result)
     
     return result_path
 
 def update_stage_status(stage_num: str, run_path: str, status: str, 
-                       artifacts: List[str] = None) -> str:
-    """Update stage status in the run metadata."""
-    status_path = os.path.join(run_path, "meta", "stage_status.json")
-    
-    # Load existing status or create new
-    if os.path.exists(status_path):
-        with open(status_path, 'r', encoding='utf-8') as f:
-            stage_status = json.load(f)
-    else:
-        stage_status = {
-            "run_id": os.path.basename(run_path),
-            "stages": {}
-        }
-    
-    # Update stage information
-    timestamp = datetime.now().isoformat()
-    
-    if stage_num not in stage_status["stages"]:
-        stage_status["stages"][stage_num] = {
-            "status": status,
-            "started_at": timestamp
-        }
-    else:
-        stage_status["stages"][stage_num]["status"] = status
+                       artifacts: List[str] = None, materialize: bool = True) -> str:
+    """
+    Record a stage transition in the run's append-only event log.
     
-    if status == "completed":
-        stage_status["stages"][stage_num]["completed_at"] = timestamp
-        if artifacts:
-            stage_status["stages"][stage_num]["artifacts"] = artifacts
+    meta/stage_status.json is a view over the log. It is refreshed at every
+    stage boundary so readers of the file (dashboard, fsck, metrics) see the
+    transition; pass materialize=False to leave the file behind the log
+    (get_stage_status still folds in the unapplied events).
+    """
+    append_event(run_path, stage_num, status, artifacts)
     
-    # Write updated status
-    with open(status_path, 'w', encoding='utf-8') as f:
-        json.dump(stage_status, f, indent=2)
+    if materialize:
+        materialize_stage_status(run_path)
     
-    return status_path
+    return os.path.join(run_path, "meta", "stage_status.json")
 
 def get_stage_status(run_path: str) -> Dict[str, Any]:
-    """Get current stage status for a run."""
-    status_path = os.path.join(run_path, "meta", "stage_status.json")
-    
-    if os.path.exists(status_path):
-        with open(status_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    else:
-        return {
-            "run_id": os.path.basename(run_path),
-            "stages": {}
-        }
+    """Get current stage status for a run, folding in any unapplied events without writing."""
+    return materialize_stage_status(run_path, write=False)
 
-def get_next_stage(run_path: str) -> str:
-    """Determine the next stage to execute based on current status."""
+def get_next_stage(run_path: str, stage_order: Optional[List[str]] = None) -> str:
+    """
+    Determine the next stage to execute based on current status.
+    
+    Besides the stages map, idea packs in batch layouts track progress in list
+    fields (stages_completed, stages_remaining, ...); those are honored too.
+    """
     status = get_stage_status(run_path)
     stages = status.get("stages", {})
     
-    # Check stages 01-10 in order
-    for stage_num in [f"{i:02d}" for i in range(1, 11)]:
-        if stage_num not in stages or stages[stage_num]["status"] != "completed":
+    completed = {
+        stage_num for stage_num, info in stages.items()
+        if isinstance(info, dict) and info.get("status") == "completed"
+    }
+    for key in COMPLETED_LIST_KEYS:
+        if isinstance(status.get(key), list):
+            completed.update(status[key])
+    
+    if stage_order is None:
+        pending_lists = [status[key] for key in PENDING_LIST_KEYS if isinstance(status.get(key), list)]
+        # Check stages 01-10 in order unless the status names its own remaining stages
+        stage_order = pending_lists[0] if pending_lists else [f"{i:02d}" for i in range(1, 11)]
+    
+    for stage_num in stage_order:
+        if stage_num not in completed:
             return stage_num
     
     return "completed"  # All stages done
@@ -173,7 +172,8 @@ def main():
                 sys.exit(1)
             
             status_path = update_stage_status(args.stage_num, args.run_path, 
-                                            args.content_or_status, args.artifacts)
+                                            args.content_or_status, args.artifacts,
+                                            materialize=True)
             print(status_path)
         
         elif args.command == "get_stage_status":
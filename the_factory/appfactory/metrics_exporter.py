@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+App Factory Prometheus Metrics Exporter
+
+Exposes pipeline and build health in the Prometheus text format, either as a
+node_exporter textfile or on a local /metrics endpoint:
+
+- stage durations per stage (histogram, from meta/events.jsonl)
+- stage counts by status (stage_status.json views with the event log tail folded in)
+- validation pass/fail counts (from outputs/stageNN_validation.json)
+- build counts by status and mode (from builds/build_index.json)
+- leaderboard size and age of the last rebuild
+
+Collection is incremental: event logs are consumed from a saved byte
+offset, JSON files are only re-parsed when their mtime/size changes, and
+directory listings are reused until the directory's mtime changes. For the
+textfile mode the state is persisted to .cache/metrics_state.json between
+runs.
+
+Usage:
+    python -m appfactory.metrics_exporter textfile <output.prom>
+    python -m appfactory.metrics_exporter serve [--port 9464]
+    python -m appfactory.metrics_exporter print
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .jsonio import read_json, write_json
+from .logging_utils import COMPLETED_LIST_KEYS, PENDING_LIST_KEYS
+from .stage_events import EVENTS_FILENAME, materialize_stage_status, read_events, resolve_event_scope
+
+STATE_VERSION = 1
+DURATION_BUCKETS = [1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600]
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_state_path() -> Path:
+    """Get the path of the persisted exporter state."""
+    return get_repo_root() / ".cache" / "metrics_state.json"
+
+def _stamp(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _parse_ts(value: str) -> Optional[float]:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.astimezone()
+    return parsed.timestamp()
+
+def stage_status_counts(view: Dict[str, Any]) -> Dict[str, int]:
+    """Count stages by status in a stage_status view, including batch-layout list fields."""
+    counts: Dict[str, int] = {}
+    seen = set()
+    for stage_num, info in view.get("stages", {}).items():
+        if isinstance(info, dict) and info.get("status"):
+            key = f"{stage_num}|{info['status']}"
+            counts[key] = counts.get(key, 0) + 1
+            seen.add(stage_num)
+
+    for keys, status in [(COMPLETED_LIST_KEYS, "completed"), (PENDING_LIST_KEYS, "pending")]:
+        for list_key in keys:
+            for stage_num in view.get(list_key) or []:
+                if isinstance(stage_num, str) and stage_num not in seen:
+                    counts[f"{stage_num}|{status}"] = counts.get(f"{stage_num}|{status}", 0) + 1
+                    seen.add(stage_num)
+    return counts
+
+class MetricsCollector:
+    """
+    Incremental collector over runs/, builds/ and leaderboards/.
+
+    Args:
+        repo_root: Repository root (default: this checkout)
+        state: Previously saved state to resume from
+    """
+
+    def __init__(self, repo_root: Optional[Path] = None, state: Optional[Dict[str, Any]] = None):
+        self.repo_root = Path(repo_root) if repo_root else get_repo_root()
+        if not state or state.get("version") != STATE_VERSION:
+            state = {"version": STATE_VERSION, "dirs": {}, "files": {}, "events": {}}
+        self.state = state
+        self.parsed_files = 0
+        self._lock = threading.Lock()
+
+    def _list_dir(self, path: str) -> List[str]:
+        """Directory entries, cached until the directory's mtime changes."""
+        stamp = _stamp(path)
+        if stamp is None:
+            self.state["dirs"].pop(path, None)
+            return []
+        cached = self.state["dirs"].get(path)
+        if cached and cached["stamp"] == stamp:
+            return cached["entries"]
+        entries = sorted(os.listdir(path))
+        self.state["dirs"][path] = {"stamp": stamp, "entries": entries}
+        return entries
+
+    def _file_value(self, path: str, parse) -> Any:
+        """Parsed contribution of a JSON file, recomputed only when its mtime/size changes."""
+        stamp = _stamp(path)
+        if stamp is None:
+            self.state["files"].pop(path, None)
+            return None
+        cached = self.state["files"].get(path)
+        if cached and cached["stamp"] == stamp:
+            return cached["value"]
+        try:
+            value = parse(read_json(path))
+        except (OSError, ValueError, AttributeError, TypeError):
+            value = None
+        self.parsed_files += 1
+        self.state["files"][path] = {"stamp": stamp, "value": value}
+        return value
+
+    def _status_value(self, path: str) -> Dict[str, int]:
+        """
+        Stage counts of a run or idea pack, read through the event log.
+
+        Recomputed only when the stage_status.json view or the run's
+        events.jsonl changes; the view itself is never rewritten here.
+        """
+        status_path = os.path.join(path, "meta", "stage_status.json")
+        events_path = os.path.join(resolve_event_scope(path)[0], "meta", EVENTS_FILENAME)
+        stamp = [_stamp(status_path), _stamp(events_path)]
+        if stamp == [None, None]:
+            self.state["files"].pop(status_path, None)
+            return {}
+        cached = self.state["files"].get(status_path)
+        if cached and cached["stamp"] == stamp:
+            return cached["value"] or {}
+        try:
+            value = stage_status_counts(materialize_stage_status(path, write=False))
+        except (OSError, ValueError, AttributeError, TypeError, KeyError):
+            value = None
+        self.parsed_files += 1
+        self.state["files"][status_path] = {"stamp": stamp, "value": value}
+        return value or {}
+
+    def _consume_events(self, events_path: str) -> Dict[str, Any]:
+        """Fold new events of one log into its duration state."""
+        entry = self.state["events"].setdefault(events_path, {"offset": 0, "started": {}, "durations": {}})
+        size = os.path.getsize(events_path)
+        if size < entry["offset"]:
+            # Log was truncated or replaced: start over
+            entry.update(offset=0, started={}, durations={})
+        events, entry["offset"] = read_events(events_path, entry["offset"])
+
+        for event in events:
+            key = f"{event.get('pack') or ''}|{event.get('stage')}"
+            timestamp = _parse_ts(event.get("ts", ""))
+            if timestamp is None:
+                continue
+            if event.get("status") == "completed" and key in entry["started"]:
+                seconds = timestamp - entry["started"].pop(key)
+                stage = entry["durations"].setdefault(
+                    event["stage"], {"sum": 0.0, "count": 0, "buckets": [0] * len(DURATION_BUCKETS)})
+                stage["sum"] += seconds
+                stage["count"] += 1
+                for i, bound in enumerate(DURATION_BUCKETS):
+                    if seconds <= bound:
+                        stage["buckets"][i] += 1
+            elif event.get("status") != "completed":
+                entry["started"].setdefault(key, timestamp)
+        return entry
+
+    def _run_paths(self) -> List[str]:
+        runs_dir = str(self.repo_root / "runs")
+        paths = []
+        for date_dir in self._list_dir(runs_dir):
+            if date_dir.startswith("."):
+                continue
+            date_path = os.path.join(runs_dir, date_dir)
+            for run_dir in self._list_dir(date_path):
+                run_path = os.path.join(date_path, run_dir)
+                if os.path.isdir(run_path):
+                    paths.append(run_path)
+        return paths
+
+    def collect(self) -> Dict[str, Any]:
+        """Collect current metric values."""
+        with self._lock:
+            return self._collect()
+
+    def _collect(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        self.parsed_files = 0
+        stage_counts: Dict[str, int] = {}
+        validations: Dict[str, int] = {}
+        durations: Dict[str, Dict[str, Any]] = {}
+        live_events = set()
+
+        def add_scope(path: str):
+            for key, count in self._status_value(path).items():
+                stage_counts[key] = stage_counts.get(key, 0) + count
+
+            outputs = os.path.join(path, "outputs")
+            for filename in self._list_dir(outputs):
+                if filename.startswith("stage") and filename.endswith("_validation.json"):
+                    result = self._file_value(
+                        os.path.join(outputs, filename),
+                        lambda data: [data.get("stage"), "pass" if data.get("valid") else "fail"])
+                    if result:
+                        key = f"{result[0]}|{result[1]}"
+                        validations[key] = validations.get(key, 0) + 1
+
+        run_paths = self._run_paths()
+        for run_path in run_paths:
+            add_scope(run_path)
+            ideas = os.path.join(run_path, "ideas")
+            for idea_dir in self._list_dir(ideas):
+                add_scope(os.path.join(ideas, idea_dir))
+
+            events_path = os.path.join(run_path, "meta", EVENTS_FILENAME)
+            if EVENTS_FILENAME in self._list_dir(os.path.join(run_path, "meta")):
+                live_events.add(events_path)
+                for stage_num, values in self._consume_events(events_path)["durations"].items():
+                    total = durations.setdefault(
+                        stage_num, {"sum": 0.0, "count": 0, "buckets": [0] * len(DURATION_BUCKETS)})
+                    total["sum"] += values["sum"]
+                    total["count"] += values["count"]
+                    total["buckets"] = [a + b for a, b in zip(total["buckets"], values["buckets"])]
+
+        # Forget state for runs that were deleted
+        for events_path in list(self.state["events"]):
+            if events_path not in live_events:
+                del self.state["events"][events_path]
+
+        def build_counts(registry):
+            counts = {}
+            for build in registry.get("builds", []):
+                key = f"{build.get('status', 'unknown')}|{build.get('origin', {}).get('mode', 'unknown')}"
+                counts[key] = counts.get(key, 0) + 1
+            return counts
+
+        builds = self._file_value(str(self.repo_root / "builds" / "build_index.json"), build_counts) or {}
+
+        leaderboard_path = str(self.repo_root / "leaderboards" / "app_factory_all_time.json")
+        leaderboard = self._file_value(
+            leaderboard_path,
+            lambda data: {"entries": len(data.get("entries", [])), "updated": _parse_ts(data.get("last_updated", ""))})
+        leaderboard_age = None
+        if leaderboard:
+            updated = leaderboard["updated"] or _stamp(leaderboard_path)[0] / 1e9
+            leaderboard_age = max(0.0, time.time() - updated)
+
+        return {
+            "stage_counts": stage_counts,
+            "validations": validations,
+            "durations": durations,
+            "builds": builds,
+            "runs": len(run_paths),
+            "leaderboard_entries": leaderboard["entries"] if leaderboard else None,
+            "leaderboard_age_seconds": leaderboard_age,
+            "collect_seconds": time.perf_counter() - started,
+            "parsed_files": self.parsed_files
+        }
+
+def _labels(**labels: str) -> str:
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+def format_metrics(values: Dict[str, Any]) -> str:
+    """Render collected values in the Prometheus text exposition format."""
+    lines = []
+
+    def header(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    header("appfactory_runs", "gauge", "Run directories under runs/")
+    lines.append(f"appfactory_runs {values['runs']}")
+
+    header("appfactory_stages", "gauge", "Stages by stage id and status across run and idea pack status views")
+    for key, count in sorted(values["stage_counts"].items()):
+        stage, status = key.split("|", 1)
+        lines.append(f"appfactory_stages{_labels(stage=stage, status=status)} {count}")
+
+    header("appfactory_stage_validations", "gauge", "Stage schema validation results")
+    for key, count in sorted(values["validations"].items()):
+        stage, result = key.split("|", 1)
+        lines.append(f"appfactory_stage_validations{_labels(stage=stage, result=result)} {count}")
+
+    name = "appfactory_stage_duration_seconds"
+    header(name, "histogram", "Stage duration from first start to completion")
+    for stage, hist in sorted(values["durations"].items()):
+        for bound, count in zip(DURATION_BUCKETS, hist["buckets"]):
+            lines.append(f"{name}_bucket{_labels(stage=stage, le=str(bound))} {count}")
+        lines.append(f"{name}_bucket{_labels(stage=stage, le='+Inf')} {hist['count']}")
+        lines.append(f"{name}_sum{_labels(stage=stage)} {hist['sum']:.3f}")
+        lines.append(f"{name}_count{_labels(stage=stage)} {hist['count']}")
+
+    header("appfactory_builds", "gauge", "Builds in build_index.json by status and origin mode")
+    for key, count in sorted(values["builds"].items()):
+        status, mode = key.split("|", 1)
+        lines.append(f"appfactory_builds{_labels(status=status, mode=mode)} {count}")
+
+    if values["leaderboard_entries"] is not None:
+        header("appfactory_leaderboard_entries", "gauge", "Entries in the all-time leaderboard")
+        lines.append(f"appfactory_leaderboard_entries {values['leaderboard_entries']}")
+        header("appfactory_leaderboard_age_seconds", "gauge", "Seconds since the leaderboard was last rebuilt")
+        lines.append(f"appfactory_leaderboard_age_seconds {values['leaderboard_age_seconds']:.0f}")
+
+    header("appfactory_exporter_collect_seconds", "gauge", "Time spent collecting metrics")
+    lines.append(f"appfactory_exporter_collect_seconds {values['collect_seconds']:.6f}")
+    header("appfactory_exporter_parsed_files", "gauge", "JSON files re-parsed during the last collection")
+    lines.append(f"appfactory_exporter_parsed_files {values['parsed_files']}")
+
+    return "\n".join(lines) + "\n"
+
+def load_collector_state() -> Optional[Dict[str, Any]]:
+    """Load the persisted collector state, if any."""
+    try:
+        return read_json(get_state_path())
+    except (OSError, ValueError):
+        return None
+
+def write_textfile(output_path: str, collector: Optional[MetricsCollector] = None) -> Dict[str, Any]:
+    """Collect once and atomically write a node_exporter textfile, persisting collector state."""
+    collector = collector or MetricsCollector(state=load_collector_state())
+    values = collector.collect()
+
+    tmp_path = f"{output_path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(format_metrics(values))
+    os.replace(tmp_path, output_path)
+
+    try:
+        get_state_path().parent.mkdir(parents=True, exist_ok=True)
+        write_json(get_state_path(), collector.state, compact=True)
+    except OSError as e:
+        print(f"Warning: Could not save metrics state: {e}", file=sys.stderr)
+    return values
+
+def serve_metrics(port: int, collector: Optional[MetricsCollector] = None) -> ThreadingHTTPServer:
+    """Create a server exposing /metrics; state stays in memory between scrapes."""
+    collector = collector or MetricsCollector(state=load_collector_state())
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = format_metrics(collector.collect()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory Prometheus metrics exporter")
+    parser.add_argument("command", choices=["textfile", "serve", "print"], help="Command to execute")
+    parser.add_argument("output", nargs="?", help="Textfile path (textfile)")
+    parser.add_argument("--port", type=int, default=9464, help="Port for serve")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "textfile":
+            if not args.output:
+                print("Error: output path required for textfile", file=sys.stderr)
+                sys.exit(1)
+            values = write_textfile(args.output)
+            print(f"✓ Wrote {args.output} ({values['parsed_files']} files parsed, "
+                  f"{values['collect_seconds'] * 1000:.1f}ms)")
+
+        elif args.command == "serve":
+            server = serve_metrics(args.port)
+            print(f"Serving metrics on http://127.0.0.1:{args.port}/metrics")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                server.server_close()
+
+        elif args.command == "print":
+            print(format_metrics(MetricsCollector().collect()), end="")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
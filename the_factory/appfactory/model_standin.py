@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+App Factory Model Stand-In
+
+Local replacement for the live model when exercising the pipeline offline.
+Serves recorded stage outputs from runs/**/stages/*.json and synthesizes
+schema-shaped outputs for stages that have no recordings, with configurable
+latency and error distributions.
+
+The stand-in plugs in anywhere a stage runner is expected, e.g. as the
+run_stage callable of appfactory.stage_cache.run_stage_cached.
+
+Usage:
+    python -m appfactory.model_standin recordings
+    python -m appfactory.model_standin generate <stage_num> [--seed N]
+"""
+
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+from .jsonio import write_json
+from .run_archive import iter_archived_files, read_json
+from .schema_validate import extract_schema_from_template
+from .stage_cache import find_stage_schema, find_stage_template
+
+STAGE_FILE_PATTERN = re.compile(r"^stage(\d{2}(?:\.\d+)?(?:_dream)?)\.json$")
+LATENCY_DISTRIBUTIONS = ["fixed", "uniform", "lognormal"]
+
+class ModelStandInError(Exception):
+    """Simulated model failure (rate limit, timeout, malformed response)."""
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def find_recorded_stages(runs_dir: Optional[str] = None) -> Dict[str, List[str]]:
+    """Map stage number to every recorded stage output under runs/, including archived runs."""
+    runs_dir = runs_dir or str(get_repo_root() / "runs")
+    recordings = defaultdict(list)
+
+    for dirpath, dirnames, filenames in os.walk(runs_dir):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        if os.path.basename(dirpath) != "stages":
+            continue
+        for filename in filenames:
+            match = STAGE_FILE_PATTERN.match(filename)
+            if match:
+                recordings[match.group(1)].append(os.path.join(dirpath, filename))
+
+    for path in iter_archived_files(runs_dir):
+        match = STAGE_FILE_PATTERN.match(os.path.basename(path))
+        if match and os.path.basename(os.path.dirname(path)) == "stages":
+            recordings[match.group(1)].append(path)
+
+    return {stage: sorted(paths) for stage, paths in recordings.items()}
+
+def synthesize_from_schema(schema: Dict[str, Any], name: str = "value") -> Any:
+    """Build a minimal instance of a JSON schema (required fields only)."""
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    for combinator in ["allOf", "anyOf", "oneOf"]:
+        if combinator in schema:
+            merged = {}
+            for sub_schema in schema[combinator]:
+                value = synthesize_from_schema(sub_schema, name)
+                if isinstance(value, dict):
+                    merged.update(value)
+            if merged or combinator == "allOf":
+                return merged
+
+    schema_type = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(schema_type, list):
+        schema_type = schema_type[0]
+
+    if schema_type == "object":
+        properties = schema.get("properties", {})
+        required = schema.get("required", list(properties))
+        return {key: synthesize_from_schema(properties.get(key, {}), key) for key in required}
+    if schema_type == "array":
+        return [synthesize_from_schema(schema.get("items", {}), name)]
+    if schema_type in ("number", "integer"):
+        return schema.get("minimum", 1)
+    if schema_type == "boolean":
+        return True
+    return f"synthetic {name.replace('_', ' ')}"
+
+class ModelStandIn:
+    """
+    Record/replay stand-in for stage model calls.
+
+    Args:
+        runs_dir: Directory to load recordings from (default: repo runs/)
+        latency: Mean simulated latency in seconds per call
+        latency_dist: One of 'fixed', 'uniform' (0..2x mean) or 'lognormal'
+        error_rate: Probability that a call raises ModelStandInError
+        seed: Seed for deterministic replay choices, latencies and errors
+    """
+
+    def __init__(self, runs_dir: Optional[str] = None, latency: float = 0.0,
+                 latency_dist: str = "lognormal", error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_dist}")
+        self.recordings = find_recorded_stages(runs_dir)
+        self.latency = latency
+        self.latency_dist = latency_dist
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._synthetic_cache: Dict[str, Dict[str, Any]] = {}
+
+    def sample_latency(self) -> float:
+        """Draw a latency in seconds from the configured distribution."""
+        if self.latency <= 0:
+            return 0.0
+        with self._lock:
+            if self.latency_dist == "fixed":
+                return self.latency
+            if self.latency_dist == "uniform":
+                return self._rng.uniform(0, 2 * self.latency)
+            # Lognormal with the configured mean and a moderate right tail
+            sigma = 0.5
+            return self._rng.lognormvariate(0, sigma) * self.latency / math.exp(sigma ** 2 / 2)
+
+    def synthesize(self, stage_num: str) -> Dict[str, Any]:
+        """Produce a schema-shaped output for a stage with no recordings."""
+        if stage_num not in self._synthetic_cache:
+            schema_path = find_stage_schema(stage_num)
+            if schema_path:
+                data = synthesize_from_schema(read_json(schema_path))
+            else:
+                # No JSON schema: the template's JSON block is already example-shaped
+                try:
+                    data = extract_schema_from_template(str(find_stage_template(stage_num)))
+                except (FileNotFoundError, ValueError):
+                    data = {}
+            if not isinstance(data, dict):
+                data = {"value": data}
+            data.setdefault("meta", {})["synthetic"] = True
+            self._synthetic_cache[stage_num] = data
+        return json.loads(json.dumps(self._synthetic_cache[stage_num]))
+
+    def generate(self, stage_num: str) -> Dict[str, Any]:
+        """
+        Simulate a model call for a stage and return its JSON output.
+
+        Raises:
+            ModelStandInError: When the error distribution fires
+        """
+        delay = self.sample_latency()
+        with self._lock:
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            recorded = self.recordings.get(stage_num)
+            choice = self._rng.choice(recorded) if recorded else None
+
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise ModelStandInError(f"Simulated model error for stage {stage_num}")
+
+        if choice is not None:
+            try:
+                return read_json(choice)
+            except json.JSONDecodeError:
+                # Broken recording; stop serving it
+                with self._lock:
+                    if choice in self.recordings.get(stage_num, []):
+                        self.recordings[stage_num].remove(choice)
+        return self.synthesize(stage_num)
+
+    def make_stage_runner(self, stage_num: str, stage_json_path: str) -> Callable[[], None]:
+        """Return a zero-argument runner that writes the stage output to disk."""
+        def run_stage():
+            data = self.generate(stage_num)
+            os.makedirs(os.path.dirname(os.path.abspath(stage_json_path)), exist_ok=True)
+            write_json(stage_json_path, data)
+        return run_stage
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory model stand-in")
+    parser.add_argument("command", choices=["recordings", "generate"], help="Command to execute")
+    parser.add_argument("stage_num", nargs="?", help="Stage number for generate")
+    parser.add_argument("--runs-dir", help="Directory to load recordings from")
+    parser.add_argument("--seed", type=int, help="Random seed")
+
+    args = parser.parse_args()
+
+    try:
+        standin = ModelStandIn(runs_dir=args.runs_dir, seed=args.seed)
+
+        if args.command == "recordings":
+            for stage_num in sorted(standin.recordings):
+                print(f"{stage_num:>10}: {len(standin.recordings[stage_num])} recordings")
+
+        elif args.command == "generate":
+            if not args.stage_num:
+                print("Error: stage_num required for generate", file=sys.stderr)
+                sys.exit(1)
+            print(json.dumps(standin.generate(args.stage_num), indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
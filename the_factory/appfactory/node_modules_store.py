@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+App Factory node_modules Store
+
+Content-addressed store of installed node_modules trees, keyed by the hash
+of the resolved package-lock.json (plus platform and Node major version,
+since native packages differ). Generated Expo apps mostly share one
+dependency tree, so after the first install every build gets node_modules
+by reflinking (or copying) from the store in seconds instead of running a
+full npm install.
+
+Store entries are populated with `npm ci` through a shared npm cache
+(.cache/npm_cache) with --prefer-offline, optionally against a local
+registry mirror (--registry). Each entry records a fingerprint of its
+files (path, size, mtime) that is checked before every install, so an
+entry modified in place is repopulated instead of spreading to later
+builds. Hard links (--link) are opt-in: read-only modes do not stop root
+builds, postinstall scripts or patch-package from writing through them.
+
+Usage:
+    python -m appfactory.node_modules_store install <app_dir> [--registry URL] [--offline] [--link]
+    python -m appfactory.node_modules_store key <app_dir>
+    python -m appfactory.node_modules_store list
+"""
+
+import errno
+import fcntl
+import hashlib
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import argparse
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .jsonio import dumps, read_json, write_json
+
+LOCK_FIELDS = ["version", "resolved", "integrity", "link", "optional", "dev", "os", "cpu"]
+ROOT_DEPENDENCY_FIELDS = ["dependencies", "devDependencies", "optionalDependencies", "peerDependencies"]
+ENTRY_FILENAME = "store_entry.json"
+NPM_TIMEOUT = 1800
+# Linux FICLONE ioctl: copy-on-write clone on btrfs/xfs
+FICLONE = 0x40049409
+
+class StoreError(Exception):
+    """Raised when a store entry cannot be populated or installed."""
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_store_dir() -> Path:
+    """Directory holding one populated node_modules tree per lockfile key."""
+    return get_repo_root() / ".cache" / "node_modules_store"
+
+def get_npm_cache_dir() -> Path:
+    """Shared npm cache used to populate store entries."""
+    return get_repo_root() / ".cache" / "npm_cache"
+
+@lru_cache(maxsize=1)
+def node_major_version() -> str:
+    """Major version of the installed Node.js ('unknown' without node)."""
+    try:
+        result = subprocess.run(["node", "--version"], capture_output=True, text=True, timeout=10)
+        return result.stdout.strip().lstrip("v").split(".")[0] or "unknown"
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+
+def _flatten_v1(dependencies: Dict[str, Any], prefix: str = "node_modules/") -> Dict[str, Any]:
+    packages = {}
+    for name, info in dependencies.items():
+        path = prefix + name
+        packages[path] = {k: info[k] for k in LOCK_FIELDS if k in info}
+        packages.update(_flatten_v1(info.get("dependencies", {}), path + "/node_modules/"))
+    return packages
+
+def canonical_lock(lock: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The parts of a lockfile that determine the installed tree.
+
+    The root package's name and version are dropped so apps with different
+    names but identical dependencies share a store entry.
+    """
+    if "packages" in lock:
+        root = lock["packages"].get("", {})
+        packages = {path: {k: info[k] for k in LOCK_FIELDS if k in info}
+                    for path, info in lock["packages"].items() if path}
+    else:
+        root = {}
+        packages = _flatten_v1(lock.get("dependencies", {}))
+    return {
+        "root": {k: root[k] for k in ROOT_DEPENDENCY_FIELDS if k in root},
+        "packages": packages
+    }
+
+def lockfile_key(app_dir: str) -> str:
+    """Store key for an app: hash of its resolved lockfile, platform and Node major version."""
+    lock = read_json(os.path.join(app_dir, "package-lock.json"))
+    material = {
+        "lock": canonical_lock(lock),
+        "platform": f"{sys.platform}-{platform.machine()}",
+        "node": node_major_version()
+    }
+    return hashlib.sha256(dumps(material, compact=True, sort_keys=True)).hexdigest()
+
+def _npm(args: List[str], cwd: str, registry: Optional[str], offline: bool) -> None:
+    command = ["npm"] + args + ["--cache", str(get_npm_cache_dir()), "--no-audit", "--no-fund"]
+    command.append("--offline" if offline else "--prefer-offline")
+    if registry:
+        command += ["--registry", registry]
+    try:
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True, timeout=NPM_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise StoreError(f"{' '.join(command[:2])} failed: {e}")
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.strip().splitlines()[-10:])
+        raise StoreError(f"{' '.join(command[:2])} failed (exit {result.returncode}):\n{tail}")
+
+def resolve_lockfile(app_dir: str, registry: Optional[str] = None, offline: bool = False) -> None:
+    """Write package-lock.json without installing anything (for apps that have none)."""
+    _npm(["install", "--package-lock-only", "--ignore-scripts"], app_dir, registry, offline)
+
+def populate_entry(app_dir: str, key: str, registry: Optional[str] = None,
+                   offline: bool = False) -> Path:
+    """
+    Install an app's lockfile into a new store entry.
+
+    npm ci runs in a private staging directory that is renamed into place,
+    so concurrent builds never see a half-populated entry.
+    """
+    store_dir = get_store_dir()
+    entry = store_dir / key
+    staging = store_dir / f"{key}.tmp.{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    try:
+        for filename in ["package.json", "package-lock.json", ".npmrc"]:
+            if os.path.exists(os.path.join(app_dir, filename)):
+                shutil.copy2(os.path.join(app_dir, filename), staging / filename)
+        started = time.perf_counter()
+        _npm(["ci"], str(staging), registry, offline)
+
+        for dirpath, dirnames, filenames in os.walk(staging / "node_modules"):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if not os.path.islink(path):
+                    os.chmod(path, os.stat(path).st_mode & ~0o222)
+        # Fingerprint after chmod: mode changes do not touch mtime, later writes do
+        fingerprint = tree_fingerprint(str(staging / "node_modules"))
+
+        write_json(staging / ENTRY_FILENAME, dict(
+            fingerprint,
+            key=key,
+            created_at=datetime.now().isoformat(),
+            source=os.path.abspath(app_dir),
+            populate_seconds=round(time.perf_counter() - started, 2)
+        ))
+        try:
+            os.rename(staging, entry)
+        except OSError as e:
+            if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                raise
+            # Another build populated the same key first
+    finally:
+        if staging.exists():
+            _make_writable(staging)
+            shutil.rmtree(staging, ignore_errors=True)
+    return entry
+
+def tree_fingerprint(root: str) -> Dict[str, Any]:
+    """File count, total size and a hash of every file's path, size and mtime under root."""
+    digest = hashlib.sha256()
+    files = 0
+    size = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if os.path.islink(path):
+                continue
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, root)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+            files += 1
+            size += stat.st_size
+    return {"files": files, "bytes": size, "fingerprint": digest.hexdigest()}
+
+def entry_intact(entry: Path) -> bool:
+    """Check that a store entry's files still match the fingerprint taken when it was populated."""
+    try:
+        recorded = read_json(entry / ENTRY_FILENAME).get("fingerprint")
+    except (OSError, ValueError):
+        return False
+    return recorded is not None and tree_fingerprint(str(entry / "node_modules"))["fingerprint"] == recorded
+
+def discard_entry(entry: Path) -> None:
+    """Move a modified entry aside and delete it (builds still reading it keep their handles)."""
+    stale = entry.parent / f"{entry.name}.tmp.stale.{os.getpid()}"
+    try:
+        os.rename(entry, stale)
+    except FileNotFoundError:
+        # Another build discarded it first
+        return
+    _make_writable(stale)
+    shutil.rmtree(stale, ignore_errors=True)
+
+def _make_writable(root: Path) -> None:
+    for dirpath, dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if not os.path.islink(path):
+                os.chmod(path, os.stat(path).st_mode | 0o200)
+
+def _clone_file(src: str, dest: str, link: bool = False) -> str:
+    """
+    Reflink src to dest, falling back to a copy. Returns the method used.
+
+    With link=True a hard link is tried first. Hard links share the store's
+    read-only inode; reflinks and copies are the app's own and get the owner
+    write bit back.
+    """
+    if link:
+        try:
+            os.link(src, dest)
+            return "link"
+        except OSError:
+            pass
+    try:
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+            fcntl.ioctl(fdest.fileno(), FICLONE, fsrc.fileno())
+        method = "reflink"
+    except OSError:
+        method = "copy"
+        shutil.copy2(src, dest)
+    os.chmod(dest, os.stat(src).st_mode | 0o200)
+    return method
+
+def link_tree(src: str, dest: str, link: bool = False) -> Dict[str, int]:
+    """
+    Recreate a directory tree at dest from src.
+
+    Files are reflinked where the filesystem supports it and copied
+    otherwise; link=True hard-links them, sharing inodes with src.
+    """
+    counts = {"link": 0, "reflink": 0, "copy": 0, "symlink": 0}
+    for dirpath, dirnames, filenames in os.walk(src):
+        target_dir = os.path.join(dest, os.path.relpath(dirpath, src))
+        os.makedirs(target_dir, exist_ok=True)
+        for name in dirnames + filenames:
+            path = os.path.join(dirpath, name)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), os.path.join(target_dir, name))
+                counts["symlink"] += 1
+            elif name in filenames:
+                counts[_clone_file(path, os.path.join(target_dir, name), link)] += 1
+        # Symlinked directories were recreated above; do not descend into them
+        dirnames[:] = [d for d in dirnames if not os.path.islink(os.path.join(dirpath, d))]
+    return counts
+
+def install(app_dir: str, registry: Optional[str] = None, offline: bool = False,
+            link: bool = False) -> Dict[str, Any]:
+    """
+    Give an app a node_modules tree from the store, populating the entry on a miss.
+
+    Apps without a package-lock.json get one resolved first. An entry whose
+    files changed since it was populated is discarded and repopulated.
+    Failures while creating node_modules raise StoreError and leave no
+    partial tree behind.
+    """
+    started = time.perf_counter()
+    app_dir = os.path.abspath(app_dir)
+    if not os.path.exists(os.path.join(app_dir, "package.json")):
+        raise StoreError(f"No package.json in {app_dir}")
+    if not os.path.exists(os.path.join(app_dir, "package-lock.json")):
+        resolve_lockfile(app_dir, registry, offline)
+
+    key = lockfile_key(app_dir)
+    entry = get_store_dir() / key
+    hit = (entry / ENTRY_FILENAME).exists()
+    if hit and not entry_intact(entry):
+        discard_entry(entry)
+        hit = False
+    if not hit:
+        entry = populate_entry(app_dir, key, registry, offline)
+
+    node_modules = os.path.join(app_dir, "node_modules")
+    try:
+        if os.path.islink(node_modules):
+            os.unlink(node_modules)
+        elif os.path.exists(node_modules):
+            shutil.rmtree(node_modules)
+        counts = link_tree(str(entry / "node_modules"), node_modules, link)
+    except OSError as e:
+        shutil.rmtree(node_modules, ignore_errors=True)
+        raise StoreError(f"Could not create {node_modules} from store entry {key[:16]}: {e}")
+
+    return {"app_dir": app_dir, "key": key, "hit": hit, "files": counts,
+            "seconds": round(time.perf_counter() - started, 2)}
+
+def list_entries() -> List[Dict[str, Any]]:
+    """Store entries with their metadata, newest first."""
+    store_dir = get_store_dir()
+    if not store_dir.exists():
+        return []
+    entries = [read_json(path / ENTRY_FILENAME) for path in store_dir.iterdir()
+               if (path / ENTRY_FILENAME).exists()]
+    return sorted(entries, key=lambda e: e["created_at"], reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory node_modules store")
+    parser.add_argument("command", choices=["install", "key", "list"], help="Command to execute")
+    parser.add_argument("app_dir", nargs="?", help="App directory containing package.json")
+    parser.add_argument("--registry", help="npm registry (e.g. a local mirror) used to populate the store")
+    parser.add_argument("--offline", action="store_true", help="Populate from the npm cache only")
+    parser.add_argument("--link", action="store_true",
+                        help="Hard-link files from the store instead of reflinking or copying")
+    parser.add_argument("--no-fallback", action="store_true",
+                        help="Fail instead of falling back to a plain npm install")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command in ["install", "key"] and not args.app_dir:
+            print(f"Error: app_dir required for {args.command}", file=sys.stderr)
+            sys.exit(1)
+
+        if args.command == "install":
+            try:
+                result = install(args.app_dir, args.registry, args.offline, args.link)
+            except StoreError as e:
+                if args.no_fallback:
+                    raise
+                print(f"⚠️ node_modules store unavailable ({e}); running npm install", file=sys.stderr)
+                sys.exit(subprocess.run(["npm", "install"], cwd=args.app_dir).returncode)
+            linked = sum(result["files"].values())
+            print(f"✓ {'Store hit' if result['hit'] else 'Store populated'} {result['key'][:16]}: "
+                  f"{linked} entries into {result['app_dir']}/node_modules in {result['seconds']}s "
+                  f"({result['files']['link']} linked, {result['files']['reflink']} reflinked, "
+                  f"{result['files']['copy']} copied)")
+
+        elif args.command == "key":
+            print(lockfile_key(args.app_dir))
+
+        elif args.command == "list":
+            for entry in list_entries():
+                print(f"{entry['key'][:16]}  {entry['files']:>7} files  {entry['bytes'] / 1e6:>8.1f} MB  "
+                      f"{entry['created_at'][:19]}  {entry['source']}")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+from .jsonio import read_json, write_json
+from .logging_utils import get_stage_status
+from .run_archive import is_archived, materialize_run
+from .run_manifest import build_manifest
+
 def get_project_root() -> str:
     """Get the App Factory project root directory."""
     current = Path(__file__).parent.parent.absolute()
@@ -47,7 +52,7 @@ def get_current_run() -> Optional[str]:
     
     for date_dir in os.listdir(runs_dir):
         date_path = os.path.join(runs_dir, date_dir)
-        if os.path.isdir(date_path):
+        if os.path.isdir(date_path) and not date_dir.startswith("."):
             # Find most recent run in this date
             for run_dir in os.listdir(date_path):
                 run_path = os.path.join(date_path, run_dir)
@@ -58,9 +63,9 @@ def get_current_run() -> Optional[str]:
     
     return latest_run_dir
 
-def create_run_directory(run_name: Optional[str] = None) -> str:
+def create_run_directory(run_name: Optional[str] = None, runs_dir: Optional[str] = None) -> str:
     """Create a new run directory with proper structure."""
-    runs_dir = get_runs_directory()
+    runs_dir = runs_dir or get_runs_directory()
     date_str = datetime.now().strftime("%Y-%m-%d")
     
     if run_name is None:
@@ -73,6 +78,9 @@ def create_run_directory(run_name: Optional[str] = None) -> str:
     for subdir in subdirs:
         os.makedirs(os.path.join(run_path, subdir), exist_ok=True)
     
+    # Start the Merkle manifest first so every later write is journaled
+    build_manifest(run_path)
+    
     # Initialize run manifest
     manifest = {
         "run_id": f"{date_str}-{run_name}",
@@ -82,8 +90,7 @@ def create_run_directory(run_name: Optional[str] = None) -> str:
     }
     
     manifest_path = os.path.join(run_path, "meta", "run_manifest.json")
-    with open(manifest_path, 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2)
+    write_json(manifest_path, manifest)
     
     # Initialize stage status
     stage_status = {
@@ -92,13 +99,39 @@ def create_run_directory(run_name: Optional[str] = None) -> str:
     }
     
     status_path = os.path.join(run_path, "meta", "stage_status.json")
-    with open(status_path, 'w', encoding='utf-8') as f:
-        json.dump(stage_status, f, indent=2)
+    write_json(status_path, stage_status)
     
     return run_path
 
+# Required subdirectories per run layout
+RUN_LAYOUTS = {
+    "classic": ["inputs", "outputs", "stages", "spec", "meta"],
+    "batch": ["inputs", "meta", "stage01", "ideas"],
+    "dream": ["inputs", "meta", "stage01_dream", "ideas"],
+}
+
+# Run-level stage output directory per layout
+STAGE_DIRS = {
+    "classic": "stages",
+    "batch": os.path.join("stage01", "stages"),
+    "dream": os.path.join("stage01_dream", "stages"),
+}
+
+def detect_run_layout(run_path: str) -> str:
+    """
+    Classify a run directory layout.
+
+    'dream' runs have stage01_dream/, 'batch' runs have a shared stage01/ and
+    per-idea packs under ideas/, anything else is a 'classic' single run.
+    """
+    if os.path.isdir(os.path.join(run_path, "stage01_dream")):
+        return "dream"
+    if os.path.isdir(os.path.join(run_path, "stage01")) or os.path.isdir(os.path.join(run_path, "ideas")):
+        return "batch"
+    return "classic"
+
 def validate_run_structure(run_path: str) -> Dict[str, Any]:
-    """Validate that a run directory has the correct structure."""
+    """Validate that a run directory has the correct structure for its layout."""
     results = {
         "valid": True,
         "errors": [],
@@ -106,13 +139,19 @@ def validate_run_structure(run_path: str) -> Dict[str, Any]:
         "structure": {}
     }
     
+    # Archived runs are checked against an unpacked copy
+    if is_archived(run_path):
+        results["archived"] = True
+        run_path = materialize_run(run_path)
+    
     if not os.path.exists(run_path):
         results["valid"] = False
         results["errors"].append(f"Run directory does not exist: {run_path}")
         return results
     
     # Check required subdirectories
-    required_dirs = ["inputs", "outputs", "stages", "spec", "meta"]
+    results["layout"] = detect_run_layout(run_path)
+    required_dirs = RUN_LAYOUTS[results["layout"]]
     for subdir in required_dirs:
         subdir_path = os.path.join(run_path, subdir)
         if os.path.exists(subdir_path):
@@ -126,8 +165,7 @@ def validate_run_structure(run_path: str) -> Dict[str, Any]:
     manifest_path = os.path.join(run_path, "meta", "run_manifest.json")
     if os.path.exists(manifest_path):
         try:
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
+            manifest = read_json(manifest_path)
             results["structure"]["manifest"] = True
             results["run_id"] = manifest.get("run_id")
         except Exception as e:
@@ -141,8 +179,7 @@ def validate_run_structure(run_path: str) -> Dict[str, Any]:
     status_path = os.path.join(run_path, "meta", "stage_status.json")
     if os.path.exists(status_path):
         try:
-            with open(status_path, 'r') as f:
-                status = json.load(f)
+            status = get_stage_status(run_path)
             results["structure"]["stage_status"] = True
             results["completed_stages"] = [
                 stage for stage, info in status.get("stages", {}).items()
@@ -155,8 +192,8 @@ def validate_run_structure(run_path: str) -> Dict[str, Any]:
         results["warnings"].append("No stage status found")
         results["structure"]["stage_status"] = False
     
-    # Check for stage files
-    stages_dir = os.path.join(run_path, "stages")
+    # Check for stage files (batch and dream runs keep run-level stages under stage01*/)
+    stages_dir = os.path.join(run_path, STAGE_DIRS[results["layout"]])
     if os.path.exists(stages_dir):
         stage_files = [f for f in os.listdir(stages_dir) if f.endswith('.json')]
         results["stage_files"] = sorted(stage_files)
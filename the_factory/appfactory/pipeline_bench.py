@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+App Factory Pipeline Throughput Harness
+
+Drives complete runs through the real run plumbing (create_run_directory,
+stage status updates, schema validation and markdown rendering) with the
+model replaced by appfactory.model_standin, and reports runs/hour and
+per-stage latency under concurrency.
+
+Usage:
+    python -m appfactory.pipeline_bench --runs 20 --concurrency 4 --latency 0.5
+    python -m appfactory.pipeline_bench --runs 50 --error-rate 0.05 --json
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from .logging_utils import get_next_stage, update_stage_status, write_validation_result
+from .model_standin import ModelStandIn, ModelStandInError, LATENCY_DISTRIBUTIONS
+from .paths import create_run_directory
+from .render_markdown import render_stage_to_markdown
+from .schema_validate import (
+    extract_schema_from_template, get_stage_template_path, load_json, validate_json_against_schema
+)
+
+def run_pipeline(standin: ModelStandIn, runs_dir: str, run_name: str,
+                 max_attempts: int = 3) -> Dict[str, Any]:
+    """Execute one full run with the stand-in and return per-stage timings."""
+    started = time.perf_counter()
+    run_path = create_run_directory(run_name, runs_dir=runs_dir)
+    result = {"run_path": run_path, "status": "completed", "stages": [], "retries": 0}
+
+    while True:
+        stage_num = get_next_stage(run_path)
+        if stage_num == "completed":
+            break
+
+        stage_started = time.perf_counter()
+        update_stage_status(stage_num, run_path, "in_progress")
+        stage_json_path = os.path.join(run_path, "stages", f"stage{stage_num}.json")
+
+        # Model call with the runbook's three-attempt policy
+        for attempt in range(1, max_attempts + 1):
+            try:
+                standin.make_stage_runner(stage_num, stage_json_path)()
+                break
+            except ModelStandInError:
+                result["retries"] += 1
+        else:
+            update_stage_status(stage_num, run_path, "failed")
+            result["status"] = "failed"
+            break
+        model_seconds = time.perf_counter() - stage_started
+
+        # Validation against the template schema, as `schema_validate --stage` does
+        data = load_json(stage_json_path)
+        try:
+            schema_path = get_stage_template_path(stage_num)
+            schema = extract_schema_from_template(schema_path)
+        except (FileNotFoundError, ValueError):
+            schema_path, schema = None, None
+        valid, errors = (True, [])
+        if schema is not None:
+            valid, errors = validate_json_against_schema(data, schema)
+        write_validation_result(stage_num, run_path, str(schema_path), stage_json_path, valid, errors)
+
+        # Rendering
+        spec_path = os.path.join(run_path, "spec", f"{stage_num}_stage_{stage_num}.md")
+        try:
+            markdown = render_stage_to_markdown(stage_num, data)
+            rendered = True
+        except (KeyError, TypeError, AttributeError):
+            markdown = f"# Stage {stage_num} Output\n"
+            rendered = False
+        with open(spec_path, 'w', encoding='utf-8') as f:
+            f.write(markdown)
+
+        update_stage_status(stage_num, run_path, "completed", [stage_json_path, spec_path])
+        result["stages"].append({
+            "stage": stage_num,
+            "seconds": time.perf_counter() - stage_started,
+            "model_seconds": model_seconds,
+            "attempts": attempt,
+            "valid": valid,
+            "rendered": rendered
+        })
+
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def summarize(results: List[Dict[str, Any]], wall_seconds: float, concurrency: int) -> Dict[str, Any]:
+    """Aggregate run results into throughput and per-stage latency figures."""
+    completed = [r for r in results if r["status"] == "completed"]
+    per_stage = defaultdict(list)
+    model_per_stage = defaultdict(list)
+    invalid = defaultdict(int)
+
+    for result in results:
+        for stage in result["stages"]:
+            per_stage[stage["stage"]].append(stage["seconds"])
+            model_per_stage[stage["stage"]].append(stage["model_seconds"])
+            if not stage["valid"]:
+                invalid[stage["stage"]] += 1
+
+    stages = {}
+    for stage_num in sorted(per_stage):
+        values = per_stage[stage_num]
+        stages[stage_num] = {
+            "count": len(values),
+            "mean_s": round(sum(values) / len(values), 4),
+            "p50_s": round(_percentile(values, 50), 4),
+            "p95_s": round(_percentile(values, 95), 4),
+            "max_s": round(max(values), 4),
+            "model_mean_s": round(sum(model_per_stage[stage_num]) / len(values), 4),
+            "validation_failures": invalid[stage_num]
+        }
+
+    run_seconds = [r["seconds"] for r in completed]
+    return {
+        "runs": len(results),
+        "completed": len(completed),
+        "failed": len(results) - len(completed),
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "runs_per_hour": round(len(completed) / wall_seconds * 3600, 1) if wall_seconds else 0.0,
+        "run_p50_s": round(_percentile(run_seconds, 50), 4) if run_seconds else None,
+        "run_p95_s": round(_percentile(run_seconds, 95), 4) if run_seconds else None,
+        "retries": sum(r["retries"] for r in results),
+        "stages": stages
+    }
+
+def run_benchmark(runs: int, concurrency: int, standin: ModelStandIn,
+                  runs_dir: Optional[str] = None, keep: bool = False) -> Dict[str, Any]:
+    """Run the benchmark and return the summary."""
+    work_dir = runs_dir or tempfile.mkdtemp(prefix="appfactory-bench-")
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(run_pipeline, standin, work_dir, f"bench-{os.getpid()}-{i:04d}")
+                for i in range(runs)
+            ]
+            results = [future.result() for future in futures]
+        summary = summarize(results, time.perf_counter() - started, concurrency)
+        summary["runs_dir"] = work_dir if keep or runs_dir else None
+        return summary
+    finally:
+        if not keep and runs_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Format a benchmark summary as a text table."""
+    lines = [
+        f"Runs: {summary['completed']}/{summary['runs']} completed "
+        f"({summary['failed']} failed, {summary['retries']} retries) "
+        f"at concurrency {summary['concurrency']}",
+        f"Wall time: {summary['wall_seconds']}s  Throughput: {summary['runs_per_hour']} runs/hour",
+        "",
+        f"{'Stage':<8} {'Count':>6} {'Mean':>9} {'P50':>9} {'P95':>9} {'Max':>9} {'Model':>9}",
+    ]
+    for stage_num, stats in summary["stages"].items():
+        lines.append(
+            f"{stage_num:<8} {stats['count']:>6} {stats['mean_s']:>9.4f} {stats['p50_s']:>9.4f} "
+            f"{stats['p95_s']:>9.4f} {stats['max_s']:>9.4f} {stats['model_mean_s']:>9.4f}"
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory pipeline throughput harness")
+    parser.add_argument("--runs", type=int, default=10, help="Number of full runs")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent runs")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean model latency (seconds)")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                       help="Model latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a model error")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    parser.add_argument("--recordings", help="Runs directory to replay recordings from")
+    parser.add_argument("--runs-dir", help="Where to create benchmark runs (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="Keep benchmark runs on disk")
+    parser.add_argument("--json", action="store_true", help="Print JSON summary")
+
+    args = parser.parse_args()
+
+    try:
+        standin = ModelStandIn(runs_dir=args.recordings, latency=args.latency,
+                               latency_dist=args.latency_dist, error_rate=args.error_rate,
+                               seed=args.seed)
+        summary = run_benchmark(args.runs, args.concurrency, standin, args.runs_dir, args.keep)
+
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print(format_summary(summary))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+App Factory PNG Optimizer
+
+Lossless recompression of generated PNG assets using only the standard
+library: the image is decoded to raw scanlines, re-filtered with every
+PNG filter type (plus a per-row adaptive choice), deflated with maximum
+zlib effort and written back only if smaller. Metadata chunks (text, EXIF,
+timestamps, pHYs) are dropped; chunks that affect how pixels render
+(PLTE, tRNS, gAMA, cHRM, sRGB, iCCP, sBIT) are kept. RGBA images whose
+alpha is fully opaque are stored as RGB, with sBIT trimmed to match.
+Animated PNGs (APNG) are rejected rather than flattened to their first
+frame.
+
+Assets run across a process pool. Optimized hashes are remembered in
+.cache/png_optimize.json so already-optimized files are skipped, and
+generation_log.json entries get before/after sizes and hashes. Files that
+are hard links into the asset store are relinked to the optimized content.
+
+Usage:
+    python -m appfactory.png_optimize optimize [paths...] [--workers N] [--dry-run]
+    python -m appfactory.png_optimize check <png_file>
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import zlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .jsonio import read_json, write_json
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Ancillary chunks that change how pixels are displayed; everything else ancillary is metadata
+KEEP_CHUNKS = {b"PLTE", b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"iCCP", b"sBIT"}
+# APNG animation chunks: frames live outside IDAT, so these files are left alone
+APNG_CHUNKS = {b"acTL", b"fcTL", b"fdAT"}
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+ZLIB_STRATEGIES = [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED]
+GENERATION_LOG = "generation_log.json"
+SKIP_DIRS = {"node_modules", ".git", ".expo"}
+
+class PNGError(Exception):
+    """Raised for files that are not PNGs this optimizer can decode."""
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_cache_path() -> Path:
+    """File recording the hashes of already-optimized PNGs."""
+    return get_repo_root() / ".cache" / "png_optimize.json"
+
+def read_chunks(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """Split a PNG into (type, body) chunks, verifying CRCs."""
+    if not data.startswith(PNG_SIGNATURE):
+        raise PNGError("not a PNG file")
+    chunks = []
+    position = len(PNG_SIGNATURE)
+    while position + 12 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        crc, = struct.unpack(">I", data[position + 8 + length:position + 12 + length])
+        if len(body) != length or zlib.crc32(chunk_type + body) != crc:
+            raise PNGError(f"corrupt {chunk_type.decode('latin-1')} chunk")
+        chunks.append((chunk_type, body))
+        position += 12 + length
+        if chunk_type == b"IEND":
+            return chunks
+    raise PNGError("missing IEND chunk")
+
+def write_chunk(chunk_type: bytes, body: bytes) -> bytes:
+    """Serialize one PNG chunk."""
+    return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+# |x| of each filtered byte read as a signed value, for the adaptive filter heuristic
+_ABS_COST = bytes(b if b < 128 else 256 - b for b in range(256))
+
+def _masks(length: int) -> Tuple[int, int]:
+    return int.from_bytes(b"\x80" * length, "big"), int.from_bytes(b"\x7f" * length, "big")
+
+def _sub_bytes(x: bytes, y: bytes) -> bytes:
+    """Bytewise (x - y) mod 256, on whole rows as big integers (no per-byte loop)."""
+    high, low = _masks(len(x))
+    a, b = int.from_bytes(x, "big"), int.from_bytes(y, "big")
+    return (((a | high) - (b & low)) ^ ((a ^ b ^ high) & high)).to_bytes(len(x), "big")
+
+def _add_bytes(x: bytes, y: bytes) -> bytes:
+    """Bytewise (x + y) mod 256."""
+    high, low = _masks(len(x))
+    a, b = int.from_bytes(x, "big"), int.from_bytes(y, "big")
+    return (((a & low) + (b & low)) ^ ((a ^ b) & high)).to_bytes(len(x), "big")
+
+def _avg_bytes(x: bytes, y: bytes) -> bytes:
+    """Bytewise floor((x + y) / 2)."""
+    a, b = int.from_bytes(x, "big"), int.from_bytes(y, "big")
+    even = int.from_bytes(b"\xfe" * len(x), "big")
+    return ((a & b) + (((a ^ b) & even) >> 1)).to_bytes(len(x), "big")
+
+def _paeth_predictions(left: bytes, up: bytes, upper_left: bytes) -> bytes:
+    return bytes(
+        a if abs(b - c) <= abs(a - c) and abs(b - c) <= abs(a + b - 2 * c) else
+        b if abs(a - c) <= abs(a + b - 2 * c) else c
+        for a, b, c in zip(left, up, upper_left)
+    )
+
+def unfilter(raw: bytes, height: int, stride: int, bpp: int) -> List[bytes]:
+    """Reverse PNG scanline filtering; returns the raw rows."""
+    rows = []
+    prev = bytes(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        filter_type = raw[start]
+        line = raw[start + 1:start + 1 + stride]
+        if filter_type == 0:
+            row = bytes(line)
+        elif filter_type == 1:
+            out = bytearray(line)
+            for ch in range(bpp):
+                out[ch::bpp] = bytes(accumulate(line[ch::bpp], lambda x, y: (x + y) & 255))
+            row = bytes(out)
+        elif filter_type == 2:
+            row = _add_bytes(line, prev)
+        elif filter_type == 3:
+            out = bytearray(line)
+            for i in range(stride):
+                left = out[i - bpp] if i >= bpp else 0
+                out[i] = (out[i] + ((left + prev[i]) >> 1)) & 255
+            row = bytes(out)
+        elif filter_type == 4:
+            out = bytearray(line)
+            for i in range(bpp):
+                out[i] = (out[i] + prev[i]) & 255
+            for i in range(bpp, stride):
+                a, b, c = out[i - bpp], prev[i], prev[i - bpp]
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                out[i] = (out[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 255
+            row = bytes(out)
+        else:
+            raise PNGError(f"invalid filter type {filter_type}")
+        rows.append(row)
+        prev = row
+    return rows
+
+def filter_row(filter_type: int, row: bytes, prev: bytes, bpp: int) -> bytes:
+    """Apply one PNG filter type to a scanline."""
+    if filter_type == 0:
+        return row
+    left = bytes(bpp) + row[:-bpp]
+    if filter_type == 1:
+        return _sub_bytes(row, left)
+    if filter_type == 2:
+        return _sub_bytes(row, prev)
+    if filter_type == 3:
+        return _sub_bytes(row, _avg_bytes(left, prev))
+    return _sub_bytes(row, _paeth_predictions(left, prev, bytes(bpp) + prev[:-bpp]))
+
+def _row_cost(line: bytes) -> int:
+    # Minimum sum of absolute differences heuristic
+    return sum(line.translate(_ABS_COST))
+
+def filter_candidates(rows: List[bytes], bpp: int) -> Dict[str, bytes]:
+    """Filtered image data for each whole-image filter type and the per-row adaptive choice."""
+    filtered = {t: [] for t in range(5)}
+    adaptive = []
+    prev = bytes(len(rows[0])) if rows else b""
+    for row in rows:
+        lines = [filter_row(t, row, prev, bpp) for t in range(5)]
+        for t, line in enumerate(lines):
+            filtered[t].append(bytes([t]) + line)
+        best = min(range(5), key=lambda t: _row_cost(lines[t]))
+        adaptive.append(filtered[best][-1])
+        prev = row
+    candidates = {f"filter{t}": b"".join(lines) for t, lines in filtered.items()}
+    candidates["adaptive"] = b"".join(adaptive)
+    return candidates
+
+def strip_opaque_alpha(rows: List[bytes], color_type: int, bit_depth: int) -> Tuple[List[bytes], int]:
+    """Drop the alpha channel of 8-bit RGBA/gray+alpha rows when every pixel is opaque."""
+    if bit_depth != 8 or color_type not in (4, 6):
+        return rows, color_type
+    channels = CHANNELS[color_type]
+    for row in rows:
+        if row[channels - 1::channels].count(255) != len(row) // channels:
+            return rows, color_type
+    stripped = []
+    for row in rows:
+        out = bytearray(len(row) // channels * (channels - 1))
+        for ch in range(channels - 1):
+            out[ch::channels - 1] = row[ch::channels]
+        stripped.append(bytes(out))
+    return stripped, {4: 0, 6: 2}[color_type]
+
+def _deflate(data: bytes, strategy: int) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+def optimize_png(data: bytes) -> Dict[str, Any]:
+    """
+    Losslessly recompress PNG bytes.
+
+    Returns the smallest encoding found (or the input when nothing smaller
+    was found) with the chosen filter and zlib strategy.
+    """
+    chunks = read_chunks(data)
+    if chunks[0][0] != b"IHDR":
+        raise PNGError("IHDR is not the first chunk")
+    width, height, bit_depth, color_type, compression, filter_method, interlace = \
+        struct.unpack(">IIBBBBB", chunks[0][1])
+    if interlace:
+        raise PNGError("interlaced PNGs are not supported")
+    if color_type not in CHANNELS:
+        raise PNGError(f"invalid color type {color_type}")
+    if any(t in APNG_CHUNKS for t, body in chunks):
+        raise PNGError("animated PNGs (APNG) are not supported")
+
+    try:
+        raw = zlib.decompress(b"".join(body for t, body in chunks if t == b"IDAT"))
+    except zlib.error as e:
+        raise PNGError(f"corrupt image data: {e}")
+    bits = CHANNELS[color_type] * bit_depth
+    stride = (width * bits + 7) // 8
+    if len(raw) < height * (stride + 1):
+        raise PNGError("truncated image data")
+
+    rows = unfilter(raw, height, stride, max(1, bits // 8))
+    source_color_type = color_type
+    rows, color_type = strip_opaque_alpha(rows, color_type, bit_depth)
+    bpp = max(1, CHANNELS[color_type] * bit_depth // 8)
+
+    # Rank filterings at full effort, then try the alternative strategies on the winner only
+    best = None
+    for name, filtered in filter_candidates(rows, bpp).items():
+        idat = _deflate(filtered, ZLIB_STRATEGIES[0])
+        if best is None or len(idat) < len(best[0]):
+            best = (idat, name, ZLIB_STRATEGIES[0], filtered)
+    for strategy in ZLIB_STRATEGIES[1:]:
+        idat = _deflate(best[3], strategy)
+        if len(idat) < len(best[0]):
+            best = (idat, best[1], strategy, best[3])
+
+    ihdr = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, compression, filter_method, 0)
+    output = PNG_SIGNATURE + write_chunk(b"IHDR", ihdr)
+    for chunk_type, body in chunks[1:]:
+        if chunk_type == b"sBIT" and color_type != source_color_type:
+            # sBIT has one byte per channel; drop the stripped alpha channel's
+            body = body[:CHANNELS[color_type]]
+        if chunk_type in KEEP_CHUNKS:
+            output += write_chunk(chunk_type, body)
+    output += write_chunk(b"IDAT", best[0]) + write_chunk(b"IEND", b"")
+
+    if len(output) >= len(data):
+        return {"data": data, "optimized": False, "filter": None, "strategy": None}
+    return {"data": output, "optimized": True, "filter": best[1], "strategy": best[2]}
+
+def encode_png(width: int, height: int, rows: List[bytes], color_type: int) -> bytes:
+    """
+    Encode 8-bit rows as a PNG.
+
+    Each row uses whichever of the None/Sub/Up filters scores best (these
+    run on whole rows, so encoding large flat images stays fast).
+    """
+    bpp = CHANNELS[color_type]
+    filtered = []
+    prev = bytes(width * bpp)
+    for row in rows:
+        lines = [filter_row(t, row, prev, bpp) for t in range(3)]
+        best = min(range(3), key=lambda t: _row_cost(lines[t]))
+        filtered.append(bytes([best]) + lines[best])
+        prev = row
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return (PNG_SIGNATURE + write_chunk(b"IHDR", ihdr)
+            + write_chunk(b"IDAT", _deflate(b"".join(filtered), zlib.Z_DEFAULT_STRATEGY))
+            + write_chunk(b"IEND", b""))
+
+def decode_pixels(data: bytes) -> Tuple[int, int, List[bytes]]:
+    """(width, height, RGBA-or-native rows) of an 8-bit PNG, for lossless comparisons."""
+    chunks = read_chunks(data)
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", chunks[0][1][:10])
+    raw = zlib.decompress(b"".join(body for t, body in chunks if t == b"IDAT"))
+    bits = CHANNELS[color_type] * bit_depth
+    rows = unfilter(raw, height, (width * bits + 7) // 8, max(1, bits // 8))
+    if color_type in (0, 2) and bit_depth == 8:
+        channels = CHANNELS[color_type]
+        rows = [_add_opaque_alpha(row, channels) for row in rows]
+    return width, height, rows
+
+def _add_opaque_alpha(row: bytes, channels: int) -> bytes:
+    out = bytearray(b"\xff" * (len(row) // channels * (channels + 1)))
+    for ch in range(channels):
+        out[ch::channels + 1] = row[ch::channels]
+    return bytes(out)
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def load_optimized_hashes() -> Dict[str, Any]:
+    """Hashes of PNGs that are already optimized (outputs, and inputs that could not be improved)."""
+    try:
+        return read_json(get_cache_path())
+    except (OSError, ValueError):
+        return {"optimized": {}}
+
+def save_optimized_hashes(cache: Dict[str, Any]) -> None:
+    try:
+        get_cache_path().parent.mkdir(parents=True, exist_ok=True)
+        write_json(get_cache_path(), cache, compact=True)
+    except OSError as e:
+        print(f"Warning: Could not save PNG optimization cache: {e}", file=sys.stderr)
+
+def _replace_file(path: str, data: bytes) -> None:
+    # Write a new inode: the old one may be a hard link shared with the asset store
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp_path, os.stat(path).st_mode & 0o777 | 0o200)
+    os.replace(tmp_path, path)
+
+def optimize_file(path: str, dry_run: bool = False) -> Dict[str, Any]:
+    """Optimize one PNG file in place (worker entry point)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    result = {"path": path, "before_size": len(data), "before_sha256": sha256(data)}
+    try:
+        optimized = optimize_png(data)
+    except PNGError as e:
+        return {**result, "status": "error", "error": str(e)}
+
+    output = optimized["data"]
+    result.update({"after_size": len(output), "after_sha256": sha256(output),
+                   "filter": optimized["filter"]})
+    if not optimized["optimized"]:
+        return {**result, "status": "already_optimal"}
+    if not dry_run:
+        _replace_file(path, output)
+    return {**result, "status": "optimized"}
+
+def find_pngs(paths: List[str]) -> List[str]:
+    """PNG files under the given files or directories, in sorted order."""
+    files = []
+    for root in paths:
+        if os.path.isfile(root):
+            files.append(root)
+            continue
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            files.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.lower().endswith(".png"))
+    return files
+
+def update_generation_logs(results: List[Dict[str, Any]]) -> int:
+    """Record before/after sizes and hashes in each optimized asset's generation log."""
+    by_dir: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for result in results:
+        if result["status"] == "optimized":
+            by_dir.setdefault(os.path.dirname(result["path"]), {})[os.path.basename(result["path"])] = result
+
+    updated = 0
+    for directory, optimized in by_dir.items():
+        log_path = os.path.join(directory, GENERATION_LOG)
+        if not os.path.exists(log_path):
+            continue
+        log = read_json(log_path)
+        for asset in log.get("generated_assets", []):
+            result = optimized.get(asset.get("filename"))
+            if result is None:
+                continue
+            asset["optimization"] = {
+                "method": "png_optimize",
+                "before_size": result["before_size"],
+                "before_sha256": result["before_sha256"],
+                "after_size": result["after_size"],
+                "after_sha256": result["after_sha256"]
+            }
+            asset["file_size"] = result["after_size"]
+            asset["sha256"] = result["after_sha256"]
+            if "store_object" in asset or "linked_to_store" in result:
+                from .asset_store import store_reference
+                asset["store_object"] = store_reference(result["after_sha256"])
+        write_json(log_path, log)
+        updated += 1
+    return updated
+
+def _relink_store_assets(results: List[Dict[str, Any]], store_linked: Dict[str, bool]) -> None:
+    from .asset_store import link_asset
+    for result in results:
+        if result["status"] == "optimized" and store_linked.get(result["path"]):
+            link_asset(result["path"], result["after_sha256"])
+            result["linked_to_store"] = True
+
+def optimize_assets(paths: List[str], workers: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Optimize every PNG under the given paths across a process pool.
+
+    Files whose hash is recorded as already optimized are skipped without
+    decoding. workers=1 runs serially in this process.
+    """
+    from .asset_store import hash_file, object_path
+
+    cache = load_optimized_hashes()
+    pending = []
+    skipped = 0
+    store_linked = {}
+    for path in find_pngs(paths):
+        digest = hash_file(path)
+        if digest in cache["optimized"]:
+            skipped += 1
+            continue
+        target = object_path(digest)
+        store_linked[path] = target.exists() and os.stat(target).st_ino == os.stat(path).st_ino
+        pending.append(path)
+
+    if workers == 1 or len(pending) <= 1:
+        results = [optimize_file(path, dry_run) for path in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(optimize_file, pending, [dry_run] * len(pending)))
+
+    logs_updated = 0
+    if not dry_run:
+        _relink_store_assets(results, store_linked)
+        logs_updated = update_generation_logs(results)
+        for result in results:
+            if result["status"] in ("optimized", "already_optimal"):
+                cache["optimized"][result["after_sha256"]] = result["after_size"]
+        save_optimized_hashes(cache)
+
+    optimized = [r for r in results if r["status"] == "optimized"]
+    return {
+        "files": len(pending) + skipped,
+        "skipped": skipped,
+        "optimized": len(optimized),
+        "already_optimal": sum(1 for r in results if r["status"] == "already_optimal"),
+        "errors": [r for r in results if r["status"] == "error"],
+        "before_bytes": sum(r["before_size"] for r in optimized),
+        "after_bytes": sum(r["after_size"] for r in optimized),
+        "logs_updated": logs_updated,
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory lossless PNG optimizer")
+    parser.add_argument("command", choices=["optimize", "check"], help="Command to execute")
+    parser.add_argument("paths", nargs="*", help="PNG files or directories (default: builds/ and app/assets)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Report savings without rewriting files")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "optimize":
+            paths = args.paths or [str(get_repo_root() / "builds"), str(get_repo_root() / "app" / "assets")]
+            report = optimize_assets(paths, args.workers, args.dry_run)
+            for error in report["errors"]:
+                print(f"⚠️ {error['path']}: {error['error']}", file=sys.stderr)
+            saved = report["before_bytes"] - report["after_bytes"]
+            print(f"✓ {report['optimized']} optimized, {report['already_optimal']} already optimal, "
+                  f"{report['skipped']} skipped, {len(report['errors'])} unreadable of {report['files']} PNGs")
+            print(f"  {report['before_bytes']:,} -> {report['after_bytes']:,} bytes "
+                  f"({saved:,} {'would be ' if args.dry_run else ''}saved), "
+                  f"{report['logs_updated']} generation logs updated")
+
+        elif args.command == "check":
+            if len(args.paths) != 1:
+                print("Error: one PNG file required for check", file=sys.stderr)
+                sys.exit(1)
+            result = optimize_file(args.paths[0], dry_run=True)
+            if result["status"] == "error":
+                print(f"Error: {result['error']}", file=sys.stderr)
+                sys.exit(1)
+            print(f"{result['path']}: {result['before_size']:,} -> {result['after_size']:,} bytes "
+                  f"({result['status']}, filter {result['filter']})")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+App Factory Prompt Assembly
+
+Builds stage requests in a fixed, prefix-stable order so provider prompt
+caches can reuse as much of each request as possible:
+
+    1. standards/ docs            (identical for every call)      | breakpoint
+    2. stage template             (identical for a stage)         | breakpoint
+    3. run-level inputs           (e.g. stage01, shared by packs) | breakpoint
+    4. pack inputs                (prior stages of this pack)     | breakpoint
+    5. stage instruction          (volatile, never cached)
+
+Input JSON is re-serialized canonically (sorted keys) and labelled with
+run-relative paths, so identical content always produces identical bytes.
+The report command replays a run's stage calls through a prefix-cache
+simulation and prints the estimated reuse ratio.
+
+Usage:
+    python -m appfactory.prompt_assembly assemble <run_or_pack_path> <stage_num> [--request]
+    python -m appfactory.prompt_assembly report <run_path> [--order stage|pack] [--json]
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .batch_executor import collect_stage_inputs, load_boundary, rebase_boundary_path
+from .jsonio import dumps, read_json
+from .logging_utils import stage_sort_key
+from .stage_events import resolve_event_scope
+from .template_bundle import get_stage_template_path
+
+# Providers honor at most four cache breakpoints per request
+TIERS = ["standards", "template", "run_inputs", "pack_inputs", "instruction"]
+BREAKPOINT_TIERS = ["standards", "template", "run_inputs", "pack_inputs"]
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d{1,3}|\n+| {2,}|[^\sA-Za-z\d]")
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def estimate_tokens(text: str) -> int:
+    """
+    Offline token estimate approximating a BPE tokenizer.
+
+    Short words, digit triples, punctuation marks, newline runs and
+    indentation runs count as one token each; long words as one per four
+    characters.
+    """
+    tokens = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        piece = match.group()
+        if piece[0].isalpha() and len(piece) > 6:
+            tokens += (len(piece) + 3) // 4
+        else:
+            tokens += 1
+    return tokens
+
+def load_standards_text() -> str:
+    """Concatenate every standards/ document in a fixed order."""
+    parts = []
+    for path in sorted((get_repo_root() / "standards").glob("*.md")):
+        parts.append(f"## standards/{path.name}\n\n{path.read_text(encoding='utf-8')}")
+    return "\n\n".join(parts)
+
+def canonical_input_text(path: str) -> str:
+    """Input file content with JSON re-serialized in canonical (sorted-key) form."""
+    try:
+        return dumps(read_json(path), sort_keys=True, ensure_ascii=False).decode("utf-8")
+    except (ValueError, OSError):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+def resolve_stage_inputs(path: str, stage_num: str) -> List[str]:
+    """
+    Input files for a stage of a run or idea pack.
+
+    Uses meta.input_stage_paths of an existing output when every listed file
+    resolves; otherwise the run's stage01 output plus earlier stages.
+    """
+    run_root, pack = resolve_event_scope(path)
+    stage_json_path = os.path.join(path, "stages", f"stage{stage_num}.json")
+
+    if os.path.exists(stage_json_path):
+        try:
+            recorded = read_json(stage_json_path).get("meta", {}).get("input_stage_paths") or []
+        except ValueError:
+            recorded = []
+        resolved = [rebase_boundary_path(p, run_root) for p in recorded if isinstance(p, str)]
+        if resolved and all(os.path.isfile(p) for p in resolved):
+            return resolved
+
+    if pack is not None:
+        return collect_stage_inputs(path, stage_num, load_boundary(path))
+
+    inputs = []
+    for directory in [os.path.join(run_root, "stage01", "stages"), os.path.join(run_root, "stages")]:
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if filename.startswith("stage") and filename.endswith(".json"):
+                prior = filename[len("stage"):-len(".json")]
+                if stage_sort_key(prior) < stage_sort_key(stage_num):
+                    inputs.append(os.path.join(directory, filename))
+    return inputs
+
+def _input_block(path: str, run_root: str) -> str:
+    label = os.path.relpath(os.path.abspath(path), run_root)
+    return f"### {label}\n\n{canonical_input_text(path)}\n"
+
+def assemble_stage_prompt(path: str, stage_num: str, input_paths: Optional[List[str]] = None,
+                          instruction: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Assemble the prompt for one stage of a run or idea pack.
+
+    Returns the ordered segments (tier, text, tokens, sha256, breakpoint)
+    and the token estimate of each input file.
+    """
+    run_root, pack = resolve_event_scope(path)
+    pack_root = os.path.abspath(path)
+    if input_paths is None:
+        input_paths = resolve_stage_inputs(path, stage_num)
+
+    # Shared run-level inputs sort ahead of pack inputs; both in stage order
+    def order(p):
+        name = os.path.basename(p)
+        stage = name[len("stage"):-len(".json")] if name.startswith("stage") else name
+        return (stage_sort_key(stage), os.path.relpath(os.path.abspath(p), run_root))
+
+    pack_inputs = sorted((p for p in input_paths if pack and os.path.abspath(p).startswith(pack_root + os.sep)),
+                         key=order)
+    run_inputs = sorted((p for p in input_paths if p not in pack_inputs), key=order)
+
+    template_path = get_stage_template_path(stage_num)
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template_text = f"## Stage {stage_num} template\n\n{f.read()}"
+
+    if instruction is None:
+        target = os.path.relpath(os.path.join(pack_root, "stages", f"stage{stage_num}.json"), run_root)
+        instruction = (f"Execute stage {stage_num} for run {os.path.basename(run_root)}"
+                       f"{f', idea pack {pack}' if pack else ''}. Write the JSON output to {target}.")
+
+    blocks = {p: _input_block(p, run_root) for p in run_inputs + pack_inputs}
+    texts = {
+        "standards": load_standards_text(),
+        "template": template_text,
+        "run_inputs": "".join(blocks[p] for p in run_inputs),
+        "pack_inputs": "".join(blocks[p] for p in pack_inputs),
+        "instruction": instruction
+    }
+
+    segments = []
+    for tier in TIERS:
+        text = texts[tier]
+        if not text:
+            continue
+        segments.append({
+            "tier": tier,
+            "text": text,
+            "tokens": estimate_tokens(text),
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            "breakpoint": tier in BREAKPOINT_TIERS
+        })
+
+    return {
+        "stage": stage_num,
+        "run_id": os.path.basename(run_root),
+        "pack": pack,
+        "inputs": [os.path.relpath(os.path.abspath(p), run_root) for p in run_inputs + pack_inputs],
+        "input_tokens": {
+            os.path.relpath(os.path.abspath(p), run_root): estimate_tokens(block)
+            for p, block in blocks.items()
+        },
+        "template_path": os.path.relpath(template_path, get_repo_root()),
+        "segments": segments,
+        "tokens": sum(s["tokens"] for s in segments)
+    }
+
+def to_messages_request(assembled: Dict[str, Any], model: str = "claude-sonnet-4-20250514",
+                        max_tokens: int = 16000) -> Dict[str, Any]:
+    """Render an assembled prompt as a Messages API request with cache_control breakpoints."""
+    def block(segment):
+        content = {"type": "text", "text": segment["text"]}
+        if segment["breakpoint"]:
+            content["cache_control"] = {"type": "ephemeral"}
+        return content
+
+    static = [block(s) for s in assembled["segments"] if s["tier"] in ("standards", "template")]
+    dynamic = [block(s) for s in assembled["segments"] if s["tier"] not in ("standards", "template")]
+    return {
+        "model": model,
+        "max_tokens": max_tokens,
+        "system": static,
+        "messages": [{"role": "user", "content": dynamic}]
+    }
+
+def prefix_hashes(assembled: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """Cumulative (hash, tokens) of the prompt prefix at each cache breakpoint."""
+    digest = hashlib.sha256()
+    tokens = 0
+    prefixes = []
+    for segment in assembled["segments"]:
+        digest.update(segment["sha256"].encode("ascii"))
+        tokens += segment["tokens"]
+        if segment["breakpoint"]:
+            prefixes.append((digest.copy().hexdigest(), tokens))
+    return prefixes
+
+class PrefixCacheSimulator:
+    """Estimate provider prompt-cache hits: a request reuses its longest previously seen breakpoint prefix."""
+
+    def __init__(self):
+        self.seen = set()
+
+    def observe(self, assembled: Dict[str, Any]) -> int:
+        """Record a request and return the number of tokens served from cache."""
+        cached = 0
+        for prefix_hash, tokens in prefix_hashes(assembled):
+            if prefix_hash in self.seen:
+                cached = tokens
+            self.seen.add(prefix_hash)
+        return cached
+
+def collect_run_stage_calls(run_path: str) -> List[Tuple[str, str]]:
+    """(path, stage_num) for every stage output of a run and its idea packs, excluding stage01."""
+    calls = []
+    roots = [run_path]
+    ideas_dir = os.path.join(run_path, "ideas")
+    if os.path.isdir(ideas_dir):
+        roots += [os.path.join(ideas_dir, d) for d in sorted(os.listdir(ideas_dir))
+                  if os.path.isdir(os.path.join(ideas_dir, d))]
+
+    for root in roots:
+        stages_dir = os.path.join(root, "stages")
+        if not os.path.isdir(stages_dir):
+            continue
+        for filename in sorted(os.listdir(stages_dir)):
+            if filename.startswith("stage") and filename.endswith(".json"):
+                stage_num = filename[len("stage"):-len(".json")]
+                if stage_num.startswith("01"):
+                    continue
+                try:
+                    get_stage_template_path(stage_num)
+                except FileNotFoundError:
+                    continue
+                calls.append((root, stage_num))
+    return calls
+
+def report_prefix_reuse(run_path: str, order: str = "stage") -> Dict[str, Any]:
+    """
+    Replay a run's stage calls through the prefix-cache simulation.
+
+    order='stage' issues every pack's stage N before stage N+1 (concurrent
+    batch execution); order='pack' finishes one pack before the next.
+    """
+    calls = collect_run_stage_calls(run_path)
+    if order == "stage":
+        calls.sort(key=lambda call: (stage_sort_key(call[1]), call[0]))
+
+    simulator = PrefixCacheSimulator()
+    requests = []
+    for path, stage_num in calls:
+        assembled = assemble_stage_prompt(path, stage_num)
+        cached = simulator.observe(assembled)
+        requests.append({
+            "pack": assembled["pack"],
+            "stage": stage_num,
+            "tokens": assembled["tokens"],
+            "cached_tokens": cached,
+            "reuse_ratio": round(cached / assembled["tokens"], 4) if assembled["tokens"] else 0.0
+        })
+
+    total = sum(r["tokens"] for r in requests)
+    cached = sum(r["cached_tokens"] for r in requests)
+    return {
+        "run_id": os.path.basename(os.path.normpath(run_path)),
+        "order": order,
+        "requests": requests,
+        "total_tokens": total,
+        "cached_tokens": cached,
+        "reuse_ratio": round(cached / total, 4) if total else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory prompt assembly")
+    parser.add_argument("command", choices=["assemble", "report"], help="Command to execute")
+    parser.add_argument("path", help="Run or idea pack directory")
+    parser.add_argument("stage_num", nargs="?", help="Stage number for assemble")
+    parser.add_argument("--request", action="store_true", help="Print the full Messages API request")
+    parser.add_argument("--order", choices=["stage", "pack"], default="stage",
+                       help="Call order for the reuse simulation")
+    parser.add_argument("--json", action="store_true", help="Print JSON report")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "assemble":
+            if not args.stage_num:
+                print("Error: stage_num required for assemble", file=sys.stderr)
+                sys.exit(1)
+            assembled = assemble_stage_prompt(args.path, args.stage_num)
+            if args.request:
+                print(json.dumps(to_messages_request(assembled), indent=2, ensure_ascii=False))
+            else:
+                for segment in assembled["segments"]:
+                    marker = "| cache" if segment["breakpoint"] else ""
+                    print(f"{segment['tier']:<12} {segment['tokens']:>8} tokens  "
+                          f"{segment['sha256'][:12]} {marker}")
+                print(f"{'total':<12} {assembled['tokens']:>8} tokens")
+
+        elif args.command == "report":
+            report = report_prefix_reuse(args.path, args.order)
+            if args.json:
+                print(json.dumps(report, indent=2))
+            else:
+                print(f"{'Pack':<50} {'Stage':>7} {'Tokens':>8} {'Cached':>8} {'Reuse':>7}")
+                for r in report["requests"]:
+                    print(f"{(r['pack'] or '-'):<50} {r['stage']:>7} {r['tokens']:>8} "
+                          f"{r['cached_tokens']:>8} {r['reuse_ratio']:>7.1%}")
+                print(f"\nEstimated prefix reuse: {report['cached_tokens']}/{report['total_tokens']} "
+                      f"tokens ({report['reuse_ratio']:.1%}), order={report['order']}")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
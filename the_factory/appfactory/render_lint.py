@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+App Factory Render Lint
+
+Static, rule-based linter for render-performance problems in generated
+React Native screens and stores (patterns that jank on low-end Android):
+
+    scrollview-map          (error)   data .map() rendered inside a ScrollView
+    serialize-on-mutation   (warning) full state JSON.stringify'd on every mutation
+    whole-store-selector    (warning) zustand store hook used without a selector
+    inline-handler-in-list  (warning) arrow-function props in list item renders
+    inline-render-item      (info)    renderItem defined inline on a list
+
+Findings carry the rule, severity, file and line. build_validator fails
+validation when a finding is at or above its severity threshold (error
+by default). A finding is suppressed by a comment on the line before it:
+
+    // render-lint-disable-next-line scrollview-map
+
+Usage:
+    python -m appfactory.render_lint <build_path> [--fail-on error|warning|info] [--json]
+"""
+
+import bisect
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .jsonio import dumps
+
+SEVERITIES = ["info", "warning", "error"]
+RULES = {
+    "scrollview-map": "error",
+    "serialize-on-mutation": "warning",
+    "whole-store-selector": "warning",
+    "inline-handler-in-list": "warning",
+    "inline-render-item": "info"
+}
+SOURCE_SUFFIXES = {".ts", ".tsx", ".js", ".jsx"}
+SKIP_DIRS = {"node_modules", ".git", ".expo", "_upstream", "_docs"}
+
+COMMENT_PATTERN = re.compile(r"/\*.*?\*/|(?<![:\\])//[^\n]*", re.DOTALL)
+SUPPRESS_PATTERN = re.compile(r"render-lint-disable-next-line\b([ \w,-]*)")
+SCROLLVIEW_OPEN = re.compile(r"<((?:Animated\.)?\w*ScrollView)\b")
+SCROLLVIEW_CLOSE = re.compile(r"</((?:Animated\.)?\w*ScrollView)\s*>")
+MAP_CALL = re.compile(r"\.map\(")
+INLINE_RENDER_ITEM = re.compile(r"renderItem=\{\s*(?:async\s+)?(?:\([^()]*\)|\w+)\s*(?::\s*[^=]+?)?=>")
+NAMED_RENDER_ITEM = re.compile(r"renderItem=\{\s*(\w+)\s*\}")
+INLINE_HANDLER = re.compile(r"\bon[A-Z]\w*=\{\s*(?:async\s+)?(?:\([^()]*\)|\w+)\s*=>")
+STORE_HOOK_DEFINITION = re.compile(r"\b(use\w+)\s*=\s*create\b")
+WHOLE_STORE_CALL = re.compile(r"\b(use[A-Z]\w*)\(\s*(?:\)|\(?\s*(\w+)\s*\)?\s*=>\s*(\w+)\s*\))")
+TOP_LEVEL_CONSTANT = re.compile(r"^(?:export\s+)?const\s+(\w+)\s*(?::[^=\n]+)?=\s*[\[{]", re.MULTILINE)
+STATE_HOOK = re.compile(r"\[\s*(\w+)\s*,\s*(set\w+)\s*\]\s*=\s*(?:React\.)?useState\b")
+GET_DESTRUCTURE = re.compile(r"\{([^{}]*)\}\s*=\s*get\(\)")
+STRINGIFY = re.compile(r"JSON\.stringify\(\s*(get\(\)\.)?(\w+)")
+USE_EFFECT = re.compile(r"\buseEffect\(\s*(?:async\s*)?\(\s*\)\s*=>\s*\{")
+# Parameter list, allowing one level of nested parentheses (defaults such as new Date())
+PARAMS = r"\((?:[^()]|\([^()]*\))*\)"
+FUNCTION_PATTERNS = [
+    # const name = (args) => {   /   const name = useCallback(async (args): T => (
+    re.compile(r"\b(?:const|let|var)\s+(\w+)\s*=\s*(?:useCallback\(\s*)?(?:async\s*)?(?:%s|\w+)\s*"
+               r"(?::\s*[^=;{]+?)?=>\s*[{(]" % PARAMS),
+    # name: async (args) => {   (object literal members, e.g. zustand actions)
+    re.compile(r"\b(\w+)\s*:\s*(?:async\s*)?(?:%s|\w+)\s*(?::\s*[^=;{]+?)?=>\s*[{(]" % PARAMS),
+    # function name(args) {
+    re.compile(r"\bfunction\s+(\w+)\s*%s[^{;]*\{" % PARAMS),
+    # private async name(args): T {   (class and object methods)
+    re.compile(r"^[ \t]*(?:(?:public|private|protected|static|readonly)\s+)*(?:async\s+)?(\w+)\s*%s\s*"
+               r"(?::\s*[^{;=]+)?\{" % PARAMS, re.MULTILINE)
+]
+NOT_FUNCTIONS = {"if", "for", "while", "switch", "catch", "return", "function"}
+
+Finding = Dict[str, Any]
+
+def strip_comments(source: str) -> str:
+    """Blank out comments, keeping offsets and line numbers."""
+    return COMMENT_PATTERN.sub(lambda m: re.sub(r"[^\n]", " ", m.group(0)), source)
+
+def match_bracket(text: str, start: int) -> int:
+    """Index of the bracket closing the one at start (len(text) when unbalanced)."""
+    pairs = {"(": ")", "[": "]", "{": "}"}
+    stack = []
+    for index in range(start, len(text)):
+        char = text[index]
+        if char in pairs:
+            stack.append(pairs[char])
+        elif stack and char == stack[-1]:
+            stack.pop()
+            if not stack:
+                return index
+    return len(text)
+
+class Source:
+    """A source file with comments blanked, line lookup and function extents."""
+
+    def __init__(self, text: str, filename: str):
+        self.filename = filename
+        self.text = strip_comments(text)
+        self.line_starts = [0] + [m.end() for m in re.finditer(r"\n", text)]
+        self.suppressed: Dict[int, Set[str]] = {}
+        for match in SUPPRESS_PATTERN.finditer(text):
+            rules = set(re.split(r"[\s,]+", match.group(1).strip())) - {""}
+            self.suppressed[self.line(match.start()) + 1] = rules or set(RULES)
+        self.functions = self._find_functions()
+
+    def line(self, offset: int) -> int:
+        return bisect.bisect_right(self.line_starts, offset)
+
+    def _find_functions(self) -> List[Tuple[str, int, int]]:
+        """(name, body start, body end) for named functions, arrows and methods."""
+        functions = {}
+        for pattern in FUNCTION_PATTERNS:
+            for match in pattern.finditer(self.text):
+                name = match.group(1)
+                if name in NOT_FUNCTIONS:
+                    continue
+                body_start = match.end() - 1
+                functions.setdefault(body_start, (name, body_start, match_bracket(self.text, body_start)))
+        return sorted(functions.values(), key=lambda f: f[1])
+
+    def enclosing_function(self, offset: int) -> Optional[Tuple[str, int, int]]:
+        """Innermost function whose body contains an offset."""
+        containing = [f for f in self.functions if f[1] < offset <= f[2]]
+        return min(containing, key=lambda f: f[2] - f[1]) if containing else None
+
+    def finding(self, rule: str, offset: int, message: str) -> Optional[Finding]:
+        line = self.line(offset)
+        if rule in self.suppressed.get(line, ()):
+            return None
+        return {"rule": rule, "severity": RULES[rule], "file": self.filename, "line": line, "message": message}
+
+def map_receiver(text: str, offset: int) -> str:
+    """The expression .map() is called on, read backwards from the dot at offset."""
+    openers = {")": "(", "]": "["}
+    index = offset
+    while index > 0:
+        char = text[index - 1]
+        if char in openers:
+            depth = 0
+            for start in range(index - 1, -1, -1):
+                depth += {char: 1, openers[char]: -1}.get(text[start], 0)
+                if depth == 0:
+                    break
+            index = start
+            if char == "]" and not re.search(r"[\w$)\]]\s*$", text[:index]):
+                break
+        elif re.match(r"[\w$.?!]", char):
+            index -= 1
+        else:
+            break
+    return text[index:offset].strip()
+
+def is_bounded_receiver(receiver: str, constants: Set[str]) -> bool:
+    """Whether a .map() receiver is fixed-size: a literal, a constant, or a fixed slice."""
+    receiver = re.sub(r"\bas\s+(?:const|[\w.<>\[\]]+)", "", receiver)
+    if re.match(r"\(*\s*\[", receiver) or re.search(r"\.slice\(\s*0\s*,\s*\d+\s*\)$", receiver):
+        return True
+    roots = set(re.findall(r"(?<![\w$.])([A-Za-z_$][\w$]*)", receiver)) - {"Object", "Array"}
+    return bool(roots) and all(name in constants or re.fullmatch(r"[A-Z][A-Z0-9_]*", name) for name in roots)
+
+def _list_item_bodies(src: Source) -> List[Tuple[int, int, str]]:
+    """(start, end, kind) of JSX-producing .map() callbacks and renderItem functions."""
+    bodies = []
+    for match in MAP_CALL.finditer(src.text):
+        end = match_bracket(src.text, match.end() - 1)
+        if re.search(r"<[A-Za-z]", src.text[match.end():end]):
+            bodies.append((match.end(), end, "map"))
+    for match in INLINE_RENDER_ITEM.finditer(src.text):
+        bodies.append((match.end(), match_bracket(src.text, src.text.index("{", match.start())), "renderItem"))
+    for match in NAMED_RENDER_ITEM.finditer(src.text):
+        for name, start, end in src.functions:
+            if name == match.group(1):
+                bodies.append((start, end, "renderItem"))
+    return bodies
+
+def scrollview_spans(src: Source) -> List[Tuple[int, int, str]]:
+    """(start, end, tag) of each ScrollView element with children."""
+    events = sorted([(m.start(), 1, m) for m in SCROLLVIEW_OPEN.finditer(src.text)]
+                    + [(m.start(), -1, m) for m in SCROLLVIEW_CLOSE.finditer(src.text)], key=lambda e: e[0])
+    spans, stack = [], []
+    for offset, kind, match in events:
+        if kind == 1:
+            # The opening tag ends at the first > outside {...} props that is not part of =>
+            depth, index = 0, match.end()
+            while index < len(src.text):
+                char = src.text[index]
+                depth += {"{": 1, "}": -1}.get(char, 0)
+                if char == ">" and depth == 0 and src.text[index - 1] != "=":
+                    break
+                index += 1
+            if index < len(src.text) and src.text[index - 1] != "/":
+                stack.append((offset, match.group(1)))
+        elif stack:
+            start, tag = stack.pop()
+            spans.append((start, offset, tag))
+    return spans
+
+def check_scrollview_map(src: Source) -> List[Finding]:
+    """Data-backed .map() rendering inside a ScrollView (directly or via a render helper) mounts every row."""
+    spans = scrollview_spans(src)
+    # Render helpers called from inside a ScrollView ({renderTasks()}) render into it too
+    helpers = {}
+    for start, end, tag in spans:
+        for call in re.finditer(r"\{\s*(\w+)\(\s*\)\s*\}", src.text[start:end]):
+            helpers.setdefault(call.group(1), tag)
+    constants = set(TOP_LEVEL_CONSTANT.findall(src.text))
+
+    findings = []
+    for match in MAP_CALL.finditer(src.text):
+        tag = next((s[2] for s in spans if s[0] < match.start() < s[1]), None)
+        if not tag:
+            function = src.enclosing_function(match.start())
+            tag = helpers.get(function[0]) if function else None
+        if not tag:
+            continue
+        end = match_bracket(src.text, match.end() - 1)
+        if not re.search(r"<[A-Za-z]", src.text[match.end():end]):
+            continue
+        receiver = map_receiver(src.text, match.start())
+        if not receiver or is_bounded_receiver(receiver, constants):
+            continue
+        findings.append(src.finding(
+            "scrollview-map", match.start(),
+            f"{receiver}.map() renders a list inside <{tag}>, mounting every item at once; "
+            f"use FlatList (or FlashList) for data-backed lists"))
+    return findings
+
+def check_list_items(src: Source) -> List[Finding]:
+    """Inline renderItem functions and arrow-function props in list items (defeat row memoization)."""
+    findings = []
+    for match in INLINE_RENDER_ITEM.finditer(src.text):
+        findings.append(src.finding(
+            "inline-render-item", match.start(),
+            "renderItem is an inline arrow recreated on every render; define it with useCallback "
+            "and render a memoized row component"))
+
+    seen: Set[int] = set()
+    for start, end, kind in sorted(_list_item_bodies(src)):
+        handlers = [m for m in INLINE_HANDLER.finditer(src.text, start, end) if m.start() not in seen]
+        if not handlers:
+            continue
+        seen.update(m.start() for m in handlers)
+        lines = sorted({src.line(m.start()) for m in handlers})
+        names = sorted({m.group(0).split("=", 1)[0] for m in handlers})
+        where = "renderItem" if kind == "renderItem" else ".map() callback"
+        findings.append(src.finding(
+            "inline-handler-in-list", handlers[0].start(),
+            f"{len(handlers)} inline arrow handler(s) ({', '.join(names)}) in a {where} on line(s) "
+            f"{', '.join(map(str, lines))} create new props for every row on each render; "
+            f"pass stable callbacks (useCallback) and the item id to a memoized row"))
+    return findings
+
+def check_whole_store(src: Source, store_hooks: Optional[Set[str]] = None) -> List[Finding]:
+    """Zustand hooks called without a selector re-render on every store change."""
+    findings = []
+    for match in WHOLE_STORE_CALL.finditer(src.text):
+        hook, param, returned = match.groups()
+        if store_hooks is not None and hook not in store_hooks:
+            continue
+        if store_hooks is None and not hook.endswith("Store"):
+            continue
+        if param is not None and param != returned:
+            continue
+        if re.search(r"\bcreate\b[^;]*$", src.text[max(0, match.start() - 80):match.start()]):
+            continue
+        findings.append(src.finding(
+            "whole-store-selector", match.start(),
+            f"{hook}() subscribes to the whole store, so the component re-renders on every store change; "
+            f"select what it uses ({hook}(s => s.field), or useShallow for several fields)"))
+    return findings
+
+def check_serialize_on_mutation(src: Source) -> List[Finding]:
+    """Full state serialized with JSON.stringify on the JS thread after every mutation."""
+    state_vars: Set[str] = set()
+    setters: Set[str] = {"set"}
+    for match in STATE_HOOK.finditer(src.text):
+        state_vars.add(match.group(1))
+        setters.add(match.group(2))
+    setter_call = re.compile(r"\b(?:%s)\(" % "|".join(sorted(setters)))
+
+    # Persist functions: serialize a useState value or zustand state read through get()
+    persisted: Dict[str, str] = {}
+    for match in STRINGIFY.finditer(src.text):
+        function = src.enclosing_function(match.start())
+        if not function:
+            continue
+        body = src.text[function[1]:function[2]]
+        from_get = {n.split(":")[-1].strip() for d in GET_DESTRUCTURE.findall(body) for n in d.split(",")}
+        if match.group(1) or match.group(2) in state_vars | from_get:
+            persisted[function[0]] = match.group(2)
+
+    effects = []
+    for match in USE_EFFECT.finditer(src.text):
+        body_end = match_bracket(src.text, match.end() - 1)
+        deps = re.match(r"\s*,\s*\[([^\]]*)\]", src.text[body_end + 1:])
+        effects.append((match.start(), body_end, deps.group(1) if deps else None))
+
+    findings = []
+    reported: Set[int] = set()
+    for name, state in sorted(persisted.items()):
+        for call in re.finditer(r"(?<![\w.])(?:get\(\)\.)?%s\(" % re.escape(name), src.text):
+            effect = next((e for e in effects if e[0] < call.start() < e[1]), None)
+            if effect:
+                if effect[2] and re.search(rf"\b{re.escape(state)}\b", effect[2]) and effect[0] not in reported:
+                    reported.add(effect[0])
+                    findings.append(src.finding(
+                        "serialize-on-mutation", effect[0],
+                        f"useEffect re-serializes the full {state} state with JSON.stringify (via {name}) "
+                        f"on every change; debounce or batch persistence off the render path"))
+                continue
+            caller = src.enclosing_function(call.start())
+            if not caller or caller[0] == name or caller[1] in reported:
+                continue
+            if setter_call.search(src.text, caller[1], caller[2]):
+                reported.add(caller[1])
+                findings.append(src.finding(
+                    "serialize-on-mutation", call.start(),
+                    f"{caller[0]} serializes the full {state} state with JSON.stringify (via {name}) "
+                    f"on every mutation; debounce writes or use zustand persist with throttled storage"))
+    return findings
+
+def lint_source(text: str, filename: str, store_hooks: Optional[Set[str]] = None) -> List[Finding]:
+    """All findings for one source file."""
+    src = Source(text, filename)
+    findings = (check_scrollview_map(src) + check_list_items(src)
+                + check_whole_store(src, store_hooks) + check_serialize_on_mutation(src))
+    return sorted((f for f in findings if f), key=lambda f: (f["line"], f["rule"]))
+
+def iter_sources(build_path: Path) -> List[Path]:
+    """TS/JS sources of a build, in sorted order."""
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(build_path):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1] in SOURCE_SUFFIXES and not filename.endswith(".d.ts"):
+                sources.append(Path(dirpath) / filename)
+    return sources
+
+def at_or_above(findings: List[Finding], threshold: str) -> List[Finding]:
+    """Findings whose severity is at least threshold."""
+    minimum = SEVERITIES.index(threshold)
+    return [f for f in findings if SEVERITIES.index(f["severity"]) >= minimum]
+
+def lint_build(build_path: Path, fail_on: str = "error") -> Dict[str, Any]:
+    """Lint every source of a build; passed is False when a finding reaches fail_on."""
+    if fail_on not in SEVERITIES:
+        raise ValueError(f"Unknown severity '{fail_on}' (expected one of {', '.join(SEVERITIES)})")
+    build_path = Path(build_path)
+    texts = {p: p.read_text(encoding="utf-8", errors="replace") for p in iter_sources(build_path)}
+    store_hooks = {m.group(1) for text in texts.values() for m in STORE_HOOK_DEFINITION.finditer(text)}
+
+    findings = []
+    for path, text in texts.items():
+        findings.extend(lint_source(text, str(path.relative_to(build_path)), store_hooks))
+    counts = {severity: sum(f["severity"] == severity for f in findings) for severity in SEVERITIES}
+    return {
+        "files": len(texts),
+        "fail_on": fail_on,
+        "counts": counts,
+        "passed": not at_or_above(findings, fail_on),
+        "findings": findings
+    }
+
+def format_finding(finding: Finding) -> str:
+    return f"{finding['file']}:{finding['line']}: {finding['severity']} [{finding['rule']}] {finding['message']}"
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory render-performance linter")
+    parser.add_argument("build_path", help="Build directory containing the app sources")
+    parser.add_argument("--fail-on", choices=SEVERITIES, default="error", help="Lowest severity that fails")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+
+    args = parser.parse_args()
+
+    try:
+        result = lint_build(Path(args.build_path), args.fail_on)
+        if args.json:
+            print(dumps(result).decode())
+        else:
+            for finding in result["findings"]:
+                print(format_finding(finding))
+            counts = result["counts"]
+            status = "✓ Passed" if result["passed"] else "❌ Failed"
+            print(f"{status}: {result['files']} files, {counts['error']} errors, "
+                  f"{counts['warning']} warnings, {counts['info']} info (fail on {args.fail_on})")
+        if not result["passed"]:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -8,18 +8,18 @@ Usage:
     python -m appfactory.render_markdown <stage_num> <stage_json_path>
 """
 
-import json
 import sys
 import os
 from pathlib import Path
 from typing import Dict, Any
 import argparse
 
+from .run_archive import is_archived, read_json, restore_run
+
 def load_stage_json(json_path: str) -> Dict[Any, Any]:
     """Load and parse stage JSON file."""
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(json_path)
     except Exception as e:
         raise ValueError(f"Failed to load JSON from {json_path}: {e}")
 
@@ -213,6 +213,9 @@ def main():
             output_path = args.output
         else:
             run_dir = get_run_directory(args.json_path)
+            # Specs are written into the run, so an archived run is restored first
+            if is_archived(run_dir):
+                restore_run(run_dir)
             output_path = os.path.join(run_dir, "spec", f"{args.stage_num}_stage_{args.stage_num}.md")
         
         # Ensure output directory exists
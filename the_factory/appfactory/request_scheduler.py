@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+App Factory Model Request Scheduler
+
+Shared asyncio scheduler for model requests issued by concurrent stages.
+Requests wait in a priority queue (resume > in-progress pack > new run) and
+are released only while the global in-flight cap and the requests/min and
+tokens/min token buckets allow. Rate-limited and transient failures are
+retried with jittered exponential backoff outside of the in-flight slot, and
+a server's Retry-After pauses dispatch for every queued request, so a burst
+of 429s does not turn into a retry storm.
+
+A local HTTP stand-in server (rate limits, latency and errors are
+configurable) makes the scheduler testable without a provider.
+
+Usage:
+    python -m appfactory.request_scheduler serve [--port 8765] [--rpm 120] [--latency 0.2]
+    python -m appfactory.request_scheduler bench [--requests 50] [--rpm 600] [--in-flight 8]
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import argparse
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Lower value is served first
+PRIORITY_CLASSES = {"resume": 0, "in_progress": 1, "new_run": 2}
+
+class RetryableError(Exception):
+    """A request failure worth retrying (rate limit, overload, transient 5xx)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_minute.
+
+    Args:
+        rate_per_minute: Sustained rate
+        burst: Bucket capacity (default: one minute of rate)
+        clock: Monotonic clock, injectable for tests
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst if burst is not None else rate_per_minute
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until amount can be consumed (0 if available now)."""
+        self._refill()
+        # Requests larger than the bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Take amount from the bucket (call after time_until returned 0)."""
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+class RequestScheduler:
+    """
+    Priority, rate-limited and retrying executor for model requests.
+
+    Args:
+        requests_per_minute: Request rate limit (None for unlimited)
+        tokens_per_minute: Token rate limit (None for unlimited)
+        max_in_flight: Global cap on concurrent requests
+        max_attempts: Attempts per request before the error is raised
+        base_delay: First backoff delay in seconds
+        max_delay: Backoff ceiling in seconds
+        seed: Seed for backoff jitter
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_in_flight: int = 8,
+                 max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 request_burst: Optional[float] = None, token_burst: Optional[float] = None,
+                 seed: Optional[int] = None):
+        self.request_bucket = TokenBucket(requests_per_minute, request_burst) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute, token_burst) if tokens_per_minute else None
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = random.Random(seed)
+        self._queue: List[List[Any]] = []
+        self._sequence = itertools.count()
+        self._condition: Optional[asyncio.Condition] = None
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._metrics = {
+            "submitted": 0, "completed": 0, "failed": 0, "retries": 0,
+            "max_queue_depth": 0, "max_in_flight": 0,
+            "wait_seconds": {name: [] for name in PRIORITY_CLASSES}
+        }
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so the scheduler binds to the loop that uses it
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than a server's Retry-After."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = self._rng.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _rate_delay(self, tokens: int) -> float:
+        delays = [self._paused_until - time.monotonic(), 0.0]
+        if self.request_bucket:
+            delays.append(self.request_bucket.time_until(1))
+        if self.token_bucket:
+            delays.append(self.token_bucket.time_until(tokens))
+        return max(delays)
+
+    async def _acquire(self, priority: str, tokens: int) -> None:
+        condition = self._get_condition()
+        entry = [PRIORITY_CLASSES[priority], next(self._sequence)]
+        enqueued_at = time.monotonic()
+
+        async with condition:
+            heapq.heappush(self._queue, entry)
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], len(self._queue))
+            acquired = False
+            try:
+                while True:
+                    if self._queue[0] is not entry or self.in_flight >= self.max_in_flight:
+                        await condition.wait()
+                        continue
+
+                    delay = self._rate_delay(tokens)
+                    if delay > 0:
+                        # Wake early if a higher-priority request arrives meanwhile
+                        try:
+                            await asyncio.wait_for(condition.wait(), delay)
+                        except asyncio.TimeoutError:
+                            pass
+                        continue
+
+                    heapq.heappop(self._queue)
+                    acquired = True
+                    if self.request_bucket:
+                        self.request_bucket.consume(1)
+                    if self.token_bucket:
+                        self.token_bucket.consume(tokens)
+                    self.in_flight += 1
+                    self._metrics["max_in_flight"] = max(self._metrics["max_in_flight"], self.in_flight)
+                    self._metrics["wait_seconds"][priority].append(time.monotonic() - enqueued_at)
+                    condition.notify_all()
+                    return
+            finally:
+                if not acquired:
+                    # Cancelled while waiting (e.g. an outer wait_for timeout): leave the queue
+                    # so the requests behind this one are not blocked forever
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    condition.notify_all()
+
+    async def _release(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    async def submit(self, call: Callable[[], Awaitable[Any]], priority: str = "new_run",
+                     tokens: int = 0) -> Any:
+        """
+        Run call() under the scheduler and return its result.
+
+        tokens is the request's estimated token cost, charged to the
+        tokens/min bucket. RetryableError is retried with backoff; any other
+        exception is raised immediately.
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        self._metrics["submitted"] += 1
+
+        for attempt in range(1, self.max_attempts + 1):
+            await self._acquire(priority, tokens)
+            try:
+                result = await call()
+            except RetryableError as e:
+                if attempt == self.max_attempts:
+                    self._metrics["failed"] += 1
+                    raise
+                self._metrics["retries"] += 1
+                delay = self.backoff_delay(attempt, e.retry_after)
+                if e.retry_after is not None:
+                    # The provider is saturated: hold back everyone, not just this request
+                    self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+            except Exception:
+                self._metrics["failed"] += 1
+                raise
+            else:
+                self._metrics["completed"] += 1
+                return result
+            finally:
+                await self._release()
+
+            # Back off without holding an in-flight slot
+            await asyncio.sleep(delay)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Current number of queued requests per priority class."""
+        names = {value: name for name, value in PRIORITY_CLASSES.items()}
+        depth = {name: 0 for name in PRIORITY_CLASSES}
+        for entry in self._queue:
+            depth[names[entry[0]]] += 1
+        return depth
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, in-flight and wait-time metrics."""
+        waits = {}
+        for name, values in self._metrics["wait_seconds"].items():
+            ordered = sorted(values)
+            waits[name] = {
+                "count": len(ordered),
+                "mean_s": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+                "p95_s": round(ordered[int(0.95 * (len(ordered) - 1))], 4) if ordered else 0.0,
+                "max_s": round(ordered[-1], 4) if ordered else 0.0
+            }
+        return {
+            "queue_depth": self.queue_depth(),
+            "in_flight": self.in_flight,
+            "max_queue_depth": self._metrics["max_queue_depth"],
+            "max_in_flight": self._metrics["max_in_flight"],
+            "submitted": self._metrics["submitted"],
+            "completed": self._metrics["completed"],
+            "failed": self._metrics["failed"],
+            "retries": self._metrics["retries"],
+            "wait": waits
+        }
+
+async def post_json(url: str, payload: Dict[str, Any], timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    POST a JSON payload and return the JSON response.
+
+    429 and 5xx responses raise RetryableError (honoring Retry-After).
+    """
+    def send():
+        request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 429 or e.code >= 500:
+                retry_after = e.headers.get("Retry-After")
+                raise RetryableError(f"HTTP {e.code} from {url}",
+                                     float(retry_after) if retry_after else None)
+            raise
+        except urllib.error.URLError as e:
+            raise RetryableError(f"Connection failed: {e.reason}")
+
+    return await asyncio.get_running_loop().run_in_executor(None, send)
+
+class StandInServer:
+    """
+    Local HTTP stand-in for a model provider.
+
+    POST any path returns {"id", "echo", "usage"} after the configured latency;
+    beyond requests_per_minute it answers 429 with Retry-After, and
+    error_rate of requests fail with 500.
+    """
+
+    def __init__(self, port: int = 0, requests_per_minute: Optional[float] = None,
+                 latency: float = 0.0, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute
+        self.latency = latency
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "rate_limited": 0, "errors": 0, "max_concurrent": 0}
+        self._concurrent = 0
+        self._bucket = TokenBucket(requests_per_minute, 1) if requests_per_minute else None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/messages"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, code: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server._lock:
+                    server.stats["requests"] += 1
+                    wait = server._bucket.time_until(1) if server._bucket else 0.0
+                    if server._bucket and wait == 0:
+                        server._bucket.consume(1)
+                    fail = server.error_rate > 0 and server._rng.random() < server.error_rate
+                    if wait > 0:
+                        server.stats["rate_limited"] += 1
+                    elif fail:
+                        server.stats["errors"] += 1
+                    else:
+                        server._concurrent += 1
+                        server.stats["max_concurrent"] = max(server.stats["max_concurrent"], server._concurrent)
+
+                if wait > 0:
+                    return self._reply(429, {"error": "rate_limited"}, {"Retry-After": f"{wait:.3f}"})
+                if fail:
+                    return self._reply(500, {"error": "overloaded"})
+
+                time.sleep(server.latency)
+                with server._lock:
+                    server._concurrent -= 1
+                    request_id = server.stats["requests"]
+                self._reply(200, {"id": request_id, "echo": payload,
+                                  "usage": {"input_tokens": len(json.dumps(payload)) // 4}})
+
+        return Handler
+
+    def start(self) -> "StandInServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+async def run_bench(scheduler: RequestScheduler, url: str, requests: int,
+                    tokens: int = 500) -> Dict[str, Any]:
+    """Submit a mix of priority classes against url and return scheduler metrics."""
+    names = list(PRIORITY_CLASSES)
+
+    async def one(i: int):
+        priority = names[i % len(names)]
+        return await scheduler.submit(
+            lambda: post_json(url, {"request": i, "priority": priority}),
+            priority=priority, tokens=tokens
+        )
+
+    started = time.monotonic()
+    results = await asyncio.gather(*(one(i) for i in range(requests)), return_exceptions=True)
+    metrics = scheduler.metrics()
+    metrics["wall_seconds"] = round(time.monotonic() - started, 3)
+    metrics["errors"] = [str(r) for r in results if isinstance(r, Exception)][:5]
+    return metrics
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory model request scheduler")
+    parser.add_argument("command", choices=["serve", "bench"], help="Command to execute")
+    parser.add_argument("--port", type=int, default=8765, help="Stand-in server port (serve)")
+    parser.add_argument("--requests", type=int, default=50, help="Requests to submit (bench)")
+    parser.add_argument("--rpm", type=float, default=600, help="Scheduler requests/min limit")
+    parser.add_argument("--tpm", type=float, help="Scheduler tokens/min limit")
+    parser.add_argument("--in-flight", type=int, default=8, help="Scheduler in-flight cap")
+    parser.add_argument("--server-rpm", type=float, help="Stand-in server requests/min before 429")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stand-in 500 rate")
+    parser.add_argument("--seed", type=int, help="Random seed")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "serve":
+            server = StandInServer(args.port, args.server_rpm, args.latency, args.error_rate, args.seed)
+            print(f"Stand-in model server listening on {server.url}")
+            try:
+                server._server.serve_forever()
+            except KeyboardInterrupt:
+                server.stop()
+
+        elif args.command == "bench":
+            with StandInServer(0, args.server_rpm, args.latency, args.error_rate, args.seed) as server:
+                scheduler = RequestScheduler(args.rpm, args.tpm, args.in_flight,
+                                             base_delay=0.05, max_delay=2.0, seed=args.seed)
+                metrics = asyncio.run(run_bench(scheduler, server.url, args.requests))
+                metrics["server"] = server.stats
+            print(json.dumps(metrics, indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
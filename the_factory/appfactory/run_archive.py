@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+App Factory Run Archive
+
+Packs cold runs into one LZMA-compressed zip per date under
+runs/.archive/<date>.zip, with a central index (runs/.archive/index.json)
+mapping each archived run to its pack. Zip members are individually
+compressed, so single files are read without unpacking the pack.
+
+Readers go through read_bytes/read_json/exists/listdir, which look on disk
+first and fall back to the archive. Code that needs a real directory uses
+materialize_run (unpacks into runs/.archive/unpacked/ on demand) and code
+that writes into a run uses restore_run (puts it back under runs/).
+
+Usage:
+    python -m appfactory.run_archive archive [--days N] [--dry-run]
+    python -m appfactory.run_archive list
+    python -m appfactory.run_archive cat <path>
+    python -m appfactory.run_archive restore <run_path>
+"""
+
+import os
+import shutil
+import sys
+import threading
+import zipfile
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from .jsonio import loads, read_json as read_json_file, write_json
+
+ARCHIVE_DIRNAME = ".archive"
+INDEX_FILENAME = "index.json"
+UNPACKED_DIRNAME = "unpacked"
+DEFAULT_ARCHIVE_DAYS = 30
+
+# Per-process caches: parsed index per runs dir and open zip handles per pack
+_index_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+_zip_cache: Dict[str, Tuple[int, zipfile.ZipFile]] = {}
+_zip_lock = threading.Lock()
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_archive_dir(runs_dir: Union[str, Path]) -> str:
+    """Directory holding the date packs and the central index."""
+    return os.path.join(str(runs_dir), ARCHIVE_DIRNAME)
+
+def load_archive_index(runs_dir: Union[str, Path]) -> Dict[str, Any]:
+    """Load the central archive index, cached until the file changes."""
+    index_path = os.path.join(get_archive_dir(runs_dir), INDEX_FILENAME)
+    try:
+        stamp = os.stat(index_path).st_mtime_ns
+    except FileNotFoundError:
+        return {"packs": {}}
+
+    cached = _index_cache.get(index_path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    index = read_json_file(index_path)
+    _index_cache[index_path] = (stamp, index)
+    return index
+
+def save_archive_index(runs_dir: Union[str, Path], index: Dict[str, Any]) -> None:
+    """Atomically write the central archive index."""
+    os.makedirs(get_archive_dir(runs_dir), exist_ok=True)
+    write_json(os.path.join(get_archive_dir(runs_dir), INDEX_FILENAME), index)
+
+def _open_pack(pack_path: str) -> zipfile.ZipFile:
+    stamp = os.stat(pack_path).st_mtime_ns
+    with _zip_lock:
+        cached = _zip_cache.get(pack_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        if cached:
+            cached[1].close()
+        archive = zipfile.ZipFile(pack_path)
+        _zip_cache[pack_path] = (stamp, archive)
+        return archive
+
+def _close_pack(pack_path: str) -> None:
+    with _zip_lock:
+        cached = _zip_cache.pop(pack_path, None)
+        if cached:
+            cached[1].close()
+
+def locate(path: Union[str, Path]) -> Optional[Tuple[str, str, str]]:
+    """
+    Find where an archived run path lives.
+
+    Returns (runs_dir, pack_path, member) for paths of the form
+    <runs_dir>/<date>/<run>/..., or None when the run is not archived.
+    member is relative to the pack ("<run>/<rest>", or "<run>" for the run itself).
+    """
+    parts = Path(os.path.abspath(str(path))).parts
+    for i in range(len(parts) - 2, 0, -1):
+        runs_dir = str(Path(*parts[:i]))
+        if not os.path.isdir(get_archive_dir(runs_dir)):
+            continue
+        date, rest = parts[i], parts[i + 1:]
+        pack = load_archive_index(runs_dir)["packs"].get(date)
+        if pack and rest and rest[0] in pack["runs"]:
+            return runs_dir, os.path.join(get_archive_dir(runs_dir), pack["file"]), "/".join(rest)
+    return None
+
+def is_archived(path: Union[str, Path]) -> bool:
+    """True if the path is inside an archived run that is not on disk."""
+    return not os.path.exists(path) and locate(path) is not None
+
+def read_bytes(path: Union[str, Path]) -> bytes:
+    """Read a file from disk, falling back to the run archive."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        found = locate(path)
+        if found is None:
+            raise
+        try:
+            return _open_pack(found[1]).read(found[2])
+        except KeyError:
+            raise FileNotFoundError(f"File not found: {path}")
+
+def read_json(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file from disk or the run archive."""
+    return loads(read_bytes(path))
+
+def read_text(path: Union[str, Path]) -> str:
+    """Read a UTF-8 text file from disk or the run archive."""
+    return read_bytes(path).decode("utf-8")
+
+def exists(path: Union[str, Path]) -> bool:
+    """os.path.exists that also sees files and directories inside archived runs."""
+    if os.path.exists(path):
+        return True
+    found = locate(path)
+    if found is None:
+        return False
+    names = _open_pack(found[1]).namelist()
+    return found[2] in names or any(name.startswith(found[2] + "/") for name in names)
+
+def listdir(path: Union[str, Path]) -> List[str]:
+    """os.listdir that also lists directories inside archived runs."""
+    if os.path.isdir(path):
+        return os.listdir(path)
+    found = locate(path)
+    if found is None:
+        raise FileNotFoundError(f"Directory not found: {path}")
+    prefix = found[2] + "/"
+    names = _open_pack(found[1]).namelist()
+    entries = {name[len(prefix):].split("/", 1)[0] for name in names if name.startswith(prefix)} - {""}
+    if not entries and prefix not in names:
+        raise FileNotFoundError(f"Directory not found: {path}")
+    return sorted(entries)
+
+def list_archived_runs(runs_dir: Union[str, Path]) -> Dict[str, str]:
+    """Map run id -> (virtual) run path for every archived run."""
+    runs = {}
+    for date, pack in load_archive_index(runs_dir)["packs"].items():
+        for run in pack["runs"]:
+            runs[run] = os.path.join(str(runs_dir), date, run)
+    return runs
+
+def iter_archived_files(runs_dir: Union[str, Path]) -> List[str]:
+    """(Virtual) paths of every file inside archived runs that are not on disk."""
+    paths = []
+    for date, pack in sorted(load_archive_index(runs_dir)["packs"].items()):
+        pack_path = os.path.join(get_archive_dir(runs_dir), pack["file"])
+        for name in _open_pack(pack_path).namelist():
+            path = os.path.join(str(runs_dir), date, *name.split("/"))
+            if not name.endswith("/") and not os.path.exists(os.path.join(str(runs_dir), date, name.split("/")[0])):
+                paths.append(path)
+    return paths
+
+def _extract_run(pack_path: str, run: str, dest: str) -> None:
+    archive = _open_pack(pack_path)
+    for info in archive.infolist():
+        if not info.filename.startswith(run + "/"):
+            continue
+        target = os.path.join(dest, *info.filename[len(run) + 1:].split("/"))
+        if info.is_dir():
+            os.makedirs(target, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(archive.read(info))
+
+def materialize_run(path: Union[str, Path]) -> str:
+    """
+    Return a real path for a run or a path inside it.
+
+    Paths on disk are returned unchanged; archived runs are unpacked into
+    runs/.archive/unpacked/<date>/<run> (once per pack version) for tools
+    that need real paths. The unpacked copy is read-only scratch.
+    """
+    path = str(path)
+    if os.path.exists(path):
+        return path
+    found = locate(path)
+    if found is None:
+        return path
+
+    runs_dir, pack_path, member = found
+    run = member.split("/", 1)[0]
+    date = Path(os.path.abspath(path)).parts[len(Path(runs_dir).parts)]
+    dest = os.path.join(get_archive_dir(runs_dir), UNPACKED_DIRNAME, date, run)
+    stamp_path = os.path.join(dest, ".unpacked")
+    stamp = str(os.stat(pack_path).st_mtime_ns)
+
+    if not (os.path.exists(stamp_path) and Path(stamp_path).read_text() == stamp):
+        shutil.rmtree(dest, ignore_errors=True)
+        _extract_run(pack_path, run, dest)
+        Path(stamp_path).write_text(stamp)
+    return os.path.join(dest, *member.split("/")[1:])
+
+def restore_run(run_path: Union[str, Path]) -> str:
+    """
+    Put an archived run back under runs/ so it can be written to.
+
+    Accepts the run or any path inside it and returns the restored run
+    directory. The run stays listed in its pack; files on disk take
+    precedence and the next archive pass re-packs the run from disk.
+    """
+    found = locate(run_path)
+    if found is None:
+        if os.path.exists(run_path):
+            return str(run_path)
+        raise FileNotFoundError(f"Run not found on disk or in archive: {run_path}")
+
+    runs_dir, pack_path, member = found
+    run = member.split("/", 1)[0]
+    parts = Path(os.path.abspath(str(run_path))).parts
+    date = parts[len(Path(runs_dir).parts)]
+    dest = os.path.join(runs_dir, date, run)
+    if not os.path.isdir(dest):
+        _extract_run(pack_path, run, dest)
+    return dest
+
+def find_cold_dates(runs_dir: Union[str, Path], days: int, today: Optional[datetime] = None) -> List[str]:
+    """Date directories (YYYY-MM-DD) older than the given number of days."""
+    cutoff = ((today or datetime.now()) - timedelta(days=days)).strftime("%Y-%m-%d")
+    dates = []
+    for name in sorted(os.listdir(runs_dir)):
+        if not os.path.isdir(os.path.join(str(runs_dir), name)):
+            continue
+        try:
+            datetime.strptime(name, "%Y-%m-%d")
+        except ValueError:
+            continue
+        if name < cutoff:
+            dates.append(name)
+    return dates
+
+def archive_date(runs_dir: Union[str, Path], date: str) -> Dict[str, Any]:
+    """
+    Pack every run of one date into runs/.archive/<date>.zip and remove them from disk.
+
+    Runs already in an existing pack are carried over unless a newer copy is
+    on disk. The pack is written to a temp file and renamed into place before
+    the index is updated and run directories are removed.
+    """
+    from .usage_ledger import USAGE_FILENAME, materialize_usage_summary
+
+    runs_dir = str(runs_dir)
+    archive_dir = get_archive_dir(runs_dir)
+    os.makedirs(archive_dir, exist_ok=True)
+    date_dir = os.path.join(runs_dir, date)
+    pack_file = f"{date}.zip"
+    pack_path = os.path.join(archive_dir, pack_file)
+
+    index = load_archive_index(runs_dir)
+    index = {"packs": dict(index.get("packs", {}))}
+    entry = {"file": pack_file, "runs": dict(index["packs"].get(date, {}).get("runs", {}))}
+    disk_runs = sorted(name for name in os.listdir(date_dir) if os.path.isdir(os.path.join(date_dir, name))) \
+        if os.path.isdir(date_dir) else []
+
+    tmp_path = f"{pack_path}.tmp.{os.getpid()}"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_LZMA) as out:
+        if os.path.exists(pack_path):
+            previous = _open_pack(pack_path)
+            for info in previous.infolist():
+                if info.filename.split("/", 1)[0] not in disk_runs:
+                    out.writestr(info, previous.read(info))
+        for run in disk_runs:
+            # Freeze the usage rollup so reports can read it straight from the pack
+            if os.path.exists(os.path.join(date_dir, run, "meta", USAGE_FILENAME)):
+                materialize_usage_summary(os.path.join(date_dir, run))
+            files = 0
+            size = 0
+            run_dir = os.path.join(date_dir, run)
+            for dirpath, dirnames, filenames in os.walk(run_dir):
+                dirnames.sort()
+                if not dirnames and not filenames:
+                    # Keep empty directories: they are part of the run layout
+                    out.writestr(run + "/" + os.path.relpath(dirpath, run_dir).replace(os.sep, "/") + "/", b"")
+                for filename in sorted(filenames):
+                    path = os.path.join(dirpath, filename)
+                    out.write(path, run + "/" + os.path.relpath(path, run_dir).replace(os.sep, "/"))
+                    files += 1
+                    size += os.path.getsize(path)
+            entry["runs"][run] = {"files": files, "bytes": size}
+
+    _close_pack(pack_path)
+    os.replace(tmp_path, pack_path)
+    entry["compressed_bytes"] = os.path.getsize(pack_path)
+    entry["archived_at"] = datetime.now().isoformat()
+    index["packs"][date] = entry
+    save_archive_index(runs_dir, index)
+
+    for run in disk_runs:
+        shutil.rmtree(os.path.join(date_dir, run))
+    if os.path.isdir(date_dir) and not os.listdir(date_dir):
+        os.rmdir(date_dir)
+
+    return {"date": date, "runs": disk_runs, "files": sum(r["files"] for r in entry["runs"].values()),
+            "bytes": sum(r["bytes"] for r in entry["runs"].values()),
+            "compressed_bytes": entry["compressed_bytes"]}
+
+def archive_runs(runs_dir: Optional[str] = None, days: int = DEFAULT_ARCHIVE_DAYS,
+                 dry_run: bool = False, today: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Archive every date directory older than the given number of days."""
+    runs_dir = runs_dir or str(get_repo_root() / "runs")
+    dates = find_cold_dates(runs_dir, days, today)
+    if dry_run:
+        return [{"date": date, "runs": sorted(os.listdir(os.path.join(runs_dir, date)))} for date in dates]
+    return [archive_date(runs_dir, date) for date in dates]
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory run archive")
+    parser.add_argument("command", choices=["archive", "list", "cat", "restore"], help="Command to execute")
+    parser.add_argument("path", nargs="?", help="File or run path for cat/restore")
+    parser.add_argument("--runs-dir", help="Runs directory (default: repo runs/)")
+    parser.add_argument("--days", type=int, default=DEFAULT_ARCHIVE_DAYS,
+                        help=f"Archive runs older than this many days (default: {DEFAULT_ARCHIVE_DAYS})")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be archived")
+
+    args = parser.parse_args()
+    runs_dir = args.runs_dir or str(get_repo_root() / "runs")
+
+    try:
+        if args.command == "archive":
+            results = archive_runs(runs_dir, args.days, args.dry_run)
+            if not results:
+                print(f"No runs older than {args.days} days")
+            for result in results:
+                if args.dry_run:
+                    print(f"Would archive {result['date']}: {len(result['runs'])} runs")
+                else:
+                    print(f"✓ Archived {result['date']}: {len(result['runs'])} runs, {result['files']} files, "
+                          f"{result['bytes']} -> {result['compressed_bytes']} bytes")
+
+        elif args.command == "list":
+            for date, pack in sorted(load_archive_index(runs_dir)["packs"].items()):
+                size = sum(r["bytes"] for r in pack["runs"].values())
+                print(f"{date}: {len(pack['runs'])} runs, {size} -> {pack['compressed_bytes']} bytes ({pack['file']})")
+
+        elif args.command in ["cat", "restore"]:
+            if not args.path:
+                print(f"Error: path required for {args.command}", file=sys.stderr)
+                sys.exit(1)
+            if args.command == "cat":
+                sys.stdout.write(read_text(args.path))
+            else:
+                print(f"✓ Restored {restore_run(args.path)}")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+App Factory Run Tree Check (fsck)
+
+Checks every run and idea pack under runs/ in parallel and prints one
+consolidated report. Each run is checked against its layout (classic,
+batch or dream, see paths.detect_run_layout):
+
+- required directories (validate_run_structure)
+- JSON parseability of meta/, stage and outputs/ files
+- schema conformance of stage outputs
+- idea_index.json directories and boundary.json paths exist
+- stage status agrees with the stage outputs on disk
+
+With --repair, safe fixes are applied: missing directories are created and
+stages whose output exists but is not marked completed are recorded as
+completed in the event log.
+
+Usage:
+    python -m appfactory.run_fsck [runs_dir] [--repair] [--workers N] [--json] [--output FILE]
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .batch_executor import load_boundary
+from .jsonio import dumps, read_json, write_json
+from .logging_utils import COMPLETED_LIST_KEYS
+from .paths import RUN_LAYOUTS, STAGE_DIRS, detect_run_layout, validate_run_structure
+from .schema_validate import extract_schema_from_template, get_stage_template_path, validate_json_against_schema
+from .stage_events import append_event, materialize_stage_status
+
+# Directories whose JSON files are checked (app source trees are left alone)
+JSON_DIRS = ["meta", "stages", "outputs"]
+PACK_REQUIRED_DIRS = ["meta"]
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+@lru_cache(maxsize=None)
+def _load_schema(stage_num: str) -> Optional[Dict[str, Any]]:
+    # The example-shaped schema of the stage template, as `schema_validate --stage` uses;
+    # schemas/*.json are JSON Schema documents that validate_json_against_schema cannot read
+    try:
+        return extract_schema_from_template(get_stage_template_path(stage_num))
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _issue(issues: List[Dict[str, Any]], path: str, severity: str, check: str, message: str) -> None:
+    issues.append({"path": path, "severity": severity, "check": check, "message": message})
+
+def check_json_files(root: str, dirs: List[str], issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parse every JSON file in the given subdirectories; returns stage outputs by stage id."""
+    stage_outputs = {}
+    for subdir in dirs:
+        directory = os.path.join(root, subdir)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                data = read_json(path)
+            except ValueError as e:
+                _issue(issues, path, "error", "json", f"Invalid JSON: {e}")
+                continue
+            if filename.startswith("stage") and os.path.basename(directory) == "stages":
+                stage_outputs[filename[len("stage"):-len(".json")]] = (path, data)
+    return stage_outputs
+
+def check_schemas(stage_outputs: Dict[str, Any], issues: List[Dict[str, Any]]) -> None:
+    """Validate stage outputs against their schemas."""
+    for stage_num, (path, data) in sorted(stage_outputs.items()):
+        schema = _load_schema(stage_num)
+        if schema is None:
+            continue
+        valid, errors = validate_json_against_schema(data, schema)
+        if not valid:
+            more = f" (+{len(errors) - 3} more)" if len(errors) > 3 else ""
+            _issue(issues, path, "error", "schema", "; ".join(errors[:3]) + more)
+
+def check_status(path: str, stage_outputs: Dict[str, Any], shared_stages: List[str],
+                 issues: List[Dict[str, Any]], repair: bool) -> List[str]:
+    """
+    Compare stage status with outputs on disk.
+
+    shared_stages are completed outside this scope (run-level stage01 for
+    idea packs) and are not expected among its outputs. Returns repairs made.
+    """
+    if not os.path.exists(os.path.join(path, "meta", "stage_status.json")):
+        return []
+    try:
+        view = materialize_stage_status(path, write=False)
+    except ValueError as e:
+        _issue(issues, path, "error", "status", f"Unreadable stage status: {e}")
+        return []
+
+    completed = {stage for stage, info in view.get("stages", {}).items()
+                 if isinstance(info, dict) and info.get("status") == "completed"}
+    for key in COMPLETED_LIST_KEYS:
+        completed.update(s for s in view.get(key) or [] if isinstance(s, str))
+
+    repairs = []
+    for stage_num in sorted(completed - set(stage_outputs) - set(shared_stages)):
+        _issue(issues, path, "warning", "status", f"Stage {stage_num} marked completed but has no output")
+
+    for stage_num in sorted(set(stage_outputs) - completed):
+        if repair:
+            append_event(path, stage_num, "completed", [stage_outputs[stage_num][0]], source="fsck")
+            repairs.append(f"Marked stage {stage_num} completed")
+        else:
+            _issue(issues, path, "warning", "status", f"Stage {stage_num} has output but is not marked completed")
+
+    if repairs:
+        materialize_stage_status(path)
+    return repairs
+
+def fsck_run(run_path: str, repair: bool = False) -> Dict[str, Any]:
+    """Check the run-level part of a run (its idea packs are checked separately)."""
+    issues: List[Dict[str, Any]] = []
+    repairs: List[str] = []
+
+    structure = validate_run_structure(run_path)
+    layout = structure["layout"]
+    for subdir in RUN_LAYOUTS[layout]:
+        if not structure["structure"].get(subdir):
+            if repair:
+                os.makedirs(os.path.join(run_path, subdir), exist_ok=True)
+                repairs.append(f"Created {subdir}/")
+            else:
+                _issue(issues, run_path, "error", "structure", f"Missing required directory: {subdir}")
+    for warning in structure["warnings"]:
+        _issue(issues, run_path, "warning", "structure", warning)
+
+    stage_outputs = check_json_files(run_path, ["meta", "outputs", STAGE_DIRS[layout]], issues)
+    check_schemas(stage_outputs, issues)
+
+    index_path = os.path.join(run_path, "meta", "idea_index.json")
+    if os.path.exists(index_path):
+        try:
+            ideas = read_json(index_path).get("ideas", [])
+        except (ValueError, AttributeError):
+            ideas = []
+        # Indexes list ideas either as an array or keyed by idea id
+        for idea in ideas.values() if isinstance(ideas, dict) else ideas:
+            if not isinstance(idea, dict):
+                continue
+            directory = idea.get("directory") or idea.get("idea_dir")
+            if directory and not os.path.isdir(os.path.join(run_path, "ideas", directory)):
+                _issue(issues, index_path, "error", "reference",
+                       f"idea_index.json lists missing idea pack: {directory}")
+
+    repairs += check_status(run_path, stage_outputs, [], issues, repair)
+    return {"path": run_path, "kind": "run", "layout": layout, "issues": issues, "repairs": repairs}
+
+def fsck_pack(pack_path: str, repair: bool = False) -> Dict[str, Any]:
+    """Check one idea pack: structure, JSON, schemas, boundary references and status."""
+    issues: List[Dict[str, Any]] = []
+    repairs: List[str] = []
+
+    for subdir in PACK_REQUIRED_DIRS:
+        if not os.path.isdir(os.path.join(pack_path, subdir)):
+            if repair:
+                os.makedirs(os.path.join(pack_path, subdir), exist_ok=True)
+                repairs.append(f"Created {subdir}/")
+            else:
+                _issue(issues, pack_path, "error", "structure", f"Missing required directory: {subdir}")
+
+    stage_outputs = check_json_files(pack_path, JSON_DIRS, issues)
+    check_schemas(stage_outputs, issues)
+
+    if os.path.exists(os.path.join(pack_path, "meta", "boundary.json")):
+        try:
+            boundary = load_boundary(pack_path)
+        except ValueError:
+            boundary = {"allowed": []}
+        for allowed in boundary["allowed"]:
+            if not os.path.exists(allowed):
+                _issue(issues, os.path.join(pack_path, "meta", "boundary.json"), "error", "reference",
+                       f"boundary.json references missing path: {allowed}")
+
+    run_path = os.path.dirname(os.path.dirname(os.path.abspath(pack_path)))
+    shared = ["01", "01_dream"] if detect_run_layout(run_path) != "classic" else []
+    repairs += check_status(pack_path, stage_outputs, shared, issues, repair)
+    return {"path": pack_path, "kind": "pack", "issues": issues, "repairs": repairs}
+
+def _fsck_unit(unit: Tuple[str, str, bool]) -> Dict[str, Any]:
+    kind, path, repair = unit
+    started = time.perf_counter()
+    try:
+        result = fsck_run(path, repair) if kind == "run" else fsck_pack(path, repair)
+    except Exception as e:
+        result = {"path": path, "kind": kind, "repairs": [],
+                  "issues": [{"path": path, "severity": "error", "check": "fsck", "message": str(e)}]}
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+def list_fsck_units(runs_dir: str) -> List[Tuple[str, str]]:
+    """Every run (runs/<date>/<run>) and idea pack (<run>/ideas/<pack>) to check."""
+    units = []
+    for date_dir in sorted(Path(runs_dir).iterdir()):
+        if not date_dir.is_dir() or date_dir.name.startswith("."):
+            continue
+        for run_dir in sorted(date_dir.iterdir()):
+            if not run_dir.is_dir():
+                continue
+            units.append(("run", str(run_dir)))
+            ideas_dir = run_dir / "ideas"
+            if ideas_dir.is_dir():
+                units.extend(("pack", str(p)) for p in sorted(ideas_dir.iterdir()) if p.is_dir())
+    return units
+
+def fsck_runs(runs_dir: Optional[str] = None, repair: bool = False,
+              workers: Optional[int] = None) -> Dict[str, Any]:
+    """Check all runs and idea packs in parallel and consolidate the results."""
+    runs_dir = runs_dir or str(get_repo_root() / "runs")
+    started = time.perf_counter()
+    units = [(kind, path, repair) for kind, path in list_fsck_units(runs_dir)]
+
+    if workers == 1:
+        results = [_fsck_unit(unit) for unit in units]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fsck_unit, units, chunksize=8))
+
+    issues = [issue for result in results for issue in result["issues"]]
+    return {
+        "runs_dir": runs_dir,
+        "runs": sum(1 for r in results if r["kind"] == "run"),
+        "packs": sum(1 for r in results if r["kind"] == "pack"),
+        "layouts": {layout: sum(1 for r in results if r.get("layout") == layout) for layout in RUN_LAYOUTS},
+        "errors": sum(1 for i in issues if i["severity"] == "error"),
+        "warnings": sum(1 for i in issues if i["severity"] == "warning"),
+        "repairs": {r["path"]: r["repairs"] for r in results if r["repairs"]},
+        "issues": issues,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+def format_fsck_report(report: Dict[str, Any]) -> str:
+    """Format an fsck report for the terminal."""
+    root = os.path.dirname(os.path.abspath(report["runs_dir"]))
+    lines = []
+    for issue in report["issues"]:
+        marker = "✗" if issue["severity"] == "error" else "!"
+        lines.append(f"{marker} [{issue['check']}] {os.path.relpath(issue['path'], root)}: {issue['message']}")
+    for path, repairs in report["repairs"].items():
+        for repair in repairs:
+            lines.append(f"✓ [repair] {os.path.relpath(path, root)}: {repair}")
+
+    layouts = ", ".join(f"{count} {layout}" for layout, count in report["layouts"].items() if count)
+    lines.append("")
+    lines.append(f"Checked {report['runs']} runs ({layouts}) and {report['packs']} idea packs "
+                 f"in {report['seconds']}s: {report['errors']} errors, {report['warnings']} warnings, "
+                 f"{sum(len(r) for r in report['repairs'].values())} repairs")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory run tree check")
+    parser.add_argument("runs_dir", nargs="?", help="Runs directory (default: repo runs/)")
+    parser.add_argument("--repair", action="store_true", help="Apply safe repairs")
+    parser.add_argument("--workers", type=int, help="Parallel worker processes")
+    parser.add_argument("--json", action="store_true", help="Print JSON report")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    args = parser.parse_args()
+
+    try:
+        report = fsck_runs(args.runs_dir, args.repair, args.workers)
+        if args.output:
+            write_json(args.output, report)
+        print(dumps(report).decode("utf-8") if args.json else format_fsck_report(report))
+        if report["errors"]:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+App Factory Run Manifest (Merkle tree)
+
+Each run keeps a Merkle tree of its files in meta/merkle.json: every file
+node holds its sha256, every directory node the hash of its sorted
+children. The root hash changes iff some file in the run changed, and the
+hash of ideas/<pack> is the root of that idea pack, so comparing two roots
+is O(1) and a diff only descends into subtrees whose hashes differ.
+
+Files written through jsonio.write_json are appended to meta/merkle.jsonl
+(one O_APPEND line per write, like the stage event log); merkle.json is a
+materialized view that folds in the journal tail when read. Logs grown
+through jsonio.append_jsonl are only marked as appended (once per manifest
+version) and hashed when the tail is folded, so appends stay O(1). Files
+written by other means are picked up by refresh, which only rehashes files
+whose size or mtime changed.
+
+Usage:
+    python -m appfactory.run_manifest build <run_path>
+    python -m appfactory.run_manifest refresh <run_path>
+    python -m appfactory.run_manifest root <run_or_idea_path>
+    python -m appfactory.run_manifest diff <run_a> <run_b>
+    python -m appfactory.run_manifest verify <run_path>
+"""
+
+import hashlib
+import os
+import sys
+import argparse
+from typing import Dict, Any, List, Optional
+
+from .jsonio import append_jsonl, dumps, read_json, write_json
+from .stage_events import read_events, resolve_event_scope
+
+MANIFEST_FILENAME = "merkle.json"
+JOURNAL_FILENAME = "merkle.jsonl"
+UNTRACKED_FILENAMES = {MANIFEST_FILENAME, JOURNAL_FILENAME, ".unpacked"}
+# How far above a written file to look for the run's meta/merkle.json
+MAX_SCOPE_DEPTH = 6
+
+# journal path -> (manifest inode and mtime, paths marked appended since it was written)
+_appended_marks: Dict[str, Any] = {}
+
+def hash_file(path: str) -> str:
+    """sha256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _is_tracked(relpath: str) -> bool:
+    name = os.path.basename(relpath)
+    return name not in UNTRACKED_FILENAMES and ".tmp." not in name
+
+def _dir_hash(children: Dict[str, Any]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(children):
+        node = children[name]
+        kind = "d" if "children" in node else "f"
+        digest.update(f"{name}\0{kind}\0{node['hash']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def _empty_tree() -> Dict[str, Any]:
+    return {"hash": _dir_hash({}), "children": {}}
+
+def set_leaf(tree: Dict[str, Any], relpath: str, leaf: Optional[Dict[str, Any]]) -> None:
+    """
+    Set (or with leaf=None, remove) one file node and rehash its ancestors.
+
+    Only the directories on the file's path are rehashed; emptied
+    directories are pruned.
+    """
+    parts = relpath.split("/")
+    path = [tree]
+    for name in parts[:-1]:
+        children = path[-1]["children"]
+        if name not in children or "children" not in children[name]:
+            if leaf is None:
+                return
+            children[name] = _empty_tree()
+        path.append(children[name])
+
+    if leaf is None:
+        path[-1]["children"].pop(parts[-1], None)
+    else:
+        path[-1]["children"][parts[-1]] = leaf
+
+    for depth in range(len(path) - 1, -1, -1):
+        node = path[depth]
+        if depth > 0 and not node["children"]:
+            path[depth - 1]["children"].pop(parts[depth - 1], None)
+            continue
+        node["hash"] = _dir_hash(node["children"])
+
+def get_node(tree: Dict[str, Any], relpath: str) -> Optional[Dict[str, Any]]:
+    """Node at a relative path ('' for the root), or None."""
+    node = tree
+    for name in [p for p in relpath.split("/") if p]:
+        node = node.get("children", {}).get(name)
+        if node is None:
+            return None
+    return node
+
+def iter_files(tree: Dict[str, Any], prefix: str = "") -> List[str]:
+    """Relative paths of every file node."""
+    files = []
+    for name, node in sorted(tree.get("children", {}).items()):
+        path = f"{prefix}{name}"
+        files.extend(iter_files(node, path + "/") if "children" in node else [path])
+    return files
+
+def find_manifest_root(path: str) -> Optional[str]:
+    """The run root above a path that keeps a manifest, or None."""
+    directory = os.path.dirname(os.path.abspath(path))
+    for _ in range(MAX_SCOPE_DEPTH):
+        if os.path.exists(os.path.join(directory, "meta", MANIFEST_FILENAME)):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    return None
+
+def record_write(path: str, data: Optional[bytes] = None) -> None:
+    """
+    Journal a file written through jsonio (called by write_json and append_jsonl).
+
+    data is the full file content when known. Appended logs (data=None) are
+    not rehashed here: the journal only marks them as appended, once until
+    the manifest is next materialized, and load_manifest hashes them then.
+    A no-op for files outside runs that keep a manifest.
+    """
+    if not _is_tracked(path):
+        return
+    run_root = find_manifest_root(path)
+    if run_root is None:
+        return
+    relpath = os.path.relpath(os.path.abspath(path), run_root).replace(os.sep, "/")
+    journal_path = os.path.join(run_root, "meta", JOURNAL_FILENAME)
+
+    if data is None:
+        try:
+            stat = os.stat(os.path.join(run_root, "meta", MANIFEST_FILENAME))
+            version = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            return
+        marked_version, marked = _appended_marks.get(journal_path, (None, set()))
+        if marked_version != version:
+            marked = set()
+            _appended_marks[journal_path] = (version, marked)
+        if relpath in marked:
+            return
+        marked.add(relpath)
+        append_jsonl(journal_path, {"path": relpath, "appended": True})
+        return
+
+    stat = os.stat(path)
+    append_jsonl(journal_path, {
+        "path": relpath,
+        "hash": hashlib.sha256(data).hexdigest(),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    })
+
+def scan_files(run_path: str) -> Dict[str, os.stat_result]:
+    """Stat every tracked file in a run, keyed by relative path."""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(run_path):
+        dirnames.sort()
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, run_path).replace(os.sep, "/")
+            if _is_tracked(relpath):
+                files[relpath] = os.stat(path)
+    return files
+
+def build_manifest(run_path: str) -> Dict[str, Any]:
+    """Hash every file of a run and write a fresh meta/merkle.json."""
+    journal_path = os.path.join(run_path, "meta", JOURNAL_FILENAME)
+    offset = os.path.getsize(journal_path) if os.path.exists(journal_path) else 0
+
+    tree = _empty_tree()
+    for relpath, stat in sorted(scan_files(run_path).items()):
+        set_leaf(tree, relpath, {"hash": hash_file(os.path.join(run_path, relpath)),
+                                 "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+
+    manifest = {"run_id": os.path.basename(os.path.abspath(run_path)), "algorithm": "sha256",
+                "journal_offset": offset, "tree": tree}
+    os.makedirs(os.path.join(run_path, "meta"), exist_ok=True)
+    write_json(os.path.join(run_path, "meta", MANIFEST_FILENAME), manifest, compact=True)
+    return manifest
+
+def load_manifest(run_path: str, write: bool = True) -> Dict[str, Any]:
+    """
+    Bring meta/merkle.json up to date with its write journal.
+
+    Only journal lines past the recorded offset are read, and only the
+    directories on their paths are rehashed. Logs marked as appended are
+    hashed from disk here, once per fold however many appends they saw.
+    """
+    manifest_path = os.path.join(run_path, "meta", MANIFEST_FILENAME)
+    manifest = read_json(manifest_path)
+
+    offset = manifest["journal_offset"]
+    entries, new_offset = read_events(os.path.join(run_path, "meta", JOURNAL_FILENAME), offset)
+    if new_offset == offset:
+        return manifest
+
+    appended = set()
+    for entry in entries:
+        if entry.get("appended"):
+            appended.add(entry["path"])
+            continue
+        appended.discard(entry["path"])
+        leaf = None if entry.get("deleted") else {
+            "hash": entry["hash"], "size": entry["size"], "mtime_ns": entry["mtime_ns"]}
+        set_leaf(manifest["tree"], entry["path"], leaf)
+
+    for relpath in sorted(appended):
+        path = os.path.join(run_path, relpath)
+        try:
+            stat = os.stat(path)
+            leaf = {"hash": hash_file(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        except FileNotFoundError:
+            leaf = None
+        set_leaf(manifest["tree"], relpath, leaf)
+    manifest["journal_offset"] = new_offset
+
+    if write:
+        write_json(manifest_path, manifest, compact=True)
+    return manifest
+
+def refresh_manifest(run_path: str) -> Dict[str, List[str]]:
+    """
+    Journal files changed outside jsonio (size or mtime differs) and fold them in.
+
+    Unchanged files are only stat'ed, never read.
+    """
+    manifest = load_manifest(run_path)
+    known = {relpath: get_node(manifest["tree"], relpath) for relpath in iter_files(manifest["tree"])}
+    on_disk = scan_files(run_path)
+    journal_path = os.path.join(run_path, "meta", JOURNAL_FILENAME)
+
+    changes = {"added": [], "changed": [], "removed": []}
+    for relpath, stat in sorted(on_disk.items()):
+        node = known.get(relpath)
+        if node and node["size"] == stat.st_size and node["mtime_ns"] == stat.st_mtime_ns:
+            continue
+        digest = hash_file(os.path.join(run_path, relpath))
+        if node and node["hash"] == digest:
+            kind = None
+        else:
+            kind = "changed" if node else "added"
+        append_jsonl(journal_path, {"path": relpath, "hash": digest,
+                                    "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+        if kind:
+            changes[kind].append(relpath)
+
+    for relpath in sorted(set(known) - set(on_disk)):
+        append_jsonl(journal_path, {"path": relpath, "deleted": True})
+        changes["removed"].append(relpath)
+
+    load_manifest(run_path)
+    return changes
+
+def root_hash(path: str) -> str:
+    """Root hash of a run or of an idea pack (its subtree in the run manifest)."""
+    run_root, pack = resolve_event_scope(path)
+    node = get_node(load_manifest(run_root)["tree"], f"ideas/{pack}" if pack else "")
+    return node["hash"] if node else _empty_tree()["hash"]
+
+def diff_trees(old: Dict[str, Any], new: Dict[str, Any], prefix: str = "") -> Dict[str, List[str]]:
+    """Files added, changed and removed between two trees, skipping identical subtrees."""
+    changes = {"added": [], "changed": [], "removed": []}
+    if old.get("hash") == new.get("hash"):
+        return changes
+
+    old_children = old.get("children", {})
+    new_children = new.get("children", {})
+    for name in sorted(set(old_children) | set(new_children)):
+        path = f"{prefix}{name}"
+        a, b = old_children.get(name), new_children.get(name)
+        if a is None:
+            changes["added"].extend(iter_files(b, path + "/") if "children" in b else [path])
+        elif b is None:
+            changes["removed"].extend(iter_files(a, path + "/") if "children" in a else [path])
+        elif a["hash"] == b["hash"]:
+            continue
+        elif "children" in a and "children" in b:
+            for kind, paths in diff_trees(a, b, path + "/").items():
+                changes[kind].extend(paths)
+        else:
+            changes["changed"].append(path)
+    return changes
+
+def verify_manifest(run_path: str) -> Dict[str, Any]:
+    """
+    Rehash every file and compare with the manifest.
+
+    Archived runs are verified against an unpacked copy, so this also checks
+    the integrity of archive packs and copied runs.
+    """
+    from .run_archive import materialize_run
+
+    real_path = materialize_run(run_path)
+    manifest = load_manifest(real_path, write=False)
+    actual = _empty_tree()
+    for relpath in sorted(scan_files(real_path)):
+        set_leaf(actual, relpath, {"hash": hash_file(os.path.join(real_path, relpath))})
+
+    changes = diff_trees(manifest["tree"], actual)
+    return {"path": run_path, "valid": not any(changes.values()), "root": actual["hash"], **changes}
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory run Merkle manifest")
+    parser.add_argument("command", choices=["build", "refresh", "root", "diff", "verify"],
+                        help="Command to execute")
+    parser.add_argument("path", help="Run (or idea pack for root) path")
+    parser.add_argument("other", nargs="?", help="Second run for diff")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            manifest = build_manifest(args.path)
+            print(f"✓ {len(iter_files(manifest['tree']))} files, root {manifest['tree']['hash']}")
+
+        elif args.command == "refresh":
+            changes = refresh_manifest(args.path)
+            print(dumps(changes).decode("utf-8"))
+
+        elif args.command == "root":
+            print(root_hash(args.path))
+
+        elif args.command == "diff":
+            if not args.other:
+                print("Error: second run required for diff", file=sys.stderr)
+                sys.exit(1)
+            changes = diff_trees(load_manifest(args.path)["tree"], load_manifest(args.other)["tree"])
+            print(dumps(changes).decode("utf-8"))
+
+        elif args.command == "verify":
+            result = verify_manifest(args.path)
+            print(dumps(result).decode("utf-8"))
+            if not result["valid"]:
+                sys.exit(1)
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
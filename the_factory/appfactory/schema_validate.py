@@ -14,15 +14,17 @@ Usage:
 import json
 import sys
 import os
-from pathlib import Path
 from typing import Dict, Any, List, Tuple
 import argparse
 
+from .jsonio import loads
+from .run_archive import read_json
+from .template_bundle import get_template_schema, get_stage_template_path as get_bundled_stage_template_path
+
 def load_json(file_path: str) -> Dict[Any, Any]:
     """Load and parse JSON file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(file_path)
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in {file_path}: {e}")
     except FileNotFoundError:
@@ -31,6 +33,11 @@ def load_json(file_path: str) -> Dict[Any, Any]:
 def extract_schema_from_template(template_path: str) -> Dict[Any, Any]:
     """Extract JSON schema from stage template markdown file."""
     try:
+        # Agent templates are served from the precompiled template bundle
+        schema = get_template_schema(template_path)
+        if schema is not None:
+            return schema
+        
         with open(template_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
@@ -48,7 +55,7 @@ def extract_schema_from_template(template_path: str) -> Dict[Any, Any]:
             raise ValueError(f"Incomplete JSON schema block in {template_path}")
         
         schema_text = content[start:end].strip()
-        return json.loads(schema_text)
+        return loads(schema_text)
     
     except Exception as e:
         raise ValueError(f"Failed to extract schema from {template_path}: {e}")
@@ -129,16 +136,7 @@ def validate_json_against_schema(json_data: Dict[Any, Any], schema: Dict[Any, An
 
 def get_stage_template_path(stage_num: str) -> str:
     """Get template file path for stage number."""
-    project_root = Path(__file__).parent.parent
-    
-    # Find template file for stage
-    templates_dir = project_root / "templates" / "agents"
-    pattern = f"{stage_num:0>2}_*_json.md"
-    
-    for template_file in templates_dir.glob(pattern):
-        return str(template_file)
-    
-    raise FileNotFoundError(f"No template found for stage {stage_num}")
+    return get_bundled_stage_template_path(stage_num)
 
 def main():
     parser = argparse.ArgumentParser(description="Validate JSON against App Factory stage schema")
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+App Factory Stage Output Cache
+
+Content-addressed cache for stage outputs. A cache key is the hash of the
+stage template, the stage schema, the content of every input stage file and
+the model parameters, so a re-run or resumed idea pack with identical inputs
+can replay the cached stageNN.json and rendered spec instead of calling the
+model again.
+
+Every read-modify-write of the cache index holds an exclusive flock on
+index.lock, so concurrent stores and lookups (batch_executor --cache runs
+them from a thread pool, several processes may share the cache) never lose
+entries.
+
+Usage:
+    python -m appfactory.stage_cache key <stage_num> <input_paths...> [--model-params JSON]
+    python -m appfactory.stage_cache store <stage_num> <stage_json_path> [--spec <spec_path>]
+    python -m appfactory.stage_cache replay <stage_num> <stage_json_path> <input_paths...>
+    python -m appfactory.stage_cache stats
+    python -m appfactory.stage_cache evict [--max-bytes N] [--max-entries N]
+"""
+
+import fcntl
+import json
+import hashlib
+import os
+import shutil
+import sys
+import argparse
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Callable
+
+from .jsonio import read_json, write_json
+from .template_bundle import get_stage_template_path
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 5000
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_cache_dir() -> Path:
+    """Get the stage cache directory."""
+    return get_repo_root() / ".cache" / "stage_cache"
+
+def resolve_repo_path(path: str) -> Path:
+    """Resolve a path as written in stage meta (repo-relative) or on the command line."""
+    candidate = Path(path)
+    if candidate.is_absolute() or candidate.exists():
+        return candidate
+    return get_repo_root() / candidate
+
+def hash_file(path: Path) -> str:
+    """Return the sha256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def find_stage_template(stage_num: str) -> Path:
+    """Find the agent template for a stage (e.g. '05', '02.5', '01_dream')."""
+    return Path(get_stage_template_path(stage_num))
+
+def find_stage_schema(stage_num: str) -> Optional[Path]:
+    """Find the JSON schema for a stage, if one exists."""
+    schemas_dir = get_repo_root() / "schemas"
+    for name in [f"stage{stage_num}.json", f"stage{stage_num}_schema.json"]:
+        if (schemas_dir / name).exists():
+            return schemas_dir / name
+    return None
+
+def compute_cache_key(stage_num: str, input_paths: List[str],
+                      model_params: Optional[Dict[str, Any]] = None,
+                      template_path: Optional[str] = None,
+                      schema_path: Optional[str] = None) -> str:
+    """
+    Compute the content-addressed cache key for a stage execution.
+
+    Input files are hashed by content in the order given, so the same inputs
+    living under a different run path still produce the same key.
+    """
+    template = Path(template_path) if template_path else find_stage_template(stage_num)
+    schema = Path(schema_path) if schema_path else find_stage_schema(stage_num)
+
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}:stage:{stage_num}\n".encode())
+    digest.update(f"template:{hash_file(template)}\n".encode())
+    digest.update(f"schema:{hash_file(schema) if schema else 'none'}\n".encode())
+    for input_path in input_paths:
+        digest.update(f"input:{hash_file(resolve_repo_path(input_path))}\n".encode())
+    params = json.dumps(model_params or {}, sort_keys=True, separators=(",", ":"))
+    digest.update(f"model:{params}\n".encode())
+
+    return digest.hexdigest()
+
+def get_input_stage_paths(stage_json_path: str) -> List[str]:
+    """Read meta.input_stage_paths from an existing stage output."""
+    data = read_json(stage_json_path)
+    return data.get("meta", {}).get("input_stage_paths", [])
+
+def load_cache_index(cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Load the cache index, returning an empty index if none exists."""
+    cache_dir = cache_dir or get_cache_dir()
+    index_path = cache_dir / "index.json"
+
+    if index_path.exists():
+        try:
+            index = read_json(index_path)
+            if index.get("version") == CACHE_VERSION:
+                return index
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not load stage cache index: {e}", file=sys.stderr)
+
+    return {
+        "version": CACHE_VERSION,
+        "entries": {},
+        "stats": {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+    }
+
+def save_cache_index(index: Dict[str, Any], cache_dir: Optional[Path] = None) -> None:
+    """Atomically write the cache index."""
+    cache_dir = cache_dir or get_cache_dir()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    write_json(cache_dir / "index.json", index, compact=True, sort_keys=True)
+
+@contextmanager
+def locked_cache_index(cache_dir: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Hold the cache index lock and yield the index; it is saved on exit.
+
+    flock locks belong to the open file, so this serializes threads of one
+    process as well as separate processes.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir / "index.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            index = load_cache_index(cache_dir)
+            yield index
+            save_cache_index(index, cache_dir)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _entry_dir(key: str, cache_dir: Path) -> Path:
+    return cache_dir / "objects" / key[:2] / key
+
+def lookup_stage(key: str, cache_dir: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Look up a cache entry, recording a hit or miss and refreshing its LRU timestamp."""
+    cache_dir = cache_dir or get_cache_dir()
+    with locked_cache_index(cache_dir) as index:
+        entry = index["entries"].get(key)
+
+        if entry is not None and not (_entry_dir(key, cache_dir) / "stage.json").exists():
+            # Object was removed behind our back; treat as a miss
+            del index["entries"][key]
+            entry = None
+
+        if entry is None:
+            index["stats"]["misses"] += 1
+        else:
+            index["stats"]["hits"] += 1
+            entry["last_used_at"] = datetime.now().isoformat()
+            entry["hits"] = entry.get("hits", 0) + 1
+
+    return entry
+
+def store_stage(key: str, stage_num: str, stage_json_path: str,
+                spec_path: Optional[str] = None, cache_dir: Optional[Path] = None,
+                max_bytes: int = DEFAULT_MAX_BYTES,
+                max_entries: int = DEFAULT_MAX_ENTRIES) -> Dict[str, Any]:
+    """Store a stage output (and optional rendered spec) under a cache key."""
+    cache_dir = cache_dir or get_cache_dir()
+    entry_dir = _entry_dir(key, cache_dir)
+    entry_dir.mkdir(parents=True, exist_ok=True)
+
+    shutil.copyfile(stage_json_path, entry_dir / "stage.json")
+    size = os.path.getsize(entry_dir / "stage.json")
+    spec_name = None
+    if spec_path and os.path.exists(spec_path):
+        spec_name = os.path.basename(spec_path)
+        shutil.copyfile(spec_path, entry_dir / "spec.md")
+        size += os.path.getsize(entry_dir / "spec.md")
+
+    timestamp = datetime.now().isoformat()
+    entry = {
+        "stage": stage_num,
+        "stage_name": os.path.basename(stage_json_path),
+        "spec_name": spec_name,
+        "size": size,
+        "created_at": timestamp,
+        "last_used_at": timestamp,
+        "hits": 0
+    }
+
+    with locked_cache_index(cache_dir) as index:
+        index["entries"][key] = entry
+        index["stats"]["stores"] += 1
+        _evict_index(index, cache_dir, max_bytes, max_entries)
+
+    return entry
+
+def replay_stage(key: str, stage_json_path: str, spec_path: Optional[str] = None,
+                 cache_dir: Optional[Path] = None) -> bool:
+    """
+    Replay a cached stage output into a run directory.
+
+    When spec_path is omitted the cached spec is written next to the stage's
+    stages/ directory (runs/.../spec/<original name>). Returns False on a miss.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    entry = lookup_stage(key, cache_dir)
+    if entry is None:
+        return False
+
+    entry_dir = _entry_dir(key, cache_dir)
+    os.makedirs(os.path.dirname(os.path.abspath(stage_json_path)), exist_ok=True)
+    shutil.copyfile(entry_dir / "stage.json", stage_json_path)
+
+    if entry.get("spec_name") and (entry_dir / "spec.md").exists():
+        if spec_path is None:
+            spec_dir = Path(stage_json_path).absolute().parent.parent / "spec"
+            spec_path = str(spec_dir / entry["spec_name"])
+        os.makedirs(os.path.dirname(os.path.abspath(spec_path)), exist_ok=True)
+        shutil.copyfile(entry_dir / "spec.md", spec_path)
+
+    return True
+
+def run_stage_cached(stage_num: str, input_paths: List[str], stage_json_path: str,
+                     run_stage: Callable[[], None], spec_path: Optional[str] = None,
+                     model_params: Optional[Dict[str, Any]] = None,
+                     cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Execute a stage through the cache.
+
+    On a hit the cached outputs are replayed and run_stage is never called.
+    On a miss run_stage() must write stage_json_path (and spec_path, if given);
+    the result is then stored for the next run.
+    """
+    key = compute_cache_key(stage_num, input_paths, model_params)
+    if replay_stage(key, stage_json_path, spec_path, cache_dir):
+        return {"key": key, "cached": True}
+
+    run_stage()
+    store_stage(key, stage_num, stage_json_path, spec_path, cache_dir)
+    return {"key": key, "cached": False}
+
+def _evict_index(index: Dict[str, Any], cache_dir: Path, max_bytes: int,
+                 max_entries: int) -> List[str]:
+    entries = index["entries"]
+    total = sum(entry.get("size", 0) for entry in entries.values())
+    evicted = []
+
+    # Least recently used first
+    for key in sorted(entries, key=lambda k: entries[k].get("last_used_at", "")):
+        if total <= max_bytes and len(entries) <= max_entries:
+            break
+        total -= entries[key].get("size", 0)
+        del entries[key]
+        shutil.rmtree(_entry_dir(key, cache_dir), ignore_errors=True)
+        evicted.append(key)
+
+    index["stats"]["evictions"] += len(evicted)
+    return evicted
+
+def evict(cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+          max_entries: int = DEFAULT_MAX_ENTRIES) -> List[str]:
+    """Evict least recently used entries until the cache fits the given limits."""
+    cache_dir = cache_dir or get_cache_dir()
+    with locked_cache_index(cache_dir) as index:
+        evicted = _evict_index(index, cache_dir, max_bytes, max_entries)
+    return evicted
+
+def get_cache_stats(cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Summarize cache size, entry count and hit/miss counters."""
+    index = load_cache_index(cache_dir)
+    stats = dict(index["stats"])
+    lookups = stats["hits"] + stats["misses"]
+    stats["entries"] = len(index["entries"])
+    stats["total_bytes"] = sum(entry.get("size", 0) for entry in index["entries"].values())
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory stage output cache")
+    parser.add_argument("command", choices=["key", "store", "replay", "stats", "evict"],
+                       help="Command to execute")
+    parser.add_argument("stage_num", nargs="?", help="Stage number (e.g. 02, 02.5, 10)")
+    parser.add_argument("paths", nargs="*", help="Stage JSON path and/or input stage paths")
+    parser.add_argument("--spec", help="Rendered spec markdown path")
+    parser.add_argument("--model-params", default="{}", help="Model parameters as JSON")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="Cache size limit")
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES, help="Cache entry limit")
+
+    args = parser.parse_args()
+
+    try:
+        model_params = json.loads(args.model_params)
+
+        if args.command == "key":
+            if not args.stage_num:
+                print("Error: stage_num required", file=sys.stderr)
+                sys.exit(1)
+            print(compute_cache_key(args.stage_num, args.paths, model_params))
+
+        elif args.command == "store":
+            if not args.stage_num or len(args.paths) != 1:
+                print("Error: stage_num and stage_json_path required", file=sys.stderr)
+                sys.exit(1)
+            stage_json_path = args.paths[0]
+            inputs = get_input_stage_paths(stage_json_path)
+            key = compute_cache_key(args.stage_num, inputs, model_params)
+            store_stage(key, args.stage_num, stage_json_path, args.spec,
+                        max_bytes=args.max_bytes, max_entries=args.max_entries)
+            print(key)
+
+        elif args.command == "replay":
+            if not args.stage_num or not args.paths:
+                print("Error: stage_num and stage_json_path required", file=sys.stderr)
+                sys.exit(1)
+            stage_json_path, inputs = args.paths[0], args.paths[1:]
+            key = compute_cache_key(args.stage_num, inputs, model_params)
+            if replay_stage(key, stage_json_path, args.spec):
+                print(f"✓ Replayed stage {args.stage_num} from cache ({key[:16]})")
+            else:
+                print(f"Cache miss for stage {args.stage_num} ({key[:16]})", file=sys.stderr)
+                sys.exit(1)
+
+        elif args.command == "stats":
+            print(json.dumps(get_cache_stats(), indent=2))
+
+        elif args.command == "evict":
+            evicted = evict(max_bytes=args.max_bytes, max_entries=args.max_entries)
+            print(f"Evicted {len(evicted)} entries")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+App Factory Stage Event Log
+
+Every stage transition is appended as one JSON line to the run-level
+meta/events.jsonl (opened with O_APPEND, so concurrent writers never
+interleave or clobber each other). Idea-pack and run-level
+meta/stage_status.json files, plus meta/run_summary.json, are materialized
+views: each records the byte offset of the events it has absorbed.
+Status reads fold in the event tail past that offset without rewriting
+the file; update_stage_status rewrites stage_status.json at every stage
+boundary (and batch runs rewrite run_summary.json when they finish), so
+readers of the files themselves never lag a finished stage.
+
+Usage:
+    python -m appfactory.stage_events history <run_path>
+    python -m appfactory.stage_events status <run_or_idea_path>
+    python -m appfactory.stage_events summary <run_path>
+    python -m appfactory.stage_events durations <run_path>
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from .jsonio import append_jsonl, dumps, loads, read_json, write_json
+
+EVENTS_FILENAME = "events.jsonl"
+SUMMARY_FILENAME = "run_summary.json"
+RUN_SCOPE = "_run"
+
+def resolve_event_scope(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Map a run or idea-pack path to (run_root, pack).
+
+    Idea packs live at <run>/ideas/<idea_dir>; their events go to the run's
+    log tagged with the idea_dir. Anything else is its own run root.
+    """
+    path = os.path.normpath(os.path.abspath(path))
+    parent = os.path.dirname(path)
+    if os.path.basename(parent) == "ideas":
+        return os.path.dirname(parent), os.path.basename(path)
+    return path, None
+
+def get_events_path(path: str) -> str:
+    """Get the events.jsonl path for a run or idea pack."""
+    run_root, _ = resolve_event_scope(path)
+    return os.path.join(run_root, "meta", EVENTS_FILENAME)
+
+def append_event(path: str, stage_num: str, status: str,
+                 artifacts: Optional[List[str]] = None, **fields: Any) -> Dict[str, Any]:
+    """Append a stage transition event for a run or idea pack."""
+    run_root, pack = resolve_event_scope(path)
+    event = {
+        "ts": datetime.now().isoformat(),
+        "run_id": os.path.basename(run_root),
+        "pack": pack,
+        "stage": stage_num,
+        "status": status
+    }
+    if artifacts:
+        event["artifacts"] = artifacts
+    event.update(fields)
+
+    events_path = os.path.join(run_root, "meta", EVENTS_FILENAME)
+    os.makedirs(os.path.dirname(events_path), exist_ok=True)
+    append_jsonl(events_path, event)
+    return event
+
+def read_events(events_path: str, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read complete events after a byte offset.
+
+    Returns the events and the offset just past the last complete line, so a
+    line still being written is picked up by the next read.
+    """
+    try:
+        with open(events_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], offset
+
+    end = data.rfind(b"\n") + 1
+    events = []
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        try:
+            events.append(loads(line))
+        except ValueError:
+            # Skip a corrupt line rather than wedging every reader
+            continue
+
+    return events, offset + end
+
+def apply_event(view: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one event to a stage_status view (same semantics as a status update)."""
+    stage_num = event["stage"]
+    status = event["status"]
+    timestamp = event["ts"]
+    stages = view.setdefault("stages", {})
+
+    if stage_num not in stages:
+        stages[stage_num] = {"status": status, "started_at": timestamp}
+    else:
+        stages[stage_num]["status"] = status
+
+    if status == "completed":
+        stages[stage_num]["completed_at"] = timestamp
+        if event.get("artifacts"):
+            stages[stage_num]["artifacts"] = event["artifacts"]
+
+        # Keep batch-layout list fields in step with the stages map
+        if isinstance(view.get("stages_completed"), list) and stage_num not in view["stages_completed"]:
+            view["stages_completed"].append(stage_num)
+        for key in ["stages_remaining", "stages_pending"]:
+            if isinstance(view.get(key), list) and stage_num in view[key]:
+                view[key].remove(stage_num)
+
+    if "last_updated" in view:
+        view["last_updated"] = timestamp
+
+    return view
+
+def materialize_stage_status(path: str, write: bool = True) -> Dict[str, Any]:
+    """
+    Bring a run's or idea pack's stage_status.json up to date with the event log.
+
+    The view is only rewritten when new events were absorbed.
+    """
+    run_root, pack = resolve_event_scope(path)
+    status_path = os.path.join(path, "meta", "stage_status.json")
+
+    if os.path.exists(status_path):
+        view = read_json(status_path)
+    else:
+        view = {"run_id": os.path.basename(path), "stages": {}}
+
+    offset = view.get("events_offset", 0)
+    events, new_offset = read_events(os.path.join(run_root, "meta", EVENTS_FILENAME), offset)
+    if new_offset == offset:
+        return view
+
+    for event in events:
+        if event.get("pack") == pack:
+            apply_event(view, event)
+    view["events_offset"] = new_offset
+
+    if write:
+        os.makedirs(os.path.dirname(status_path), exist_ok=True)
+        write_json(status_path, view)
+    return view
+
+def materialize_run_summary(run_path: str, write: bool = True) -> Dict[str, Any]:
+    """
+    Bring meta/run_summary.json up to date: per-pack stage state and status counts.
+
+    Run-level (non idea-pack) events are reported under the '_run' key.
+    """
+    run_root, _ = resolve_event_scope(run_path)
+    summary_path = os.path.join(run_root, "meta", SUMMARY_FILENAME)
+
+    if os.path.exists(summary_path):
+        summary = read_json(summary_path)
+    else:
+        summary = {"run_id": os.path.basename(run_root), "events_offset": 0, "packs": {}}
+
+    offset = summary.get("events_offset", 0)
+    events, new_offset = read_events(os.path.join(run_root, "meta", EVENTS_FILENAME), offset)
+    if new_offset == offset and "counts" in summary:
+        return summary
+
+    for event in events:
+        pack = summary["packs"].setdefault(event.get("pack") or RUN_SCOPE, {"stages": {}})
+        apply_event(pack, event)
+        pack["current_stage"] = event["stage"]
+        pack["updated_at"] = event["ts"]
+
+    counts = {}
+    for pack in summary["packs"].values():
+        pack["completed"] = sum(1 for info in pack["stages"].values() if info["status"] == "completed")
+        for info in pack["stages"].values():
+            counts[info["status"]] = counts.get(info["status"], 0) + 1
+    summary["counts"] = counts
+    summary["events_offset"] = new_offset
+
+    if write:
+        os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+        write_json(summary_path, summary)
+    return summary
+
+def stage_durations(run_path: str) -> List[Dict[str, Any]]:
+    """Replay the event log into per-stage durations (first start to completion)."""
+    events, _ = read_events(get_events_path(run_path))
+    started = {}
+    durations = []
+
+    for event in events:
+        key = (event.get("pack"), event["stage"])
+        timestamp = datetime.fromisoformat(event["ts"])
+        if event["status"] == "completed" and key in started:
+            durations.append({
+                "pack": key[0],
+                "stage": key[1],
+                "seconds": round((timestamp - started.pop(key)).total_seconds(), 3)
+            })
+        elif event["status"] != "completed":
+            started.setdefault(key, timestamp)
+
+    return durations
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory stage event log")
+    parser.add_argument("command", choices=["history", "status", "summary", "durations"],
+                       help="Command to execute")
+    parser.add_argument("path", help="Run or idea pack directory")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "history":
+            events, _ = read_events(get_events_path(args.path))
+            for event in events:
+                pack = event.get("pack") or RUN_SCOPE
+                print(f"{event['ts']}  {pack:<40} {event['stage']:>6}  {event['status']}")
+
+        elif args.command == "status":
+            print(dumps(materialize_stage_status(args.path, write=False)).decode("utf-8"))
+
+        elif args.command == "summary":
+            print(dumps(materialize_run_summary(args.path)).decode("utf-8"))
+
+        elif args.command == "durations":
+            for row in stage_durations(args.path):
+                print(f"{row['pack'] or RUN_SCOPE:<40} {row['stage']:>6}  {row['seconds']:.3f}s")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
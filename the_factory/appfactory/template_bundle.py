@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+App Factory Template Bundle
+
+Precompiled index of templates/agents: stage id -> template path, content
+hash, extracted JSON blocks and section offsets. The bundle is persisted to
+.cache/template_bundle.json, loaded once per process and rebuilt for any
+template whose mtime or size changed.
+
+Usage:
+    python -m appfactory.template_bundle build
+    python -m appfactory.template_bundle stages
+    python -m appfactory.template_bundle show <stage_num>
+"""
+
+import copy
+import hashlib
+import json
+import sys
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .jsonio import read_json, write_json, loads
+
+BUNDLE_VERSION = 1
+JSON_START_MARKER = "```json"
+FENCE_MARKER = "```"
+
+_bundle_lock = threading.Lock()
+_bundle: Optional[Dict[str, Any]] = None
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def get_templates_dir() -> Path:
+    """Get the agent templates directory."""
+    return get_repo_root() / "templates" / "agents"
+
+def get_bundle_path() -> Path:
+    """Get the path of the persisted template bundle."""
+    return get_repo_root() / ".cache" / "template_bundle.json"
+
+def stage_id_for_template(filename: str) -> str:
+    """Derive the stage id from a template filename (e.g. '02.5_product_reality.md' -> '02.5')."""
+    stem = Path(filename).stem
+    if stem == "01_dream":
+        return "01_dream"
+    return stem.split("_", 1)[0]
+
+def extract_json_blocks(content: str) -> List[Dict[str, Any]]:
+    """Extract every fenced JSON block with its offsets and parsed value."""
+    blocks = []
+    start = content.find(JSON_START_MARKER)
+
+    while start != -1:
+        body_start = start + len(JSON_START_MARKER)
+        end = content.find(FENCE_MARKER, body_start)
+        if end == -1:
+            blocks.append({"offset": start, "end": None, "data": None,
+                           "error": "Incomplete JSON schema block"})
+            break
+
+        block = {"offset": start, "end": end + len(FENCE_MARKER), "data": None, "error": None}
+        try:
+            block["data"] = loads(content[body_start:end].strip())
+        except json.JSONDecodeError as e:
+            block["error"] = str(e)
+        blocks.append(block)
+        start = content.find(JSON_START_MARKER, end + len(FENCE_MARKER))
+
+    return blocks
+
+def extract_sections(content: str) -> List[Dict[str, Any]]:
+    """List markdown headings (outside code fences) with their character offsets."""
+    sections = []
+    offset = 0
+    in_fence = False
+
+    for line in content.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped.startswith(FENCE_MARKER):
+            in_fence = not in_fence
+        elif not in_fence and stripped.startswith("#"):
+            level = len(stripped) - len(stripped.lstrip("#"))
+            title = stripped[level:].strip()
+            if title and level <= 6:
+                sections.append({"title": title, "level": level, "offset": offset})
+        offset += len(line)
+
+    return sections
+
+def build_template_entry(template_path: Path) -> Dict[str, Any]:
+    """Parse a single template into its bundle entry."""
+    raw = template_path.read_bytes()
+    content = raw.decode("utf-8")
+    stat = template_path.stat()
+
+    return {
+        "stage": stage_id_for_template(template_path.name),
+        "path": str(template_path.relative_to(get_repo_root())),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "json_blocks": extract_json_blocks(content),
+        "sections": extract_sections(content)
+    }
+
+def _index_stages(templates: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    # Sorted filenames make duplicate stage ids (e.g. 08.5) resolve deterministically
+    stages = {}
+    for filename in sorted(templates):
+        stages.setdefault(templates[filename]["stage"], filename)
+    return stages
+
+def _refresh_bundle(bundle: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+    """Bring a bundle up to date with templates on disk; returns (bundle, changed)."""
+    if bundle is None or bundle.get("version") != BUNDLE_VERSION:
+        bundle = {"version": BUNDLE_VERSION, "stages": {}, "templates": {}}
+
+    templates = {}
+    changed = False
+    for template_path in sorted(get_templates_dir().glob("*.md")):
+        stat = template_path.stat()
+        entry = bundle["templates"].get(template_path.name)
+        if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+            entry = build_template_entry(template_path)
+            changed = True
+        templates[template_path.name] = entry
+
+    if not changed and set(templates) == set(bundle["templates"]):
+        return bundle, False
+
+    return {"version": BUNDLE_VERSION, "stages": _index_stages(templates), "templates": templates}, True
+
+def save_template_bundle(bundle: Dict[str, Any]) -> None:
+    """Atomically persist the bundle index."""
+    bundle_path = get_bundle_path()
+    try:
+        bundle_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(bundle_path, bundle, compact=True)
+    except OSError as e:
+        # A read-only checkout still works from the in-memory bundle
+        print(f"Warning: Could not save template bundle: {e}", file=sys.stderr)
+
+def load_template_bundle(force_rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Get the template bundle.
+
+    The persisted bundle is read once per process; every call re-stats the
+    templates and rebuilds entries whose mtime or size changed.
+    """
+    global _bundle
+
+    with _bundle_lock:
+        bundle = None if force_rebuild else _bundle
+        if bundle is None and not force_rebuild:
+            try:
+                bundle = read_json(get_bundle_path())
+            except (OSError, json.JSONDecodeError):
+                bundle = None
+
+        bundle, changed = _refresh_bundle(bundle)
+        if changed:
+            save_template_bundle(bundle)
+        _bundle = bundle
+        return bundle
+
+def get_stage_template_path(stage_num: str) -> str:
+    """Get the template path for a stage id (e.g. '05', '02.5', '01_dream')."""
+    bundle = load_template_bundle()
+    filename = bundle["stages"].get(stage_num)
+    if filename is None and stage_num.isdigit():
+        filename = bundle["stages"].get(f"{stage_num:0>2}")
+    if filename is None:
+        raise FileNotFoundError(f"No template found for stage {stage_num}")
+    return str(get_repo_root() / bundle["templates"][filename]["path"])
+
+def get_template_entry(template_path: str) -> Optional[Dict[str, Any]]:
+    """Get the bundle entry for a template path, or None if it is not an agent template."""
+    path = Path(template_path).resolve()
+    if path.parent != get_templates_dir().resolve():
+        return None
+    return load_template_bundle()["templates"].get(path.name)
+
+def get_template_schema(template_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the first JSON block of a bundled template.
+
+    Returns None when the template is not part of the bundle; raises ValueError
+    when the template has no usable JSON block.
+    """
+    entry = get_template_entry(template_path)
+    if entry is None:
+        return None
+    if not entry["json_blocks"]:
+        raise ValueError(f"No JSON schema found in {template_path}")
+
+    block = entry["json_blocks"][0]
+    if block["error"]:
+        raise ValueError(f"{block['error']} in {template_path}")
+    return copy.deepcopy(block["data"])
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory template bundle")
+    parser.add_argument("command", choices=["build", "stages", "show"], help="Command to execute")
+    parser.add_argument("stage_num", nargs="?", help="Stage id for show")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            bundle = load_template_bundle(force_rebuild=True)
+            print(f"✓ Bundled {len(bundle['templates'])} templates: {get_bundle_path()}")
+
+        elif args.command == "stages":
+            bundle = load_template_bundle()
+            for stage_num, filename in sorted(bundle["stages"].items()):
+                entry = bundle["templates"][filename]
+                print(f"{stage_num:>10}: {filename} ({len(entry['json_blocks'])} JSON blocks, "
+                      f"{len(entry['sections'])} sections)")
+
+        elif args.command == "show":
+            if not args.stage_num:
+                print("Error: stage_num required for show", file=sys.stderr)
+                sys.exit(1)
+            path = get_stage_template_path(args.stage_num)
+            entry = dict(get_template_entry(path))
+            entry["json_blocks"] = [
+                {k: v for k, v in block.items() if k != "data"} for block in entry["json_blocks"]
+            ]
+            print(json.dumps(entry, indent=2))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+App Factory Token Budget Analyzer
+
+Estimates the full input size of each stage call of a run or idea pack
+(standards + template + input files + instruction, exactly as assembled by
+appfactory.prompt_assembly), attributes tokens to every input file, flags
+stages over a budget and suggests which inputs to summarize. Runs offline
+with the local tokenizer approximation.
+
+Usage:
+    python -m appfactory.token_budget <run_or_pack_path> [--budget 40000] [--json] [--output FILE]
+"""
+
+import os
+import sys
+import argparse
+from typing import Dict, Any, List
+
+from .jsonio import dumps, write_json
+from .logging_utils import get_next_stage
+from .prompt_assembly import assemble_stage_prompt, collect_run_stage_calls, stage_sort_key
+from .stage_events import resolve_event_scope
+
+DEFAULT_BUDGET = 40000
+# Expected size of an input after summarization, relative to the original
+SUMMARY_RATIO = 0.15
+
+def list_stage_calls(path: str, include_next: bool = True) -> List[tuple]:
+    """
+    (path, stage_num) pairs to analyze for a run or a single idea pack.
+
+    Includes the pending next stage of each pack or run when include_next is set.
+    """
+    _, pack = resolve_event_scope(path)
+    if pack is not None:
+        calls = [call for call in collect_run_stage_calls(os.path.dirname(os.path.dirname(path)))
+                 if os.path.abspath(call[0]) == os.path.abspath(path)]
+        roots = [path]
+    else:
+        calls = collect_run_stage_calls(path)
+        ideas_dir = os.path.join(path, "ideas")
+        roots = [path] if not os.path.isdir(ideas_dir) else [
+            os.path.join(ideas_dir, d) for d in sorted(os.listdir(ideas_dir))
+            if os.path.isdir(os.path.join(ideas_dir, d))
+        ]
+
+    if include_next:
+        known = set(calls)
+        for root in roots:
+            next_stage = get_next_stage(root)
+            if next_stage != "completed" and (root, next_stage) not in known:
+                calls.append((root, next_stage))
+    return sorted(calls, key=lambda call: (call[0], stage_sort_key(call[1])))
+
+def suggest_summaries(inputs: List[Dict[str, Any]], overage: int) -> List[Dict[str, Any]]:
+    """Pick the largest inputs whose summarization brings the stage back under budget."""
+    suggestions = []
+    saved = 0
+    for item in sorted(inputs, key=lambda i: i["tokens"], reverse=True):
+        if saved >= overage:
+            break
+        summary_tokens = int(item["tokens"] * SUMMARY_RATIO)
+        saved += item["tokens"] - summary_tokens
+        suggestions.append({
+            "path": item["path"],
+            "tokens": item["tokens"],
+            "summary_tokens": summary_tokens,
+            "savings": item["tokens"] - summary_tokens
+        })
+    return suggestions
+
+def analyze_stage(path: str, stage_num: str, budget: int = DEFAULT_BUDGET) -> Dict[str, Any]:
+    """Token breakdown of one stage call, with budget status and summarization suggestions."""
+    assembled = assemble_stage_prompt(path, stage_num)
+    tiers = {segment["tier"]: segment["tokens"] for segment in assembled["segments"]}
+    total = assembled["tokens"]
+
+    inputs = [
+        {"path": input_path, "tokens": tokens, "share": round(tokens / total, 4) if total else 0.0}
+        for input_path, tokens in sorted(assembled["input_tokens"].items(), key=lambda kv: -kv[1])
+    ]
+    overage = max(0, total - budget)
+
+    return {
+        "pack": assembled["pack"],
+        "stage": stage_num,
+        "template": assembled["template_path"],
+        "total_tokens": total,
+        "standards_tokens": tiers.get("standards", 0),
+        "template_tokens": tiers.get("template", 0),
+        "input_tokens": sum(item["tokens"] for item in inputs),
+        "instruction_tokens": tiers.get("instruction", 0),
+        "inputs": inputs,
+        "over_budget": overage > 0,
+        "overage": overage,
+        "suggestions": suggest_summaries(inputs, overage) if overage else []
+    }
+
+def analyze_budget(path: str, budget: int = DEFAULT_BUDGET, include_next: bool = True) -> Dict[str, Any]:
+    """Analyze every stage call of a run or idea pack against a token budget."""
+    stages = [analyze_stage(stage_path, stage_num, budget)
+              for stage_path, stage_num in list_stage_calls(path, include_next)]
+    return {
+        "path": path,
+        "budget": budget,
+        "stages": stages,
+        "over_budget": sum(1 for stage in stages if stage["over_budget"]),
+        "max_tokens": max((stage["total_tokens"] for stage in stages), default=0)
+    }
+
+def format_budget_table(report: Dict[str, Any]) -> str:
+    """Format a budget report as a per-stage text table."""
+    lines = [
+        f"{'Pack':<44} {'Stage':>6} {'Total':>8} {'Templ':>7} {'Inputs':>8}  Largest input",
+    ]
+    for stage in report["stages"]:
+        largest = stage["inputs"][0] if stage["inputs"] else None
+        largest_text = f"{os.path.basename(largest['path'])} ({largest['tokens']})" if largest else "-"
+        flag = "  OVER" if stage["over_budget"] else ""
+        lines.append(
+            f"{(stage['pack'] or '-')[:44]:<44} {stage['stage']:>6} {stage['total_tokens']:>8} "
+            f"{stage['template_tokens']:>7} {stage['input_tokens']:>8}  {largest_text}{flag}"
+        )
+        for suggestion in stage["suggestions"]:
+            lines.append(f"{'':<52}summarize {suggestion['path']} "
+                         f"(-{suggestion['savings']} tokens)")
+
+    lines.append("")
+    lines.append(f"{report['over_budget']}/{len(report['stages'])} stages over budget "
+                 f"({report['budget']} tokens); largest stage input: {report['max_tokens']} tokens")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory token budget analyzer")
+    parser.add_argument("path", help="Run or idea pack directory")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="Token budget per stage call")
+    parser.add_argument("--no-next", action="store_true", help="Skip the pending next stage")
+    parser.add_argument("--json", action="store_true", help="Print JSON report")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+
+    args = parser.parse_args()
+
+    try:
+        if not os.path.isdir(args.path):
+            print(f"Error: Not a directory: {args.path}", file=sys.stderr)
+            sys.exit(1)
+
+        report = analyze_budget(args.path, args.budget, not args.no_next)
+        if args.output:
+            write_json(args.output, report)
+        if args.json:
+            print(dumps(report).decode("utf-8"))
+        else:
+            print(format_budget_table(report))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
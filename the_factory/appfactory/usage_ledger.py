@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+App Factory Usage Ledger
+
+Every stage model call is appended to the run's meta/usage.jsonl with its
+input/output tokens, prompt-cache tokens, latency, retries and estimated
+cost (idea packs write to their run's ledger, tagged with the pack). Each
+run's ledger is rolled up incrementally into meta/usage_summary.json, and
+the report aggregates those summaries by stage, run, mode or date, or joins
+them to builds/build_index.json for cost per successful build.
+
+Usage:
+    python -m appfactory.usage_ledger record <run_or_pack_path> <stage_num> --input-tokens N --output-tokens N [--latency S]
+    python -m appfactory.usage_ledger summary <run_path>
+    python -m appfactory.usage_ledger report [--by stage|run|mode|date|build] [--json]
+"""
+
+import os
+import re
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .build_registry import load_build_registry
+from .jsonio import append_jsonl, dumps, read_json, write_json
+from .run_archive import list_archived_runs, read_json as read_archived_json
+from .stage_events import RUN_SCOPE, read_events, resolve_event_scope
+
+USAGE_FILENAME = "usage.jsonl"
+USAGE_SUMMARY_FILENAME = "usage_summary.json"
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+
+# USD per million tokens: input, output, cache write, cache read
+MODEL_PRICES = {
+    "claude-sonnet-4-20250514": {"input": 3.0, "output": 15.0, "cache_write": 3.75, "cache_read": 0.30},
+    "claude-opus-4-20250514": {"input": 15.0, "output": 75.0, "cache_write": 18.75, "cache_read": 1.50},
+    "claude-3-5-haiku-20241022": {"input": 0.80, "output": 4.0, "cache_write": 1.0, "cache_read": 0.08},
+}
+
+TOTAL_FIELDS = ["input_tokens", "output_tokens", "cache_write_tokens", "cache_read_tokens",
+                "latency_s", "retries", "cost_usd"]
+REPORT_GROUPS = ["stage", "run", "mode", "date", "build"]
+
+def get_repo_root() -> Path:
+    """Get the App Factory repository root."""
+    return Path(__file__).parent.parent
+
+def detect_run_mode(run_root: str) -> str:
+    """Classify a run as 'dream' or 'pipeline' from its manifest, index or layout."""
+    for name in ["run_manifest.json", "idea_index.json"]:
+        path = os.path.join(run_root, "meta", name)
+        try:
+            mode = read_json(path).get("mode")
+        except (OSError, ValueError, AttributeError):
+            continue
+        if mode:
+            return "dream" if mode == "dream" else "pipeline"
+    if os.path.isdir(os.path.join(run_root, "stage01_dream")):
+        return "dream"
+    return "pipeline"
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int,
+                  cache_write_tokens: int = 0, cache_read_tokens: int = 0) -> float:
+    """Estimated USD cost of one call (unknown models are priced as the default model)."""
+    prices = MODEL_PRICES.get(model, MODEL_PRICES[DEFAULT_MODEL])
+    cost = (input_tokens * prices["input"] + output_tokens * prices["output"]
+            + cache_write_tokens * prices["cache_write"] + cache_read_tokens * prices["cache_read"])
+    return round(cost / 1_000_000, 6)
+
+def record_usage(path: str, stage_num: str, input_tokens: int = 0, output_tokens: int = 0,
+                 cache_write_tokens: int = 0, cache_read_tokens: int = 0, latency_s: float = 0.0,
+                 retries: int = 0, cached: bool = False, model: str = DEFAULT_MODEL,
+                 **fields: Any) -> Dict[str, Any]:
+    """
+    Append one stage call to the run's usage ledger.
+
+    cached marks a call served from the stage cache (no model tokens spent).
+    """
+    run_root, pack = resolve_event_scope(path)
+    now = datetime.now()
+    record = {
+        "ts": now.isoformat(),
+        "date": now.strftime("%Y-%m-%d"),
+        "run_id": os.path.basename(run_root),
+        "pack": pack,
+        "stage": stage_num,
+        "mode": detect_run_mode(run_root),
+        "model": model,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cache_write_tokens": cache_write_tokens,
+        "cache_read_tokens": cache_read_tokens,
+        "latency_s": round(latency_s, 4),
+        "retries": retries,
+        "cached": cached,
+        "cost_usd": estimate_cost(model, input_tokens, output_tokens, cache_write_tokens, cache_read_tokens)
+    }
+    record.update(fields)
+
+    ledger_path = os.path.join(run_root, "meta", USAGE_FILENAME)
+    os.makedirs(os.path.dirname(ledger_path), exist_ok=True)
+    append_jsonl(ledger_path, record)
+    return record
+
+def _empty_totals() -> Dict[str, Any]:
+    totals = {field: 0 for field in TOTAL_FIELDS}
+    totals.update(calls=0, cached_calls=0)
+    return totals
+
+def _add_totals(totals: Dict[str, Any], record: Dict[str, Any]) -> None:
+    totals["calls"] += record.get("calls", 1)
+    totals["cached_calls"] += record.get("cached_calls", 1 if record.get("cached") else 0)
+    for field in TOTAL_FIELDS:
+        totals[field] = round(totals[field] + record.get(field, 0), 6)
+
+def materialize_usage_summary(run_path: str, write: bool = True) -> Dict[str, Any]:
+    """
+    Bring meta/usage_summary.json up to date with the run's ledger.
+
+    Only ledger lines past the recorded offset are read.
+    """
+    run_root, _ = resolve_event_scope(run_path)
+    summary_path = os.path.join(run_root, "meta", USAGE_SUMMARY_FILENAME)
+
+    if os.path.exists(summary_path):
+        summary = read_json(summary_path)
+    else:
+        summary = {"run_id": os.path.basename(run_root), "mode": detect_run_mode(run_root),
+                   "ledger_offset": 0, "totals": _empty_totals(), "stages": {}, "packs": {}, "dates": {}}
+
+    offset = summary["ledger_offset"]
+    records, new_offset = read_events(os.path.join(run_root, "meta", USAGE_FILENAME), offset)
+    if new_offset == offset:
+        return summary
+
+    for record in records:
+        _add_totals(summary["totals"], record)
+        for key, group in [("stages", record["stage"]), ("packs", record.get("pack") or RUN_SCOPE),
+                           ("dates", record.get("date") or record["ts"][:10])]:
+            _add_totals(summary[key].setdefault(group, _empty_totals()), record)
+    summary["ledger_offset"] = new_offset
+
+    if write:
+        write_json(summary_path, summary)
+    return summary
+
+def find_run_paths(runs_dir: Optional[str] = None) -> Dict[str, str]:
+    """Map run id -> run path for every runs/<date>/<run> directory."""
+    runs_dir = Path(runs_dir) if runs_dir else get_repo_root() / "runs"
+    return {path.name: str(path) for path in sorted(runs_dir.glob("*/*"))
+            if path.is_dir() and not path.parent.name.startswith(".")}
+
+def _pack_for_slug(run_path: str, idea_slug: str, packs: List[str]) -> Optional[str]:
+    index_path = os.path.join(run_path, "meta", "idea_index.json")
+    if os.path.exists(index_path):
+        ideas = read_json(index_path).get("ideas", [])
+        # Batch runs key the index by idea id; older runs keep a list
+        for idea in (ideas.values() if isinstance(ideas, dict) else ideas):
+            directory = idea.get("directory") or idea.get("idea_dir")
+            if (idea.get("idea_slug") or idea.get("slug")) == idea_slug and directory in packs:
+                return directory
+
+    normalized = re.sub(r"[^a-z0-9]", "", idea_slug.lower())
+    for pack in packs:
+        slug = pack.split("_", 1)[-1].split("__", 1)[0]
+        if re.sub(r"[^a-z0-9]", "", slug.lower()) == normalized:
+            return pack
+    return None
+
+def build_usage(build: Dict[str, Any], summary: Dict[str, Any], run_path: str) -> Dict[str, Any]:
+    """
+    Usage attributable to one build.
+
+    The build's own idea pack counts in full; run-level calls (e.g. shared
+    stage01 research) are split evenly across the run's idea packs.
+    """
+    packs = [p for p in summary["packs"] if p != RUN_SCOPE]
+    ideas_dir = os.path.join(run_path, "ideas")
+    pack_count = len(os.listdir(ideas_dir)) if os.path.isdir(ideas_dir) else max(1, len(packs))
+    pack = _pack_for_slug(run_path, build.get("origin", {}).get("ideaSlug") or build.get("slug", ""), packs)
+
+    totals = _empty_totals()
+    if pack:
+        _add_totals(totals, summary["packs"][pack])
+    shared = summary["packs"].get(RUN_SCOPE)
+    if shared:
+        portion = {field: shared[field] / max(1, pack_count) for field in TOTAL_FIELDS}
+        portion.update(calls=0, cached_calls=0)
+        _add_totals(totals, portion)
+    return totals
+
+def usage_report(by: str = "stage", runs_dir: Optional[str] = None,
+                 registry: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Aggregate usage across runs by stage, run, mode, date or build (joined to the build registry)."""
+    if by not in REPORT_GROUPS:
+        raise ValueError(f"Unknown grouping: {by}")
+
+    run_paths = find_run_paths(runs_dir)
+    summaries = {}
+    for run_id, run_path in run_paths.items():
+        if os.path.exists(os.path.join(run_path, "meta", USAGE_FILENAME)):
+            summaries[run_id] = materialize_usage_summary(run_path)
+
+    # Archived runs carry the summary materialized when they were packed
+    for run_id, run_path in list_archived_runs(runs_dir or get_repo_root() / "runs").items():
+        if run_id in summaries:
+            continue
+        try:
+            summaries[run_id] = read_archived_json(os.path.join(run_path, "meta", USAGE_SUMMARY_FILENAME))
+            run_paths[run_id] = run_path
+        except FileNotFoundError:
+            continue
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    totals = _empty_totals()
+    for run_id, summary in summaries.items():
+        _add_totals(totals, summary["totals"])
+        if by == "run":
+            groups[run_id] = summary["totals"]
+        elif by == "mode":
+            _add_totals(groups.setdefault(summary["mode"], _empty_totals()), summary["totals"])
+        elif by in ("stage", "date"):
+            for key, values in summary["stages" if by == "stage" else "dates"].items():
+                _add_totals(groups.setdefault(key, _empty_totals()), values)
+
+    report = {"by": by, "groups": groups, "totals": totals}
+    if by == "build":
+        successful = []
+        registry = registry if registry is not None else load_build_registry()
+        for build in registry.get("builds", []):
+            run_id = build.get("origin", {}).get("runId")
+            if run_id not in summaries:
+                continue
+            usage = build_usage(build, summaries[run_id], run_paths[run_id])
+            groups[build.get("buildId") or build.get("slug")] = dict(
+                usage, name=build.get("name"), status=build.get("status"), runId=run_id)
+            if build.get("status") == "success":
+                successful.append(usage["cost_usd"])
+        report["successful_builds"] = len(successful)
+        report["cost_per_successful_build"] = (
+            round(sum(successful) / len(successful), 4) if successful else None
+        )
+    return report
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format a usage report as a text table."""
+    lines = [f"{report['by'].capitalize():<40} {'Calls':>6} {'In tok':>10} {'Out tok':>9} "
+             f"{'Cache rd':>9} {'Latency s':>10} {'Retries':>8} {'Cost $':>9}"]
+    for key in sorted(report["groups"]):
+        row = report["groups"][key]
+        label = f"{key} ({row['name']})" if row.get("name") else key
+        lines.append(f"{label[:40]:<40} {row['calls']:>6} {row['input_tokens']:>10.0f} "
+                     f"{row['output_tokens']:>9.0f} {row['cache_read_tokens']:>9.0f} "
+                     f"{row['latency_s']:>10.1f} {row['retries']:>8.0f} {row['cost_usd']:>9.4f}")
+    totals = report["totals"]
+    lines.append(f"{'TOTAL':<40} {totals['calls']:>6} {totals['input_tokens']:>10.0f} "
+                 f"{totals['output_tokens']:>9.0f} {totals['cache_read_tokens']:>9.0f} "
+                 f"{totals['latency_s']:>10.1f} {totals['retries']:>8.0f} {totals['cost_usd']:>9.4f}")
+    if report["by"] == "build":
+        lines.append(f"\nCost per successful build: {report['cost_per_successful_build']} "
+                     f"({report['successful_builds']} builds with usage)")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="App Factory usage ledger")
+    parser.add_argument("command", choices=["record", "summary", "report"], help="Command to execute")
+    parser.add_argument("path", nargs="?", help="Run or idea pack directory")
+    parser.add_argument("stage_num", nargs="?", help="Stage number (record)")
+    parser.add_argument("--input-tokens", type=int, default=0)
+    parser.add_argument("--output-tokens", type=int, default=0)
+    parser.add_argument("--cache-write-tokens", type=int, default=0)
+    parser.add_argument("--cache-read-tokens", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Call latency in seconds")
+    parser.add_argument("--retries", type=int, default=0)
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--by", choices=REPORT_GROUPS, default="stage", help="Report grouping")
+    parser.add_argument("--runs-dir", help="Runs directory (default: repo runs/)")
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "record":
+            if not args.path or not args.stage_num:
+                print("Error: path and stage_num required for record", file=sys.stderr)
+                sys.exit(1)
+            record = record_usage(args.path, args.stage_num, args.input_tokens, args.output_tokens,
+                                  args.cache_write_tokens, args.cache_read_tokens, args.latency,
+                                  args.retries, model=args.model)
+            print(f"✓ Recorded stage {args.stage_num} usage (${record['cost_usd']:.4f})")
+
+        elif args.command == "summary":
+            if not args.path:
+                print("Error: path required for summary", file=sys.stderr)
+                sys.exit(1)
+            print(dumps(materialize_usage_summary(args.path)).decode("utf-8"))
+
+        elif args.command == "report":
+            report = usage_report(args.by, args.runs_dir)
+            print(dumps(report).decode("utf-8") if args.json else format_report(report))
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
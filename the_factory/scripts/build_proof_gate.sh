@@ -16,6 +16,7 @@
 set -euo pipefail
 
 # Configuration
+REPO_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 METRO_START_TIMEOUT=60
 METRO_PORT=8081
 MAX_RETRIES=3
@@ -106,15 +107,17 @@ run_npm_install() {
 
     cd "$app_dir"
 
-    # Clean node_modules and lock file for fresh install
-    rm -rf node_modules package-lock.json 2>/dev/null || true
+    # Clean node_modules for a fresh install. The lockfile is kept: it keys the
+    # node_modules store, and the store resolves one for apps that have none
+    rm -rf node_modules 2>/dev/null || true
 
     # Run npm install with full output capture
     {
         echo "=== npm install started at $(date -Iseconds) ==="
         echo "Directory: $app_dir"
         echo ""
-        npm install 2>&1
+        # node_modules comes from the lockfile-keyed store (falls back to npm install)
+        (cd "$REPO_ROOT" && python3 -m appfactory.node_modules_store install "$PWD") 2>&1
         local exit_code=$?
         echo ""
         echo "=== npm install completed with exit code $exit_code ==="
@@ -2,22 +2,26 @@
 #
 # Generate Simple Assets
 # 
-# A reliable fallback asset generator using macOS sips
-# Creates deterministic placeholder assets when Node.js/Sharp is unavailable
+# A reliable fallback asset generator for when Node.js/Sharp is unavailable.
+# Renders deterministic assets from the Stage 08 brand output with the
+# pure-Python generator (appfactory.asset_generator), so it runs headless on
+# Linux workers; macOS sips is used only when python3 is missing.
 #
-# Usage: generate_simple_assets.sh <output_dir> [app_name]
+# Usage: generate_simple_assets.sh <output_dir> [app_name] [stage08.json|idea_dir]
 #
 
 set -euo pipefail
 
 OUTPUT_DIR="${1:-./assets}"
 APP_NAME="${2:-App Factory App}"
+BRAND_SPEC="${3:-}"
+REPO_ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 
 # Color configuration
 BLUE_COLOR="#2563EB"
 WHITE_COLOR="#FFFFFF"
 
-echo "🎨 Simple Asset Generator (sips fallback)"
+echo "🎨 Simple Asset Generator"
 echo "=========================================="
 echo "App Name: $APP_NAME"
 echo "Output Dir: $OUTPUT_DIR"
@@ -25,6 +29,8 @@ echo ""
 
 # Ensure output directory exists
 mkdir -p "$OUTPUT_DIR"
+OUTPUT_DIR_ABS="$(cd "$OUTPUT_DIR" && pwd)"
+LOG_FILE="$OUTPUT_DIR/generation_log.json"
 
 # Asset configurations (filename:dimensions)
 ASSETS=(
@@ -75,75 +81,105 @@ create_asset() {
   fi
 }
 
-# Generate all assets
-echo "🚀 Generating placeholder assets..."
-echo ""
-
-GENERATED_COUNT=0
-FAILED_COUNT=0
+# Generate all assets and the generation log with sips (macOS only)
+generate_with_sips() {
+  echo "🚀 Generating placeholder assets with sips..."
+  echo ""
 
-for asset_spec in "${ASSETS[@]}"; do
-  IFS=':' read -r filename dimensions <<< "$asset_spec"
-  if create_asset "$filename" "$dimensions"; then
-    ((GENERATED_COUNT++))
-  else
-    ((FAILED_COUNT++))
-  fi
-done
-
-# Create generation log
-LOG_FILE="$OUTPUT_DIR/generation_log.json"
-TIMESTAMP=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
-
-cat > "$LOG_FILE" << EOF
-{
-  "generation_session": {
-    "timestamp": "$TIMESTAMP",
-    "app_name": "$APP_NAME",
-    "output_directory": "$OUTPUT_DIR",
-    "method": "sips_fallback",
-    "assets_generated": $GENERATED_COUNT,
-    "assets_failed": $FAILED_COUNT
-  },
-  "generated_assets": [
-EOF
-
-FIRST=true
-for asset_spec in "${ASSETS[@]}"; do
-  IFS=':' read -r filename dimensions <<< "$asset_spec"
-  asset_path="$OUTPUT_DIR/$filename"
-  if [[ -f "$asset_path" ]]; then
-    if [[ "$FIRST" == "true" ]]; then
-      FIRST=false
+  for asset_spec in "${ASSETS[@]}"; do
+    IFS=':' read -r filename dimensions <<< "$asset_spec"
+    if create_asset "$filename" "$dimensions"; then
+      ((GENERATED_COUNT++))
     else
-      echo "," >> "$LOG_FILE"
+      ((FAILED_COUNT++))
     fi
-    
-    size=$(wc -c < "$asset_path" | tr -d ' ')
-    hash=$(shasum -a 256 "$asset_path" | cut -d' ' -f1)
-    IFS='x' read -r width height <<< "$dimensions"
-    
-    cat >> "$LOG_FILE" << EOF
-    {
-      "filename": "$filename",
-      "dimensions": {"width": $width, "height": $height},
-      "file_size": $size,
-      "sha256": "$hash"
-    }
+  done
+
+  # Create generation log
+  TIMESTAMP=$(date -u +"%Y-%m-%dT%H:%M:%SZ")
+
+  cat > "$LOG_FILE" << EOF
+  {
+    "generation_session": {
+      "timestamp": "$TIMESTAMP",
+      "app_name": "$APP_NAME",
+      "output_directory": "$OUTPUT_DIR",
+      "method": "sips_fallback",
+      "assets_generated": $GENERATED_COUNT,
+      "assets_failed": $FAILED_COUNT
+    },
+    "generated_assets": [
 EOF
-  fi
-done
 
-cat >> "$LOG_FILE" << EOF
+  FIRST=true
+  for asset_spec in "${ASSETS[@]}"; do
+    IFS=':' read -r filename dimensions <<< "$asset_spec"
+    asset_path="$OUTPUT_DIR/$filename"
+    if [[ -f "$asset_path" ]]; then
+      if [[ "$FIRST" == "true" ]]; then
+        FIRST=false
+      else
+        echo "," >> "$LOG_FILE"
+      fi
+
+      size=$(wc -c < "$asset_path" | tr -d ' ')
+      hash=$(shasum -a 256 "$asset_path" | cut -d' ' -f1)
+      IFS='x' read -r width height <<< "$dimensions"
+
+      cat >> "$LOG_FILE" << EOF
+      {
+        "filename": "$filename",
+        "dimensions": {"width": $width, "height": $height},
+        "file_size": $size,
+        "sha256": "$hash"
+      }
+EOF
+    fi
+  done
+
+  cat >> "$LOG_FILE" << EOF
 
-  ],
-  "tools_used": {
-    "sips_available": true,
-    "sharp_available": false,
-    "platform": "$(uname -s)"
+    ],
+    "tools_used": {
+      "sips_available": true,
+      "sharp_available": false,
+      "platform": "$(uname -s)"
+    }
   }
-}
 EOF
+}
+
+GENERATED_COUNT=0
+FAILED_COUNT=0
+
+if command -v python3 >/dev/null 2>&1; then
+  echo "🚀 Rendering assets with the Python generator..."
+  GEN_ARGS=("$OUTPUT_DIR_ABS")
+  if [[ -n "${2:-}" ]]; then
+    GEN_ARGS+=(--app-name "$APP_NAME")
+  fi
+  if [[ -n "$BRAND_SPEC" ]]; then
+    GEN_ARGS+=(--brand "$(cd "$(dirname "$BRAND_SPEC")" && pwd)/$(basename "$BRAND_SPEC")")
+  fi
+  if (cd "$REPO_ROOT" && python3 -m appfactory.asset_generator generate "${GEN_ARGS[@]}"); then
+    GENERATED_COUNT=${#ASSETS[@]}
+  else
+    FAILED_COUNT=${#ASSETS[@]}
+  fi
+elif command -v sips >/dev/null 2>&1; then
+  generate_with_sips
+else
+  echo "❌ Neither python3 nor sips is available"
+fi
+
+# Losslessly recompress the PNGs, then share identical assets across builds
+# via the content-addressed asset store
+if [[ $GENERATED_COUNT -gt 0 ]] && command -v python3 >/dev/null 2>&1; then
+  (cd "$REPO_ROOT" && python3 -m appfactory.png_optimize optimize "$OUTPUT_DIR_ABS") || \
+    echo "⚠️  PNG optimization failed; keeping unoptimized assets"
+  (cd "$REPO_ROOT" && python3 -m appfactory.asset_store add "$OUTPUT_DIR_ABS") || \
+    echo "⚠️  Asset store unavailable; keeping standalone copies"
+fi
 
 echo ""
 if [[ $GENERATED_COUNT -gt 0 ]]; then
@@ -11,6 +11,9 @@ from pathlib import Path
 from datetime import datetime, timezone
 import re
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from appfactory.jsonio import read_json, write_json
+
 def parse_run_date(run_id, run_date=None):
     """Extract sortable date from run_date or run_id"""
     if run_date:
@@ -118,8 +121,7 @@ def rebuild_global_leaderboard():
     
     # Read raw data
     try:
-        with open(raw_file) as f:
-            raw_data = json.load(f)
+        raw_data = read_json(raw_file)
     except FileNotFoundError:
         print(f"Error: Raw leaderboard file not found: {raw_file}")
         sys.exit(1)
@@ -162,8 +164,7 @@ def rebuild_global_leaderboard():
         'entries': global_entries
     }
     
-    with open(global_json, 'w') as f:
-        json.dump(global_data, f, indent=2, ensure_ascii=False)
+    write_json(global_json, global_data, ensure_ascii=False)
     
     # Write global CSV
     if global_entries:
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test one-pass app scaffolding from the precompiled template manifest.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import app_scaffold
+from appfactory.app_scaffold import (
+    ScaffoldError, compile_segments, get_objects_dir, get_template_dir,
+    load_scaffold_manifest, render_segments, sample_values, scaffold_app
+)
+
+def read_tree(root: Path):
+    """Map relative path to content for every file under root."""
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob("*")) if p.is_file()}
+
+def test_segments_round_trip():
+    """Test that compiled segments render the same text as naive replacement."""
+    text = "name: {{APP_NAME}} ({{APP_NAME}}) {{lower}} {{BUILD_ID}}"
+    segments = compile_segments(text)
+    values = {"APP_NAME": "Demo {{BUILD_ID}}", "BUILD_ID": "b1"}
+    assert render_segments(segments, values) == "name: Demo {{BUILD_ID}} (Demo {{BUILD_ID}}) {{lower}} b1", \
+        "Substitution is one pass: values are never rescanned"
+
+    print("✓ Compiled segments render in one pass")
+
+def test_scaffold_is_deterministic_and_links_static_files():
+    """Test that two scaffolds are identical, complete and share static files only when asked."""
+    manifest = load_scaffold_manifest()
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = Path(tmp) / "first", Path(tmp) / "second"
+        result = scaffold_app(str(first), sample_values(1), link=True)
+        copied = scaffold_app(str(second), sample_values(1))
+        assert copied["linked"] == 0, "Static files are copied by default"
+
+        assert read_tree(first) == read_tree(second)
+        assert result["rendered"] + result["linked"] + result["copied"] == len(manifest["files"])
+        assert (first / "package.json").exists() and not (first / "package.template.json").exists()
+        assert "{{" not in (first / "app.config.js").read_text()
+        assert (first / "app.config.js").read_text().count("Sample App 1") >= 1
+
+        theme = (get_template_dir() / "src" / "ui" / "theme.ts")
+        if "{{" not in theme.read_text():
+            assert (first / "src" / "ui" / "theme.ts").read_bytes() == theme.read_bytes()
+        if result["linked"]:
+            static = next(e for e in manifest["files"].values() if e["segments"] is None)
+            linked = first / static["target"]
+            assert os.stat(linked).st_ino == os.stat(get_objects_dir() / static["sha256"]).st_ino
+            assert os.stat(linked).st_ino != os.stat(get_template_dir() / static["target"]).st_ino, \
+                "Builds must never share inodes with the template sources"
+
+        values = sample_values(2)
+        del values["BUILD_ID"]
+        try:
+            scaffold_app(str(Path(tmp) / "third"), values)
+            assert False, "Missing placeholder values must be rejected"
+        except ScaffoldError as e:
+            assert "BUILD_ID" in str(e)
+        try:
+            scaffold_app(str(first), sample_values(1))
+            assert False, "Non-empty destinations must be rejected"
+        except ScaffoldError:
+            pass
+
+    print("✓ Scaffolds are deterministic and link static files")
+
+def test_values_are_escaped_for_each_file():
+    """Test that quotes and shell syntax in values cannot break or inject into outputs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        values = sample_values(1)
+        values["APP_NAME"] = 'Kid\'s "Focus" $(touch pwned) Timer'
+        values["IDEA_NAME"] = 'The "Focus" idea'
+        build = Path(tmp) / "build"
+        scaffold_app(str(build), values)
+
+        config = (build / "app.config.js").read_text()
+        assert 'name: "Kid\'s \\"Focus\\" $(touch pwned) Timer"' in config
+        assert json.loads((build / "build_meta.json").read_text())["idea"]["ideaName"] == 'The "Focus" idea'
+        install = (build / "install.sh").read_text()
+        assert 'echo "🚀 Installing Kid\'s \\"Focus\\" \\$(touch pwned) Timer dependencies..."' in install
+        if shutil.which("node"):
+            assert subprocess.run(["node", "--check", str(build / "app.config.js")]).returncode == 0
+        assert subprocess.run(["bash", "-n", str(build / "install.sh")]).returncode == 0
+        onboarding = (build / "app" / "onboarding" / "index.tsx").read_text()
+        assert "Welcome to Kid's \"Focus\" $(touch pwned) Timer" in onboarding
+
+        values["EXPO_MODULES"] = "expo-haptics; rm -rf ~"
+        try:
+            scaffold_app(str(Path(tmp) / "unsafe"), values)
+            assert False, "Shell syntax in an unquoted argument list must be rejected"
+        except ScaffoldError as e:
+            assert "EXPO_MODULES" in str(e)
+
+    print("✓ Placeholder values are escaped per file type")
+
+def test_modified_objects_are_not_propagated():
+    """Test that an in-place edit of a shared object is detected and repaired."""
+    original = (app_scaffold.get_objects_dir, app_scaffold.get_manifest_path, app_scaffold._manifest)
+    with tempfile.TemporaryDirectory() as tmp:
+        app_scaffold.get_objects_dir = lambda: Path(tmp) / "objects"
+        app_scaffold.get_manifest_path = lambda: Path(tmp) / "manifest.json"
+        app_scaffold._manifest = None
+        try:
+            first = Path(tmp) / "a"
+            scaffold_app(str(first), sample_values(1), link=True)
+            components = first / "src" / "ui" / "components.tsx"
+            os.chmod(components, 0o644)
+            with open(components, 'a') as f:
+                f.write("// local edit\n")
+
+            second = Path(tmp) / "b"
+            scaffold_app(str(second), sample_values(1), link=True)
+            assert (second / "src" / "ui" / "components.tsx").read_bytes() == \
+                (get_template_dir() / "src" / "ui" / "components.tsx").read_bytes()
+        finally:
+            app_scaffold.get_objects_dir, app_scaffold.get_manifest_path, app_scaffold._manifest = original
+
+    print("✓ Modified template objects are re-stored before linking")
+
+if __name__ == "__main__":
+    test_segments_round_trip()
+    test_scaffold_is_deterministic_and_links_static_files()
+    test_values_are_escaped_for_each_file()
+    test_modified_objects_are_not_propagated()
+    print("\n✓ All app scaffold tests passed")
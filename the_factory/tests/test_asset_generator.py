@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test brand extraction and pure-Python asset generation.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.asset_generator import ASSETS, extract_brand, generate_assets
+from appfactory.png_optimize import decode_pixels, read_chunks
+
+def test_extract_brand_from_stage08_shapes():
+    """Test that colors are classified across the Stage 08 shapes seen in runs."""
+    listed = {
+        "meta": {"idea_name": "WarrantyVault"},
+        "brand_identity": {"visual_identity": {"color_palette": {
+            "primary_colors": [
+                {"color_name": "Vault Blue", "hex_value": "#2563eb", "accessibility_rating": "4.5:1 on white backgrounds"},
+                {"color_name": "Night", "hex_value": "#0D0D0F", "usage": "Primary background"}
+            ],
+            "secondary_colors": [{"color_name": "Warning Orange", "hex_value": "#EA580C"}]
+        }}}
+    }
+    assert extract_brand(listed) == {"app_name": "WarrantyVault", "primary": "#2563EB",
+                                     "secondary": "#EA580C", "background": "#0D0D0F"}
+
+    keyed = {"brand_identity": {"color_palette": {"primary_colors": {"sunshine_yellow": "#FFD93D"},
+                                                  "neutral_colors": {"warm_white": "#FFFBF5"}}}}
+    brand = extract_brand(keyed, app_name="VisualBell")
+    assert brand["primary"] == "#FFD93D" and brand["secondary"] == "#FFFBF5"
+    assert extract_brand({})["primary"] == "#2563EB", "Specs without colors fall back to defaults"
+
+    print("✓ Brand colors are extracted from Stage 08 outputs")
+
+def test_generate_assets_writes_pngs_and_log():
+    """Test that every required asset is rendered at its size, deterministically."""
+    brand = {"app_name": "Demo", "primary": "#2563EB", "secondary": "#EA580C", "background": "#FFFFFF"}
+    with tempfile.TemporaryDirectory() as tmp:
+        log = generate_assets(tmp, brand, workers=1)
+        assert log["generation_session"]["method"] == "python_raster"
+        assert [a["filename"] for a in log["generated_assets"]] == [a[0] for a in ASSETS]
+
+        for filename, width, height, transparent in ASSETS:
+            data = (Path(tmp) / filename).read_bytes()
+            ihdr = read_chunks(data)[0][1]
+            assert int.from_bytes(ihdr[0:4], "big") == width and int.from_bytes(ihdr[4:8], "big") == height
+            assert ihdr[9] == (6 if transparent else 2), f"{filename} alpha channel"
+
+        _, _, rows = decode_pixels((Path(tmp) / "icon.png").read_bytes())
+        assert rows[0][:4] == bytes([0x25, 0x63, 0xEB, 255]), "Icon background is the primary color"
+        _, _, rows = decode_pixels((Path(tmp) / "adaptive-icon.png").read_bytes())
+        assert rows[0][3] == 0 and rows[512][512 * 4 + 3] == 255, "Adaptive icon is a transparent foreground"
+
+        with open(Path(tmp) / "generation_log.json") as f:
+            first = json.load(f)["generated_assets"]
+        again = generate_assets(tmp, brand, workers=1)["generated_assets"]
+        assert [a["sha256"] for a in first] == [a["sha256"] for a in again]
+
+    print("✓ Assets are generated at the required sizes")
+
+if __name__ == "__main__":
+    test_extract_brand_from_stage08_shapes()
+    test_generate_assets_writes_pngs_and_log()
+    print("\n✓ All asset generator tests passed")
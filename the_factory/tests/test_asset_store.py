@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed asset store and build dedupe.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import appfactory.asset_store as asset_store
+from appfactory.asset_store import dedupe, hash_file
+
+def write(path: Path, data: bytes):
+    """Write a binary file, creating parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+def test_dedupe_links_builds_and_updates_logs():
+    """Test that duplicate assets become links to one object and logs reference it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store_dir = Path(tmp) / "store"
+        original = asset_store.get_store_dir
+        asset_store.get_store_dir = lambda: store_dir
+        try:
+            icon = b"\x89PNG icon" * 1000
+            builds = Path(tmp) / "builds"
+            write(builds / "a" / "assets" / "icon.png", icon)
+            write(builds / "a" / "assets" / "adaptive-icon.png", icon)
+            write(builds / "b" / "assets" / "icon.png", icon)
+            write(builds / "b" / "assets" / "splash.png", b"\x89PNG splash")
+            write(builds / "b" / "node_modules" / "pkg" / "logo.png", icon)
+            with open(builds / "a" / "assets" / "generation_log.json", 'w') as f:
+                json.dump({"generated_assets": [{"filename": "icon.png", "sha256": "stale"}]}, f)
+
+            preview = dedupe(str(builds), dry_run=True)
+            report = dedupe(str(builds))
+            assert preview["reclaimed"] == report["reclaimed"] == 2 * len(icon)
+            assert report["files"] == 4 and report["objects"] == 2, "node_modules is skipped"
+
+            inodes = {os.stat(builds / b / "assets" / n).st_ino
+                      for b, n in [("a", "icon.png"), ("a", "adaptive-icon.png"), ("b", "icon.png")]}
+            assert len(inodes) == 1
+            assert (builds / "b" / "assets" / "splash.png").read_bytes() == b"\x89PNG splash"
+            assert not os.access(asset_store.object_path(hash_file(str(builds / "b" / "assets" / "icon.png"))), os.W_OK) \
+                or os.geteuid() == 0
+
+            with open(builds / "a" / "assets" / "generation_log.json") as f:
+                logged = json.load(f)["generated_assets"][0]
+            assert logged["sha256"] == hash_file(str(builds / "a" / "assets" / "icon.png"))
+            assert logged["store_object"].endswith(logged["sha256"])
+
+            again = dedupe(str(builds))
+            assert again["linked"] == 0 and again["reclaimed"] == 0
+        finally:
+            asset_store.get_store_dir = original
+            for dirpath, dirnames, filenames in os.walk(store_dir):
+                for filename in filenames:
+                    os.chmod(os.path.join(dirpath, filename), 0o644)
+
+    print("✓ Dedupe links duplicate assets to one store object")
+
+if __name__ == "__main__":
+    test_dedupe_links_builds_and_updates_logs()
+    print("\n✓ All asset store tests passed")
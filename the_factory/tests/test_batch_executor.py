@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Test the concurrent idea-pack batch executor.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import batch_executor
+from appfactory.logging_utils import get_next_stage
+
+def make_batch_run(root: Path, pack_count: int = 3) -> Path:
+    """Create a minimal batch run with idea packs that still need stages 02-03."""
+    run = root / "batch-demo"
+    (run / "stage01" / "stages").mkdir(parents=True)
+    (run / "meta").mkdir()
+    with open(run / "stage01" / "stages" / "stage01.json", 'w') as f:
+        json.dump({"ideas": []}, f)
+
+    ideas = {}
+    for i in range(1, pack_count + 1):
+        directory = f"{i:02d}_idea__idea_{i:03d}"
+        # Batch runs key the idea index by idea id
+        ideas[f"idea_{i:03d}"] = {"rank": i, "directory": directory}
+        (run / "ideas" / directory / "meta").mkdir(parents=True)
+        with open(run / "ideas" / directory / "meta" / "stage_status.json", 'w') as f:
+            json.dump({"status": "unbuilt", "stages_completed": ["01"],
+                       "stages_remaining": ["02", "03"]}, f)
+        with open(run / "ideas" / directory / "meta" / "boundary.json", 'w') as f:
+            json.dump({"boundary_path": f"runs/2026-01-07/batch-demo/ideas/{directory}/",
+                       "allowed_reads": ["runs/2026-01-07/batch-demo/stage01/stages/stage01.json"]}, f)
+
+    with open(run / "meta" / "idea_index.json", 'w') as f:
+        json.dump({"ideas": ideas}, f)
+    return run
+
+def test_batch_runs_packs_concurrently_within_boundaries():
+    """Test that all packs advance concurrently and only see their own inputs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_batch_run(Path(tmp))
+        active = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+        seen_inputs = {}
+
+        def run_stage(stage_num, stage_json_path, input_paths):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            seen_inputs[stage_json_path] = input_paths
+            threading.Event().wait(0.05)
+            with open(stage_json_path, 'w') as f:
+                json.dump({"stage": stage_num}, f)
+            with lock:
+                active["now"] -= 1
+
+        result = batch_executor.run_batch(str(run), run_stage, workers=3)
+
+        assert all(pack["status"] == "completed" for pack in result["packs"].values())
+        assert active["peak"] == 3, "Packs should run concurrently"
+        for pack_dir in (run / "ideas").iterdir():
+            assert get_next_stage(str(pack_dir)) == "completed"
+            stage03_inputs = seen_inputs[str(pack_dir / "stages" / "stage03.json")]
+            assert all(path.startswith(str(pack_dir)) or path.endswith("stage01.json")
+                       for path in stage03_inputs)
+            assert str(pack_dir / "stages" / "stage02.json") in stage03_inputs
+
+        boundary = batch_executor.load_boundary(str(run / "ideas" / "01_idea__idea_001"))
+        try:
+            batch_executor.check_boundary(boundary, str(run / "ideas" / "02_idea__idea_002" / "stages"))
+            assert False, "Sibling pack should be outside the boundary"
+        except batch_executor.BoundaryViolation:
+            pass
+
+    print("✓ Batch packs run concurrently within their boundaries")
+
+def test_batch_resumes_after_failure():
+    """Test that a failed pack stops alone and a rerun resumes from its checkpoint."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_batch_run(Path(tmp), pack_count=2)
+        calls = []
+
+        def flaky_stage(stage_num, stage_json_path, input_paths):
+            calls.append((os.path.basename(os.path.dirname(os.path.dirname(stage_json_path))), stage_num))
+            if "02_idea" in stage_json_path and stage_num == "03":
+                raise RuntimeError("model unavailable")
+            with open(stage_json_path, 'w') as f:
+                json.dump({"stage": stage_num}, f)
+
+        result = batch_executor.run_batch(str(run), flaky_stage, workers=2, max_attempts=1)
+        assert result["packs"]["01_idea__idea_001"]["status"] == "completed"
+        assert result["packs"]["02_idea__idea_002"]["status"] == "failed"
+        assert get_next_stage(str(run / "ideas" / "02_idea__idea_002")) == "03"
+
+        def steady_stage(stage_num, stage_json_path, input_paths):
+            calls.append(("resume", stage_num))
+            with open(stage_json_path, 'w') as f:
+                json.dump({"stage": stage_num}, f)
+
+        result = batch_executor.run_batch(str(run), steady_stage, workers=2)
+        assert list(result["packs"]) == ["02_idea__idea_002"], "Completed packs should be skipped"
+        assert [c for c in calls if c[0] == "resume"] == [("resume", "03")]
+
+    print("✓ Batch resumes after a failed stage")
+
+def test_retried_stage_usage_is_summed():
+    """Test that every attempt of a retried stage is billed in the usage ledger."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_batch_run(Path(tmp), pack_count=1)
+        pack = run / "ideas" / "01_idea__idea_001"
+        attempts = []
+
+        def retried_stage(stage_num, stage_json_path, input_paths):
+            attempts.append(stage_num)
+            if len(attempts) == 1:
+                error = RuntimeError("truncated response")
+                error.usage = {"input_tokens": 1000, "output_tokens": 200}
+                raise error
+            with open(stage_json_path, 'w') as f:
+                json.dump({"stage": stage_num}, f)
+            return {"input_tokens": 1000, "output_tokens": 300}
+
+        result = batch_executor.execute_pack_stage(
+            str(pack), "02", batch_executor.load_boundary(str(pack)), retried_stage)
+        assert result["status"] == "completed" and result["attempts"] == 2
+
+        with open(run / "meta" / "usage.jsonl") as f:
+            records = [json.loads(line) for line in f]
+        assert len(records) == 1
+        assert records[0]["input_tokens"] == 2000 and records[0]["output_tokens"] == 500
+        assert records[0]["retries"] == 1
+
+    print("✓ Usage of every attempt of a retried stage is recorded")
+
+def test_pack_stages_and_inputs():
+    """Test pack stage ordering, stage output inputs and planning on a real batch run."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_batch_run(Path(tmp), pack_count=1)
+        pack = run / "ideas" / "01_idea__idea_001"
+        with open(pack / "meta" / "stage_status.json", 'w') as f:
+            json.dump({"status": "unbuilt", "stages_completed": []}, f)
+        assert batch_executor.next_pack_stage(str(pack)) == "02", "Stage 01 runs at run level"
+
+        (pack / "stages").mkdir()
+        for name in ["stage02.json", "stage02_validation.json", "stage02.5.json", "stage10.json"]:
+            (pack / "stages" / name).write_text("{}")
+        inputs = batch_executor.collect_stage_inputs(str(pack), "03", batch_executor.load_boundary(str(pack)))
+        assert [os.path.basename(p) for p in inputs] == ["stage01.json", "stage02.json", "stage02.5.json"]
+
+        real = Path(__file__).parent.parent / "runs" / "2026-01-07" / "batch-specs-010718-5233"
+        shutil.copytree(real, Path(tmp) / real.name)
+        plan = batch_executor.plan_batch(str(Path(tmp) / real.name))
+        assert len(plan) == len(os.listdir(real / "ideas"))
+        assert all(entry["next_stage"] == "02" for entry in plan)
+
+        result = subprocess.run([sys.executable, "-m", "appfactory.batch_executor", "run", str(run)],
+                                cwd=Path(__file__).parent.parent, capture_output=True, text=True)
+        assert result.returncode == 1 and "--standin" in result.stderr
+        assert not (run / "ideas" / "01_idea__idea_001" / "stages" / "stage03.json").exists()
+
+    print("✓ Packs start at stage 02 and only read earlier stage outputs")
+
+if __name__ == "__main__":
+    test_batch_runs_packs_concurrently_within_boundaries()
+    test_batch_resumes_after_failure()
+    test_retried_stage_usage_is_summed()
+    test_pack_stages_and_inputs()
+    print("\n✓ All batch executor tests passed")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test retention-policy garbage collection of builds, runs and stores.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import asset_store, build_gc, node_modules_store
+from appfactory.build_gc import DEFAULT_POLICY, run_gc
+
+def make_app(path: Path, lock: bool = False) -> Path:
+    (path / "app").mkdir(parents=True)
+    (path / "app" / "package.json").write_text(json.dumps({"name": path.name}))
+    if lock:
+        (path / "app" / "package-lock.json").write_text(json.dumps({"lockfileVersion": 3, "packages": {}}))
+    return path / "app"
+
+def make_tree(root: Path) -> None:
+    builds = root / "builds"
+    slug = builds / "01_notes__notes_001"
+    make_app(slug / "build_20260101_000000")
+    make_app(slug / "build_20260102_000000")
+    newest = make_app(slug / "build_20260103_000000", lock=True)
+    make_app(slug / "notes_working")
+    (slug / "notes_working" / "locked").mkdir()
+    (slug / "notes_working" / "locked" / "log.txt").write_text("x" * 100)
+    os.chmod(slug / "notes_working" / "locked", 0o555)
+    failed = make_app(builds / "02_timer__timer_002" / "build_20260104_000000")
+    (failed.parent / "meta").mkdir()
+    (failed.parent / "meta" / "build_validation.json").write_text(json.dumps({"errors": ["Missing app.json"]}))
+    (builds / "build_index.json").write_text(json.dumps({"builds": [
+        {"slug": "notes", "status": "success", "createdAt": "2026-01-01T00:00:00Z",
+         "buildPath": "builds/01_notes__notes_001/build_20260101_000000/app",
+         "origin": {"runId": "run-done"}}]}))
+
+    # One node_modules file shared with a store entry still in use, one private file
+    entry = root / "store" / node_modules_store.lockfile_key(str(newest))
+    (entry / "node_modules" / "pkg").mkdir(parents=True)
+    (entry / "node_modules" / "pkg" / "index.js").write_text("s" * 1000)
+    os.chmod(entry / "node_modules" / "pkg" / "index.js", 0o444)
+    (newest / "node_modules" / "pkg").mkdir(parents=True)
+    os.link(entry / "node_modules" / "pkg" / "index.js", newest / "node_modules" / "pkg" / "index.js")
+    (newest / "node_modules" / "pkg" / "local.js").write_text("l" * 10)
+    (root / "store" / "unused").mkdir()
+    (root / "store" / "unused" / "store_entry.json").write_text("{}")
+
+    # Asset objects: one linked only from the superseded build, one from a kept build
+    for build, content in [("build_20260102_000000", b"old-icon"), ("build_20260103_000000", b"new-icon")]:
+        icon = slug / build / "app" / "assets" / "icon.png"
+        icon.parent.mkdir()
+        icon.write_bytes(content)
+        asset_store.link_asset(str(icon))
+
+    runs = root / "runs" / "2026-01-01"
+    (runs / "run-abandoned" / "meta").mkdir(parents=True)
+    (runs / "run-abandoned" / "inputs").mkdir()
+    (runs / "run-abandoned" / "inputs" / "00_intake.md").write_text("intake")
+    (runs / "run-specs" / "stage01").mkdir(parents=True)
+    (runs / "run-specs" / "stage01" / "stage01.json").write_text("{}")
+    (runs / "run-done" / "meta").mkdir(parents=True)
+
+def test_gc_applies_retention_policy():
+    """Test the dry-run plan, hard-link aware sizes and parallel deletion."""
+    original = (asset_store.get_store_dir, node_modules_store.get_store_dir, build_gc.get_repo_root)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        asset_store.get_store_dir = lambda: root / "assets"
+        node_modules_store.get_store_dir = lambda: root / "store"
+        build_gc.get_repo_root = lambda: root
+        try:
+            make_tree(root)
+            policy = dict(DEFAULT_POLICY, keep_successful=1)
+            today = datetime.now() + timedelta(days=40)
+            args = (str(root / "builds"), str(root / "runs"), policy)
+
+            plan = run_gc(*args, dry_run=True, today=today)
+            removed = {(a["kind"], os.path.relpath(a["path"], tmp)) for a in plan["actions"]}
+            notes = "builds/01_notes__notes_001"
+            old_icon = asset_store.object_path(hashlib.sha256(b"old-icon").hexdigest())
+            assert removed == {
+                ("superseded_build", f"{notes}/build_20260102_000000"),
+                ("scratch", f"{notes}/notes_working"),
+                ("failed_build", "builds/02_timer__timer_002/build_20260104_000000"),
+                ("node_modules", f"{notes}/build_20260103_000000/app/node_modules"),
+                ("store_entry", "store/unused"),
+                ("asset_object", os.path.relpath(old_icon, tmp)),
+                ("abandoned_run", "runs/2026-01-01/run-abandoned"),
+            }, removed
+
+            node_modules = next(a for a in plan["actions"] if a["kind"] == "node_modules")
+            assert node_modules["bytes"] == 1010 and node_modules["reclaimable"] == 10, \
+                "Files shared with a kept store entry are not reclaimable"
+            superseded = next(a for a in plan["actions"] if a["kind"] == "superseded_build")
+            assert superseded["reclaimable"] == superseded["bytes"], "The old icon's object goes too"
+            assert (root / notes / "notes_working").exists(), "A dry run deletes nothing"
+
+            report = run_gc(*args, workers=4, today=today)
+            assert report["errors"] == []
+            assert not (root / notes / "notes_working").exists(), "Read-only directories are removed"
+            assert not (root / notes / "build_20260102_000000").exists()
+            assert not (root / "builds" / "02_timer__timer_002").exists(), "Emptied slug directories go"
+            assert (root / notes / "build_20260101_000000").exists(), "Registered builds are kept"
+            assert (root / notes / "build_20260103_000000" / "app" / "assets" / "icon.png").exists()
+            assert not (root / notes / "build_20260103_000000" / "app" / "node_modules").exists()
+            assert (root / "runs" / "2026-01-01" / "run-specs").exists()
+            assert (root / "runs" / "2026-01-01" / "run-done").exists()
+            assert asset_store.store_stats()["objects"] == 1
+
+            assert run_gc(*args, dry_run=True, today=today)["actions"] == []
+        finally:
+            asset_store.get_store_dir, node_modules_store.get_store_dir, build_gc.get_repo_root = original
+
+    print("✓ Garbage collection follows the retention policy")
+
+if __name__ == "__main__":
+    test_gc_applies_retention_policy()
+    print("\n✓ All build gc tests passed")
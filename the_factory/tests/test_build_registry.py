@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the build registry lookup index and dream build reuse.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import build_registry
+from appfactory.build_registry import (
+    build_registry_index, clone_build_tree, find_build_by_dream_prompt_hash,
+    find_pipeline_build, register_dream_build, register_pipeline_build, reuse_dream_build
+)
+
+def make_build(path: Path) -> Path:
+    """Create a small build tree with a symlinked file and a symlinked directory."""
+    (path / "app" / "src").mkdir(parents=True)
+    (path / "app" / "package.json").write_text('{"name": "notes"}')
+    (path / "app" / "src" / "App.tsx").write_text("export default function App() {}\n")
+    os.symlink("App.tsx", path / "app" / "src" / "index.tsx")
+    os.symlink("src", path / "app" / "lib")
+    return path
+
+def test_index_picks_latest_successful_build():
+    """Test that the index keeps the newest successful build per origin."""
+    registry = {"builds": [
+        {"buildId": "old", "status": "success", "createdAt": "2026-01-01T00:00:00",
+         "origin": {"mode": "dream", "dreamPromptHash": "abc"}},
+        {"buildId": "new", "status": "success", "createdAt": "2026-01-02T00:00:00",
+         "origin": {"mode": "dream", "dreamPromptHash": "abc"}},
+        {"buildId": "broken", "status": "failed", "createdAt": "2026-01-03T00:00:00",
+         "origin": {"mode": "dream", "dreamPromptHash": "abc"}},
+        {"buildId": "pipe", "status": "success", "createdAt": "2026-01-01T00:00:00",
+         "origin": {"mode": "pipeline", "runId": "run-1", "ideaSlug": "notes"}},
+    ]}
+    index = build_registry_index(registry)
+    assert index["byDreamPromptHash"]["abc"]["buildId"] == "new"
+    assert index["byPipelineOrigin"]["run-1::notes"]["buildId"] == "pipe"
+
+    print("✓ Registry index keeps the latest successful build per origin")
+
+def test_lookups_follow_registry_changes_and_clone_builds():
+    """Test hash and pipeline lookups see new registrations and reuse clones the tree."""
+    original = build_registry.get_build_registry_path
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_registry.get_build_registry_path = lambda: root / "builds" / "build_index.json"
+        try:
+            assert find_build_by_dream_prompt_hash("abc") is None
+
+            source = make_build(root / "builds" / "notes" / "build_1")
+            register_dream_build("Notes", "notes", str(source), "success", "dream-1", "abc")
+            assert find_build_by_dream_prompt_hash("abc")["buildPath"] == str(source), \
+                "The cached index is rebuilt when the registry changes"
+            register_pipeline_build("Timer", "timer", str(root / "timer"), "success", "run-1", "timer")
+            assert find_pipeline_build("run-1", "timer")["slug"] == "timer"
+            assert find_pipeline_build("run-1", "notes") is None
+
+            dest = root / "builds" / "notes" / "build_2"
+            reused = reuse_dream_build("abc", "Notes", "notes", str(dest), "dream-2")
+            assert reused["buildPath"] == str(dest) and reused["origin"]["runId"] == "dream-2"
+            assert (dest / "app" / "package.json").read_text() == '{"name": "notes"}'
+            assert os.readlink(dest / "app" / "src" / "index.tsx") == "App.tsx"
+            assert os.readlink(dest / "app" / "lib") == "src", "Symlinked directories are kept"
+            assert (dest / "app" / "lib" / "App.tsx").exists()
+            assert reuse_dream_build("unknown", "Notes", "notes", str(dest), "dream-3") is None
+
+            try:
+                clone_build_tree(str(source), str(dest))
+                assert False, "Cloning into a non-empty directory should fail"
+            except FileExistsError:
+                pass
+        finally:
+            build_registry.get_build_registry_path = original
+
+    print("✓ Registry lookups follow changes and reuse clones build trees")
+
+if __name__ == "__main__":
+    test_index_picks_latest_successful_build()
+    test_lookups_follow_registry_changes_and_clone_builds()
+    print("\n✓ All build registry tests passed")
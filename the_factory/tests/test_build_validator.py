@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test streamed command capture in the build validator.
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.build_validator import OUTPUT_HEAD_BYTES, OUTPUT_TAIL_BYTES, run_command
+
+def process_alive(pid: int) -> bool:
+    """Whether a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            return not any(line.startswith("State:") and "Z" in line for line in f)
+    except FileNotFoundError:
+        return False
+
+def test_output_is_streamed_and_bounded():
+    """Test that full output goes to the log and the result keeps head, tail and hash."""
+    with tempfile.TemporaryDirectory() as tmp:
+        script = "import sys; sys.stdout.write('line\\n' * 5000 + 'END'); sys.stderr.write('warn')"
+        result = run_command([sys.executable, "-c", script], log_dir=Path(tmp), name="chatty")
+
+        log = Path(tmp) / "chatty.stdout.log"
+        data = log.read_bytes()
+        assert result["success"] and result["stdoutLog"] == str(log)
+        assert result["stdoutBytes"] == len(data) == 25003
+        assert result["stdoutSha256"] == hashlib.sha256(data).hexdigest()
+        assert result["stdoutTruncated"] and result["stdout"].endswith("END")
+        assert len(result["stdout"]) < OUTPUT_HEAD_BYTES + OUTPUT_TAIL_BYTES + 100
+        assert result["stderr"] == "warn" and not result["stderrTruncated"]
+
+        small = run_command([sys.executable, "-c", "print('v1.2.3')"])
+        assert small["stdout"] == "v1.2.3" and "stdoutLog" not in small
+
+    print("✓ Command output is streamed to logs and bounded in results")
+
+def test_timeout_kills_process_group():
+    """Test that a timed-out command's children are killed with it."""
+    if not os.path.isdir("/proc"):
+        print("✓ Skipped process group test (no /proc)")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_file = Path(tmp) / "child.pid"
+        started = time.time()
+        result = run_command(["sh", "-c", f"sleep 60 & echo $! > {pid_file}; wait"], timeout=1)
+        assert result["timedOut"] and not result["success"]
+        assert result["stderr"].startswith("Command timed out after 1s")
+        assert time.time() - started < 10
+
+        child = int(pid_file.read_text())
+        for _ in range(50):
+            if not process_alive(child):
+                break
+            time.sleep(0.05)
+        assert not process_alive(child), "The backgrounded child must be killed with its group"
+
+    print("✓ Timeouts kill the whole process group")
+
+def test_unknown_lint_threshold_is_rejected():
+    """Test that a misspelled --lint-threshold fails instead of silently disabling the lint gate."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result = subprocess.run(
+            [sys.executable, "-m", "appfactory.build_validator", "validate", tmp, "--lint-threshold", "warn"],
+            cwd=Path(__file__).parent.parent, capture_output=True, text=True, timeout=60)
+        assert result.returncode == 1
+        assert "Unknown lint threshold 'warn'" in result.stderr
+        assert os.listdir(tmp) == [], "Nothing is validated or written"
+
+    print("✓ Unknown lint thresholds are rejected")
+
+if __name__ == "__main__":
+    test_output_is_streamed_and_bounded()
+    test_timeout_kills_process_group()
+    test_unknown_lint_threshold_is_rejected()
+    print("\n✓ All build validator tests passed")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the bundle-size analyzer and its budgets.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.bundle_analyzer import analyze_build, find_imports, parse_budget_overrides
+
+def write(path: Path, content) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content if isinstance(content, str) else json.dumps(content))
+
+def make_build(root: Path) -> Path:
+    """An expo-router build with a path alias, an unused dependency and installed packages."""
+    build = root / "app"
+    write(build / "package.json", {
+        "main": "expo-router/entry",
+        "dependencies": {"expo": "~51.0.0", "expo-router": "~3.5.0", "moment": "^2.30.0",
+                         "date-fns": "^3.0.0", "left-pad": "^1.3.0"}
+    })
+    write(build / "tsconfig.json", '{\n  // comments are allowed\n  "compilerOptions": {"paths": {"@/*": ["src/*"]},},\n}')
+    write(build / "app" / "_layout.tsx", "import { Stack } from 'expo-router';\nimport { format } from '@/utils/dates';\n")
+    write(build / "app" / "index.tsx", "import type { Item } from '@/types';\nimport moment from 'moment';\n"
+          "const icon = require('../assets/icon.png');\n")
+    write(build / "src" / "utils" / "dates.ts", "export { format } from 'date-fns/format';\nimport './missing';\n")
+    write(build / "assets" / "icon.png", b"\x89PNG" + bytes(6000))
+
+    modules = build / "node_modules"
+    for name, size, deps in [("moment", 3000, {}), ("date-fns", 2000, {"tslib": "*"}), ("tslib", 500, {}),
+                             ("left-pad", 100, {}), ("expo", 50, {}), ("expo-router", 50, {})]:
+        write(modules / name / "package.json", {"name": name, "dependencies": deps})
+        write(modules / name / "index.js", "x" * size)
+    return build
+
+def test_find_imports():
+    """Test import extraction (type-only imports and comments excluded)."""
+    source = ("import React from 'react';\nimport type { A } from './types';\n// import x from 'commented';\n"
+              "export * from './reexport';\nconst lazy = import('./lazy');\nrequire(\"./legacy\");\n")
+    assert find_imports(source) == ["react", "./reexport", "./lazy", "./legacy"]
+
+    assert parse_budget_overrides(["asset_bytes=10"]) == {"asset_bytes": 10}
+    try:
+        parse_budget_overrides(["unknown=1"])
+        assert False, "Unknown budgets must be rejected"
+    except ValueError:
+        pass
+
+    print("✓ Imports are extracted from sources")
+
+def test_analyze_build_against_budgets():
+    """Test graph walk, package attribution, unused dependencies and budget violations."""
+    with tempfile.TemporaryDirectory() as tmp:
+        build = make_build(Path(tmp))
+        analysis = analyze_build(build, {"asset_bytes": 1000, "dependency_count": 10})
+
+        assert analysis["entry_points"] == ["app/_layout.tsx", "app/index.tsx"]
+        assert analysis["source_files"] == 3, "Alias import of src/utils/dates.ts must resolve"
+        assert [u["import"] for u in analysis["unresolved_imports"]] == ["./missing"]
+        assert set(analysis["packages"]) == {"expo-router", "moment", "date-fns"}
+        date_fns = analysis["packages"]["date-fns"]
+        assert date_fns["with_dependencies_bytes"] > date_fns["installed_bytes"], "tslib is attributed to date-fns"
+        assert analysis["dependencies"]["unused"] == ["left-pad"]
+        assert [h["package"] for h in analysis["heavy_imports"]] == ["moment"]
+        assert analysis["assets"]["referenced"] == 1
+        assert [v["budget"] for v in analysis["budget_violations"]] == ["asset_bytes"]
+
+        assert analyze_build(build, {"asset_bytes": 10_000})["budget_violations"] == []
+
+    print("✓ Builds are analyzed against budgets")
+
+if __name__ == "__main__":
+    test_find_imports()
+    test_analyze_build_against_budgets()
+    print("\n✓ All bundle analyzer tests passed")
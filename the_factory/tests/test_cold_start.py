@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test cold-start analysis and per-build regression records.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.cold_start import analyze_cold_start, cold_start_trend, record_cold_start
+
+LAYOUT = """import { useEffect, useState } from 'react';
+import { Stack } from 'expo-router';
+import Purchases from 'react-native-purchases';
+import { DataProvider } from '../src/DataContext';
+import { hasOnboarded } from '../src/storage';
+
+export default function RootLayout() {
+  const [isLoading, setIsLoading] = useState(true);
+
+  useEffect(() => {
+    const init = async () => {
+      await hasOnboarded();
+      await Purchases.configure({ apiKey: 'key' });
+      setIsLoading(false);
+    };
+    init();
+  }, []);
+
+  if (isLoading) {
+    return null;
+  }
+  return <DataProvider><Stack /></DataProvider>;
+}
+"""
+
+DATA_CONTEXT = """import React, { useEffect } from 'react';
+import AsyncStorage from '@react-native-async-storage/async-storage';
+import * as Notifications from 'expo-notifications';
+
+Notifications.setNotificationHandler({ handleNotification: async () => ({}) });
+
+export function DataProvider({ children }) {
+  useEffect(() => {
+    loadItems();
+  }, []);
+
+  const loadItems = async () => {
+    const raw = await AsyncStorage.getItem('items');
+  };
+
+  const removeItem = async (id) => {
+    await AsyncStorage.getItem('items');
+  };
+
+  return children;
+}
+"""
+
+STORAGE = """import AsyncStorage from '@react-native-async-storage/async-storage';
+
+export const hasOnboarded = async () => {
+  return (await AsyncStorage.getItem('onboarded')) === 'true';
+};
+"""
+
+def make_build(root: Path, routes: int) -> Path:
+    build = root / "build_1" / "app"
+    (build / "app").mkdir(parents=True)
+    (build / "src").mkdir()
+    (build / "package.json").write_text(json.dumps({"main": "expo-router/entry",
+                                                     "dependencies": {"expo-router": "~3.5.0"}}))
+    (build / "build_meta.json").write_text(json.dumps({"generation": {"templateVersion": "3.1"}}))
+    (build / "app" / "_layout.tsx").write_text(LAYOUT)
+    for index in range(routes):
+        (build / "app" / f"screen{index}.tsx").write_text(
+            "import { Text } from 'react-native';\nexport default () => <Text>" + "x" * 2000 + "</Text>;\n")
+    (build / "src" / "DataContext.tsx").write_text(DATA_CONTEXT)
+    (build / "src" / "storage.ts").write_text(STORAGE)
+    return build
+
+def test_analyze_cold_start():
+    """Test startup work detection, first-frame blocking and suggested actions."""
+    with tempfile.TemporaryDirectory() as tmp:
+        build = make_build(Path(tmp), routes=3)
+        analysis = analyze_cold_start(build)
+
+        assert analysis["template_version"] == "3.1" and analysis["eager_routes"] == 3
+        tasks = {(t["kind"], t["file"], t["line"]): t for t in analysis["tasks"]}
+        held = tasks[("storage_read", "src/storage.ts", 4)]
+        assert held["blocking"], "The layout renders nothing until the onboarding flag is read"
+        assert tasks[("sdk_init", "app/_layout.tsx", 13)]["blocking"]
+        assert not tasks[("storage_read", "src/DataContext.tsx", 13)]["blocking"], "Provider effects run after"
+        assert ("storage_read", "src/DataContext.tsx", 17) not in tasks, "Event handlers are not startup work"
+        assert tasks[("notification_setup", "src/DataContext.tsx", 5)]["phase"] == "module_load"
+        assert analysis["providers"] == [{"name": "DataProvider", "file": "src/DataContext.tsx",
+                                          "holds_first_frame": False, "tasks": 1}]
+
+        estimate = analysis["estimate"]
+        assert estimate["first_frame_ms"] > estimate["module_load_ms"] > 0
+        actions = {a["id"] for a in analysis["actions"]}
+        assert {"lazy-routes", "defer-sdk-init", "render-before-hydration", "concurrent-init",
+                "lazy-package"} <= actions
+
+    print("✓ Startup work is reconstructed with actions")
+
+def test_record_cold_start_tracks_regressions():
+    """Test per-build records, regression detection and the per-template trend."""
+    with tempfile.TemporaryDirectory() as tmp:
+        build = make_build(Path(tmp), routes=1)
+        assert record_cold_start(build, analyze_cold_start(build)) == {}
+        meta = build.parent / "meta"
+        assert json.loads((meta / "cold_start.json").read_text())["root"] == "app/_layout.tsx"
+
+        for index in range(1, 12):
+            (build / "app" / f"screen{index}.tsx").write_text((build / "app" / "screen0.tsx").read_text())
+        regression = record_cold_start(build, analyze_cold_start(build))
+        assert regression["first_frame_ms"]["after"] > regression["first_frame_ms"]["before"]
+        assert len((meta / "cold_start_history.jsonl").read_text().splitlines()) == 2
+
+        trend = cold_start_trend(tmp)
+        assert trend["3.1"]["builds"] == ["build_1"]
+
+    print("✓ Cold-start records track regressions")
+
+if __name__ == "__main__":
+    test_analyze_cold_start()
+    test_record_cold_start_tracks_regressions()
+    print("\n✓ All cold-start tests passed")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the shared JSON I/O layer.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import jsonio
+
+SAMPLE = {"name": "Café", "rank": 1, "tags": ["a", "b"], "nested": {"ok": True, "none": None}}
+
+def test_codecs_match_stdlib_formatting():
+    """Test that every codec writes the same pretty output as json.dump(indent=2)."""
+    active = jsonio.get_codec()
+    try:
+        for codec in jsonio.AVAILABLE_CODECS:
+            jsonio.set_codec(codec)
+            expected = json.dumps(SAMPLE, indent=2, sort_keys=True, ensure_ascii=False)
+            assert jsonio.dumps(SAMPLE, sort_keys=True, ensure_ascii=False).decode() == expected, codec
+            assert jsonio.loads(jsonio.dumps(SAMPLE, compact=True)) == SAMPLE, codec
+    finally:
+        jsonio.set_codec(active)
+
+    print("✓ JSON codecs produce identical pretty output")
+
+def test_default_options_match_stdlib_for_every_value():
+    """Test default dumps, small/large floats and NaN against json.dumps byte for byte."""
+    values = dict(SAMPLE, small=1e-05, large=1e16, ratio=0.25, zero=-0.0)
+    active = jsonio.get_codec()
+    try:
+        for codec in jsonio.AVAILABLE_CODECS:
+            jsonio.set_codec(codec)
+            assert jsonio.dumps(values).decode() == json.dumps(values, indent=2), codec
+            assert jsonio.dumps(values, compact=True).decode() == \
+                json.dumps(values, separators=(",", ":")), codec
+            assert "Caf\\u00e9" in jsonio.dumps(SAMPLE).decode(), codec
+
+            special = {"nan": float("nan"), "inf": [float("inf"), -float("inf")]}
+            assert jsonio.dumps(special).decode() == json.dumps(special, indent=2), codec
+            assert "NaN" in jsonio.dumps(special, compact=True).decode(), codec
+    finally:
+        jsonio.set_codec(active)
+
+    print("✓ Default dumps output matches the stdlib for every value")
+
+def test_atomic_write_and_decode_errors():
+    """Test atomic writes leave no temp files and invalid JSON raises JSONDecodeError."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.json"
+        jsonio.write_json(path, SAMPLE, compact=True)
+        assert jsonio.read_json(path) == SAMPLE
+        assert os.listdir(tmp) == ["data.json"]
+
+        path.write_text("{not json")
+        try:
+            jsonio.read_json(path)
+            assert False, "Invalid JSON should raise"
+        except json.JSONDecodeError:
+            pass
+
+    print("✓ Atomic JSON writes and decode errors behave")
+
+if __name__ == "__main__":
+    test_codecs_match_stdlib_formatting()
+    test_default_options_match_stdlib_for_every_value()
+    test_atomic_write_and_decode_errors()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test the incremental Prometheus metrics exporter.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.jsonio import append_jsonl
+from appfactory.metrics_exporter import MetricsCollector, format_metrics
+
+def write(path: Path, data: dict):
+    """Write a JSON file, creating parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+def test_metrics_are_collected_incrementally():
+    """Test metric values and that unchanged files are not re-parsed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        run = root / "runs" / "2026-01-07" / "batch-demo"
+        write(run / "ideas" / "01_a__a" / "meta" / "stage_status.json",
+              {"stages_completed": ["01"], "stages_remaining": ["02", "03"]})
+        write(run / "outputs" / "stage01_validation.json", {"stage": "01", "valid": True})
+        write(root / "builds" / "build_index.json", {"builds": [
+            {"status": "success", "origin": {"mode": "dream"}},
+            {"status": "failed", "origin": {"mode": "pipeline"}}]})
+        write(root / "leaderboards" / "app_factory_all_time.json",
+              {"last_updated": "2026-01-09T20:15:00Z", "entries": [{}, {}, {}]})
+        events = run / "meta" / "events.jsonl"
+        events.parent.mkdir(parents=True)
+        append_jsonl(events, {"ts": "2026-01-07T10:00:00", "pack": "01_a__a", "stage": "02", "status": "in_progress"})
+        append_jsonl(events, {"ts": "2026-01-07T10:00:42", "pack": "01_a__a", "stage": "02", "status": "completed"})
+
+        collector = MetricsCollector(repo_root=root)
+        text = format_metrics(collector.collect())
+        # The view still lists 02 as remaining; the event log says it completed
+        assert 'appfactory_stages{stage="02",status="completed"} 1' in text
+        assert 'appfactory_stages{stage="03",status="pending"} 1' in text
+        assert 'appfactory_stages{stage="01",status="completed"} 1' in text
+        assert 'appfactory_stage_validations{stage="01",result="pass"} 1' in text
+        assert 'appfactory_builds{status="success",mode="dream"} 1' in text
+        assert "appfactory_leaderboard_entries 3" in text
+        assert 'appfactory_stage_duration_seconds_bucket{stage="02",le="30"} 0' in text
+        assert 'appfactory_stage_duration_seconds_bucket{stage="02",le="60"} 1' in text
+        assert 'appfactory_stage_duration_seconds_sum{stage="02"} 42.000' in text
+
+        again = collector.collect()
+        assert again["parsed_files"] == 0, "Unchanged files should not be re-parsed"
+
+        append_jsonl(events, {"ts": "2026-01-07T10:01:00", "pack": "01_a__a", "stage": "03", "status": "in_progress"})
+        append_jsonl(events, {"ts": "2026-01-07T10:01:05", "pack": "01_a__a", "stage": "03", "status": "completed"})
+        values = collector.collect()
+        assert values["durations"]["03"]["count"] == 1
+        assert values["durations"]["02"]["count"] == 1, "Old events must not be counted twice"
+        assert values["stage_counts"]["03|completed"] == 1, "Stage counts follow the event log"
+        assert values["parsed_files"] == 2, "Only the run and pack read through the new events"
+
+    print("✓ Metrics are collected incrementally")
+
+if __name__ == "__main__":
+    test_metrics_are_collected_incrementally()
+    print("\n✓ All metrics exporter tests passed")
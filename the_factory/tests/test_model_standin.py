@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test the model stand-in: recorded and synthesized outputs, latency and seeding.
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.model_standin import ModelStandIn, ModelStandInError
+from appfactory.schema_validate import load_json
+from appfactory.stage_cache import find_stage_schema
+
+def make_recordings(runs_dir: Path) -> None:
+    """Record stage02 outputs in two runs and one stage02.5 output."""
+    for run, filename, name in [("demo", "stage02.json", "alpha"), ("demo", "stage02.5.json", "beta"),
+                                ("other", "stage02.json", "gamma")]:
+        stages = runs_dir / "2026-01-08" / run / "stages"
+        stages.mkdir(parents=True, exist_ok=True)
+        with open(stages / filename, 'w') as f:
+            json.dump({"recorded": name}, f)
+
+def test_outputs_are_recorded_or_schema_shaped():
+    """Test that recorded stages replay recordings and others get schema-shaped synthetic output."""
+    with tempfile.TemporaryDirectory() as tmp:
+        make_recordings(Path(tmp))
+        standin = ModelStandIn(runs_dir=tmp, seed=3)
+        assert sorted(standin.recordings) == ["02", "02.5"]
+        assert standin.generate("02")["recorded"] in {"alpha", "gamma"}
+        assert standin.generate("02.5") == {"recorded": "beta"}
+
+        output = standin.generate("03")
+        assert output["meta"]["synthetic"] is True
+        schema = load_json(str(find_stage_schema("03")))
+        required = set()
+        for part in schema.get("allOf", [schema]):
+            required.update(part.get("required", []))
+        assert required and required <= set(output), "Every required top-level field is synthesized"
+
+        output["meta"]["mutated"] = True
+        assert "mutated" not in standin.generate("03")["meta"], "Callers get their own copy"
+
+    print("✓ Stand-in replays recordings and synthesizes schema-shaped outputs")
+
+def test_latency_and_seeded_determinism():
+    """Test latency distributions and that a seed fixes choices, latencies and errors."""
+    with tempfile.TemporaryDirectory() as tmp:
+        make_recordings(Path(tmp))
+
+        fixed = ModelStandIn(runs_dir=tmp, latency=0.02, latency_dist="fixed")
+        started = time.perf_counter()
+        fixed.generate("02")
+        assert time.perf_counter() - started >= 0.02
+
+        for dist in ["uniform", "lognormal"]:
+            standin = ModelStandIn(runs_dir=tmp, latency=0.5, latency_dist=dist, seed=1)
+            samples = [standin.sample_latency() for _ in range(4000)]
+            assert min(samples) >= 0
+            assert abs(sum(samples) / len(samples) - 0.5) < 0.05, f"{dist} keeps the configured mean"
+
+        def trace(seed):
+            standin = ModelStandIn(runs_dir=tmp, latency=0.001, latency_dist="uniform",
+                                   error_rate=0.4, seed=seed)
+            events = []
+            for _ in range(20):
+                latency = standin.sample_latency()
+                try:
+                    events.append((round(latency, 9), standin.generate("02")["recorded"]))
+                except ModelStandInError:
+                    events.append((round(latency, 9), "error"))
+            return events
+
+        first = trace(7)
+        assert first == trace(7), "The same seed replays the same run"
+        assert first != trace(8)
+        assert any(kind == "error" for _, kind in first) and any(kind != "error" for _, kind in first)
+
+    print("✓ Stand-in latency follows its distribution and seeds are deterministic")
+
+if __name__ == "__main__":
+    test_outputs_are_recorded_or_schema_shaped()
+    test_latency_and_seeded_determinism()
+    print("\n✓ All model stand-in tests passed")
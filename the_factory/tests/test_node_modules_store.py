@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test lockfile keys and tree linking of the node_modules store.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import node_modules_store
+from appfactory.jsonio import write_json
+from appfactory.node_modules_store import StoreError, install, link_tree, lockfile_key, tree_fingerprint
+
+def write_lock(app_dir: Path, name: str, react_version: str):
+    """Write a v3 package-lock.json for an app."""
+    app_dir.mkdir(parents=True)
+    lock = {
+        "name": name, "version": "1.0.0", "lockfileVersion": 3, "requires": True,
+        "packages": {
+            "": {"name": name, "version": "1.0.0", "dependencies": {"react": f"^{react_version}"}},
+            "node_modules/react": {
+                "version": react_version,
+                "resolved": f"https://registry.npmjs.org/react/-/react-{react_version}.tgz",
+                "integrity": f"sha512-{react_version}"
+            }
+        }
+    }
+    with open(app_dir / "package-lock.json", 'w') as f:
+        json.dump(lock, f)
+
+def test_lockfile_key_ignores_app_identity():
+    """Test that apps with the same resolved dependencies share a key."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_lock(Path(tmp) / "alpha", "alpha-app", "18.2.0")
+        write_lock(Path(tmp) / "beta", "beta-app", "18.2.0")
+        write_lock(Path(tmp) / "gamma", "gamma-app", "18.3.1")
+
+        alpha = lockfile_key(str(Path(tmp) / "alpha"))
+        assert alpha == lockfile_key(str(Path(tmp) / "beta")), "App name must not change the key"
+        assert alpha != lockfile_key(str(Path(tmp) / "gamma")), "Resolved versions must change the key"
+
+    print("✓ Lockfile keys depend only on resolved dependencies")
+
+def test_link_tree_shares_files():
+    """Test that linked trees share file contents and keep symlinks."""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "store" / "node_modules"
+        (src / "tiny" / "lib").mkdir(parents=True)
+        (src / ".bin").mkdir()
+        (src / "tiny" / "lib" / "index.js").write_text("module.exports = 42\n")
+        os.symlink("../tiny/lib/index.js", src / ".bin" / "tiny")
+
+        dest = Path(tmp) / "app" / "node_modules"
+        counts = link_tree(str(src), str(dest), link=True)
+        assert counts["link"] + counts["reflink"] + counts["copy"] == 1
+        assert counts["symlink"] == 1
+        assert os.readlink(dest / ".bin" / "tiny") == "../tiny/lib/index.js"
+        assert (dest / ".bin" / "tiny").read_text() == "module.exports = 42\n"
+        if counts["link"]:
+            assert os.stat(dest / "tiny" / "lib" / "index.js").st_ino == os.stat(src / "tiny" / "lib" / "index.js").st_ino
+
+    print("✓ Linked trees share files with the store")
+
+def make_entry(store: Path, app_dir: Path) -> Path:
+    """Populate a store entry for an app's lockfile without running npm."""
+    entry = store / lockfile_key(str(app_dir))
+    (entry / "node_modules" / "tiny").mkdir(parents=True)
+    (entry / "node_modules" / "tiny" / "index.js").write_text("module.exports = 42\n")
+    os.chmod(entry / "node_modules" / "tiny" / "index.js", 0o444)
+    write_json(entry / "store_entry.json", dict(tree_fingerprint(str(entry / "node_modules")),
+                                                key=entry.name, created_at="2026-01-08T00:00:00"))
+    return entry
+
+def test_install_copies_and_repopulates_modified_entries():
+    """Test default installs share no inodes, modified entries are repopulated and failures raise StoreError."""
+    original = (node_modules_store.get_store_dir, node_modules_store.populate_entry,
+                node_modules_store._clone_file)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Path(tmp) / "store"
+        app = Path(tmp) / "app"
+        write_lock(app, "alpha-app", "18.2.0")
+        (app / "package.json").write_text(json.dumps({"name": "alpha-app"}))
+        populated = []
+
+        def populate_entry(app_dir, key, registry=None, offline=False):
+            populated.append(key)
+            return make_entry(store, Path(app_dir))
+
+        node_modules_store.get_store_dir = lambda: store
+        node_modules_store.populate_entry = populate_entry
+        try:
+            entry = make_entry(store, app)
+            result = install(str(app))
+            assert result["hit"] and result["files"]["link"] == 0
+            installed = app / "node_modules" / "tiny" / "index.js"
+            assert os.stat(installed).st_ino != os.stat(entry / "node_modules" / "tiny" / "index.js").st_ino
+            assert os.stat(installed).st_mode & 0o200, "Copied files are writable by the app"
+
+            # A postinstall script (or root) writing through a hard link changes the entry
+            if install(str(app), link=True)["files"]["link"]:
+                assert not os.stat(installed).st_mode & 0o200, "Hard links keep the store's read-only mode"
+            os.chmod(installed, 0o644)
+            installed.write_text("module.exports = 'patched'\n")
+            result = install(str(app))
+            assert not result["hit"] and populated == [entry.name], "Modified entries are repopulated"
+            assert installed.read_text() == "module.exports = 42\n"
+
+            def failing_clone(src, dest, link=False):
+                raise OSError(28, "No space left on device")
+            node_modules_store._clone_file = failing_clone
+            try:
+                install(str(app))
+                assert False, "Link failures should raise StoreError"
+            except StoreError:
+                pass
+            assert not (app / "node_modules").exists(), "No partial node_modules is left behind"
+        finally:
+            (node_modules_store.get_store_dir, node_modules_store.populate_entry,
+             node_modules_store._clone_file) = original
+
+    print("✓ Installs copy by default and never reuse modified store entries")
+
+if __name__ == "__main__":
+    test_lockfile_key_ignores_app_identity()
+    test_link_tree_shares_files()
+    test_install_copies_and_repopulates_modified_entries()
+    print("\n✓ All node_modules store tests passed")
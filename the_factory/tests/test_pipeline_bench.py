@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the pipeline throughput harness on a small stand-in run.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import paths
+from appfactory.logging_utils import get_next_stage
+from appfactory.model_standin import ModelStandIn
+from appfactory.pipeline_bench import format_summary, run_benchmark
+
+def test_small_benchmark_completes_every_run():
+    """Test that a small benchmark drives every run to completion and reports throughput."""
+    original = paths.get_project_root
+    with tempfile.TemporaryDirectory() as tmp:
+        paths.get_project_root = lambda: tmp
+        try:
+            recordings = os.path.join(tmp, "recordings")
+            os.makedirs(recordings)
+            standin = ModelStandIn(runs_dir=recordings, error_rate=0.2, seed=5)
+            summary = run_benchmark(3, 2, standin, runs_dir=os.path.join(tmp, "runs"))
+
+            assert summary["runs"] == 3 and summary["completed"] + summary["failed"] == 3
+            assert summary["concurrency"] == 2 and summary["runs_per_hour"] > 0
+            assert summary["retries"] > 0, "Stand-in errors are retried"
+            assert "01" in summary["stages"] and summary["stages"]["01"]["count"] == 3
+            finished = [get_next_stage(str(run_path)) == "completed"
+                        for run_path in Path(tmp, "runs").glob("*/*")]
+            assert len(finished) == 3 and sum(finished) == summary["completed"]
+            assert "runs/hour" in format_summary(summary)
+        finally:
+            paths.get_project_root = original
+
+    print("✓ Small pipeline benchmark completes every run")
+
+def test_replayed_recordings_pass_validation():
+    """Test that real recordings replayed by the stand-in validate against their template schemas."""
+    source = Path(__file__).parent.parent / "runs" / "2026-01-06" / "app_factory_220354"
+    original = paths.get_project_root
+    with tempfile.TemporaryDirectory() as tmp:
+        paths.get_project_root = lambda: tmp
+        try:
+            stages = Path(tmp, "recordings", "2026-01-06", "recorded", "stages")
+            stages.mkdir(parents=True)
+            shutil.copy(source / "stage01" / "stages" / "stage01.json", stages)
+            shutil.copy(source / "ideas" / "02_neurodash__neurodash_002" / "stages" / "stage02.json", stages)
+            standin = ModelStandIn(runs_dir=str(Path(tmp, "recordings")), seed=1)
+            summary = run_benchmark(1, 1, standin, runs_dir=os.path.join(tmp, "runs"))
+
+            assert summary["stages"]["01"]["validation_failures"] == 0
+            assert summary["stages"]["02"]["validation_failures"] == 0
+            run_path = next(Path(tmp, "runs").glob("*/*"))
+            with open(run_path / "outputs" / "stage02_validation.json") as f:
+                result = json.load(f)
+            assert result["valid"] and result["schema_path"].endswith("02_product_spec.md"), result
+        finally:
+            paths.get_project_root = original
+
+    print("✓ Replayed recordings pass validation")
+
+if __name__ == "__main__":
+    test_small_benchmark_completes_every_run()
+    test_replayed_recordings_pass_validation()
+    print("\n✓ All pipeline bench tests passed")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test lossless PNG optimization and generation log updates.
+"""
+
+import json
+import struct
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import appfactory.png_optimize as png_optimize
+from appfactory.png_optimize import (
+    PNG_SIGNATURE, decode_pixels, filter_row, optimize_assets, optimize_png, read_chunks, unfilter, write_chunk
+)
+
+def make_png(width: int, height: int) -> bytes:
+    """An opaque RGBA gradient with metadata, stored with mixed filters at low effort."""
+    rows = [bytes(v for x in range(width) for v in ((x * 7) & 255, (y * 5) & 255, (x + y) & 255, 255))
+            for y in range(height)]
+    raw = b""
+    prev = bytes(width * 4)
+    for y, row in enumerate(rows):
+        filter_type = y % 5
+        raw += bytes([filter_type]) + filter_row(filter_type, row, prev, 4)
+        prev = row
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (PNG_SIGNATURE + write_chunk(b"IHDR", ihdr) + write_chunk(b"gAMA", struct.pack(">I", 45455))
+            + write_chunk(b"tEXt", b"Software\x00sips") + write_chunk(b"IDAT", zlib.compress(raw, 1))
+            + write_chunk(b"IEND", b""))
+
+def test_optimize_png_is_lossless():
+    """Test that every filter round-trips and optimized pixels match the original."""
+    data = make_png(40, 30)
+    width, height, rows = decode_pixels(data)
+    for filter_type in range(5):
+        prev = bytes(width * 4)
+        raw = b""
+        for row in rows:
+            raw += bytes([filter_type]) + filter_row(filter_type, row, prev, 4)
+            prev = row
+        assert unfilter(raw, height, width * 4, 4) == rows, f"filter {filter_type} must round-trip"
+
+    result = optimize_png(data)
+    assert result["optimized"] and len(result["data"]) < len(data)
+    assert decode_pixels(result["data"]) == (width, height, rows)
+    chunk_types = [t for t, body in read_chunks(result["data"])]
+    assert b"tEXt" not in chunk_types and b"gAMA" in chunk_types
+    assert read_chunks(result["data"])[0][1][9] == 2, "Opaque RGBA is stored as RGB"
+
+    print("✓ PNG optimization is lossless")
+
+def test_sbit_follows_stripped_alpha_and_apng_is_rejected():
+    """Test that sBIT loses its alpha byte with the alpha channel and animated PNGs are left alone."""
+    data = make_png(16, 8)
+    chunks = read_chunks(data)
+    with_sbit = (PNG_SIGNATURE + write_chunk(*chunks[0]) + write_chunk(b"sBIT", bytes([8, 8, 8, 8]))
+                 + b"".join(write_chunk(*chunk) for chunk in chunks[1:]))
+    result = optimize_png(with_sbit)
+    assert read_chunks(result["data"])[0][1][9] == 2
+    assert dict(read_chunks(result["data"]))[b"sBIT"] == bytes([8, 8, 8]), "RGB sBIT has three bytes"
+
+    animated = (PNG_SIGNATURE + write_chunk(*chunks[0]) + write_chunk(b"acTL", struct.pack(">II", 2, 0))
+                + b"".join(write_chunk(*chunk) for chunk in chunks[1:]))
+    try:
+        optimize_png(animated)
+        assert False, "APNGs should be rejected"
+    except png_optimize.PNGError:
+        pass
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "spinner.png"
+        path.write_bytes(animated)
+        assert png_optimize.optimize_file(str(path))["status"] == "error"
+        assert path.read_bytes() == animated
+
+    print("✓ sBIT follows the stripped alpha channel and APNGs are left alone")
+
+def test_optimize_assets_updates_logs_and_skips_optimized():
+    """Test that generation logs get before/after figures and reruns skip optimized files."""
+    with tempfile.TemporaryDirectory() as tmp:
+        original = png_optimize.get_cache_path
+        png_optimize.get_cache_path = lambda: Path(tmp) / "cache.json"
+        try:
+            assets = Path(tmp) / "assets"
+            assets.mkdir()
+            data = make_png(64, 64)
+            (assets / "icon.png").write_bytes(data)
+            (assets / "broken.png").write_bytes(b"not a png")
+            with open(assets / "generation_log.json", 'w') as f:
+                json.dump({"generated_assets": [{"filename": "icon.png", "file_size": len(data)}]}, f)
+
+            report = optimize_assets([str(assets)], workers=1)
+            assert report["optimized"] == 1 and len(report["errors"]) == 1
+            with open(assets / "generation_log.json") as f:
+                logged = json.load(f)["generated_assets"][0]
+            assert logged["optimization"]["before_size"] == len(data)
+            assert logged["file_size"] == (assets / "icon.png").stat().st_size < len(data)
+
+            again = optimize_assets([str(assets)], workers=1)
+            assert again["skipped"] == 1 and again["optimized"] == 0
+        finally:
+            png_optimize.get_cache_path = original
+
+    print("✓ Optimized assets are logged and skipped on rerun")
+
+if __name__ == "__main__":
+    test_optimize_png_is_lossless()
+    test_sbit_follows_stripped_alpha_and_apng_is_rejected()
+    test_optimize_assets_updates_logs_and_skips_optimized()
+    print("\n✓ All PNG optimizer tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test prefix-stable prompt assembly and the prefix reuse simulation.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.prompt_assembly import (
+    PrefixCacheSimulator, assemble_stage_prompt, prefix_hashes, to_messages_request
+)
+
+def make_pack(run: Path, directory: str, stage02: dict) -> Path:
+    """Create an idea pack with a stage02 output."""
+    pack = run / "ideas" / directory
+    (pack / "stages").mkdir(parents=True)
+    (pack / "meta").mkdir()
+    with open(pack / "stages" / "stage02.json", 'w') as f:
+        json.dump(stage02, f)
+    return pack
+
+def test_prompt_prefix_is_stable_and_ordered():
+    """Test tier order, breakpoints and byte stability under JSON key reordering."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = Path(tmp) / "batch-demo"
+        (run / "stage01" / "stages").mkdir(parents=True)
+        with open(run / "stage01" / "stages" / "stage01.json", 'w') as f:
+            json.dump({"ideas": [{"id": "a"}, {"id": "b"}]}, f)
+
+        first = make_pack(run, "01_a__a", {"title": "A", "features": ["x"]})
+        again = assemble_stage_prompt(str(first), "03")
+        with open(first / "stages" / "stage02.json", 'w') as f:
+            json.dump({"features": ["x"], "title": "A"}, f)
+        assembled = assemble_stage_prompt(str(first), "03")
+
+        tiers = [s["tier"] for s in assembled["segments"]]
+        assert tiers == ["standards", "template", "run_inputs", "pack_inputs", "instruction"]
+        assert [s["breakpoint"] for s in assembled["segments"]] == [True, True, True, True, False]
+        assert prefix_hashes(again) == prefix_hashes(assembled), "Key order must not change the prefix"
+
+        request = to_messages_request(assembled)
+        cached_blocks = [b for b in request["system"] + request["messages"][0]["content"]
+                         if "cache_control" in b]
+        assert len(cached_blocks) == 4
+        assert "cache_control" not in request["messages"][0]["content"][-1]
+
+    print("✓ Prompt prefix is stable and ordered")
+
+def test_packs_share_prefix_through_run_inputs():
+    """Test that the same stage of two packs reuses everything but the pack inputs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = Path(tmp) / "batch-demo"
+        (run / "stage01" / "stages").mkdir(parents=True)
+        with open(run / "stage01" / "stages" / "stage01.json", 'w') as f:
+            json.dump({"ideas": [{"id": "a"}, {"id": "b"}]}, f)
+        first = make_pack(run, "01_a__a", {"title": "A"})
+        second = make_pack(run, "02_b__b", {"title": "B"})
+
+        simulator = PrefixCacheSimulator()
+        a = assemble_stage_prompt(str(first), "03")
+        b = assemble_stage_prompt(str(second), "03")
+        assert simulator.observe(a) == 0
+
+        shared = sum(s["tokens"] for s in b["segments"] if s["tier"] in ("standards", "template", "run_inputs"))
+        assert simulator.observe(b) == shared
+        assert simulator.observe(b) == b["tokens"] - b["segments"][-1]["tokens"]
+
+    print("✓ Packs share the prompt prefix through run inputs")
+
+if __name__ == "__main__":
+    test_prompt_prefix_is_stable_and_ordered()
+    test_packs_share_prefix_through_run_inputs()
+    print("\n✓ All prompt assembly tests passed")
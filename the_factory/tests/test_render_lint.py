@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test the render-performance linter rules and severity gating.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.render_lint import lint_build, lint_source
+
+SCREEN = """import { ScrollView, FlatList, View, Text, TouchableOpacity } from 'react-native';
+import { useTaskStore } from '../store/taskStore';
+
+const LEVELS = ['low', 'high'];
+
+export default function Screen() {
+  const { tasks, completeTask } = useTaskStore();
+  const count = useTaskStore((s) => s.tasks.length);
+
+  const renderSection = () => (
+    <View>{tasks.map((task) => <Text key={task.id}>{task.text}</Text>)}</View>
+  );
+
+  return (
+    <ScrollView refreshControl={<View />}>
+      {LEVELS.map((level) => <Text key={level}>{level}</Text>)}
+      {(['a', 'b'] as const).map((x) => <Text key={x}>{x}</Text>)}
+      {tasks.map((task) => (
+        <TouchableOpacity key={task.id} onPress={() => completeTask(task.id)}>
+          <Text>{task.text}</Text>
+        </TouchableOpacity>
+      ))}
+      {renderSection()}
+      {/* render-lint-disable-next-line scrollview-map */}
+      {tasks.slice(1).map((task) => <Text key={task.id}>{task.text}</Text>)}
+      <FlatList data={tasks} renderItem={({ item }) => <Text>{item.text}</Text>} />
+    </ScrollView>
+  );
+}
+"""
+
+STORE = """import { create } from 'zustand';
+import AsyncStorage from '@react-native-async-storage/async-storage';
+
+export const useTaskStore = create((set, get) => ({
+  tasks: [],
+  addTask: (text) => {
+    set((state) => ({ tasks: [...state.tasks, { id: Date.now(), text }] }));
+    get().saveTasks();
+  },
+  saveTasks: async () => {
+    const { tasks } = get();
+    await AsyncStorage.setItem('tasks', JSON.stringify(tasks));
+  },
+}));
+"""
+
+def test_rules():
+    """Test each rule's findings, lines and exemptions."""
+    findings = lint_source(SCREEN, "app/index.tsx", {"useTaskStore"})
+    found = [(f["rule"], f["line"]) for f in findings]
+    assert ("scrollview-map", 11) in found, "Render helpers called inside a ScrollView count"
+    assert ("scrollview-map", 18) in found
+    assert not [f for f in findings if f["rule"] == "scrollview-map" and f["line"] in (16, 17, 25)], \
+        "Constants, literals and suppressed lines are exempt"
+    assert ("whole-store-selector", 7) in found and not [l for r, l in found if l == 8]
+    assert ("inline-handler-in-list", 19) in found
+    assert ("inline-render-item", 26) in found
+
+    store = lint_source(STORE, "src/store/taskStore.ts")
+    assert [(f["rule"], f["line"]) for f in store] == [("serialize-on-mutation", 8)]
+    assert "addTask" in store[0]["message"] and "saveTasks" in store[0]["message"]
+
+    print("✓ Render lint rules report file and line")
+
+def test_lint_build_gates_on_threshold():
+    """Test that the severity threshold decides whether a build passes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        build = Path(tmp)
+        (build / "app").mkdir()
+        (build / "src" / "store").mkdir(parents=True)
+        (build / "app" / "index.tsx").write_text(SCREEN.replace("render-lint-disable-next-line scrollview-map", ""))
+        (build / "src" / "store" / "taskStore.ts").write_text(STORE)
+        (build / "node_modules" / "x").mkdir(parents=True)
+        (build / "node_modules" / "x" / "index.js").write_text(STORE)
+
+        result = lint_build(build)
+        assert result["files"] == 2
+        assert not result["passed"] and result["counts"]["error"] == 3
+        assert result["counts"]["warning"] == 3 and result["counts"]["info"] == 1
+
+        (build / "app" / "index.tsx").write_text(STORE.replace("get().saveTasks();", ""))
+        assert lint_build(build)["passed"]
+        assert not lint_build(build, fail_on="warning")["passed"]
+
+    print("✓ Builds are gated on the severity threshold")
+
+if __name__ == "__main__":
+    test_rules()
+    test_lint_build_gates_on_threshold()
+    print("\n✓ All render lint tests passed")
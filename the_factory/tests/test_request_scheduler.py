@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test the model request scheduler against a local HTTP stand-in.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.request_scheduler import (
+    RequestScheduler, StandInServer, TokenBucket, post_json
+)
+
+def test_token_bucket_refills_at_rate():
+    """Test token bucket wait times with a controlled clock."""
+    now = [0.0]
+    bucket = TokenBucket(60, burst=2, clock=lambda: now[0])
+
+    assert bucket.time_until(1) == 0.0
+    bucket.consume(1)
+    bucket.consume(1)
+    assert abs(bucket.time_until(1) - 1.0) < 1e-9, "60/min refills one token per second"
+
+    now[0] = 0.5
+    assert abs(bucket.time_until(1) - 0.5) < 1e-9
+    assert abs(bucket.time_until(100) - 1.5) < 1e-9, "Oversized requests wait for a full bucket"
+
+    print("✓ Token bucket refills at its configured rate")
+
+def test_priority_classes_are_served_in_order():
+    """Test that resume beats in-progress beats new-run once a slot frees up."""
+    async def scenario():
+        scheduler = RequestScheduler(max_in_flight=1)
+        gate = asyncio.Event()
+        served = []
+
+        async def blocker():
+            await gate.wait()
+
+        def record(name):
+            async def call():
+                served.append(name)
+            return call
+
+        first = asyncio.create_task(scheduler.submit(blocker))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(scheduler.submit(record(name), priority=name))
+                 for name in ["new_run", "in_progress", "resume"]]
+        await asyncio.sleep(0.01)
+        assert scheduler.queue_depth() == {"resume": 1, "in_progress": 1, "new_run": 1}
+
+        gate.set()
+        await asyncio.gather(first, *tasks)
+        return served, scheduler.metrics()
+
+    served, metrics = asyncio.run(scenario())
+    assert served == ["resume", "in_progress", "new_run"]
+    assert metrics["max_in_flight"] == 1
+    assert metrics["completed"] == 4
+
+    print("✓ Priority classes are served in order")
+
+def test_cancelled_waiter_leaves_the_queue():
+    """Test that a request cancelled while queued does not block the ones behind it."""
+    async def scenario():
+        scheduler = RequestScheduler(max_in_flight=1)
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+
+        async def call():
+            return "done"
+
+        first = asyncio.create_task(scheduler.submit(blocker))
+        await asyncio.sleep(0)
+        # The resume request sits at the head of the queue until its timeout cancels it
+        try:
+            await asyncio.wait_for(scheduler.submit(call, priority="resume"), 0.01)
+            raise AssertionError("The queued request should have timed out")
+        except asyncio.TimeoutError:
+            pass
+        assert scheduler.queue_depth()["resume"] == 0
+
+        later = asyncio.create_task(scheduler.submit(call, priority="new_run"))
+        await asyncio.sleep(0)
+        gate.set()
+        result = await asyncio.wait_for(later, 1.0)
+        await first
+        return result, scheduler.queue_depth()
+
+    result, depth = asyncio.run(scenario())
+    assert result == "done"
+    assert sum(depth.values()) == 0
+
+    print("✓ Cancelled waiters leave the queue")
+
+def test_rate_limited_server_is_retried_with_backoff():
+    """Test that 429s from the stand-in are retried until every request succeeds."""
+    with StandInServer(requests_per_minute=1200, latency=0.01, seed=1) as server:
+        scheduler = RequestScheduler(max_in_flight=4, max_attempts=10,
+                                     base_delay=0.01, max_delay=0.1, seed=1)
+
+        async def scenario():
+            return await asyncio.gather(*(
+                scheduler.submit(lambda i=i: post_json(server.url, {"request": i}), tokens=10)
+                for i in range(12)
+            ))
+
+        results = asyncio.run(scenario())
+        stats = dict(server.stats)
+
+    assert len(results) == 12
+    assert sorted(r["echo"]["request"] for r in results) == list(range(12))
+    metrics = scheduler.metrics()
+    assert metrics["completed"] == 12 and metrics["failed"] == 0
+    assert stats["rate_limited"] > 0, "The stand-in should have pushed back"
+    assert metrics["retries"] == stats["rate_limited"]
+    assert stats["max_concurrent"] <= 4
+
+    print("✓ Rate-limited requests are retried with backoff")
+
+if __name__ == "__main__":
+    test_token_bucket_refills_at_rate()
+    test_priority_classes_are_served_in_order()
+    test_cancelled_waiter_leaves_the_queue()
+    test_rate_limited_server_is_retried_with_backoff()
+    print("\n✓ All request scheduler tests passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test run archive packs and transparent reads from archived runs.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.model_standin import find_recorded_stages
+from appfactory.paths import validate_run_structure
+from appfactory.run_archive import (
+    archive_runs, exists, listdir, load_archive_index, materialize_run, read_json, restore_run
+)
+from appfactory.schema_validate import load_json
+
+def write(path: Path, data: dict):
+    """Write a JSON file, creating parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+def make_runs(runs_dir: Path) -> Path:
+    """Create one cold batch run and one recent run."""
+    run = runs_dir / "2026-01-06" / "batch-demo"
+    (run / "inputs").mkdir(parents=True)
+    write(run / "meta" / "run_manifest.json", {"run_id": "batch-demo"})
+    write(run / "stage01" / "stages" / "stage01.json", {"ideas": [{"name": "Alpha"}]})
+    write(run / "ideas" / "01_alpha__alpha_001" / "stages" / "stage02.json", {"spec": "alpha"})
+    write(runs_dir / "2026-03-01" / "recent" / "meta" / "run_manifest.json", {"run_id": "recent"})
+    return run
+
+def test_archive_and_read_transparently():
+    """Test that cold runs are packed and still readable without unpacking."""
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = Path(tmp)
+        run = make_runs(runs_dir)
+
+        results = archive_runs(str(runs_dir), days=30, today=datetime(2026, 3, 10))
+        assert [r["date"] for r in results] == ["2026-01-06"]
+        assert not run.exists() and not (runs_dir / "2026-01-06").exists()
+        assert (runs_dir / "2026-03-01" / "recent").exists(), "Recent runs stay on disk"
+        assert load_archive_index(runs_dir)["packs"]["2026-01-06"]["runs"]["batch-demo"]["files"] == 3
+
+        stage02 = run / "ideas" / "01_alpha__alpha_001" / "stages" / "stage02.json"
+        assert read_json(stage02) == {"spec": "alpha"}
+        assert load_json(str(stage02)) == {"spec": "alpha"}
+        assert exists(run / "ideas") and not exists(run / "outputs")
+        assert listdir(run) == ["ideas", "inputs", "meta", "stage01"]
+        assert str(stage02) in find_recorded_stages(str(runs_dir))["02"]
+        assert not (runs_dir / ".archive" / "unpacked").exists(), "Reads must not unpack"
+
+        results = validate_run_structure(str(run))
+        assert results["archived"] and results["valid"] and results["layout"] == "batch"
+        assert results["stage_files"] == ["stage01.json"]
+        assert materialize_run(str(stage02)).startswith(str(runs_dir / ".archive" / "unpacked"))
+
+    print("✓ Archived runs are readable in place")
+
+def test_restore_and_rearchive():
+    """Test that restoring from inside a pack brings back the whole run and re-packs cleanly."""
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = Path(tmp)
+        run = make_runs(runs_dir)
+        archive_runs(str(runs_dir), days=30, today=datetime(2026, 3, 10))
+
+        pack = run / "ideas" / "01_alpha__alpha_001"
+        assert restore_run(str(pack)) == str(run)
+        assert (run / "stage01" / "stages" / "stage01.json").exists()
+        write(pack / "spec" / "notes.json", {"edited": True})
+
+        archive_runs(str(runs_dir), days=30, today=datetime(2026, 3, 10))
+        assert not run.exists()
+        assert read_json(pack / "spec" / "notes.json") == {"edited": True}
+        assert read_json(run / "stage01" / "stages" / "stage01.json")["ideas"][0]["name"] == "Alpha"
+        assert sorted(os.listdir(runs_dir / ".archive")) == ["2026-01-06.zip", "index.json"]
+
+    print("✓ Restored runs are re-archived without losing files")
+
+if __name__ == "__main__":
+    test_archive_and_read_transparently()
+    test_restore_and_rearchive()
+    print("\n✓ All run archive tests passed")
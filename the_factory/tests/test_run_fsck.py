@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test the parallel run tree check and its safe repairs.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.paths import detect_run_layout
+from appfactory.run_fsck import fsck_runs
+
+def write(path: Path, data):
+    """Write a JSON file, creating parent directories."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+def make_batch_run(runs_dir: Path) -> Path:
+    """Create a batch run with one healthy pack and one broken pack."""
+    run = runs_dir / "2026-01-08" / "batch-demo"
+    (run / "inputs").mkdir(parents=True)
+    write(run / "stage01" / "stages" / "stage01.json", {"ideas": []})
+    write(run / "meta" / "idea_index.json", {"ideas": {
+        "alpha_001": {"directory": "01_alpha__alpha_001"},
+        "beta_002": {"directory": "02_beta__beta_002"},
+        "gamma_003": {"directory": "03_gamma__gamma_003"}}})
+
+    alpha = run / "ideas" / "01_alpha__alpha_001"
+    write(alpha / "meta" / "boundary.json", {"allowed_reads": [str(run / "stage01" / "stages" / "stage01.json")]})
+    write(alpha / "meta" / "stage_status.json", {"stages_completed": ["01"], "stages_remaining": ["02"]})
+    write(alpha / "stages" / "stage02.json", {"draft": True})
+
+    beta = run / "ideas" / "02_beta__beta_002"
+    write(beta / "meta" / "boundary.json", {"allowed_reads": [str(run / "missing" / "notes.md")]})
+    (beta / "stages").mkdir(parents=True)
+    (beta / "stages" / "stage02.json").write_text("{not json")
+    return run
+
+def test_fsck_reports_layout_aware_issues():
+    """Test that a batch run is checked against its own layout."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_batch_run(Path(tmp))
+        assert detect_run_layout(str(run)) == "batch"
+
+        report = fsck_runs(tmp, workers=2)
+        assert report["runs"] == 1 and report["packs"] == 2
+        assert report["layouts"]["batch"] == 1
+        messages = [(i["check"], i["message"]) for i in report["issues"]]
+        assert not any(c == "structure" and "outputs" in m for c, m in messages), \
+            "Batch runs do not need a classic outputs/ directory"
+        assert ("reference", "idea_index.json lists missing idea pack: 03_gamma__gamma_003") in messages
+        assert any(c == "reference" and "notes.md" in m for c, m in messages)
+        assert any(c == "json" and i["path"].endswith("stage02.json") for (c, m), i in zip(messages, report["issues"]))
+        assert ("status", "Stage 02 has output but is not marked completed") in messages
+
+    print("✓ fsck reports layout-aware issues")
+
+def test_fsck_repairs_stale_status():
+    """Test that --repair marks stages with outputs completed and creates missing directories."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_batch_run(Path(tmp))
+        (run / "ideas" / "03_gamma__gamma_003").mkdir()
+
+        report = fsck_runs(tmp, repair=True, workers=1)
+        pack_repairs = report["repairs"][str(run / "ideas" / "01_alpha__alpha_001")]
+        assert pack_repairs == ["Marked stage 02 completed"]
+        assert (run / "ideas" / "03_gamma__gamma_003" / "meta").is_dir()
+
+        with open(run / "ideas" / "01_alpha__alpha_001" / "meta" / "stage_status.json") as f:
+            status = json.load(f)
+        assert status["stages"]["02"]["status"] == "completed"
+
+        again = fsck_runs(tmp, workers=1)
+        assert not any(i["check"] == "status" for i in again["issues"])
+        assert not again["repairs"]
+
+    print("✓ fsck repairs stale stage status")
+
+def test_valid_stage_output_has_no_schema_issues():
+    """Test that a stage output matching its template schema passes the schema check."""
+    recorded = (Path(__file__).parent.parent / "runs" / "2026-01-06" / "app_factory_220354" / "ideas"
+                / "02_neurodash__neurodash_002" / "stages" / "stage02.json")
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_batch_run(Path(tmp))
+        shutil.copy(recorded, run / "ideas" / "01_alpha__alpha_001" / "stages" / "stage02.json")
+
+        report = fsck_runs(tmp, workers=1)
+        assert not [i for i in report["issues"] if i["check"] == "schema" and "01_alpha" in i["path"]], \
+            [i["message"] for i in report["issues"] if i["check"] == "schema"]
+
+    print("✓ Valid stage outputs pass the schema check")
+
+if __name__ == "__main__":
+    test_fsck_reports_layout_aware_issues()
+    test_valid_stage_output_has_no_schema_issues()
+    test_fsck_repairs_stale_status()
+    print("\n✓ All run fsck tests passed")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the per-run Merkle manifest: journaled writes, diffs and verification.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.jsonio import append_jsonl, write_json
+from appfactory.logging_utils import update_stage_status
+from appfactory.run_manifest import (
+    build_manifest, diff_trees, load_manifest, refresh_manifest, root_hash, verify_manifest
+)
+
+def make_run(root: Path) -> Path:
+    """Create a batch run with two idea packs."""
+    run = root / "2026-01-08" / "batch-demo"
+    for pack in ["01_alpha__alpha_001", "02_beta__beta_002"]:
+        (run / "ideas" / pack / "meta").mkdir(parents=True)
+        with open(run / "ideas" / pack / "stages.md", 'w') as f:
+            f.write(f"# {pack}\n")
+    (run / "meta").mkdir(exist_ok=True)
+    with open(run / "meta" / "run_manifest.json", 'w') as f:
+        json.dump({"run_id": "batch-demo"}, f)
+    return run
+
+def test_writes_update_roots_incrementally():
+    """Test that jsonio writes and status events change exactly the affected roots."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_run(Path(tmp))
+        alpha = run / "ideas" / "01_alpha__alpha_001"
+        beta = run / "ideas" / "02_beta__beta_002"
+        build_manifest(str(run))
+        before = load_manifest(str(run))["tree"]
+        run_root, alpha_root, beta_root = root_hash(str(run)), root_hash(str(alpha)), root_hash(str(beta))
+
+        (alpha / "stages").mkdir()
+        write_json(alpha / "stages" / "stage02.json", {"spec": 1})
+        assert root_hash(str(alpha)) != alpha_root
+        assert root_hash(str(beta)) == beta_root, "Untouched packs keep their root"
+        assert root_hash(str(run)) != run_root
+
+        update_stage_status("02", str(alpha), "completed")
+        changes = diff_trees(before, load_manifest(str(run))["tree"])
+        assert changes["added"] == ["ideas/01_alpha__alpha_001/meta/stage_status.json",
+                                    "ideas/01_alpha__alpha_001/stages/stage02.json", "meta/events.jsonl"]
+        assert changes["changed"] == [] and changes["removed"] == []
+        assert verify_manifest(str(run))["valid"]
+
+    print("✓ Journaled writes update Merkle roots incrementally")
+
+def test_appended_logs_are_hashed_on_load():
+    """Test that log appends journal one marker and are hashed when the manifest is loaded."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_run(Path(tmp))
+        build_manifest(str(run))
+        journal = run / "meta" / "merkle.jsonl"
+
+        for i in range(200):
+            append_jsonl(run / "meta" / "events.jsonl", {"event": i})
+        with open(journal) as f:
+            assert [json.loads(line) for line in f] == [{"path": "meta/events.jsonl", "appended": True}]
+
+        first = root_hash(str(run))
+        assert verify_manifest(str(run))["valid"]
+        append_jsonl(run / "meta" / "events.jsonl", {"event": 200})
+        assert root_hash(str(run)) != first, "Appends after a load are marked again"
+        assert verify_manifest(str(run))["valid"]
+
+    print("✓ Appended logs are hashed once per manifest load")
+
+def test_refresh_and_verify_copies():
+    """Test that refresh picks up out-of-band edits and verify catches tampered copies."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_run(Path(tmp))
+        build_manifest(str(run))
+
+        (run / "ideas" / "02_beta__beta_002" / "stages.md").write_text("# edited\n")
+        (run / "ideas" / "01_alpha__alpha_001" / "stages.md").unlink()
+        changes = refresh_manifest(str(run))
+        assert changes == {"added": [], "changed": ["ideas/02_beta__beta_002/stages.md"],
+                           "removed": ["ideas/01_alpha__alpha_001/stages.md"]}
+        assert refresh_manifest(str(run)) == {"added": [], "changed": [], "removed": []}
+
+        copy = Path(tmp) / "copy"
+        shutil.copytree(run, copy)
+        assert verify_manifest(str(copy))["valid"]
+        (copy / "meta" / "run_manifest.json").write_text("{}")
+        result = verify_manifest(str(copy))
+        assert not result["valid"] and result["changed"] == ["meta/run_manifest.json"]
+
+    print("✓ Refresh and verify detect out-of-band changes")
+
+if __name__ == "__main__":
+    test_writes_update_roots_incrementally()
+    test_appended_logs_are_hashed_on_load()
+    test_refresh_and_verify_copies()
+    print("\n✓ All run manifest tests passed")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed stage output cache.
+"""
+
+import json
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import stage_cache
+
+def _write_json(path: Path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+def test_cache_key_tracks_input_content():
+    """Test that keys depend on input content and model params, not paths."""
+    with tempfile.TemporaryDirectory() as tmp:
+        a = Path(tmp) / "a" / "stage02.json"
+        b = Path(tmp) / "b" / "stage02.json"
+        _write_json(a, {"value": 1})
+        _write_json(b, {"value": 1})
+
+        key_a = stage_cache.compute_cache_key("03", [str(a)])
+        key_b = stage_cache.compute_cache_key("03", [str(b)])
+        assert key_a == key_b, "Identical inputs at different paths should share a key"
+
+        assert key_a != stage_cache.compute_cache_key("03", [str(a)], {"temperature": 0.2})
+        assert key_a != stage_cache.compute_cache_key("04", [str(a)])
+
+        _write_json(b, {"value": 2})
+        assert key_a != stage_cache.compute_cache_key("03", [str(b)])
+
+    print("✓ Stage cache keys are content-addressed")
+
+def test_run_stage_cached_replays_on_hit():
+    """Test that a second run with identical inputs replays instead of executing."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / "cache"
+        input_path = Path(tmp) / "run1" / "stages" / "stage02.json"
+        _write_json(input_path, {"product": "x"})
+        calls = []
+
+        def make_runner(run_dir: Path):
+            def run():
+                calls.append(run_dir)
+                _write_json(run_dir / "stages" / "stage03.json", {"ux": "y"})
+                (run_dir / "spec").mkdir(parents=True, exist_ok=True)
+                (run_dir / "spec" / "03_ux_design.md").write_text("# UX\n")
+            return run
+
+        run1 = Path(tmp) / "run1"
+        first = stage_cache.run_stage_cached(
+            "03", [str(input_path)], str(run1 / "stages" / "stage03.json"), make_runner(run1),
+            spec_path=str(run1 / "spec" / "03_ux_design.md"), cache_dir=cache_dir)
+        assert first["cached"] is False
+
+        run2 = Path(tmp) / "run2"
+        second = stage_cache.run_stage_cached(
+            "03", [str(input_path)], str(run2 / "stages" / "stage03.json"), make_runner(run2),
+            cache_dir=cache_dir)
+        assert second["cached"] is True
+        assert calls == [run1], "Cached stage should not be re-executed"
+        assert (run2 / "spec" / "03_ux_design.md").read_text() == "# UX\n"
+
+        stats = stage_cache.get_cache_stats(cache_dir)
+        assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+    print("✓ Stage cache replays identical runs")
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / "cache"
+        output = Path(tmp) / "stage.json"
+        _write_json(output, {"v": 1})
+
+        stage_cache.store_stage("a" * 64, "02", str(output), cache_dir=cache_dir)
+        stage_cache.store_stage("b" * 64, "02", str(output), cache_dir=cache_dir)
+        assert stage_cache.lookup_stage("a" * 64, cache_dir) is not None
+
+        evicted = stage_cache.evict(cache_dir, max_entries=1)
+        assert evicted == ["b" * 64]
+        assert stage_cache.lookup_stage("b" * 64, cache_dir) is None
+        assert stage_cache.get_cache_stats(cache_dir)["evictions"] == 1
+
+    print("✓ Stage cache evicts least recently used entries")
+
+def test_evict_uses_default_cache_dir():
+    """Test that evict() without cache_dir works on the default cache."""
+    original = stage_cache.get_cache_dir
+    with tempfile.TemporaryDirectory() as tmp:
+        stage_cache.get_cache_dir = lambda: Path(tmp) / "cache"
+        try:
+            output = Path(tmp) / "stage.json"
+            _write_json(output, {"v": 1})
+            stage_cache.store_stage("a" * 64, "02", str(output))
+            stage_cache.store_stage("b" * 64, "02", str(output))
+            assert stage_cache.lookup_stage("a" * 64) is not None
+
+            assert stage_cache.evict(max_entries=1) == ["b" * 64]
+            assert stage_cache.lookup_stage("b" * 64) is None
+            assert stage_cache.get_cache_stats()["evictions"] == 1
+        finally:
+            stage_cache.get_cache_dir = original
+
+    print("✓ Stage cache evicts from the default cache directory")
+
+def test_concurrent_stores_keep_every_entry():
+    """Test that parallel stores and lookups do not lose index entries."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / "cache"
+        output = Path(tmp) / "stage.json"
+        _write_json(output, {"v": 1})
+        keys = [f"{i:02x}" * 32 for i in range(16)]
+
+        def store_and_lookup(key):
+            stage_cache.store_stage(key, "02", str(output), cache_dir=cache_dir)
+            return stage_cache.lookup_stage(key, cache_dir) is not None
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            assert all(pool.map(store_and_lookup, keys))
+
+        stats = stage_cache.get_cache_stats(cache_dir)
+        assert stats["entries"] == 16 and stats["stores"] == 16 and stats["hits"] == 16
+        assert len(list((cache_dir / "objects").glob("*/*"))) == 16
+
+    print("✓ Concurrent stores keep every index entry")
+
+if __name__ == "__main__":
+    test_cache_key_tracks_input_content()
+    test_run_stage_cached_replays_on_hit()
+    test_lru_eviction()
+    test_evict_uses_default_cache_dir()
+    test_concurrent_stores_keep_every_entry()
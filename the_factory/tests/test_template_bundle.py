@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the precompiled agent template bundle.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory import template_bundle
+from appfactory.schema_validate import extract_schema_from_template, get_stage_template_path
+
+def test_stage_template_resolution():
+    """Test that stage ids resolve to their canonical templates."""
+    expected = {
+        "01": "01_market_research.md",
+        "1": "01_market_research.md",
+        "01_dream": "01_dream.md",
+        "02.5": "02.5_product_reality.md",
+        "09.7": "09.7_build_contract_synthesis.md",
+        "10": "10_app_builder.md",
+    }
+    for stage_num, filename in expected.items():
+        assert Path(get_stage_template_path(stage_num)).name == filename, stage_num
+
+    print("✓ Stage templates resolve through the bundle")
+
+def test_bundle_matches_direct_extraction():
+    """Test that bundled schemas match a direct parse of the template."""
+    template_path = get_stage_template_path("05")
+    content = Path(template_path).read_text(encoding="utf-8")
+    blocks = template_bundle.extract_json_blocks(content)
+
+    assert extract_schema_from_template(template_path) == blocks[0]["data"]
+    assert content[blocks[0]["offset"]:].startswith("```json")
+
+    # Callers may mutate the returned schema without corrupting the bundle
+    schema = extract_schema_from_template(template_path)
+    schema.clear()
+    assert extract_schema_from_template(template_path) == blocks[0]["data"]
+
+    print("✓ Bundled schema matches template content")
+
+def test_sections_skip_code_fences():
+    """Test that headings inside fenced code are not treated as sections."""
+    content = "# Title\n\n```bash\n# not a heading\n```\n\n## Inputs\n"
+    sections = template_bundle.extract_sections(content)
+    assert [(s["title"], s["level"]) for s in sections] == [("Title", 1), ("Inputs", 2)]
+    assert content[sections[1]["offset"]:].startswith("## Inputs")
+
+    print("✓ Section offsets ignore fenced code")
+
+def test_bundle_sees_templates_edited_in_place():
+    """Test that a template rewritten in place is re-read on the next lookup."""
+    original = (template_bundle.get_repo_root, template_bundle._bundle)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "templates" / "agents").mkdir(parents=True)
+        template = root / "templates" / "agents" / "06_market.md"
+        template.write_text("# Market\n\n```json\n{\"ok\": true}\n```\n")
+
+        template_bundle.get_repo_root = lambda: root
+        template_bundle._bundle = None
+        try:
+            template_path = get_stage_template_path("06")
+            assert extract_schema_from_template(template_path) == {"ok": True}
+
+            # Rewrite the same file (no rename, so the directory mtime is unchanged)
+            dir_stat = template.parent.stat()
+            with open(template, "w") as f:
+                f.write("# Market\n\n```json\n{\"ok\": false, \"tam\": 1}\n```\n")
+            os.utime(template.parent, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+            assert extract_schema_from_template(template_path) == {"ok": False, "tam": 1}
+        finally:
+            template_bundle.get_repo_root, template_bundle._bundle = original
+
+    print("✓ Template bundle picks up templates edited in place")
+
+if __name__ == "__main__":
+    test_stage_template_resolution()
+    test_bundle_matches_direct_extraction()
+    test_sections_skip_code_fences()
+    test_bundle_sees_templates_edited_in_place()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test the stage token budget analyzer.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.prompt_assembly import estimate_tokens
+from appfactory.token_budget import analyze_budget
+
+def test_estimate_tokens_counts_words_and_symbols():
+    """Test the offline tokenizer approximation."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("build the app") == 3
+    assert estimate_tokens('{"a": 1}') == 7
+    assert estimate_tokens("internationalization") == 5, "Long words split into 4-char pieces"
+
+    print("✓ Token estimate counts words and symbols")
+
+def test_budget_flags_stage_and_attributes_inputs():
+    """Test per-input attribution, budget flagging and summarization suggestions."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = Path(tmp) / "batch-demo"
+        (run / "stage01" / "stages").mkdir(parents=True)
+        with open(run / "stage01" / "stages" / "stage01.json", 'w') as f:
+            json.dump({"ideas": ["tiny"]}, f)
+
+        pack = run / "ideas" / "01_a__a"
+        (pack / "stages").mkdir(parents=True)
+        (pack / "meta").mkdir()
+        with open(pack / "stages" / "stage02.json", 'w') as f:
+            json.dump({"notes": ["word"] * 5000}, f)
+        with open(pack / "meta" / "stage_status.json", 'w') as f:
+            json.dump({"stages_completed": ["01", "02"], "stages_remaining": ["03"]}, f)
+
+        report = analyze_budget(str(pack), budget=20000)
+        stages = {stage["stage"]: stage for stage in report["stages"]}
+        assert list(stages) == ["02", "03"], "Recorded stages plus the pending next stage"
+
+        stage03 = stages["03"]
+        assert stage03["inputs"][0]["path"] == "ideas/01_a__a/stages/stage02.json"
+        assert stage03["inputs"][0]["tokens"] > stage03["inputs"][1]["tokens"]
+        assert stage03["over_budget"]
+        assert stage03["suggestions"][0]["path"] == "ideas/01_a__a/stages/stage02.json"
+        assert sum(s["savings"] for s in stage03["suggestions"]) >= stage03["overage"]
+        assert not stages["02"]["over_budget"]
+
+    print("✓ Budget flags large stages and attributes inputs")
+
+if __name__ == "__main__":
+    test_estimate_tokens_counts_words_and_symbols()
+    test_budget_flags_stage_and_attributes_inputs()
+    print("\n✓ All token budget tests passed")
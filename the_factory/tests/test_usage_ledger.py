@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test the per-run usage ledger and the usage report.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import appfactory modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from appfactory.usage_ledger import (
+    estimate_cost, materialize_usage_summary, record_usage, usage_report
+)
+
+def make_run(runs_dir: Path, run_id: str, mode: str) -> Path:
+    """Create a run directory with a manifest declaring its mode."""
+    run = runs_dir / "2026-01-08" / run_id
+    (run / "meta").mkdir(parents=True)
+    with open(run / "meta" / "run_manifest.json", 'w') as f:
+        json.dump({"run_id": run_id, "mode": mode}, f)
+    return run
+
+def test_ledger_rolls_up_incrementally():
+    """Test that ledger lines roll up into usage_summary.json by stage and pack."""
+    with tempfile.TemporaryDirectory() as tmp:
+        run = make_run(Path(tmp), "batch-demo", "pipeline")
+        pack = run / "ideas" / "01_demo__demo_001"
+        pack.mkdir(parents=True)
+
+        record_usage(str(run), "01", input_tokens=1000, output_tokens=500, latency_s=2.0)
+        record = record_usage(str(pack), "02", input_tokens=2000, output_tokens=1000,
+                              cache_read_tokens=4000, latency_s=3.0, retries=1)
+        assert record["pack"] == "01_demo__demo_001"
+        assert record["cost_usd"] == estimate_cost(record["model"], 2000, 1000, 0, 4000)
+
+        summary = materialize_usage_summary(str(run))
+        assert summary["totals"]["calls"] == 2
+        assert summary["stages"]["02"]["cache_read_tokens"] == 4000
+        assert summary["packs"]["_run"]["input_tokens"] == 1000
+        assert summary["totals"]["retries"] == 1
+
+        record_usage(str(pack), "03", output_tokens=10)
+        summary = materialize_usage_summary(str(run))
+        assert summary["totals"]["calls"] == 3
+        assert summary["packs"]["01_demo__demo_001"]["calls"] == 2
+
+    print("✓ Usage ledger rolls up incrementally")
+
+def test_report_groups_and_build_cost():
+    """Test report grouping by mode and cost per successful build."""
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = Path(tmp)
+        dream = make_run(runs_dir, "dream-demo", "dream")
+        pipeline = make_run(runs_dir, "pipeline-demo", "pipeline")
+        for name in ["01_alpha__alpha_001", "02_beta__beta_002"]:
+            (pipeline / "ideas" / name).mkdir(parents=True)
+        # Batch runs key the idea index by idea id; the slug only matches through it
+        with open(pipeline / "meta" / "idea_index.json", 'w') as f:
+            json.dump({"ideas": {
+                "alpha_001": {"slug": "alpha_app", "directory": "01_alpha__alpha_001"},
+                "beta_002": {"slug": "beta_app", "directory": "02_beta__beta_002"},
+            }}, f)
+
+        record_usage(str(dream), "02", input_tokens=1_000_000)
+        record_usage(str(pipeline), "01", input_tokens=1_000_000)
+        record_usage(str(pipeline / "ideas" / "01_alpha__alpha_001"), "02", output_tokens=100_000)
+
+        by_mode = usage_report("mode", str(runs_dir))
+        assert by_mode["groups"]["dream"]["cost_usd"] == 3.0
+        assert by_mode["groups"]["pipeline"]["calls"] == 2
+
+        registry = {"builds": [
+            {"buildId": "b1", "name": "Alpha", "status": "success",
+             "origin": {"mode": "pipeline", "runId": "pipeline-demo", "ideaSlug": "alpha_app"}},
+            {"buildId": "b2", "name": "Dream", "status": "failed",
+             "origin": {"mode": "dream", "runId": "dream-demo", "ideaSlug": "dream"}},
+        ]}
+        by_build = usage_report("build", str(runs_dir), registry)
+        # Alpha pays for its own pack plus half of the shared stage01 research
+        assert by_build["groups"]["b1"]["cost_usd"] == 1.5 + 1.5
+        assert by_build["successful_builds"] == 1
+        assert by_build["cost_per_successful_build"] == 3.0
+
+    print("✓ Usage report groups by mode and prices successful builds")
+
+if __name__ == "__main__":
+    test_ledger_rolls_up_incrementally()
+    test_report_groups_and_build_cost()
+    print("\n✓ All usage ledger tests passed")